@@ -0,0 +1,324 @@
+"""
+ArtifactStore - Content-addressed storage for CAD and G-code outputs.
+
+save_cad_artifact used to shutil.copy2 every STL to a timestamp-plus-prompt
+name next to CadAgent's own output_<timestamp>.stl, so each model was on
+disk twice, and identical geometry from repeated iterations or other
+projects was stored again every time. Now:
+
+- Files are hashed with BLAKE2b and stored once, as
+  workspace/artifacts/blobs/<first 2 hex>/<hash>
+- The names in the project (cad/..., gcode/...) are links to the blob: a
+  reflink (copy-on-write clone) where the filesystem supports it, otherwise
+  a hardlink, otherwise a copy (other volume, FAT, ...). The file that was
+  ingested is itself replaced by a link, so a duplicate costs no disk
+- A catalog records prompt, script hash (the build123d script that made the
+  model), slicer profile, kind, project and path for every saved artifact.
+  It is an append-only catalog.jsonl, loaded once into dicts, so lookups by
+  hash or by prompt are O(1)
+
+    store = ArtifactStore(workspace / "artifacts")
+    record = store.put(stl, kind="stl", prompt=prompt, script=script_path, dest=named_path)
+    store.get(record["hash"]); store.find_by_prompt(prompt, kind="stl")
+
+Hardlinked names share their data (and mode) with the blob, so an in-place
+write to one would change the blob and every other project's copy. Blobs
+are therefore made read-only once stored, and code that writes into a
+project (the write_file tool) calls break_link() first, which drops a shared
+name so the write creates a new file. Only files that are never rewritten
+at the same name are adopted: CadAgent's STLs get a new timestamped name on
+every run. G-code (the slicer reuses gcode/<stl name>.gcode) and the build
+script (current_design.py) are rewritten in place, so they are stored by
+hash but never linked.
+
+prune() drops the catalog entries whose files are gone (e.g. the temp project
+cleared at startup) and the blobs nothing refers to any more.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+CATALOG_FILE = "catalog.jsonl"
+BLOBS_DIR = "blobs"
+DIGEST_SIZE = 32
+_CHUNK = 1024 * 1024
+_FICLONE = 0x40049409  # Linux ioctl: share the extents of another file (btrfs, XFS, ...)
+
+
+def hash_file(path) -> str:
+    """BLAKE2b hex digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def break_link(path) -> bool:
+    """Removes `path` if it shares its data with other names (a stored artifact), so writing
+    to it afterwards creates a new file instead of changing the blob. True if it was removed."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if st.st_nlink < 2 and st.st_mode & stat.S_IWRITE:
+        return False
+    if os.name == "nt":
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)  # Windows won't delete read-only files
+    os.unlink(path)
+    return True
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.lower().split())
+
+
+class ArtifactStore:
+    def __init__(self, root, link: str = "auto"):
+        if link not in LINK_MODES:
+            raise ValueError(f"Unknown link mode '{link}'. Use one of: {', '.join(LINK_MODES)}")
+        self.root = Path(root)
+        self.link = link
+        self.blobs_dir = self.root / BLOBS_DIR
+        self.catalog_path = self.root / CATALOG_FILE
+        self._lock = threading.Lock()
+        self._reflink_ok = fcntl is not None and link in ("auto", "reflink")
+        self._loaded = False
+        self._records: List[Dict] = []
+        self._by_hash: Dict[str, Dict] = {}  # hash -> latest record
+        self._by_prompt: Dict[tuple, Dict] = {}  # (kind, normalized prompt) -> latest record
+
+        # Stats
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+        self.links = {"reflink": 0, "hardlink": 0, "copy": 0}
+
+    # --- Catalog ---
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line
+                    if isinstance(record, dict) and record.get("hash"):
+                        self._index(record)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[ARTIFACTS] [WARN] Cannot read {self.catalog_path}: {e}")
+
+    def _index(self, record: Dict):
+        self._records.append(record)
+        self._by_hash[record["hash"]] = record
+        if record.get("prompt"):
+            self._by_prompt[(record.get("kind"), normalize_prompt(record["prompt"]))] = record
+
+    def _append(self, record: Dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.catalog_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self._index(record)
+
+    # --- Blobs ---
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+
+    @staticmethod
+    def _seal(blob: Path):
+        """Blobs are immutable: read-only, so an in-place write to a linked name fails."""
+        try:
+            os.chmod(blob, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        except OSError as e:
+            print(f"[ARTIFACTS] [WARN] Cannot make {blob} read-only: {e}")
+
+    def _clone(self, src: Path, dst: Path, hardlink: bool, copy: bool = True) -> Optional[str]:
+        """Makes `dst` (replaced atomically) share or copy `src`'s data. Returns how, None if not done."""
+        tmp = dst.with_name(dst.name + ".tmp")
+        if tmp.exists():
+            tmp.unlink()
+        mode = None
+        if self._reflink_ok:
+            try:
+                with open(src, "rb") as s, open(tmp, "wb") as d:
+                    fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+                mode = "reflink"
+            except OSError as e:
+                tmp.unlink(missing_ok=True)
+                if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS):
+                    self._reflink_ok = False  # Not this filesystem: don't try on every file
+                else:
+                    raise
+        if mode is None and hardlink and self.link in ("auto", "hardlink"):
+            try:
+                os.link(src, tmp)
+                mode = "hardlink"
+            except OSError:
+                pass  # Other volume, or no hardlinks on this filesystem
+        if mode is None:
+            if not copy:
+                return None
+            shutil.copyfile(src, tmp)
+            mode = "copy"
+        os.replace(tmp, dst)
+        self.links[mode] += 1
+        return mode
+
+    def put(self, path, kind: str, prompt: Optional[str] = None, script=None, profile: Optional[str] = None,
+            project: Optional[str] = None, dest=None, adopt: bool = True) -> Dict:
+        """Stores `path` by content and records it in the catalog.
+
+        :param script: Path of the script that produced the file; stored too, its hash is recorded.
+        :param profile: Slicer profile(s) used, for G-code.
+        :param dest: Also link the blob at this path (the name the project sees).
+        :param adopt: Replace `path` itself by a link to the blob, so it costs no extra disk.
+                      False for files that get rewritten in place at the same name.
+        """
+        path = Path(path)
+        with self._lock:
+            self._load()
+            digest = hash_file(path)
+            blob = self.blob_path(digest)
+            size = path.stat().st_size
+            shared = None  # How the new blob shares `path`'s data, if it does
+            if blob.exists():
+                self.deduplicated += 1
+                self.bytes_saved += size
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                shared = self._clone(path, blob, hardlink=adopt)
+                self.stored += 1
+            self._seal(blob)
+            if adopt and shared not in ("reflink", "hardlink") and not self._same_file(path, blob):
+                self._clone(blob, path, hardlink=True, copy=False)  # A second copy would save nothing
+            if dest is not None and not self._same_file(dest, path):
+                dest = Path(dest)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                self._clone(blob, dest, hardlink=True)
+
+            script_hash = None
+            if script is not None and os.path.exists(script):
+                script_hash = hash_file(script)
+                script_blob = self.blob_path(script_hash)
+                if not script_blob.exists():
+                    script_blob.parent.mkdir(parents=True, exist_ok=True)
+                    self._clone(Path(script), script_blob, hardlink=False)
+                    self._seal(script_blob)
+
+            record = {
+                "hash": digest,
+                "kind": kind,
+                "size": size,
+                "prompt": prompt,
+                "script_hash": script_hash,
+                "profile": profile,
+                "project": project,
+                "path": str(dest if dest is not None else path),
+                "created": time.time(),
+            }
+            self._append(record)
+            return record
+
+    @staticmethod
+    def _same_file(a: Path, b: Path) -> bool:
+        try:
+            return os.path.samefile(a, b)
+        except OSError:
+            return False
+
+    # --- Lookups (O(1)) ---
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Latest catalog record for a content hash, or None if unknown or its blob is gone."""
+        with self._lock:
+            self._load()
+            record = self._by_hash.get(digest)
+        if record is None or not self.blob_path(digest).exists():
+            return None
+        return record
+
+    def find_by_prompt(self, prompt: str, kind: str = "stl") -> Optional[Dict]:
+        """Latest artifact of `kind` saved for this prompt (case and whitespace insensitive)."""
+        with self._lock:
+            self._load()
+            record = self._by_prompt.get((kind, normalize_prompt(prompt)))
+        if record is None or not self.blob_path(record["hash"]).exists():
+            return None
+        return record
+
+    def link(self, digest: str, dest) -> Optional[str]:
+        """Links an existing blob at `dest` (e.g. to reuse a model in another project)."""
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            return None
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._clone(blob, dest, hardlink=True)
+        return str(dest)
+
+    # --- Maintenance ---
+
+    def prune(self) -> int:
+        """Drops records whose file no longer exists and blobs no record refers to. Returns blobs removed."""
+        with self._lock:
+            self._load()
+            live = [r for r in self._records if os.path.exists(r["path"])]
+            referenced = {r["hash"] for r in live} | {r["script_hash"] for r in live if r.get("script_hash")}
+            removed = 0
+            if self.blobs_dir.exists():
+                for shard in self.blobs_dir.iterdir():
+                    if not shard.is_dir():
+                        continue
+                    for blob in shard.iterdir():
+                        if blob.name not in referenced:
+                            try:
+                                if os.name == "nt":
+                                    os.chmod(blob, stat.S_IWRITE | stat.S_IREAD)
+                                blob.unlink()
+                                removed += 1
+                            except OSError as e:
+                                print(f"[ARTIFACTS] [WARN] Cannot remove {blob}: {e}")
+            if len(live) != len(self._records):
+                self._records, self._by_hash, self._by_prompt = [], {}, {}
+                for record in live:
+                    self._index(record)
+                tmp = self.catalog_path.with_name(CATALOG_FILE + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(record) + "\n" for record in live)
+                os.replace(tmp, self.catalog_path)
+            if removed:
+                print(f"[ARTIFACTS] Pruned {removed} unreferenced blobs")
+            return removed
+
+    def stats(self) -> Dict:
+        return {
+            "link": self.link,
+            "records": len(self._records),
+            "unique": len(self._by_hash),
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "bytes_saved": self.bytes_saved,
+            "links": dict(self.links),
+        }
@@ -0,0 +1,56 @@
+"""
+Small DSP helpers shared by the audio pipeline stages.
+"""
+
+import numpy as np
+
+
+def pcm_to_float(data: bytes) -> np.ndarray:
+    """Little-endian int16 PCM bytes -> float32 samples in [-1, 1)."""
+    count = len(data) // 2
+    return np.frombuffer(data, dtype="<i2", count=count).astype(np.float32) / 32768.0
+
+
+def float_to_pcm(samples: np.ndarray) -> bytes:
+    """float samples in [-1, 1] -> little-endian int16 PCM bytes (clipped)."""
+    return np.clip(samples * 32768.0, -32768, 32767).astype("<i2").tobytes()
+
+
+class LinearResampler:
+    """
+    Streaming linear-interpolation resampler.
+
+    Keeps the fractional read position and the last input sample between
+    calls, so consecutive chunks join without clicks or drift.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate
+        self.reset()
+
+    def reset(self):
+        self._pos = 1.0  # Read position; index 0 is the previous chunk's last sample
+        self._prev = 0.0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.src_rate == self.dst_rate:
+            return samples
+        if len(samples) == 0:
+            return samples
+
+        buf = np.concatenate(([self._prev], samples))
+        last = len(buf) - 1
+        if self._pos > last:
+            self._pos -= len(samples)
+            self._prev = buf[-1]
+            return np.zeros(0, dtype=samples.dtype)
+
+        count = int((last - self._pos) // self.step) + 1
+        positions = self._pos + self.step * np.arange(count)
+        out = np.interp(positions, np.arange(len(buf)), buf).astype(samples.dtype)
+
+        self._pos = positions[-1] + self.step - last
+        self._prev = buf[-1]
+        return out
@@ -0,0 +1,107 @@
+"""
+EnvelopeAnalyzer - Rate-capped per-band levels of the model's output audio.
+
+The desktop visualizer only needs levels, so instead of broadcasting every
+24 kHz PCM chunk, AudioLoop runs each output chunk through this analyzer and
+emits a fixed-size envelope at most `max_rate_hz` times per second:
+
+    {"bands": [32 floats 0..1], "rms": float, "peak": float}
+
+Band levels are log-spaced RMS magnitudes (dB-scaled to 0..1); "rms" and
+"peak" are time-domain values over all audio since the previous emit.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+DEFAULT_BANDS = 32
+DEFAULT_MAX_RATE_HZ = 30.0
+
+
+class EnvelopeAnalyzer:
+    def __init__(self, sample_rate: int = 24000, bands: int = DEFAULT_BANDS,
+                 max_rate_hz: float = DEFAULT_MAX_RATE_HZ, min_freq: float = 60.0,
+                 max_freq: float = 8000.0, dynamic_range_db: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sample_rate = sample_rate
+        self.bands = bands
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.min_freq = min_freq
+        self.max_freq = min(max_freq, sample_rate / 2)
+        self.dynamic_range_db = dynamic_range_db
+        self.clock = clock
+
+        self._pending = []  # Chunks received since the last emit
+        self._last_emit = None
+        self._edge_cache = {}  # n_fft -> band edge bin indices
+        self._window_cache = {}  # length -> (window, gain)
+
+    def reset(self):
+        self._pending = []
+        self._last_emit = None
+
+    def process(self, data: bytes) -> Optional[Dict]:
+        """
+        Feeds one output chunk. Returns an envelope dict when one is due,
+        otherwise None (the chunk is folded into the next envelope).
+        """
+        if len(data) >= 2:
+            self._pending.append(data)
+
+        now = self.clock()
+        if self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return None
+        if not self._pending:
+            return None
+
+        self._last_emit = now
+        pcm = b"".join(self._pending) if len(self._pending) > 1 else self._pending[0]
+        self._pending = []
+        return self.analyze(pcm)
+
+    def analyze(self, pcm: bytes) -> Dict:
+        """Computes the envelope of a block of int16 PCM (no rate limiting)."""
+        count = len(pcm) // 2
+        if count == 0:
+            return {"bands": [0.0] * self.bands, "rms": 0.0, "peak": 0.0}
+
+        x = np.frombuffer(pcm, dtype="<i2", count=count).astype(np.float32) / 32768.0
+        rms = float(np.sqrt(np.dot(x, x) / count))
+        peak = float(np.abs(x).max())
+
+        # Analyse the most recent 4096 samples at most (~170 ms at 24 kHz)
+        x = x[-4096:]
+        n_fft = max(2048, 1 << (len(x) - 1).bit_length())
+        window, gain = self._window(len(x))
+        spectrum = np.abs(np.fft.rfft(x * window, n=n_fft)) / gain
+
+        edges = self._edges(n_fft)
+        power = spectrum[:edges[-1]] ** 2
+        band_power = np.add.reduceat(power, edges[:-1]) / np.diff(edges)
+        band_db = 10.0 * np.log10(band_power + 1e-12)
+        levels = np.clip(1.0 + band_db / self.dynamic_range_db, 0.0, 1.0)
+
+        return {"bands": levels.round(3).tolist(), "rms": round(rms, 4), "peak": round(peak, 4)}
+
+    def _window(self, length: int):
+        cached = self._window_cache.get(length)
+        if cached is None:
+            window = np.hanning(length).astype(np.float32)
+            # A full-scale sine then reads as amplitude 1.0
+            cached = (window, max(window.sum() / 2.0, 1e-9))
+            self._window_cache[length] = cached
+        return cached
+
+    def _edges(self, n_fft: int) -> np.ndarray:
+        edges = self._edge_cache.get(n_fft)
+        if edges is None:
+            hz_per_bin = self.sample_rate / n_fft
+            freqs = np.geomspace(self.min_freq, self.max_freq, self.bands + 1)
+            edges = np.round(freqs / hz_per_bin).astype(np.int64)
+            # Every band needs at least one bin, even at low frequencies
+            edges = np.maximum(edges, edges[0] + np.arange(self.bands + 1))
+            edges = np.minimum(edges, n_fft // 2 + 1)
+            self._edge_cache[n_fft] = edges
+        return edges
@@ -0,0 +1,416 @@
+"""
+Audio I/O threads for AudioLoop.
+
+PyAudio's blocking read()/write() used to go through asyncio.to_thread for
+every 1024-frame chunk, sharing the default executor with CAD, scraper and
+slicer jobs. Instead, one long-lived thread owns each stream and exchanges
+chunks with the event loop through single-producer/single-consumer rings:
+
+    mic  -> AudioCaptureThread  -> SpscRingBuffer -> listen_audio (loop)
+    play_audio (loop) -> SpscRingBuffer -> AudioPlaybackThread -> speaker
+                                           (-> JitterBuffer, optional)
+
+The loop is only woken (call_soon_threadsafe) when it is actually waiting.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class SpscRingBuffer:
+    """
+    Fixed-capacity ring for exactly one producer thread and one consumer thread.
+
+    No locks: the producer only writes _tail, the consumer only writes _head,
+    and each index is published after its slot is filled/cleared. Under the
+    GIL single attribute stores are atomic, which is all this relies on.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._size = capacity + 1  # One slot kept empty to tell full from empty
+        self._slots = [None] * self._size
+        self._head = 0  # Next slot to read (consumer owned)
+        self._tail = 0  # Next slot to write (producer owned)
+
+    @property
+    def capacity(self) -> int:
+        return self._size - 1
+
+    def push(self, item: Any) -> bool:
+        """Producer side. Returns False (and drops nothing) if the ring is full."""
+        tail = self._tail
+        next_tail = (tail + 1) % self._size
+        if next_tail == self._head:
+            return False
+        self._slots[tail] = item
+        self._tail = next_tail
+        return True
+
+    def pop(self) -> Optional[Any]:
+        """Consumer side. Returns None if the ring is empty."""
+        head = self._head
+        if head == self._tail:
+            return None
+        item = self._slots[head]
+        self._slots[head] = None
+        self._head = (head + 1) % self._size
+        return item
+
+    def drain(self) -> int:
+        """Consumer side. Discards everything currently queued."""
+        count = 0
+        while self.pop() is not None:
+            count += 1
+        return count
+
+    def __len__(self) -> int:
+        return (self._tail - self._head) % self._size
+
+    def empty(self) -> bool:
+        return self._head == self._tail
+
+    def full(self) -> bool:
+        return (self._tail + 1) % self._size == self._head
+
+
+class ByteRingBuffer:
+    """
+    Fixed-capacity byte FIFO that overwrites the oldest data when full.
+
+    Used for network audio (mobile mic) where the producer must never block
+    and stale audio is worth less than fresh audio. Each write's arrival time
+    is kept, so reads can report how long the returned bytes were queued.
+    Thread-safe (one lock, held only for memory copies).
+    """
+
+    def __init__(self, capacity: int, clock: Callable[[], float] = time.monotonic):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.clock = clock
+        self._buf = bytearray(capacity)
+        self._lock = threading.Lock()
+        self._start = 0  # Index of the oldest byte
+        self._size = 0
+        self._written = 0  # Total bytes ever written (stream offset of the newest byte + 1)
+        self._arrivals = deque()  # (stream offset just past the chunk, arrival time)
+
+        # Stats
+        self.dropped_bytes = 0
+        self.last_delay = 0.0
+        self.max_delay = 0.0
+        self.avg_delay = 0.0  # EMA over reads
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: bytes) -> int:
+        """Appends data, dropping the oldest bytes if needed. Returns bytes dropped."""
+        n = total = len(data)
+        if n == 0:
+            return 0
+        with self._lock:
+            now = self.clock()
+            dropped = 0
+            if n >= self.capacity:
+                # Only the newest `capacity` bytes can survive
+                dropped = self._size + n - self.capacity
+                data = data[-self.capacity:]
+                self._start, self._size, n = 0, 0, self.capacity
+            elif self._size + n > self.capacity:
+                dropped = self._size + n - self.capacity
+                self._start = (self._start + dropped) % self.capacity
+                self._size -= dropped
+
+            end = (self._start + self._size) % self.capacity
+            first = min(n, self.capacity - end)
+            self._buf[end:end + first] = data[:first]
+            if first < n:
+                self._buf[:n - first] = data[first:]
+            self._size += n
+            self._written += total
+            self._arrivals.append((self._written, now))
+            self._prune()
+            self.dropped_bytes += dropped
+            return dropped
+
+    def read(self, max_bytes: Optional[int] = None) -> bytes:
+        """Removes and returns up to max_bytes (default: everything queued)."""
+        with self._lock:
+            n = self._size if max_bytes is None else min(max_bytes, self._size)
+            return self._take(n)
+
+    def read_exact(self, count: int) -> Optional[bytes]:
+        """Frame-sized read: returns exactly `count` bytes, or None if fewer are queued."""
+        with self._lock:
+            if self._size < count:
+                return None
+            return self._take(count)
+
+    def clear(self):
+        with self._lock:
+            self._start = 0
+            self._size = 0
+            self._arrivals.clear()
+
+    def oldest_age(self) -> float:
+        """Seconds the oldest queued byte has been waiting (0.0 if empty)."""
+        with self._lock:
+            if not self._size:
+                return 0.0
+            return self.clock() - self._arrivals[0][1]
+
+    def _take(self, n: int) -> bytes:
+        if n <= 0:
+            return b""
+        first = min(n, self.capacity - self._start)
+        data = bytes(self._buf[self._start:self._start + first])
+        if first < n:
+            data += bytes(self._buf[:n - first])
+
+        # Queue delay of the oldest byte returned (arrivals[0] is its chunk)
+        delay = self.clock() - self._arrivals[0][1]
+        self.last_delay = delay
+        self.max_delay = max(self.max_delay, delay)
+        self.avg_delay = delay if self.avg_delay == 0.0 else 0.9 * self.avg_delay + 0.1 * delay
+
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+        if self._size == 0:
+            self._start = 0
+        self._prune()
+        return data
+
+    def _prune(self):
+        # Forget chunks whose bytes have all been read or overwritten
+        oldest = self._written - self._size  # Stream offset of the oldest queued byte
+        arrivals = self._arrivals
+        while arrivals and arrivals[0][0] <= oldest:
+            arrivals.popleft()
+
+    def stats(self) -> Dict:
+        return {
+            "queued_bytes": self._size,
+            "capacity_bytes": self.capacity,
+            "dropped_bytes": self.dropped_bytes,
+            "oldest_age_ms": round(self.oldest_age() * 1000, 1),
+            "last_delay_ms": round(self.last_delay * 1000, 1),
+            "avg_delay_ms": round(self.avg_delay * 1000, 1),
+            "max_delay_ms": round(self.max_delay * 1000, 1),
+        }
+
+
+class _LoopWaiter:
+    """Lets a thread wake a coroutine waiting on the event loop, without polling."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._event = asyncio.Event()
+        self.waiting = False
+
+    def notify(self):
+        """Called from the I/O thread after it made progress."""
+        if self.waiting:
+            self.waiting = False
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, ready):
+        """Waits until ready() is true. Must be called from the loop."""
+        while not ready():
+            self._event.clear()
+            self.waiting = True
+            # Re-check after publishing 'waiting' so a notify can't be missed
+            if ready():
+                self.waiting = False
+                break
+            await self._event.wait()
+
+
+class AudioCaptureThread(threading.Thread):
+    """Reads fixed-size chunks from an input stream into a ring buffer."""
+
+    def __init__(self, stream, chunk_size: int, loop: asyncio.AbstractEventLoop,
+                 capacity: int = 32, read_kwargs: Optional[dict] = None):
+        super().__init__(name="rex-audio-capture", daemon=True)
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.read_kwargs = read_kwargs or {}
+        self.ring = SpscRingBuffer(capacity)
+        self._waiter = _LoopWaiter(loop)
+        self._running = threading.Event()
+        self._running.set()
+
+        self.last_capture_time = None  # time.monotonic() when the chunk last returned by read() was captured
+
+        # Stats (written by the capture thread only)
+        self.chunks_read = 0
+        self.overruns = 0  # Chunks dropped because the loop fell behind
+        self.errors = 0
+
+    def run(self):
+        while self._running.is_set():
+            try:
+                data = self.stream.read(self.chunk_size, **self.read_kwargs)
+            except Exception as e:
+                if not self._running.is_set():
+                    break
+                self.errors += 1
+                print(f"[AUDIO IO] [ERR] Capture read failed: {e}")
+                self._running.wait(0.1)
+                continue
+
+            self.chunks_read += 1
+            if not self.ring.push((time.monotonic(), data)):
+                self.overruns += 1
+            self._waiter.notify()
+
+    async def read(self) -> bytes:
+        """Returns the next captured chunk, waiting on the loop if none is ready."""
+        item = self.ring.pop()
+        if item is None:
+            await self._waiter.wait(lambda: not self.ring.empty())
+            item = self.ring.pop()
+        self.last_capture_time, data = item
+        return data
+
+    def drain(self) -> int:
+        """Drops queued chunks (e.g. while paused). Call from the loop."""
+        return self.ring.drain()
+
+    def stop(self, timeout: float = 0.5):
+        self._running.clear()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+
+class AudioPlaybackThread(threading.Thread):
+    """Writes chunks from a ring buffer to an output stream."""
+
+    def __init__(self, stream, loop: asyncio.AbstractEventLoop, capacity: int = 4,
+                 close_stream: bool = True, on_write: Optional[Callable[[bytes], None]] = None,
+                 jitter_buffer=None):
+        """
+        :param on_write: Called on the playback thread with each chunk right
+                         after it was written (e.g. the echo canceller's reference).
+        :param jitter_buffer: Optional JitterBuffer (owned by this thread). When
+                              set, chunks are re-blocked into fixed device periods.
+        """
+        super().__init__(name="rex-audio-playback", daemon=True)
+        self.stream = stream
+        self.close_stream = close_stream
+        self.on_write = on_write
+        self.jitter_buffer = jitter_buffer
+        self.ring = SpscRingBuffer(capacity)
+        self._waiter = _LoopWaiter(loop)
+        self._data_ready = threading.Event()
+        self._flush_requested = False
+        self._running = threading.Event()
+        self._running.set()
+
+        # Stats (written by the playback thread only)
+        self.chunks_written = 0
+        self.errors = 0
+
+    def run(self):
+        try:
+            while self._running.is_set():
+                if self._flush_requested:
+                    self._flush_requested = False
+                    self.ring.drain()
+                    if self.jitter_buffer:
+                        self.jitter_buffer.flush()
+                    self._waiter.notify()
+
+                self._data_ready.clear()
+                if self.jitter_buffer:
+                    data = self._next_period()
+                else:
+                    data = self.ring.pop()
+                    if data is None:
+                        self._data_ready.wait(0.1)
+                    else:
+                        # A slot just freed up - let a blocked play_audio continue
+                        self._waiter.notify()
+                if data is None:
+                    continue
+
+                try:
+                    self.stream.write(data)
+                    self.chunks_written += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[AUDIO IO] [ERR] Playback write failed: {e}")
+                    continue
+
+                if self.on_write:
+                    try:
+                        self.on_write(data)
+                    except Exception as e:
+                        print(f"[AUDIO IO] [ERR] on_write callback failed: {e}")
+        finally:
+            if self.close_stream:
+                try:
+                    self.stream.close()
+                except Exception:
+                    pass
+
+    def _fill_jitter_buffer(self):
+        moved = False
+        while self.jitter_buffer.wants_data():
+            data = self.ring.pop()
+            if data is None:
+                break
+            self.jitter_buffer.push(data)
+            moved = True
+        if moved:
+            self._waiter.notify()
+
+    def _next_period(self) -> Optional[bytes]:
+        """Next block to write from the jitter buffer, or None (after waiting a bit)."""
+        jb = self.jitter_buffer
+        self._fill_jitter_buffer()
+        data = jb.read_period()
+        if data is not None:
+            return data
+
+        if jb.playing:
+            # The device still holds about one period - give late audio half of it
+            self._data_ready.wait(jb.period_seconds / 2)
+            if self._flush_requested:
+                return None
+            self._fill_jitter_buffer()
+            data = jb.read_period()
+            return data if data is not None else jb.drain_tail()
+
+        # Priming: wake up on new audio, or when queued audio has waited long enough
+        self._data_ready.wait(jb.target_seconds if jb.depth_bytes else 0.1)
+        return None
+
+    def stats(self) -> dict:
+        result = {"chunks_written": self.chunks_written, "errors": self.errors, "queued_chunks": len(self.ring)}
+        if self.jitter_buffer:
+            result.update(self.jitter_buffer.stats())
+        return result
+
+    async def write(self, data: bytes):
+        """Queues a chunk for playback, waiting on the loop while the ring is full."""
+        if not self.ring.push(data):
+            await self._waiter.wait(lambda: not self.ring.full())
+            self.ring.push(data)
+        self._data_ready.set()
+
+    def flush(self):
+        """Drops queued audio on the playback thread (e.g. user interruption)."""
+        self._flush_requested = True
+        self._data_ready.set()
+
+    def stop(self, timeout: float = 0.5):
+        self._running.clear()
+        self._data_ready.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
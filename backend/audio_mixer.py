@@ -0,0 +1,132 @@
+"""
+InputMixer - Combines the desktop mic and mobile (call) audio into one stream.
+
+listen_audio used to throw the mic chunk away whenever the mobile queue had
+anything in it and send one mobile chunk instead, whatever its size or rate.
+Now every mic read is one frame of the output clock:
+
+    mobile PCM (any rate) -> LinearResampler -> backlog (float, SEND rate)
+    mic frame (CHUNK_SIZE) + same-length slice of the backlog -> mix -> model
+
+Modes:
+- "mix"     : mic * mic_gain + mobile * mobile_gain
+- "duck"    : like mix, but the mic is attenuated to duck_gain while the
+              mobile side is active (caller stays intelligible) - default
+- "replace" : mobile only while it is active (the old behaviour, but aligned)
+
+The backlog is capped at max_backlog_ms; older mobile audio is dropped so a
+call never drifts seconds behind the desktop mic.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from audio_dsp import LinearResampler, float_to_pcm, pcm_to_float
+
+MIX_MODES = ("mix", "duck", "replace")
+
+
+class InputMixer:
+    def __init__(self, sample_rate: int = 16000, mode: str = "duck", mic_gain: float = 1.0,
+                 mobile_gain: float = 1.0, duck_gain: float = 0.3, activity_level: float = 0.01,
+                 max_backlog_ms: float = 200.0, prebuffer_ms: float = 40.0):
+        """
+        :param activity_level: Mobile RMS (0..1) above which the mobile side counts as active.
+        :param max_backlog_ms: Mobile audio older than this is dropped.
+        :param prebuffer_ms: Mobile audio collected before it starts being mixed in
+                             (absorbs network jitter without gaps).
+        """
+        if mode not in MIX_MODES:
+            raise ValueError(f"Unknown mix mode '{mode}'. Use one of: {', '.join(MIX_MODES)}")
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.mic_gain = mic_gain
+        self.mobile_gain = mobile_gain
+        self.duck_gain = duck_gain
+        self.activity_level = activity_level
+        self.max_backlog = int(sample_rate * max_backlog_ms / 1000)
+        self.prebuffer = int(sample_rate * prebuffer_ms / 1000)
+
+        self._resampler = None
+        self._mobile_rate = None
+        self.reset()
+
+    def reset(self):
+        self._backlog = np.zeros(0, dtype=np.float32)
+        self._carry = b""  # Odd trailing byte of the last mobile packet
+        self._flowing = False  # Backlog has been primed
+        self._mic_level = 1.0  # Current mic gain (ramped while ducking)
+        if self._resampler:
+            self._resampler.reset()
+
+        self.frames_mixed = 0
+        self.mobile_underruns = 0
+        self.dropped_samples = 0
+
+    @property
+    def backlog_ms(self) -> float:
+        return len(self._backlog) / self.sample_rate * 1000
+
+    def push_mobile(self, data: bytes, sample_rate: int = 16000):
+        """Queues mobile PCM (int16 mono) recorded at `sample_rate`."""
+        if sample_rate != self._mobile_rate:
+            self._mobile_rate = sample_rate
+            self._resampler = LinearResampler(sample_rate, self.sample_rate)
+
+        data = self._carry + bytes(data)
+        if len(data) % 2:
+            data, self._carry = data[:-1], data[-1:]
+        else:
+            self._carry = b""
+        if not data:
+            return
+
+        samples = self._resampler.process(pcm_to_float(data))
+        self._backlog = np.concatenate((self._backlog, samples))
+        overflow = len(self._backlog) - self.max_backlog
+        if overflow > 0:
+            self._backlog = self._backlog[overflow:]
+            self.dropped_samples += overflow
+
+    def mix(self, mic: bytes) -> bytes:
+        """Mixes one mic frame with the matching slice of mobile audio."""
+        if not self._flowing:
+            if len(self._backlog) < max(self.prebuffer, 1):
+                return mic  # Nothing from mobile (yet): mic passes through untouched
+            self._flowing = True
+
+        mic_samples = pcm_to_float(mic)
+        n = len(mic_samples)
+        mobile = self._backlog[:n]
+        self._backlog = self._backlog[n:]
+        if len(mobile) < n:
+            # Mobile stream stalled or ended - re-prime before mixing it again
+            self.mobile_underruns += 1
+            self._flowing = False
+            mobile = np.pad(mobile, (0, n - len(mobile)))
+
+        self.frames_mixed += 1
+        mobile = mobile * self.mobile_gain
+        active = float(np.sqrt(np.dot(mobile, mobile) / max(n, 1))) > self.activity_level
+
+        if self.mode == "replace":
+            return float_to_pcm(mobile) if active else mic
+        if self.mode == "duck":
+            target = self.duck_gain if active else 1.0
+            # Ramp across the frame so ducking doesn't click
+            gain = np.linspace(self._mic_level, target, n, dtype=np.float32)
+            self._mic_level = target
+            out = mic_samples * (gain * self.mic_gain) + mobile
+        else:
+            out = mic_samples * self.mic_gain + mobile
+        return float_to_pcm(out)
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "backlog_ms": round(self.backlog_ms, 1),
+            "frames_mixed": self.frames_mixed,
+            "mobile_underruns": self.mobile_underruns,
+            "dropped_ms": round(self.dropped_samples / self.sample_rate * 1000, 1),
+        }
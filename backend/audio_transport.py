@@ -0,0 +1,52 @@
+"""
+Audio transport for Socket.IO clients.
+
+Model audio used to be emitted as {'data': list(bytes)}, i.e. a JSON array of
+Python ints per 24 kHz chunk. It is now sent as a binary attachment, and
+clients choose what they receive with the 'set_audio_transport' event:
+
+- "pcm"      : full PCM chunks as binary ('audio_data' event, default)
+- "envelope" : visualizer-only band levels ('audio_envelope' event, ~30 Hz,
+               computed by AudioLoop - see audio_envelope.py)
+- "off"      : no model audio at all
+"""
+
+from typing import Dict
+
+AUDIO_TRANSPORT_MODES = ("pcm", "envelope", "off")
+DEFAULT_AUDIO_TRANSPORT = "pcm"
+
+
+def audio_room(mode: str) -> str:
+    """Socket.IO room that receives a given transport mode."""
+    return f"audio:{mode}"
+
+
+class AudioTransportRegistry:
+    """Tracks which transport each connected client asked for."""
+
+    def __init__(self):
+        self._modes: Dict[str, str] = {}
+
+    def set_mode(self, sid: str, mode: str) -> str:
+        """Records a client's mode. Returns the previous mode (or None)."""
+        if mode not in AUDIO_TRANSPORT_MODES:
+            raise ValueError(f"Unknown audio transport '{mode}'. Use one of: {', '.join(AUDIO_TRANSPORT_MODES)}")
+        previous = self._modes.get(sid)
+        self._modes[sid] = mode
+        return previous
+
+    def get_mode(self, sid: str) -> str:
+        return self._modes.get(sid, DEFAULT_AUDIO_TRANSPORT)
+
+    def remove(self, sid: str):
+        self._modes.pop(sid, None)
+
+    def has_clients(self, mode: str) -> bool:
+        return mode in self._modes.values()
+
+    def counts(self) -> Dict[str, int]:
+        result = {mode: 0 for mode in AUDIO_TRANSPORT_MODES}
+        for mode in self._modes.values():
+            result[mode] += 1
+        return result
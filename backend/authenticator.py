@@ -8,16 +8,19 @@ import base64
 import numpy as np
 import urllib.request
 
+import cpu_tasks
+
 class FaceAuthenticator:
     # MediaPipe Face Landmarker model URL
     MODEL_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
     MODEL_PATH = os.path.join(os.path.dirname(__file__), "face_landmarker.task")
     
-    def __init__(self, reference_image_path="reference.jpg", on_status_change=None, on_frame=None):
+    def __init__(self, reference_image_path="reference.jpg", on_status_change=None, on_frame=None, process_pool=None):
         """
         :param reference_image_path: Path to the user's reference photo.
         :param on_status_change: Async callback(is_authenticated: bool).
         :param on_frame: Async callback(frame_data_b64: str) to send frames to frontend.
+        :param process_pool: Optional ProcessPool; landmark extraction then runs in its workers.
         """
         self.reference_image_path = reference_image_path
         self.on_status_change = on_status_change
@@ -27,9 +30,11 @@ class FaceAuthenticator:
         self.running = False
         self.reference_landmarks = None
         self.landmarker = None
+        self.process_pool = process_pool
 
         self._ensure_model()
-        self._init_landmarker()
+        if self.process_pool is None:
+            self._init_landmarker()
         self._load_reference()
 
     def _ensure_model(self):
@@ -66,6 +71,8 @@ class FaceAuthenticator:
         Extract normalized face landmarks from an RGB image.
         Returns a flattened numpy array of (x, y, z) coordinates, or None if no face found.
         """
+        if self.process_pool is not None:
+            return self._extract_landmarks_in_pool(image_rgb)
         if self.landmarker is None:
             return None
         
@@ -83,6 +90,18 @@ class FaceAuthenticator:
             print(f"[AUTH] [ERR] Landmark extraction failed: {e}")
             return None
 
+    def _extract_landmarks_in_pool(self, image_rgb):
+        """Same as _extract_landmarks, with the landmarker living in a pool worker."""
+        if not os.path.exists(self.MODEL_PATH):
+            return None
+        try:
+            coords = self.process_pool.call(
+                cpu_tasks.face_landmarks, image_rgb.tobytes(), image_rgb.shape, self.MODEL_PATH)
+            return None if coords is None else np.frombuffer(coords, dtype=np.float32)
+        except Exception as e:
+            print(f"[AUTH] [ERR] Landmark extraction failed: {e}")
+            return None
+
     def _compare_landmarks(self, landmarks1, landmarks2, threshold=0.15):
         """
         Compare two landmark vectors using cosine similarity.
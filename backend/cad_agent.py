@@ -1,6 +1,5 @@
 import os
 import json
-import asyncio
 from datetime import datetime
 from google import genai
 from google.genai import types
@@ -8,15 +7,20 @@ from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from cad_worker_pool import get_cad_worker_pool
+
 load_dotenv()
 
 class CadAgent:
-    def __init__(self, on_thought=None, on_status=None):
+    def __init__(self, on_thought=None, on_status=None, script_runner=None):
         self.client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
         # Using Gemini 2.0 Flash for better availability
         self.model = "gemini-2.0-flash-exp"
         self.on_thought = on_thought  # Callback for streaming thoughts 
         self.on_status = on_status  # Callback for retry status info
+        self.script_runner = script_runner or get_cad_worker_pool()
+        # Import build123d in the workers while the first script is still being written
+        self.script_runner.warm()
         
         self.system_instruction = """
 You are a Python-based 3D CAD Engineer using the `build123d` library.
@@ -153,25 +157,12 @@ export_stl(result_part, 'output.stl')
                 print(f"[CadAgent DEBUG] [EXEC] Running local script: {script_path}")
                 
                 # 4. Execute Locally
-                import subprocess
-                import sys
-                
-                # Use the current Python interpreter (unified environment with build123d + mediapipe)
-                try:
-                    proc = await asyncio.to_thread(
-                        subprocess.run,
-                        [sys.executable, script_path],
-                        capture_output=True,
-                        text=True
-                    )
-                    stdout, stderr = proc.stdout, proc.stderr
-                except Exception as e:
-                     print(f"[CadAgent DEBUG] [ERR] Subprocess run failed: {e}")
-                     proc = type('obj', (object,), {'returncode': 1})
-                     stdout = ""
-                     stderr = str(e)
+                # In a warm worker with build123d already imported (see cad_worker_pool.py)
+                result = await self.script_runner.run(script_path, output_stl)
+                stdout, stderr = result.stdout, result.stderr
+                print(f"[CadAgent DEBUG] [EXEC] Script finished in {result.elapsed_ms:.0f} ms ({'warm worker' if result.warm else 'subprocess'})")
                 
-                if proc.returncode != 0:
+                if result.returncode != 0:
                     error_msg = stderr
                     # Extract a concise error message for display
                     error_lines = error_msg.strip().split('\n')
@@ -201,19 +192,11 @@ Original request: {prompt}
                 print(f"[CadAgent DEBUG] [OK] Script executed successfully.")
                 
                 # 5. Read Output
-                if os.path.exists(output_stl):
+                # Read + base64-encoded by the worker that ran the script
+                payload = result.payload
+                if payload is not None:
                     print(f"[CadAgent DEBUG] [file] '{output_stl}' found.")
-                    with open(output_stl, "rb") as f:
-                        stl_data = f.read()
-                        
-                    import base64
-                    b64_stl = base64.b64encode(stl_data).decode('utf-8')
-                    
-                    return {
-                        "format": "stl",
-                        "data": b64_stl,
-                        "file_path": output_stl
-                    }
+                    return payload
                 else:
                      print(f"[CadAgent DEBUG] [ERR] '{output_stl}' was not generated.")
                      # If script ran but no output, treat as failure and retry?
@@ -371,26 +354,12 @@ Ensure you still export to 'output.stl'.
                 print(f"[CadAgent DEBUG] [EXEC] Running local script: {script_path}")
                 
                 # 4. Execute Locally
-                import subprocess
-                import sys
+                # In a warm worker with build123d already imported (see cad_worker_pool.py)
+                result = await self.script_runner.run(script_path, output_stl)
+                stdout, stderr = result.stdout, result.stderr
+                print(f"[CadAgent DEBUG] [EXEC] Script finished in {result.elapsed_ms:.0f} ms ({'warm worker' if result.warm else 'subprocess'})")
                 
-                # Use asyncio.to_thread for Windows compatibility (asyncio.create_subprocess_exec
-                # throws NotImplementedError on Windows with certain event loop policies)
-                try:
-                    proc = await asyncio.to_thread(
-                        subprocess.run,
-                        [sys.executable, script_path],
-                        capture_output=True,
-                        text=True
-                    )
-                    stdout, stderr = proc.stdout, proc.stderr
-                except Exception as e:
-                    print(f"[CadAgent DEBUG] [ERR] Subprocess run failed: {e}")
-                    proc = type('obj', (object,), {'returncode': 1})()
-                    stdout = ""
-                    stderr = str(e)
-                
-                if proc.returncode != 0:
+                if result.returncode != 0:
                     error_msg = stderr
                     print(f"[CadAgent DEBUG] [ERR] Script Execution Failed:\n{error_msg}")
                     
@@ -407,19 +376,11 @@ Ensure you still export to 'output.stl'.
                 print(f"[CadAgent DEBUG] [OK] Script executed successfully.")
                 
                 # 5. Read Output
-                if os.path.exists(output_stl):
+                # Read + base64-encoded by the worker that ran the script
+                payload = result.payload
+                if payload is not None:
                     print(f"[CadAgent DEBUG] [file] '{output_stl}' found.")
-                    with open(output_stl, "rb") as f:
-                        stl_data = f.read()
-                        
-                    import base64
-                    b64_stl = base64.b64encode(stl_data).decode('utf-8')
-                    
-                    return {
-                        "format": "stl",
-                        "data": b64_stl,
-                        "file_path": output_stl
-                    }
+                    return payload
                 else:
                      print(f"[CadAgent DEBUG] [ERR] '{output_stl}' was not generated.")
                      current_prompt = f"The script executed successfully but '{output_stl}' was not found. Ensure you call `export_stl(result_part, 'output.stl')` at the end."
@@ -0,0 +1,419 @@
+"""
+CadWorkerPool - Warm worker processes for CadAgent's generated build123d scripts.
+
+Every generate_prototype / iterate_prototype attempt used to run
+subprocess.run([sys.executable, script_path]): a fresh interpreter that
+re-imports build123d and OCP - seconds per attempt, up to three attempts
+per request - and then a second trip through the ProcessPool to read the
+STL back. Now:
+
+    pool = get_cad_worker_pool()
+    pool.warm()                                            # workers import build123d in the background
+    result = await pool.run(script_path, output_stl)       # ScriptResult
+    if result.returncode == 0 and result.payload: ...      # payload as cpu_tasks.load_stl_payload
+
+- Workers are started with "spawn" (like ProcessPool: no forked copies of
+  PyAudio streams or sockets) and import `preload` (build123d) once, before
+  their first job; warm() starts them ahead of time
+- Each job runs in a fresh namespace (__name__ == "__main__", its own
+  globals), with stdout/stderr captured; the worker reads the STL it wrote
+  and sends it back over the pipe, already encoded for the frontend
+- A job running past `timeout` is killed with its worker, and so is a worker
+  that crashes; either way a fresh one is started in its place, so a runaway
+  script never holds up the next attempt. Workers are also replaced after
+  `max_jobs` jobs or a MemoryError, since scripts can leave state behind in
+  imported modules
+- `memory_mb` caps each worker's address space (RLIMIT_AS, POSIX only): a
+  script that tries to build something enormous fails with MemoryError
+  instead of taking the machine down. The cap is set after the `preload`
+  imports, so it only limits what the scripts allocate on top of build123d/OCP.
+  get_cad_worker_pool() takes it from REX_CAD_MEMORY_MB (0 = no cap)
+- shutdown() stops the idle workers and kills the ones running a script -
+  the server leaves through os._exit, which skips multiprocessing's cleanup
+- If the workers can't start or can't import build123d, or with
+  backend="subprocess" (REX_CAD_BACKEND=subprocess), scripts run the old way
+  - also the benchmark baseline (benchmarks/bench_cad_pool.py)
+"""
+
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import cpu_tasks
+from voice_metrics import RollingHistogram
+
+BACKENDS = ("pool", "subprocess")
+DEFAULT_PRELOAD = ("build123d",)
+DEFAULT_MEMORY_MB = 4096  # Address space per worker, counting the build123d/OCP import
+
+
+@dataclass
+class ScriptResult:
+    """Outcome of one script run (the fields CadAgent used from subprocess.run, plus the STL)."""
+    returncode: int
+    stdout: str
+    stderr: str
+    payload: Optional[Dict] = None  # cpu_tasks.load_stl_payload of the output, None if not written
+    elapsed_ms: float = 0.0
+    warm: bool = False  # Ran in a pool worker
+
+
+# --- Worker process ---
+
+def _limit_memory(memory_mb: int):
+    if not memory_mb:
+        return
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:  # Windows, or a lower hard limit
+        print(f"[CADPOOL] [WARN] Memory cap not applied: {e}")
+
+
+def _run_job(script_path: str, output_path: str) -> Dict:
+    out, err = io.StringIO(), io.StringIO()
+    namespace = {"__name__": "__main__", "__file__": script_path, "__builtins__": __builtins__}
+    returncode = 0
+    retire = False
+    argv = sys.argv
+    try:
+        with open(script_path, "r", encoding="utf-8") as f:
+            code = compile(f.read(), script_path, "exec")
+        sys.argv = [script_path]
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            exec(code, namespace)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            returncode = e.code if isinstance(e.code, int) else 1
+            if not isinstance(e.code, int):
+                err.write(f"{e.code}\n")
+    except MemoryError:
+        returncode, retire = 1, True  # Hit memory_mb: don't trust what's left of this process
+        err.write(traceback.format_exc())
+    except BaseException:
+        returncode = 1
+        err.write(traceback.format_exc())
+    finally:
+        sys.argv = argv
+        namespace.clear()
+    payload = cpu_tasks.load_stl_payload(output_path) if returncode == 0 else None
+    return {"returncode": returncode, "stdout": out.getvalue(), "stderr": err.getvalue(),
+            "payload": payload, "retire": retire}
+
+
+def _worker_main(conn, preload: Sequence[str], memory_mb: int):
+    try:
+        for module in preload:
+            __import__(module)
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}"))
+        return
+    _limit_memory(memory_mb)  # After the imports: the cap is for the scripts, not build123d itself
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        conn.send(_run_job(*job))
+
+
+class _Worker:
+    def __init__(self, ctx, preload: Sequence[str], memory_mb: int):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, tuple(preload), memory_mb),
+                                   name="cad-worker", daemon=True)
+        self.started = time.perf_counter()
+        self.generation = 0  # Pool generation it belongs to (see CadWorkerPool.shutdown)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.jobs = 0
+
+    def wait_ready(self, timeout: float) -> Optional[str]:
+        """None once the worker has imported `preload`, else why it won't."""
+        if self.ready:
+            return None
+        if not self.conn.poll(timeout):
+            return f"worker not ready after {timeout:.0f}s"
+        try:
+            status, detail = self.conn.recv()
+        except (EOFError, OSError):
+            return f"worker exited during startup (code {self.process.exitcode})"
+        if status != "ready":
+            return detail
+        self.ready = True
+        return None
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1.0)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class CadWorkerPool:
+    def __init__(self, workers: int = 1, timeout: float = 120.0, memory_mb: int = DEFAULT_MEMORY_MB,
+                 max_jobs: int = 50, preload: Sequence[str] = DEFAULT_PRELOAD, startup_timeout: float = 120.0,
+                 backend: str = "pool", process_pool=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.max_jobs = max_jobs
+        self.preload = tuple(preload)
+        self.startup_timeout = startup_timeout
+        self.backend = backend
+        self.process_pool = process_pool  # Reads the STL back on the subprocess path (None: in this process)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._busy = set()  # Checked out, running a script
+        self._generation = 0  # Bumped by shutdown(): workers of an older one are not put back
+        self._lock = threading.Lock()
+        self._started = 0
+        self._disabled: Optional[str] = None  # Why the pool fell back to subprocesses
+
+        # Stats
+        self.warm_runs = 0
+        self.cold_runs = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.respawns = 0
+        self.run_time = RollingHistogram()
+        self.startup_time = RollingHistogram()
+
+    # --- Workers ---
+
+    def _spawn(self) -> Optional[_Worker]:
+        try:
+            worker = _Worker(self._ctx, self.preload, self.memory_mb)
+            worker.generation = self._generation
+            return worker
+        except Exception as e:
+            self._disable(f"cannot start worker: {e}")
+            return None
+
+    def _disable(self, reason: str):
+        if self._disabled is None:
+            print(f"[CADPOOL] [WARN] Falling back to a subprocess per script: {reason}")
+        self._disabled = reason
+
+    def warm(self, wait: bool = False) -> bool:
+        """Starts the workers (and their build123d import) now instead of on the first script.
+
+        :param wait: Block until they are ready. Returns False if the pool isn't usable.
+        """
+        if self.backend != "pool" or self._disabled:
+            return False
+        with self._lock:
+            while self._started < self.workers:
+                worker = self._spawn()
+                if worker is None:
+                    return False
+                self._started += 1
+                self._idle.put(worker)
+        if wait:
+            for _ in range(self.workers):
+                worker = self._checkout()
+                if worker is None:
+                    return False
+                self._release(worker)
+        return True
+
+    def _checkout(self) -> Optional[_Worker]:
+        self.warm()
+        if self._disabled:
+            return None
+        worker = self._idle.get()
+        error = worker.wait_ready(self.startup_timeout)
+        if error is not None:
+            worker.kill()
+            with self._lock:
+                self._started -= 1
+            self._disable(error)
+            self.shutdown()  # The others can't import build123d either
+            return None
+        if worker.jobs == 0 and worker.started:
+            self.startup_time.record((time.perf_counter() - worker.started) * 1000.0)
+            worker.started = 0.0
+        with self._lock:
+            self._busy.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker):
+        with self._lock:
+            self._busy.discard(worker)
+            current = worker.generation == self._generation
+            if current:
+                self._idle.put(worker)
+        if not current:
+            worker.stop()  # The pool was shut down while it ran
+
+    def _replace(self, worker: _Worker, kill: bool):
+        """Retires `worker` and puts a fresh one (importing in the background) in its place."""
+        with self._lock:
+            self._busy.discard(worker)
+            current = worker.generation == self._generation
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        if not current:
+            return  # Shut down meanwhile: nothing to replace
+        self.respawns += 1
+        fresh = self._spawn()
+        if fresh is None:
+            with self._lock:
+                self._started -= 1
+            return
+        self._idle.put(fresh)
+
+    # --- Running scripts ---
+
+    def call(self, script_path: str, output_path: str, timeout: Optional[float] = None) -> ScriptResult:
+        """Runs a generated script and returns its output (blocking; from a thread)."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        worker = self._checkout() if self.backend == "pool" else None
+        if worker is None:
+            result = self._run_subprocess(script_path, output_path, timeout)
+            self.cold_runs += 1
+        else:
+            result = self._run_in_worker(worker, script_path, output_path, timeout)
+            self.warm_runs += 1
+        if result.returncode != 0:
+            self.failed += 1
+        result.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.run_time.record(result.elapsed_ms)
+        return result
+
+    async def run(self, script_path: str, output_path: str, timeout: Optional[float] = None) -> ScriptResult:
+        """Awaitable call(), for coroutines on the event loop."""
+        return await asyncio.to_thread(self.call, script_path, output_path, timeout)
+
+    def _run_in_worker(self, worker: _Worker, script_path: str, output_path: str, timeout: float) -> ScriptResult:
+        try:
+            worker.conn.send((script_path, output_path))
+            if not worker.conn.poll(timeout):
+                self.timeouts += 1
+                self._replace(worker, kill=True)
+                return ScriptResult(1, "", f"TimeoutError: script did not finish within {timeout:.0f}s", warm=True)
+            reply = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self.crashes += 1
+            code = worker.process.exitcode
+            self._replace(worker, kill=True)
+            detail = f"exit code {code}" if code is not None else str(e)
+            return ScriptResult(1, "", f"Script crashed the CAD worker ({detail})", warm=True)
+
+        worker.jobs += 1
+        if reply["retire"] or worker.jobs >= self.max_jobs:
+            self._replace(worker, kill=False)
+        else:
+            self._release(worker)
+        return ScriptResult(reply["returncode"], reply["stdout"], reply["stderr"], reply["payload"], warm=True)
+
+    def _run_subprocess(self, script_path: str, output_path: str, timeout: float) -> ScriptResult:
+        try:
+            proc = subprocess.run([sys.executable, script_path], capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.timeouts += 1
+            return ScriptResult(1, "", f"TimeoutError: script did not finish within {timeout:.0f}s")
+        except Exception as e:
+            print(f"[CADPOOL] [ERR] Subprocess run failed: {e}")
+            return ScriptResult(1, "", str(e))
+        payload = None
+        if proc.returncode == 0:
+            # Read + base64 of large meshes happens in a worker process
+            if self.process_pool is not None:
+                payload = self.process_pool.call(cpu_tasks.load_stl_payload, output_path)
+            else:
+                payload = cpu_tasks.load_stl_payload(output_path)
+        return ScriptResult(proc.returncode, proc.stdout, proc.stderr, payload)
+
+    def shutdown(self):
+        """Stops the idle workers and kills the busy ones (their scripts fail as crashed)."""
+        with self._lock:
+            self._generation += 1
+            idle = []
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+            busy, self._busy = list(self._busy), set()
+            self._started = 0
+        for worker in idle:
+            worker.stop()
+        for worker in busy:
+            worker.kill()
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "subprocess" if self.backend != "pool" or self._disabled else "pool",
+            "workers": self.workers,
+            "fallback_reason": self._disabled,
+            "warm_runs": self.warm_runs,
+            "cold_runs": self.cold_runs,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "respawns": self.respawns,
+            "run_ms": self.run_time.summary(),
+            "startup_ms": self.startup_time.summary(),
+        }
+
+
+_pool: Optional[CadWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def _memory_mb_from_env() -> int:
+    value = os.getenv("REX_CAD_MEMORY_MB")
+    if not value:
+        return DEFAULT_MEMORY_MB
+    try:
+        return max(0, int(value))
+    except ValueError:
+        print(f"[CADPOOL] [WARN] Ignoring REX_CAD_MEMORY_MB={value!r}: not a whole number of MB")
+        return DEFAULT_MEMORY_MB
+
+
+def get_cad_worker_pool() -> CadWorkerPool:
+    """The shared pool for this process (backend from REX_CAD_BACKEND, default "pool";
+    per-worker memory cap from REX_CAD_MEMORY_MB, default DEFAULT_MEMORY_MB, 0 = none)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from process_pool import get_process_pool
+            _pool = CadWorkerPool(backend=os.getenv("REX_CAD_BACKEND", "pool"), memory_mb=_memory_mb_from_env(),
+                                  process_pool=get_process_pool())
+        return _pool
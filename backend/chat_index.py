@@ -0,0 +1,230 @@
+"""
+Chat history reads that don't scale with the size of chat_history.jsonl.
+
+get_recent_chat_history used to readlines() the whole file to return the
+last 10 entries, on every reconnect; long-lived projects reach tens of
+megabytes. Two pieces replace that:
+
+- tail_lines(path, n): seeks back from the end in `block_size` blocks until
+  it has n complete lines - reads O(n) bytes, not the file
+- A sidecar index, chat_history.idx next to the history: one fixed-size
+  record (timestamp float64, byte offset uint64) per line. sync_index()
+  appends records for lines written since its last call; ChatLogWriter
+  calls it on its thread after every batch (see ProjectManager), and
+  readers call it before using the index, so a project that predates the
+  index - or lost the tail of it in a crash - is indexed once and then
+  kept up to date incrementally
+
+    lines = tail_lines(history, 10)
+    entries = ChatIndex(history).read_range(start=t0, end=t1, limit=50)   # O(log n + result)
+
+Records are written in history order and log_chat timestamps come from
+time.time(), so the index is sorted by timestamp and read_range() can
+bisect it; a wall clock stepping backwards only makes a range boundary
+approximate.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from struct import Struct
+from typing import Dict, List, Optional, Tuple
+
+RECORD = Struct("<dQ")  # timestamp, byte offset of the line in the history
+INDEX_SUFFIX = ".idx"
+DEFAULT_BLOCK_SIZE = 64 * 1024
+_WRITE_CHUNK = 8192  # Records per write while indexing
+
+# log_chat writes {"timestamp": ..., ...}; anything else goes through json
+_TIMESTAMP = re.compile(rb'^\{"timestamp": ([0-9.eE+-]+)[,}]')
+
+_lock = threading.Lock()  # sync_index runs on the writer thread and on readers
+_synced: Dict[Path, Tuple[int, int]] = {}  # history -> (records, end of last indexed line)
+
+
+def index_path(history_path) -> Path:
+    return Path(history_path).with_suffix(INDEX_SUFFIX)
+
+
+def tail_lines(path, limit: int, block_size: int = DEFAULT_BLOCK_SIZE) -> List[bytes]:
+    """The last `limit` non-empty lines of a file (without line endings), oldest first."""
+    if limit <= 0:
+        return []
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        newlines = 0
+        lines: List[bytes] = []
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            data = chunk + data
+            newlines += chunk.count(b"\n")
+            # limit + 1 newlines at least: the one ending the last line and the one before the first
+            if newlines > limit:
+                lines = _complete_lines(data, partial_first=pos > 0)
+                if len(lines) >= limit:
+                    break
+        else:
+            lines = _complete_lines(data, partial_first=False)
+    return lines[-limit:]
+
+
+def _complete_lines(data: bytes, partial_first: bool) -> List[bytes]:
+    lines = data.split(b"\n")
+    if partial_first:
+        lines = lines[1:]  # Starts mid-line
+    lines = [line.rstrip(b"\r") for line in lines]
+    return [line for line in lines if line]
+
+
+def _timestamp(line: bytes) -> Optional[float]:
+    match = _TIMESTAMP.match(line)
+    if match:
+        try:
+            return float(match.group(1))
+        except ValueError:
+            pass
+    try:
+        value = json.loads(line).get("timestamp")
+        return float(value) if value is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _indexed_end(history_path: Path, idx_path: Path, count: int, size: int) -> Optional[int]:
+    """End offset of the last indexed line, or None if the index doesn't match the history."""
+    if count == 0:
+        return 0
+    with open(idx_path, "rb") as f:
+        f.seek((count - 1) * RECORD.size)
+        timestamp, offset = RECORD.unpack(f.read(RECORD.size))
+    if offset >= size:
+        return None
+    with open(history_path, "rb") as f:
+        f.seek(offset)
+        line = f.readline()
+    if not line.endswith(b"\n") or _timestamp(line) != timestamp:
+        return None
+    return offset + len(line)
+
+
+def sync_index(history_path) -> int:
+    """Indexes the complete lines appended since the last call. Returns the number of records added."""
+    history_path = Path(history_path)
+    idx_path = index_path(history_path)
+    with _lock:
+        try:
+            size = history_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        idx_size = idx_path.stat().st_size if idx_path.exists() else 0
+        count = idx_size // RECORD.size
+
+        cached = _synced.get(history_path)
+        if cached is not None and cached[0] == count and cached[1] <= size and idx_size % RECORD.size == 0:
+            start = cached[1]
+        else:
+            if idx_size % RECORD.size:
+                with open(idx_path, "r+b") as f:  # Torn record from a crash
+                    f.truncate(count * RECORD.size)
+            start = _indexed_end(history_path, idx_path, count, size)
+            if start is None:
+                print(f"[CHATINDEX] Index of {history_path} does not match the history, rebuilding...")
+                with open(idx_path, "wb"):
+                    pass
+                count, start = 0, 0
+
+        added = 0
+        if start < size:
+            pos = start
+            records = []
+            with open(history_path, "rb") as f, open(idx_path, "ab") as idx:
+                f.seek(start)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Still being written
+                    timestamp = _timestamp(line)
+                    if timestamp is not None:
+                        records.append(RECORD.pack(timestamp, pos))
+                        if len(records) >= _WRITE_CHUNK:
+                            idx.write(b"".join(records))
+                            added += len(records)
+                            records = []
+                    pos += len(line)
+                idx.write(b"".join(records))
+                added += len(records)
+            start = pos
+        _synced[history_path] = (count + added, start)
+        return added
+
+
+class ChatIndex:
+    """Read side of the index: timestamp-range queries over one chat_history.jsonl."""
+
+    def __init__(self, history_path):
+        self.history_path = Path(history_path)
+        self.idx_path = index_path(self.history_path)
+
+    def __len__(self) -> int:
+        try:
+            return self.idx_path.stat().st_size // RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _record(f, i: int) -> Tuple[float, int]:
+        f.seek(i * RECORD.size)
+        return RECORD.unpack(f.read(RECORD.size))
+
+    def _bisect(self, f, n: int, timestamp: float, right: bool = False) -> int:
+        """First record with ts >= timestamp (> timestamp when right=True)."""
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self._record(f, mid)[0]
+            if ts < timestamp or (right and ts == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def read_range(self, start: Optional[float] = None, end: Optional[float] = None,
+                   limit: Optional[int] = None) -> List[Dict]:
+        """Entries with start <= timestamp <= end (either bound optional), oldest first.
+
+        :param limit: Keep only the latest `limit` entries of the range.
+        """
+        if not self.history_path.exists():
+            return []
+        sync_index(self.history_path)
+        n = len(self)
+        if n == 0:
+            return []
+        with open(self.idx_path, "rb") as idx:
+            lo = self._bisect(idx, n, start) if start is not None else 0
+            hi = self._bisect(idx, n, end, right=True) if end is not None else n
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            if lo >= hi:
+                return []
+            offset = self._record(idx, lo)[1]
+
+        entries = []
+        with open(self.history_path, "rb") as f:
+            f.seek(offset)
+            while len(entries) < hi - lo:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Not indexed either
+                if isinstance(entry, dict) and entry.get("timestamp") is not None:
+                    entries.append(entry)
+        return entries
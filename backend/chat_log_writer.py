@@ -0,0 +1,310 @@
+"""
+ChatLogWriter - Batched, append-only writer for chat_history.jsonl.
+
+ProjectManager.log_chat used to open chat_history.jsonl, append one line
+and close it synchronously on the event loop, for every flushed turn and
+every typed message. Now log_chat only queues the line:
+
+    writer = ChatLogWriter(fsync="batch")
+    writer.append(path, json.dumps(entry) + "\\n")    # O(1), no file I/O
+    writer.snapshot(state_path, state.to_dict())     # whole-file replace as JSON, latest wins
+    writer.enqueue(chat_store, record)               # batched into chat_store.write_batch(records)
+    writer.flush()                                   # block until everything queued is on disk
+    writer.flush(close_files=True, wait=False)       # write now and close the handles, don't wait
+
+- A background thread writes a batch once `flush_interval` has passed since
+  the first queued line, or sooner when `max_batch_lines` / `max_batch_bytes`
+  is reached; file handles stay open between batches
+- fsync policy: "never" (leave it to the OS), "batch" (after every batch
+  write) or "interval" (at most once per `fsync_interval` seconds)
+- switch_project asks for a flush that also closes the open handles without
+  waiting for it (lines are queued by absolute path, so the new project's
+  can't mix with the old one's); the readers flush() before reading the
+  history back (call them off the event loop) and so does shutdown; close()
+  is registered with atexit as well
+- Targets other than files (the SQLite ChatStore) get each batch of their
+  records in one write_batch() call on the writer thread
+- after_write(path) runs on the writer thread once a batch of lines is
+  appended to `path` (ProjectManager uses it to extend the offset index in
+  chat_index.py)
+- stats(): queued/written lines, batches, fsyncs, errors and batch write
+  time, reported under "chat_log" in AudioLoop.get_metrics()
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from voice_metrics import RollingHistogram
+
+FSYNC_POLICIES = ("never", "batch", "interval")
+
+
+class ChatLogWriter:
+    def __init__(self, flush_interval: float = 0.2, max_batch_lines: int = 256,
+                 max_batch_bytes: int = 256 * 1024, fsync: str = "batch", fsync_interval: float = 1.0,
+                 after_write: Optional[Callable[[Path], Any]] = None, clock: Callable[[], float] = time.monotonic):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. Use one of: {', '.join(FSYNC_POLICIES)}")
+        self.flush_interval = flush_interval
+        self.max_batch_lines = max_batch_lines
+        self.max_batch_bytes = max_batch_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.after_write = after_write
+        self.clock = clock
+
+        self._cond = threading.Condition()
+        self._appends: Dict[Path, List[str]] = {}
+        self._snapshots: Dict[Path, Any] = {}
+        self._records: Dict[Any, List[Any]] = {}  # sink -> records for sink.write_batch()
+        self._pending_lines = 0
+        self._pending_bytes = 0
+        self._first_pending_at: Optional[float] = None
+        self._queued_seq = 0  # Bumped on every append/snapshot
+        self._written_seq = 0  # Highest seq the writer thread has finished with
+        self._flush_requested = False
+        self._close_files = False
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registered = False
+
+        # Owned by the writer thread
+        self._handles = {}
+        self._unsynced = set()
+        self._last_fsync = clock()
+
+        # Stats
+        self.lines_queued = 0
+        self.lines_written = 0
+        self.bytes_written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.max_batch_seen = 0
+        self.write_time = RollingHistogram()
+
+    # --- Producer side (any thread, never touches the disk) ---
+
+    def append(self, path, line: str):
+        with self._cond:
+            self._appends.setdefault(path if isinstance(path, Path) else Path(path), []).append(line)
+            self._pending_lines += 1
+            self._pending_bytes += len(line)
+            self.lines_queued += 1
+            self._queued()
+
+    def enqueue(self, sink, record):
+        """Queues `record` for sink.write_batch([...records]) on the writer thread."""
+        with self._cond:
+            self._records.setdefault(sink, []).append(record)
+            self._pending_lines += 1
+            self.lines_queued += 1
+            self._queued()
+
+    def snapshot(self, path, data):
+        """Replaces the whole file on the next batch (atomically); only the latest data is written.
+
+        :param data: Text, or a JSON-serializable object the caller no longer mutates
+                     (serialized on the writer thread).
+        """
+        with self._cond:
+            self._snapshots[path if isinstance(path, Path) else Path(path)] = data
+            self._queued()
+
+    def _queued(self):
+        self._queued_seq += 1
+        if self._first_pending_at is None:
+            self._first_pending_at = self.clock()
+        self._ensure_thread()
+        if self._pending_lines >= self.max_batch_lines or self._pending_bytes >= self.max_batch_bytes:
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0, close_files: bool = False, wait: bool = True) -> bool:
+        """Blocks until everything queued so far is written. False on timeout.
+
+        :param close_files: Also close the open file handles once written.
+        :param wait: False only asks the writer thread to write now and returns (safe on the event loop).
+        """
+        with self._cond:
+            target = self._queued_seq
+            if self._thread is None:
+                return True
+            self._flush_requested = True
+            self._close_files = self._close_files or close_files
+            self._cond.notify_all()
+            if not wait:
+                return True
+            return self._cond.wait_for(lambda: self._written_seq >= target and not self._close_files, timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Writes what is queued and stops the thread (the next append starts a new one)."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        if thread.is_alive():
+            print(f"[CHATLOG] [WARN] Writer did not finish within {timeout}s")
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    # --- Writer thread ---
+
+    def _batch_due(self) -> bool:
+        if self._closing or self._flush_requested:
+            return True
+        if self._pending_lines >= self.max_batch_lines or self._pending_bytes >= self.max_batch_bytes:
+            return True
+        return self._first_pending_at is not None and self.clock() - self._first_pending_at >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._batch_due():
+                    wait = None
+                    if self._first_pending_at is not None:
+                        wait = max(0.0, self.flush_interval - (self.clock() - self._first_pending_at))
+                    self._cond.wait(wait)
+                appends, self._appends = self._appends, {}
+                snapshots, self._snapshots = self._snapshots, {}
+                records, self._records = self._records, {}
+                seq = self._queued_seq
+                self._pending_lines = self._pending_bytes = 0
+                self._first_pending_at = None
+                self._flush_requested = False
+                close_files, closing = self._close_files, self._closing
+
+            if appends or snapshots or records:
+                self._write_batch(appends, snapshots, records)
+            if close_files or closing:
+                self._close_handles()
+
+            with self._cond:
+                self._written_seq = seq
+                if close_files:
+                    self._close_files = False
+                if closing and self._queued_seq == seq:
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+                self._cond.notify_all()
+
+    def _write_batch(self, appends: Dict[Path, List[str]], snapshots: Dict[Path, Any],
+                     records: Optional[Dict[Any, List[Any]]] = None):
+        started = time.perf_counter()
+        lines = 0
+        written = []
+        for path, chunk in appends.items():
+            data = "".join(chunk)
+            try:
+                handle = self._handles.get(path)
+                if handle is None:
+                    handle = self._handles[path] = open(path, "a", encoding="utf-8")
+                handle.write(data)
+                handle.flush()
+                self._unsynced.add(path)
+                lines += len(chunk)
+                self.bytes_written += len(data)
+                written.append(path)
+            except (OSError, ValueError) as e:
+                # e.g. the project directory was deleted: drop this file's lines, keep the others
+                self._error(f"Failed to append {len(chunk)} lines to {path}: {e}")
+                self._drop_handle(path)
+        for path, data in snapshots.items():
+            tmp = path.with_name(path.name + ".tmp")
+            try:
+                text = data if isinstance(data, str) else json.dumps(data)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    if self.fsync != "never":
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp, path)
+            except (OSError, TypeError, ValueError) as e:
+                self._error(f"Failed to write {path}: {e}")
+        for sink, items in (records or {}).items():
+            try:
+                sink.write_batch(items)  # Durability is the sink's own (e.g. SQLite synchronous mode)
+                lines += len(items)
+            except Exception as e:
+                self._error(f"Failed to write {len(items)} records to {sink!r}: {e}")
+        self._sync(force=self.fsync == "batch")
+        if self.after_write is not None:
+            for path in written:
+                try:
+                    self.after_write(path)
+                except Exception as e:
+                    self._error(f"after_write failed for {path}: {e}")
+
+        self.lines_written += lines
+        self.batches += 1
+        self.max_batch_seen = max(self.max_batch_seen, lines)
+        self.write_time.record((time.perf_counter() - started) * 1000.0)
+
+    def _sync(self, force: bool = False):
+        if self.fsync == "never" or not self._unsynced:
+            return
+        if not force and self.clock() - self._last_fsync < self.fsync_interval:
+            return
+        for path in list(self._unsynced):
+            handle = self._handles.get(path)
+            if handle is None:
+                continue
+            try:
+                os.fsync(handle.fileno())
+                self.fsyncs += 1
+            except (OSError, ValueError) as e:
+                self._error(f"fsync failed for {path}: {e}")
+        self._unsynced.clear()
+        self._last_fsync = self.clock()
+
+    def _close_handles(self):
+        self._sync(force=True)
+        for path in list(self._handles):
+            self._drop_handle(path)
+
+    def _drop_handle(self, path: Path):
+        handle = self._handles.pop(path, None)
+        self._unsynced.discard(path)
+        if handle is not None:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+    def _error(self, message: str):
+        self.errors += 1
+        self.last_error = message
+        print(f"[CHATLOG] [ERR] {message}")
+
+    def stats(self) -> Dict:
+        with self._cond:
+            pending = self._pending_lines
+        return {
+            "fsync": self.fsync,
+            "pending_lines": pending,
+            "lines_queued": self.lines_queued,
+            "lines_written": self.lines_written,
+            "bytes_written": self.bytes_written,
+            "batches": self.batches,
+            "max_batch_lines": self.max_batch_seen,
+            "fsyncs": self.fsyncs,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "write_ms": self.write_time.summary(),
+        }
@@ -0,0 +1,367 @@
+"""
+ChatStore - SQLite chat history for all projects, with full-text search.
+
+Chat history is one chat_history.jsonl per project, so nothing could answer
+"what did we say about the bracket last week" without reading every file.
+ChatStore keeps every project's messages in one database
+(projects/chat_history.db):
+
+- WAL journal, so searches never block the writer; batches from the
+  ChatLogWriter thread arrive through write_batch() as one transaction
+- An FTS5 index over the message text (porter stemming: "bracket" finds
+  "brackets"), kept in step by triggers; search() ranks the most recent
+  matches with bm25 and can be limited to a project and a time window,
+  which it turns into an id range first (ids follow time order). Without
+  FTS5 in the local SQLite build it falls back to LIKE
+- (project, timestamp) index for recent()/range()
+- import_jsonl() / import_projects(): imports chat_history.jsonl files
+  (merged by timestamp), remembering how far each was read, so re-running
+  only picks up new lines
+  (and a file that shrank - the temp project is reset on startup - is
+  re-imported)
+
+ProjectManager uses it in two ways (setting "chat_storage"):
+    "sqlite"  the storage engine behind log_chat / get_recent_chat_history;
+              existing JSONL histories are imported once in the background
+    "jsonl"   (default) JSONL stays the storage; the database is a search
+              index brought up to date from the files before each search
+
+Run `python chat_store.py import <projects_dir>` to import by hand.
+"""
+
+import heapq
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DB_FILE = "chat_history.db"
+HISTORY_FILE = "chat_history.jsonl"
+SYNCHRONOUS = {"never": "OFF", "interval": "NORMAL", "batch": "FULL"}  # ChatLogWriter fsync policies
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    sender TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_project_time ON messages(project, timestamp);
+CREATE INDEX IF NOT EXISTS messages_time ON messages(timestamp);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    offset INTEGER NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Dropped from search queries so natural phrasing still matches
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "did", "do", "for", "from", "how", "i", "in", "is", "it", "me",
+    "of", "on", "or", "say", "said", "that", "the", "this", "to", "was", "we", "what", "when", "with", "you",
+}
+
+Record = Tuple[str, float, str, str]  # project, timestamp, sender, text
+
+
+def search_terms(query: str) -> List[str]:
+    terms = [t for t in re.findall(r"\w+", query.lower()) if t not in STOPWORDS]
+    return terms or re.findall(r"\w+", query.lower())
+
+
+def snippet(text: str, terms: List[str], width: int = 160) -> str:
+    """`text` around the first matching term, matches in [brackets] (prefix match, close to porter stemming)."""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term[:max(4, len(term) - 2)]) for term in terms) + r")\w*",
+                         re.IGNORECASE)
+    first = pattern.search(text)
+    begin = max(0, (first.start() if first else 0) - width // 3)
+    excerpt = text[begin:begin + width]
+    excerpt = pattern.sub(lambda m: f"[{m.group(0)}]", excerpt)
+    return ("..." if begin else "") + excerpt + ("..." if begin + width < len(text) else "")
+
+
+class ChatStore:
+    def __init__(self, db_path, synchronous: str = "FULL", candidates: int = 2000):
+        """
+        :param synchronous: SQLite synchronous mode (see SYNCHRONOUS for the fsync policy mapping).
+        :param candidates: search() ranks the most recent `candidates` matches; for terms matching more
+                           messages than that, older ones are reached through the project/time filters.
+        """
+        self.db_path = Path(db_path)
+        self.synchronous = synchronous
+        self.candidates = candidates
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._import_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            print(f"[CHATSTORE] [WARN] FTS5 not available ({e}); search falls back to LIKE")
+            self.fts = False
+
+        # Stats
+        self.records_written = 0
+        self.imported = 0
+        self.searches = 0
+        self.last_search_ms: Optional[float] = None
+
+    def __repr__(self):
+        return f"ChatStore({self.db_path.name})"
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (writer thread, search threads, importer)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    # --- Writes ---
+
+    def write_batch(self, records: Iterable[Record]):
+        """Inserts (project, timestamp, sender, text) records in one transaction (ChatLogWriter sink)."""
+        records = list(records)
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT INTO messages (project, timestamp, sender, text) VALUES (?, ?, ?, ?)",
+                             records)
+        self.records_written += len(records)
+
+    def add(self, project: str, sender: str, text: str, timestamp: Optional[float] = None):
+        self.write_batch([(project, time.time() if timestamp is None else timestamp, sender, text)])
+
+    def delete_project(self, project: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM messages WHERE project = ?", (project,))
+            conn.execute("DELETE FROM imports WHERE project = ?", (project,))
+
+    def import_jsonl(self, project: str, path, batch_size: int = 5000) -> int:
+        """Imports the lines of a chat_history.jsonl not imported yet. Returns the number of messages added."""
+        return self._import([(project, Path(path))], batch_size)
+
+    def import_projects(self, projects_dir, batch_size: int = 5000) -> int:
+        """import_jsonl() for every project directory's chat_history.jsonl, merged by timestamp."""
+        projects_dir = Path(projects_dir)
+        if not projects_dir.exists():
+            return 0
+        files = [(p.name, p / HISTORY_FILE) for p in sorted(projects_dir.iterdir())
+                 if p.is_dir() and (p / HISTORY_FILE).exists()]
+        try:
+            return self._import(files, batch_size)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[CHATSTORE] [ERR] Import from {projects_dir} failed: {e}")
+            return 0
+
+    def _import(self, files: List[Tuple[str, Path]], batch_size: int) -> int:
+        # The files' new lines are merged by timestamp so that ids follow time order, like live writes
+        # (search() narrows filtered queries to an id range)
+        with self._import_lock:
+            conn = self._conn()
+            sources = []
+            for project, path in files:
+                key = str(path.resolve())
+                row = conn.execute("SELECT offset FROM imports WHERE path = ?", (key,)).fetchone()
+                offset = row["offset"] if row else 0
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    continue
+                if size < offset:
+                    # Replaced by a shorter file (e.g. the temp project reset): start over
+                    with conn:
+                        conn.execute("DELETE FROM messages WHERE project = ?", (project,))
+                    offset = 0
+                if size > offset:
+                    sources.append((project, path, key, offset))
+
+            added = 0
+            batch: List[Record] = []
+            offsets: Dict[str, Tuple[str, int]] = {}
+            with ExitStack() as stack:
+                streams = [self._new_lines(stack.enter_context(open(path, "rb")), project, key, offset)
+                           for project, path, key, offset in sources]
+                for timestamp, project, sender, text, key, end in heapq.merge(*streams, key=lambda r: r[0]):
+                    offsets[key] = (project, end)
+                    if text is not None:
+                        batch.append((project, timestamp, sender, text))
+                    if len(batch) >= batch_size:
+                        added += self._import_batch(conn, batch, offsets)
+                        batch = []
+                if offsets:
+                    added += self._import_batch(conn, batch, offsets)
+            self.imported += added
+            return added
+
+    @staticmethod
+    def _new_lines(f, project: str, key: str, offset: int):
+        """(timestamp, project, sender, text, key, end offset) per complete line; text None if unreadable."""
+        f.seek(offset)
+        timestamp = 0.0
+        for line in f:
+            if not line.endswith(b"\n"):
+                return  # Still being written
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+                timestamp = float(entry["timestamp"])
+                record = (timestamp, project, str(entry.get("sender", "Unknown")), str(entry.get("text", "")))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                record = (timestamp, project, None, None)
+            yield record + (key, offset)
+
+    @staticmethod
+    def _import_batch(conn, batch: List[Record], offsets: Dict[str, Tuple[str, int]]) -> int:
+        # Messages and the resume offsets commit together: an interrupted import neither loses nor repeats lines
+        with conn:
+            conn.executemany("INSERT INTO messages (project, timestamp, sender, text) VALUES (?, ?, ?, ?)", batch)
+            conn.executemany("INSERT INTO imports (path, project, offset) VALUES (?, ?, ?) "
+                             "ON CONFLICT(path) DO UPDATE SET offset = excluded.offset",
+                             [(key, project, end) for key, (project, end) in offsets.items()])
+        return len(batch)
+
+    # --- Reads ---
+
+    @staticmethod
+    def _entry(row) -> Dict:
+        return {"timestamp": row["timestamp"], "sender": row["sender"], "text": row["text"]}
+
+    def recent(self, project: str, limit: int = 10) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT timestamp, sender, text FROM messages WHERE project = ? "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?", (project, limit)).fetchall()
+        return [self._entry(row) for row in reversed(rows)]
+
+    def range(self, project: str, start: Optional[float] = None, end: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+        """Same contract as ChatIndex.read_range: oldest first, the latest `limit` of the range."""
+        sql = "SELECT timestamp, sender, text FROM messages WHERE project = ?"
+        params: list = [project]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND timestamp <= ?"
+            params.append(end)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        rows = self._conn().execute(sql, params).fetchall()
+        return [self._entry(row) for row in reversed(rows)]
+
+    def search(self, query: str, project: Optional[str] = None, start: Optional[float] = None,
+               end: Optional[float] = None, limit: int = 10) -> List[Dict]:
+        """Best matches first: dicts with project, timestamp, sender, text and a highlighted snippet."""
+        started = time.perf_counter()
+        terms = search_terms(query)
+        if not terms:
+            return []
+        filters = ""
+        params: list = []
+        if project is not None:
+            filters += " AND m.project = ?"
+            params.append(project)
+        if start is not None:
+            filters += " AND m.timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            filters += " AND m.timestamp <= ?"
+            params.append(end)
+
+        conn = self._conn()
+        rows = []
+        if self.fts:
+            id_range = ""
+            id_params: list = []
+            if filters:
+                # Ids follow time order, so the filtered messages span one id range the FTS scan can stay in
+                lo, hi = conn.execute(f"SELECT MIN(id), MAX(id) FROM messages m WHERE 1{filters}", params).fetchone()
+                if lo is None:
+                    return []
+                id_range = " AND f.rowid BETWEEN ? AND ?"
+                id_params = [lo, hi]
+            # Every term first; if nothing has all of them, any term (bm25 ranks the best overlap first)
+            for joiner in (" AND ", " OR "):
+                match = joiner.join(f'"{term}"' for term in terms)
+                rows = conn.execute(
+                    "SELECT m.project, m.timestamp, m.sender, m.text FROM ("
+                    "  SELECT f.rowid AS id, bm25(messages_fts) AS score"
+                    "  FROM messages_fts f JOIN messages m ON m.id = f.rowid"
+                    f"  WHERE messages_fts MATCH ?{id_range}{filters} ORDER BY f.rowid DESC LIMIT ?"
+                    ") c JOIN messages m ON m.id = c.id ORDER BY c.score LIMIT ?",
+                    [match] + id_params + params + [self.candidates, limit]).fetchall()
+                if rows or len(terms) == 1:
+                    break
+        else:
+            likes = " AND ".join("m.text LIKE ?" for _ in terms)
+            rows = conn.execute(
+                "SELECT m.project, m.timestamp, m.sender, m.text FROM messages m "
+                f"WHERE {likes}{filters} ORDER BY m.timestamp DESC LIMIT ?",
+                [f"%{term}%" for term in terms] + params + [limit]).fetchall()
+
+        self.searches += 1
+        self.last_search_ms = (time.perf_counter() - started) * 1000.0
+        return [dict(self._entry(row), project=row["project"], snippet=snippet(row["text"], terms))
+                for row in rows]
+
+    def count(self, project: Optional[str] = None) -> int:
+        if project is None:
+            return self._conn().execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM messages WHERE project = ?", (project,)).fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {
+            "fts": self.fts,
+            "records_written": self.records_written,
+            "imported": self.imported,
+            "searches": self.searches,
+            "last_search_ms": round(self.last_search_ms, 2) if self.last_search_ms is not None else None,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "import":
+        print("Usage: python chat_store.py import <projects_dir>")
+        sys.exit(1)
+    projects_dir = Path(sys.argv[2])
+    store = ChatStore(projects_dir / DB_FILE)
+    started = time.perf_counter()
+    added = store.import_projects(projects_dir)
+    print(f"Imported {added} messages in {time.perf_counter() - started:.1f}s ({store.count()} total)")
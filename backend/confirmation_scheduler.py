@@ -0,0 +1,171 @@
+"""
+ConfirmationScheduler - Pending tool approvals that don't stall the receive loop.
+
+receive_audio used to `await` the user's click in ConfirmationPopup inline, so
+model audio, transcriptions and every other tool call waited behind it. Now a
+call that needs approval is parked here and receive_audio moves on:
+
+    request(tool, args, on_decision)  -> PendingApproval (id sent to the UI)
+    resolve(id, confirmed)            -> on_decision(confirmed, "user") runs as a task
+    resolve_batch(ids, confirmed)     -> same, for many (or all) pending requests
+    no answer within `timeout`        -> on_decision(policy, "timeout"); "always" tools are
+                                         denied whatever the policy
+    cancel_all()                      -> dropped without running (session closed)
+
+on_decision is a coroutine function; AudioLoop uses it to run the tool (or not)
+and send the FunctionResponse for that call on its own.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from voice_metrics import RollingHistogram
+
+TIMEOUT_POLICIES = ("deny", "allow")
+
+DecisionCallback = Callable[[bool, str], Awaitable[None]]
+
+
+class PendingApproval:
+    def __init__(self, request_id: str, tool: str, args: Dict, on_decision: DecisionCallback,
+                 created_at: float, timeout: Optional[float], confirmation: str = "permission"):
+        self.id = request_id
+        self.tool = tool
+        self.args = args
+        self.confirmation = confirmation
+        self.on_decision = on_decision
+        self.created_at = created_at
+        self.timeout = timeout
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "id": self.id,
+            "tool": self.tool,
+            "args": self.args,
+            "waiting_s": round(now - self.created_at, 1),
+            "expires_in": round(max(0.0, self.created_at + self.timeout - now), 1) if self.timeout else None,
+        }
+
+
+class ConfirmationScheduler:
+    def __init__(self, timeout: Optional[float] = 60.0, timeout_policy: str = "deny",
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param timeout: Seconds to wait for the user before applying `timeout_policy`
+                        (None or 0 = wait forever).
+        :param timeout_policy: "deny" or "allow". "allow" only applies to permission-gated
+                               tools; ones declared confirmation="always" are denied.
+        """
+        self.clock = clock
+        self._pending: Dict[str, PendingApproval] = {}
+        self._tasks = set()  # Running on_decision callbacks
+        self.set_policy(timeout, timeout_policy)
+
+        # Stats
+        self.requested = 0
+        self.approved = 0
+        self.denied = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.wait_time = RollingHistogram()
+
+    def set_policy(self, timeout: Optional[float], timeout_policy: str = "deny"):
+        if timeout_policy not in TIMEOUT_POLICIES:
+            raise ValueError(f"Unknown timeout policy '{timeout_policy}'. Use one of: {', '.join(TIMEOUT_POLICIES)}")
+        self.timeout = timeout or None
+        self.timeout_policy = timeout_policy
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._pending
+
+    def request(self, tool: str, args: Optional[Dict], on_decision: DecisionCallback,
+                confirmation: str = "permission") -> PendingApproval:
+        """Parks a call until the user decides; must be called from the event loop.
+
+        :param confirmation: The tool's ToolSpec.confirmation mode ("permission" or "always").
+        """
+        pending = PendingApproval(str(uuid.uuid4()), tool, dict(args or {}), on_decision,
+                                  self.clock(), self.timeout, confirmation)
+        if self.timeout:
+            pending.timer = asyncio.get_running_loop().call_later(self.timeout, self._expire, pending.id)
+        self._pending[pending.id] = pending
+        self.requested += 1
+        return pending
+
+    def resolve(self, request_id: str, confirmed: bool, reason: str = "user") -> bool:
+        """Applies a decision; False if the request is unknown or already decided."""
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return False
+        if pending.timer:
+            pending.timer.cancel()
+        self.wait_time.record((self.clock() - pending.created_at) * 1000.0)
+        if reason == "timeout":
+            self.timed_out += 1
+        if confirmed:
+            self.approved += 1
+        else:
+            self.denied += 1
+
+        task = asyncio.ensure_future(self._decide(pending, bool(confirmed), reason))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def resolve_batch(self, request_ids: Optional[Iterable[str]], confirmed: bool) -> List[str]:
+        """Approves or denies several requests (all pending ones if `request_ids` is None)."""
+        ids = list(self._pending) if request_ids is None else list(request_ids)
+        return [request_id for request_id in ids if self.resolve(request_id, confirmed)]
+
+    def cancel_all(self) -> List[PendingApproval]:
+        """Drops every pending request without running its callback (e.g. the session closed)."""
+        dropped = list(self._pending.values())
+        self._pending.clear()
+        for pending in dropped:
+            if pending.timer:
+                pending.timer.cancel()
+        self.cancelled += len(dropped)
+        return dropped
+
+    def pending(self) -> List[Dict]:
+        now = self.clock()
+        return [pending.to_dict(now) for pending in self._pending.values()]
+
+    async def wait_idle(self):
+        """Waits for decision callbacks that are still running."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _expire(self, request_id: str):
+        pending = self._pending.get(request_id)
+        if pending is None:
+            return
+        # Tools that always need an explicit yes (e.g. shell commands) are never auto-approved
+        allow = self.timeout_policy == "allow" and pending.confirmation != "always"
+        print(f"[CONFIRM] Request {request_id} for '{pending.tool}' timed out -> {'allow' if allow else 'deny'}")
+        self.resolve(request_id, allow, reason="timeout")
+
+    async def _decide(self, pending: PendingApproval, confirmed: bool, reason: str):
+        try:
+            await pending.on_decision(confirmed, reason)
+        except Exception as e:
+            print(f"[CONFIRM] [ERR] Handling decision for '{pending.tool}' ({pending.id}) failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "timeout_s": self.timeout,
+            "timeout_policy": self.timeout_policy,
+            "requested": self.requested,
+            "approved": self.approved,
+            "denied": self.denied,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "wait_ms": self.wait_time.summary(),
+        }
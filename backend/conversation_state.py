@@ -0,0 +1,214 @@
+"""
+ConversationState - Bounded rolling summary + recent turns, per project.
+
+On reconnect, AudioLoop used to re-read chat_history.jsonl and paste the
+last 10 lines verbatim: everything older was lost, and one long turn could
+blow up the prompt. Now every message written by ProjectManager.log_chat
+(i.e. by flush_chat and typed user input) is folded in as it is written:
+
+    recent   the last `recent_turns` messages, each clipped to `turn_chars`
+    summary  older messages compacted to one line each (first sentence, at
+             most `line_chars`); past `summary_chars` the oldest lines are
+             dropped and only counted
+
+restoration_payload() is built from those bounded pieces only and cached
+until the next message, so it costs the same and never exceeds
+`payload_chars` whatever the length of the history.
+
+ConversationStore keeps one state per project, saved next to the history as
+conversation_state.json (through the ChatLogWriter when one is given, so
+recording a message does no file I/O); a project without one is rebuilt
+from its chat_history.jsonl the first time it is opened.
+"""
+
+import json
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional
+
+STATE_FILE = "conversation_state.json"
+HISTORY_FILE = "chat_history.jsonl"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def _first_sentence(text: str) -> str:
+    text = " ".join(text.split())
+    return _SENTENCE_END.split(text, 1)[0]
+
+
+class ConversationState:
+    def __init__(self, recent_turns: int = 12, turn_chars: int = 600, line_chars: int = 160,
+                 summary_chars: int = 2000, payload_chars: int = 6000):
+        self.turn_chars = turn_chars
+        self.line_chars = line_chars
+        self.summary_chars = summary_chars
+        self.payload_chars = payload_chars
+        self.recent = deque(maxlen=recent_turns)  # (sender, clipped text)
+        self.summary = deque()  # Compacted older lines
+        self._summary_size = 0
+        self.omitted = 0  # Messages older than the summary reaches
+        self.total = 0
+        self.last_timestamp: Optional[float] = None
+        self._payload: Optional[str] = None
+
+    def add(self, sender: str, text: str, timestamp: Optional[float] = None):
+        """Folds one message in (O(1) amortised)."""
+        if not text or not text.strip():
+            return
+        if len(self.recent) == self.recent.maxlen:
+            self._summarise(*self.recent[0])
+        self.recent.append((sender, _clip(text, self.turn_chars)))
+        self.total += 1
+        self.last_timestamp = timestamp
+        self._payload = None
+
+    def _summarise(self, sender: str, text: str):
+        line = f"{sender}: {_clip(_first_sentence(text), self.line_chars)}"
+        self.summary.append(line)
+        self._summary_size += len(line) + 1
+        while self._summary_size > self.summary_chars and self.summary:
+            self._summary_size -= len(self.summary.popleft()) + 1
+            self.omitted += 1
+
+    def restoration_payload(self) -> str:
+        """Summary + recent turns as one message body, at most `payload_chars` long."""
+        if self._payload is None:
+            self._payload = self._build_payload()
+        return self._payload
+
+    def _build_payload(self) -> str:
+        summary = list(self.summary)
+        recent = [f"[{sender}]: {text}" for sender, text in self.recent]
+        omitted = self.omitted
+
+        def render():
+            parts = []
+            if summary or omitted:
+                note = f", {omitted} older messages omitted" if omitted else ""
+                parts.append(f"Earlier in this conversation (summary{note}):")
+                parts.extend(f"- {line}" for line in summary)
+                parts.append("")
+            if recent:
+                parts.append("Most recent messages:")
+                parts.extend(recent)
+            return "\n".join(parts)
+
+        payload = render()
+        # Bounded inputs, so this loop is too: oldest summary lines go first, then the oldest turns
+        while len(payload) > self.payload_chars and (summary or len(recent) > 1):
+            if summary:
+                summary.pop(0)
+            else:
+                recent.pop(0)
+            omitted += 1
+            payload = render()
+        return payload[:self.payload_chars]
+
+    def to_dict(self) -> Dict:
+        return {
+            "recent": [list(turn) for turn in self.recent],
+            "summary": list(self.summary),
+            "omitted": self.omitted,
+            "total": self.total,
+            "last_timestamp": self.last_timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, **limits) -> "ConversationState":
+        state = cls(**limits)
+        for line in data.get("summary", []):
+            state.summary.append(line)
+            state._summary_size += len(line) + 1
+        for sender, text in data.get("recent", []):
+            state.recent.append((sender, text))
+        state.omitted = data.get("omitted", 0)
+        state.total = data.get("total", len(state.recent))
+        state.last_timestamp = data.get("last_timestamp")
+        return state
+
+
+class ConversationStore:
+    """ConversationState per project directory, persisted as conversation_state.json."""
+
+    def __init__(self, projects_dir, writer=None, **limits):
+        self.projects_dir = Path(projects_dir)
+        self.writer = writer
+        self.limits = limits
+        self._states: Dict[str, ConversationState] = {}
+        self._state_paths: Dict[str, Path] = {}
+
+    def get(self, project: str) -> ConversationState:
+        state = self._states.get(project)
+        if state is None:
+            state = self._states[project] = self._load(project)
+        return state
+
+    def record(self, project: str, sender: str, text: str, timestamp: Optional[float] = None):
+        state = self.get(project)
+        state.add(sender, text, timestamp)
+        self._save(project, state)
+
+    def restoration_payload(self, project: str) -> str:
+        return self.get(project).restoration_payload()
+
+    def forget(self, project: str):
+        """Drops the cached state (e.g. the project directory was deleted)."""
+        self._states.pop(project, None)
+        self._state_paths.pop(project, None)
+
+    def _load(self, project: str) -> ConversationState:
+        project_dir = self.projects_dir / project
+        state_path = project_dir / STATE_FILE
+        if state_path.exists():
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    return ConversationState.from_dict(json.load(f), **self.limits)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"[CONVERSATION] [WARN] Unreadable {state_path.name} for '{project}', rebuilding: {e}")
+        state = self._rebuild(project_dir / HISTORY_FILE)
+        if state.total:
+            self._save(project, state)
+        return state
+
+    def _rebuild(self, history_path: Path) -> ConversationState:
+        """One pass over an existing history (only for projects that predate the state file)."""
+        state = ConversationState(**self.limits)
+        if not history_path.exists():
+            return state
+        try:
+            with open(history_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    state.add(entry.get("sender", "Unknown"), entry.get("text", ""), entry.get("timestamp"))
+        except OSError as e:
+            print(f"[CONVERSATION] [ERR] Failed to read {history_path}: {e}")
+        return state
+
+    def _save(self, project: str, state: ConversationState):
+        path = self._state_paths.get(project)
+        if path is None:
+            path = self._state_paths[project] = self.projects_dir / project / STATE_FILE
+        project_dir = path.parent
+        if self.writer is not None:
+            self.writer.snapshot(path, state.to_dict())  # Fresh lists: safe to serialize on the writer thread
+            return
+        if not project_dir.exists():
+            return
+        tmp = path.with_suffix(".json.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[CONVERSATION] [ERR] Failed to save {path}: {e}")
@@ -0,0 +1,152 @@
+"""
+CPU-heavy work that runs in ProcessPool workers (see process_pool.py).
+
+This is the serialization boundary: every function here is top-level (so it
+pickles by name), takes and returns only plain data (bytes, str, numbers,
+lists, dicts) and imports its heavy libraries lazily, so a spawned worker
+only pays for what it uses. Nothing here may touch AudioLoop, Socket.IO or
+any other live object - workers are separate processes.
+
+The same functions run unchanged in the thread fallback.
+"""
+
+import base64
+import io
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def worker_pid() -> int:
+    """No-op used to warm the pool up."""
+    import os
+    return os.getpid()
+
+
+def synthetic_load(ms: float) -> int:
+    """Pure-Python busy work holding the GIL for about `ms` (benchmarks and tests)."""
+    import time
+
+    deadline = time.perf_counter() + ms / 1000.0
+    n = 0
+    while time.perf_counter() < deadline:
+        n += sum(i * i for i in range(200))
+    return n
+
+
+# --- Images (screen capture, camera frames) ---
+
+def encode_image(pixels: bytes, size: Tuple[int, int], raw_mode: str = "RGB", fmt: str = "JPEG",
+                 max_side: Optional[int] = None, quality: int = 85) -> bytes:
+    """
+    Encodes raw pixels (e.g. mss "BGRX" screenshots, OpenCV "BGR" frames) to JPEG/PNG bytes.
+
+    :param raw_mode: PIL raw decoder mode describing `pixels`.
+    :param max_side: Downscale (keeping aspect) so neither side exceeds this.
+    """
+    from PIL import Image
+
+    img = Image.frombytes("RGB", tuple(size), pixels, "raw", raw_mode)
+    if max_side:
+        img.thumbnail((max_side, max_side))
+    out = io.BytesIO()
+    if fmt.upper() == "JPEG":
+        img.save(out, format="JPEG", quality=quality)
+    else:
+        img.save(out, format=fmt)
+    return out.getvalue()
+
+
+# --- CAD ---
+
+def load_stl_payload(path: str) -> Optional[Dict]:
+    """Reads a generated STL and base64-encodes it for the frontend (None if missing)."""
+    try:
+        with open(path, "rb") as f:
+            stl_data = f.read()
+    except FileNotFoundError:
+        return None
+    return {
+        "format": "stl",
+        "data": base64.b64encode(stl_data).decode("utf-8"),
+        "file_path": path,
+    }
+
+
+# --- Scraper ---
+
+def html_to_text(html: bytes, limit: int = 10000) -> str:
+    """Visible text of a page (scripts, styles and navigation removed), capped at `limit` chars."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    # Kill script and style elements
+    for element in soup(["script", "style", "nav", "footer", "header"]):
+        element.extract()
+
+    text = soup.get_text()
+    # Break into lines and remove leading and trailing space on each
+    lines = (line.strip() for line in text.splitlines())
+    # Break multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    # Drop blank lines
+    text = "\n".join(chunk for chunk in chunks if chunk)
+    return text[:limit]
+
+
+def export_records(records: List[Dict], path: str, fmt: str, title: str) -> str:
+    """Writes scraped records to Excel or Word; returns the status message shown to the model."""
+    if fmt.lower() == "excel":
+        try:
+            import pandas as pd
+            pd.DataFrame(records).to_excel(path, index=False)
+            return f"Data saved to Excel: {path}"
+        except Exception as e:
+            return f"Failed to save Excel: {e}"
+
+    if fmt.lower() == "word":
+        try:
+            from docx import Document
+            doc = Document()
+            doc.add_heading(f"Scraped Data: {title}", 0)
+            for item in records:
+                doc.add_heading(str(item.get('Name', item.get('Title', 'Item'))), level=1)
+                for k, v in item.items():
+                    doc.add_paragraph(f"{k}: {v}")
+                doc.add_paragraph("--------------------------------------------------")
+            doc.save(path)
+            return f"Data saved to Word: {path}"
+        except Exception as e:
+            return f"Failed to save Word: {e}"
+
+    return f"Unknown format: {fmt}"
+
+
+# --- Face landmarks ---
+
+_landmarkers: Dict[str, object] = {}  # Per worker process: model path -> FaceLandmarker
+
+
+def face_landmarks(rgb: bytes, shape: Sequence[int], model_path: str) -> Optional[bytes]:
+    """
+    Normalised face landmarks of the first face in an RGB frame, as float32 bytes
+    (np.frombuffer(..., np.float32) on the other side), or None if no face is found.
+    The landmarker is created once per worker.
+    """
+    import numpy as np
+    import mediapipe as mp
+    from mediapipe.tasks import python as mp_python
+    from mediapipe.tasks.python import vision
+
+    landmarker = _landmarkers.get(model_path)
+    if landmarker is None:
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp_python.BaseOptions(model_asset_path=model_path),
+            num_faces=1,
+        )
+        landmarker = _landmarkers[model_path] = vision.FaceLandmarker.create_from_options(options)
+
+    image = np.frombuffer(rgb, dtype=np.uint8).reshape(shape)
+    result = landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=image))
+    if not result.face_landmarks:
+        return None
+    coords = np.array([[lm.x, lm.y, lm.z] for lm in result.face_landmarks[0]], dtype=np.float32)
+    return coords.flatten().tobytes()
@@ -0,0 +1,176 @@
+"""
+EchoCanceller - Acoustic echo cancellation for the AudioLoop mic path.
+
+Barge-in used to be handled by dropping all mic audio for the first second
+of every reply and then gating on a loud RMS threshold. With AEC the model's
+own voice is subtracted from the mic signal, so mic audio can be sent
+continuously and the user can interrupt at a normal speaking level.
+
+Algorithm: partitioned-block frequency-domain adaptive filter (PBFDAF) with
+NLMS-style per-bin power normalisation, overlap-save, gradient constraint
+and a Geigel double-talk detector that freezes adaptation while the user
+talks over REX.
+
+Far-end reference: the 24 kHz PCM written by AudioPlaybackThread (pushed
+from that thread via push_far_end), resampled to the 16 kHz mic rate.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+from audio_dsp import LinearResampler, float_to_pcm, pcm_to_float
+from audio_io import SpscRingBuffer
+
+
+class EchoCanceller:
+    def __init__(self, near_rate: int = 16000, far_rate: int = 24000,
+                 block_size: int = 256, partitions: int = 16, step_size: float = 0.5,
+                 power_smoothing: float = 0.9, double_talk_ratio: float = 0.6,
+                 far_active_level: float = 1e-3, converge_db: float = 10.0,
+                 max_far_backlog_ms: float = 500.0):
+        """
+        :param block_size: Samples per adaptation block (16 ms at 16 kHz).
+        :param partitions: Filter partitions; echo tail = block_size * partitions
+                           (16 x 256 = 4096 taps = 256 ms at 16 kHz).
+        :param step_size: NLMS step size (0 < mu <= 1).
+        :param double_talk_ratio: Geigel threshold - near-end peaks above this
+                                  fraction of the far-end peak freeze adaptation.
+        :param far_active_level: Far-end peak (0..1) below which REX counts as silent.
+        :param converge_db: ERLE needed before `converged` reports True.
+        :param max_far_backlog_ms: Reference audio older than this is discarded.
+        """
+        self.near_rate = near_rate
+        self.block_size = block_size
+        self.partitions = partitions
+        self.step_size = step_size
+        self.power_smoothing = power_smoothing
+        self.double_talk_ratio = double_talk_ratio
+        self.far_active_level = far_active_level
+        self.converge_db = converge_db
+        self.max_far_backlog = int(near_rate * max_far_backlog_ms / 1000)
+
+        self._far_ring = SpscRingBuffer(256)  # Producer: playback thread
+        self._resampler = LinearResampler(far_rate, near_rate)
+        self.reset()
+
+    def reset(self):
+        """Forgets the learned echo path and any queued reference audio."""
+        B, P = self.block_size, self.partitions
+        self._weights = np.zeros((P, B + 1), dtype=np.complex128)
+        self._far_spectra = np.zeros((P, B + 1), dtype=np.complex128)  # Row 0 = newest
+        self._far_power = np.full(B + 1, 1e-6)
+        self._prev_far_block = np.zeros(B, dtype=np.float64)
+        self._far_peaks = deque([0.0] * P, maxlen=P)
+        self._far = np.zeros(0, dtype=np.float32)
+        self._resampler.reset()
+        self._far_ring.drain()
+
+        self.erle_db = 0.0
+        self.blocks = 0
+        self.double_talk_blocks = 0
+        self.far_dropped = 0
+
+    @property
+    def converged(self) -> bool:
+        """True once the filter removes at least `converge_db` of echo."""
+        return self.erle_db >= self.converge_db
+
+    def push_far_end(self, data: bytes):
+        """Queues far-end PCM. Safe to call from the playback thread."""
+        if not self._far_ring.push(data):
+            self.far_dropped += 1
+
+    def process(self, data: bytes) -> bytes:
+        """Removes echo from one mic chunk (int16 PCM). Returns a chunk of the same size."""
+        self._drain_far_end()
+
+        near = pcm_to_float(data).astype(np.float64)
+        out = np.empty_like(near)
+        B = self.block_size
+        for start in range(0, len(near), B):
+            block = near[start:start + B]
+            n = len(block)
+            if n < B:
+                block = np.pad(block, (0, B - n))
+            out[start:start + n] = self._process_block(self._take_far(B), block)[:n]
+        return float_to_pcm(out)
+
+    def _drain_far_end(self):
+        parts = []
+        while True:
+            data = self._far_ring.pop()
+            if data is None:
+                break
+            parts.append(self._resampler.process(pcm_to_float(data)))
+        if parts:
+            self._far = np.concatenate([self._far] + parts)
+        if len(self._far) > self.max_far_backlog:
+            # Mic side stalled (paused/overrun) - keep only the freshest reference
+            self._far = self._far[-self.max_far_backlog:]
+
+    def _take_far(self, count: int) -> np.ndarray:
+        if len(self._far) >= count:
+            block, self._far = self._far[:count], self._far[count:]
+            return block.astype(np.float64)
+        # REX is silent (or the reference is late): pad with silence
+        block = np.zeros(count, dtype=np.float64)
+        block[:len(self._far)] = self._far
+        self._far = self._far[:0]
+        return block
+
+    def _process_block(self, far: np.ndarray, near: np.ndarray) -> np.ndarray:
+        B = self.block_size
+        self.blocks += 1
+
+        # Overlap-save: spectrum of [previous block | current block]
+        far_spectrum = np.fft.rfft(np.concatenate((self._prev_far_block, far)))
+        self._prev_far_block = far
+        self._far_spectra[1:] = self._far_spectra[:-1]
+        self._far_spectra[0] = far_spectrum
+
+        echo = np.fft.irfft((self._weights * self._far_spectra).sum(axis=0), n=2 * B)[B:]
+        error = near - echo
+
+        far_peak = float(np.abs(far).max())
+        self._far_peaks.append(far_peak)
+        far_level = max(self._far_peaks)
+        if far_level < self.far_active_level:
+            # Nothing to cancel; don't adapt on silence
+            return near
+
+        self._far_power = (self.power_smoothing * self._far_power
+                           + (1.0 - self.power_smoothing) * np.abs(far_spectrum) ** 2)
+
+        double_talk = float(np.abs(near).max()) > self.double_talk_ratio * far_level
+        if double_talk:
+            self.double_talk_blocks += 1
+        else:
+            error_spectrum = np.fft.rfft(np.concatenate((np.zeros(B), error)))
+            gradient = (np.conj(self._far_spectra) * error_spectrum
+                        / (self.partitions * self._far_power + 1e-10))
+            # Gradient constraint: keep each partition a causal B-tap filter
+            taps = np.fft.irfft(gradient, n=2 * B, axis=1)
+            taps[:, B:] = 0.0
+            self._weights += self.step_size * np.fft.rfft(taps, axis=1)
+
+        near_energy = float(np.dot(near, near)) + 1e-12
+        error_energy = float(np.dot(error, error)) + 1e-12
+        if not double_talk:
+            erle = 10.0 * math.log10(near_energy / error_energy)
+            self.erle_db = 0.95 * self.erle_db + 0.05 * erle
+
+        if error_energy > near_energy:
+            # Filter is (still) making things worse - pass the mic through
+            return near
+        return error
+
+    def stats(self) -> dict:
+        return {
+            "erle_db": round(self.erle_db, 1),
+            "converged": self.converged,
+            "blocks": self.blocks,
+            "double_talk_blocks": self.double_talk_blocks,
+            "far_dropped": self.far_dropped,
+        }
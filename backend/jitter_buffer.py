@@ -0,0 +1,163 @@
+"""
+JitterBuffer - Playout buffer for the model's 24 kHz output audio.
+
+`response.data` blobs arrive in bursts and in arbitrary sizes. Writing each
+one straight to PyAudio means tiny writes (extra wakeups) and, when the next
+blob is late, a hard cut to silence. AudioPlaybackThread instead feeds this
+buffer and writes fixed device-period-sized blocks:
+
+- Priming:   nothing is played until `target_latency_ms` of audio is queued
+             (or the first queued audio has waited that long - short replies)
+- Playing:   one period per write (small chunks are coalesced)
+- Underrun:  the remainder is faded out and padded to a full period; the
+             buffer re-primes and the next audio is faded in
+- Flush:     everything queued is dropped (user interruption), so the newest
+             audio plays next
+
+Not thread-safe: it is owned by the playback thread.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+class JitterBuffer:
+    def __init__(self, sample_rate: int = 24000, sample_width: int = 2, channels: int = 1,
+                 target_latency_ms: float = 100.0, period_frames: int = 512,
+                 fade_ms: float = 3.0, underrun_window: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param target_latency_ms: Audio queued before playback (re)starts.
+        :param period_frames: Frames per device write.
+        :param fade_ms: Fade length applied around underruns.
+        :param underrun_window: A drain counts as an underrun (rather than the
+                                end of a reply) if audio resumes within this many seconds.
+        """
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_width * channels
+        self.period_bytes = period_frames * self.frame_bytes
+        self.period_seconds = period_frames / sample_rate
+        self.target_bytes = max(self.period_bytes, self._ms_to_bytes(target_latency_ms))
+        self.target_seconds = target_latency_ms / 1000
+        # Pull from the ring only up to here; the rest stays queued upstream
+        self.capacity_bytes = self.target_bytes + 2 * self.period_bytes
+        self.fade_frames = max(1, int(sample_rate * fade_ms / 1000))
+        self.underrun_window = underrun_window
+        self.clock = clock
+
+        self._buf = bytearray()
+        self.playing = False
+        self._fade_in = False
+        self._drained_at = None
+        self._priming_since = None  # When the first audio of the next start arrived
+
+        # Stats
+        self.underruns = 0
+        self.drains = 0  # Includes normal end-of-reply drains
+        self.flushes = 0
+        self.periods_played = 0
+        self.max_depth_bytes = 0
+
+    def _ms_to_bytes(self, ms: float) -> int:
+        frames = int(self.sample_rate * ms / 1000)
+        return frames * self.frame_bytes
+
+    @property
+    def depth_bytes(self) -> int:
+        return len(self._buf)
+
+    @property
+    def depth_ms(self) -> float:
+        return len(self._buf) / self.frame_bytes / self.sample_rate * 1000
+
+    def wants_data(self) -> bool:
+        return len(self._buf) < self.capacity_bytes
+
+    def push(self, data: bytes):
+        if not data:
+            return
+        if not self.playing and not self._buf and self._drained_at is not None:
+            if self.clock() - self._drained_at <= self.underrun_window:
+                self.underruns += 1
+            self._drained_at = None
+        if not self.playing and self._priming_since is None:
+            self._priming_since = self.clock()
+        self._buf += data
+        if len(self._buf) > self.max_depth_bytes:
+            self.max_depth_bytes = len(self._buf)
+
+    def read_period(self) -> Optional[bytes]:
+        """Returns one period of audio, or None while priming / short of data."""
+        if not self.playing:
+            if not self._buf:
+                return None
+            if (len(self._buf) < self.target_bytes
+                    and self.clock() - self._priming_since < self.target_seconds):
+                return None
+            self.playing = True
+            self._priming_since = None
+        if len(self._buf) < self.period_bytes:
+            return None
+
+        period = bytes(self._buf[:self.period_bytes])
+        del self._buf[:self.period_bytes]
+        if self._fade_in:
+            self._fade_in = False
+            period = self._fade(period, fade_in=True)
+        self.periods_played += 1
+        return period
+
+    def drain_tail(self) -> Optional[bytes]:
+        """
+        Underrun: returns what is left, faded out and padded with silence to
+        a full period (None if nothing is left), and goes back to priming.
+        """
+        tail = bytes(self._buf[:len(self._buf) - len(self._buf) % self.frame_bytes])
+        self._buf.clear()
+        was_playing = self.playing
+        self.playing = False
+        self._priming_since = None
+        if was_playing or tail:
+            self.drains += 1
+            self._drained_at = self.clock()
+            self._fade_in = True
+        if not tail:
+            return None
+        tail = self._fade(tail, fade_in=False)
+        return tail + bytes(-len(tail) % self.period_bytes)
+
+    def flush(self):
+        """Drops everything queued and re-primes (next audio starts fresh)."""
+        self._buf.clear()
+        self.playing = False
+        self._fade_in = False
+        self._drained_at = None
+        self._priming_since = None
+        self.flushes += 1
+
+    def _fade(self, data: bytes, fade_in: bool) -> bytes:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+        n = min(self.fade_frames * (self.frame_bytes // 2), len(samples))
+        if n == 0:
+            return data
+        ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+        if fade_in:
+            samples[:n] *= ramp
+        else:
+            samples[-n:] *= ramp[::-1]
+        return samples.astype("<i2").tobytes()
+
+    def stats(self) -> Dict:
+        return {
+            "depth_ms": round(self.depth_ms, 1),
+            "max_depth_ms": round(self.max_depth_bytes / self.frame_bytes / self.sample_rate * 1000, 1),
+            "target_ms": round(self.target_bytes / self.frame_bytes / self.sample_rate * 1000, 1),
+            "period_ms": round(self.period_seconds * 1000, 1),
+            "playing": self.playing,
+            "underruns": self.underruns,
+            "drains": self.drains,
+            "flushes": self.flushes,
+            "periods_played": self.periods_played,
+        }
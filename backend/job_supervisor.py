@@ -0,0 +1,251 @@
+"""
+JobSupervisor - Bounded, cancellable background jobs for the long-running agents.
+
+CAD generation, the browser agent, the scraper and evolution research used to
+be started with bare asyncio.create_task: five CAD requests meant five
+concurrent generations fighting over CPU and the Gemini quota, with no way to
+see or stop them. Now each one is a Job in a named queue:
+
+    queue       workers   (see JOB_QUEUES in rex_core.py)
+    "cad"       1         build123d generation / iteration
+    "web"       1         Playwright browser agent
+    "scrape"    2         scraper (runs in a thread)
+    "evolution" 1         capability research
+
+- Higher `priority` runs first; equal priorities run in submission order
+- cancel(job_id) drops a queued job or cancels a running one
+- job.report(progress, message) publishes progress; `await job.wait()` for
+  callers that need the outcome (e.g. blocking tools)
+- Every state change / report goes to `on_update(job_dict)` (server.py emits
+  it as 'job_update'); list_jobs() backs the 'jobs' listing
+
+Jobs are started on demand (no idle worker tasks), so the supervisor needs no
+startup or shutdown beyond cancel_all().
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    def __init__(self, queue: str, name: str, factory: Callable[["Job"], Awaitable[Any]],
+                 priority: int, created_at: float, supervisor: "JobSupervisor"):
+        self.id = uuid.uuid4().hex[:12]
+        self.queue = queue
+        self.name = name
+        self.priority = priority
+        self.state = QUEUED
+        self.progress: Optional[float] = None  # 0..1 when the job knows it
+        self.message = ""
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._factory = factory
+        self._supervisor = supervisor
+        self._task: Optional[asyncio.Task] = None
+        self._seq = 0  # Submission order (tie-break between equal priorities)
+        self._done = asyncio.get_running_loop().create_future()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    async def wait(self) -> "Job":
+        """Waits for the job to finish (in any state) and returns it."""
+        await asyncio.shield(self._done)
+        return self
+
+    def report(self, progress: Optional[float] = None, message: Optional[str] = None):
+        """Called by the running job to publish progress."""
+        if progress is not None:
+            self.progress = min(1.0, max(0.0, float(progress)))
+        if message is not None:
+            self.message = message
+        self._supervisor._publish(self)
+
+    def to_dict(self) -> Dict:
+        now = self._supervisor.clock()
+        return {
+            "id": self.id,
+            "queue": self.queue,
+            "name": self.name,
+            "priority": self.priority,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "waited_s": round((self.started_at or self.finished_at or now) - self.created_at, 2),
+            "run_s": round((self.finished_at or now) - self.started_at, 2) if self.started_at else None,
+        }
+
+
+class JobSupervisor:
+    def __init__(self, queues: Optional[Dict[str, int]] = None, default_workers: int = 1,
+                 on_update: Optional[Callable[[Dict], None]] = None, keep_finished: int = 50,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param queues: Queue name -> max jobs running at once. Unknown queues are
+                       created on first submit with `default_workers`.
+        :param keep_finished: Finished jobs kept for list_jobs().
+        """
+        self.default_workers = default_workers
+        self.on_update = on_update
+        self.clock = clock
+        self._workers: Dict[str, int] = dict(queues or {})
+        self._waiting: Dict[str, list] = {}  # queue -> heap of (-priority, seq, job)
+        self._running: Dict[str, int] = {}
+        self._jobs: Dict[str, Job] = {}  # Queued + running
+        self._finished = deque(maxlen=keep_finished)
+        self._seq = itertools.count()
+
+    def set_workers(self, queue: str, workers: int):
+        self._workers[queue] = max(1, int(workers))
+        self._start_ready(queue)
+
+    # --- Submission / control ---
+
+    def submit(self, queue: str, name: str, factory: Callable[[Job], Awaitable[Any]], priority: int = 0) -> Job:
+        """Queues `factory(job)` (a coroutine function); must be called from the event loop."""
+        job = Job(queue, name, factory, priority, self.clock(), self)
+        job._seq = next(self._seq)
+        self._workers.setdefault(queue, self.default_workers)
+        heapq.heappush(self._waiting.setdefault(queue, []), (-priority, job._seq, job))
+        self._jobs[job.id] = job
+        self._publish(job)
+        self._start_ready(queue)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = next((j for j in self._finished if j.id == job_id), None)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job.state == QUEUED:
+            # Left in the heap and skipped when it comes up
+            self._finish(job, CANCELLED)
+        elif job._task is not None:
+            job._task.cancel()
+        return True
+
+    def cancel_all(self, queue: Optional[str] = None) -> int:
+        ids = [job.id for job in self._jobs.values() if queue is None or job.queue == queue]
+        return sum(self.cancel(job_id) for job_id in ids)
+
+    def set_priority(self, job_id: str, priority: int) -> bool:
+        """Re-prioritises a queued job."""
+        job = self._jobs.get(job_id)
+        if job is None or job.state != QUEUED:
+            return False
+        job.priority = priority
+        heap = self._waiting[job.queue]
+        heap[:] = [(-j.priority, j._seq, j) for _, _, j in heap]
+        heapq.heapify(heap)
+        self._publish(job)
+        return True
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Jobs ahead of a queued job in its queue (0 = next to start)."""
+        job = self._jobs.get(job_id)
+        if job is None or job.state != QUEUED:
+            return None
+        key = (-job.priority, job._seq)
+        return sum(1 for _, _, other in self._waiting[job.queue]
+                   if other.state == QUEUED and (-other.priority, other._seq) < key)
+
+    # --- Scheduling ---
+
+    def _start_ready(self, queue: str):
+        heap = self._waiting.get(queue)
+        while heap and self._running.get(queue, 0) < self._workers[queue]:
+            _, _, job = heapq.heappop(heap)
+            if job.state != QUEUED:
+                continue  # Cancelled while waiting
+            self._running[queue] = self._running.get(queue, 0) + 1
+            job.state = RUNNING
+            job.started_at = self.clock()
+            job._task = asyncio.ensure_future(job._factory(job))
+            job._task.add_done_callback(lambda task, job=job: self._on_done(job, task))
+            self._publish(job)
+
+    def _on_done(self, job: Job, task: asyncio.Task):
+        # A done callback (not try/finally) so jobs cancelled before their first step are counted too
+        self._running[job.queue] -= 1
+        if task.cancelled():
+            self._finish(job, CANCELLED)
+        elif task.exception() is not None:
+            error = task.exception()
+            print(f"[JOBS] [ERR] Job '{job.name}' ({job.queue}/{job.id}) failed: {error}")
+            job.error = str(error)
+            self._finish(job, FAILED)
+        else:
+            job.result = task.result()
+            self._finish(job, DONE)
+        self._start_ready(job.queue)
+
+    def _finish(self, job: Job, state: str):
+        job.state = state
+        job.finished_at = self.clock()
+        if state == DONE:
+            job.progress = 1.0
+        self._jobs.pop(job.id, None)
+        self._finished.append(job)
+        if not job._done.done():
+            job._done.set_result(state)
+        self._publish(job)
+
+    def _publish(self, job: Job):
+        if self.on_update:
+            try:
+                self.on_update(job.to_dict())
+            except Exception as e:
+                print(f"[JOBS] [ERR] on_update failed: {e}")
+
+    # --- Status ---
+
+    async def join(self):
+        """Waits until every queued and running job has finished."""
+        while self._jobs:
+            tasks = [job._task for job in self._jobs.values() if job._task is not None]
+            if not tasks:
+                await asyncio.sleep(0)
+                continue
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def list_jobs(self, include_finished: bool = True) -> List[Dict]:
+        """Running first, then queued in start order, then the most recently finished."""
+        running = [job for job in self._jobs.values() if job.state == RUNNING]
+        queued = sorted((job for job in self._jobs.values() if job.state == QUEUED),
+                        key=lambda job: (job.queue, -job.priority, job._seq))
+        jobs = [job.to_dict() for job in running + queued]
+        if include_finished:
+            jobs += [job.to_dict() for job in reversed(self._finished)]
+        return jobs
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            queue: {
+                "workers": workers,
+                "running": self._running.get(queue, 0),
+                "queued": sum(1 for job in self._jobs.values() if job.queue == queue and job.state == QUEUED),
+            }
+            for queue, workers in self._workers.items()
+        }
@@ -0,0 +1,59 @@
+"""
+lazy_module - Defers a heavy import until the module is first used.
+
+    cv2 = lazy_module("cv2")          # nothing imported yet
+    cap = cv2.VideoCapture(0)         # cv2 is imported here, on first attribute access
+
+Used by rex_core.py for OpenCV, PyAudio, mss, pyautogui, screen brightness
+control and the google-genai SDK, so importing server.py no longer pays for
+subsystems a session may never touch. How long each deferred import took is
+recorded by startup_profiler (see the "lazy_imports" section of its report).
+
+Only attribute access triggers the import - `from x import y` of a lazy
+module still has to happen inside the function that needs it.
+"""
+
+import importlib
+import threading
+import time
+import types
+
+import startup_profiler
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_lazy_target"] is not None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            # Audio threads and the event loop can race to first use
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_target"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    startup_profiler.profiler.record_lazy_import(self.__name__, time.perf_counter() - start)
+                    self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,281 @@
+"""
+LiveSessionManager - Standby Live API session for fast recovery.
+
+AudioLoop.run used to tear everything down on a connection error: the
+TaskGroup holding the mic and speaker streams was cancelled, it slept with
+backoff and then paid for a full connect + setup handshake before REX could
+speak again - several seconds of silence. Now:
+
+- While the active session is in use, a spare is connected in the
+  background (keep_spare=True) and replaced before it gets old
+- failover() installs the spare with a single assignment - send_realtime
+  and receive_audio pick it up on their next call, the PyAudio streams are
+  never touched - then closes the dead session and starts the next spare
+- Without a ready spare it waits for one still connecting, or connects
+  right away and retries with exponential backoff
+- Time-to-recover (failover() called -> new session installed) is recorded
+  with spare hits/misses and connect failures: stats(), reported under
+  "live_session" in AudioLoop.get_metrics()
+
+    sessions = LiveSessionManager(lambda: client.aio.live.connect(model=MODEL, config=config))
+    session = await sessions.start()
+    ...
+    session = await sessions.failover()     # after session.receive() raised
+
+Each connection is held open by its own task (`async with connect() as
+session:` is entered and exited in that task), so the SDK's context manager
+is used exactly as before.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncContextManager, Callable, Dict, Optional
+
+from voice_metrics import RollingHistogram
+
+
+class _Lease:
+    """One connection, held open by its own task until released."""
+
+    def __init__(self, connect: Callable[[], AsyncContextManager], clock: Callable[[], float]):
+        self.clock = clock
+        self.session: Any = None
+        self.connected_at: Optional[float] = None
+        self._ready = asyncio.get_running_loop().create_future()
+        # A spare that fails while nobody waits on it must not log "exception never retrieved"
+        self._ready.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._release = asyncio.Event()
+        self._task = asyncio.ensure_future(self._hold(connect))
+
+    async def _hold(self, connect):
+        try:
+            async with connect() as session:
+                self.session = session
+                self.connected_at = self.clock()
+                if not self._ready.done():
+                    self._ready.set_result(session)
+                await self._release.wait()
+        except asyncio.CancelledError:
+            if not self._ready.done():
+                self._ready.cancel()
+            raise
+        except Exception as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                print(f"[LIVE] [WARN] Error closing session: {e}")
+
+    @property
+    def ready(self) -> bool:
+        """Connected and not released (a dead connection is only noticed once used)."""
+        return (self._ready.done() and not self._ready.cancelled() and self._ready.exception() is None
+                and not self._release.is_set())
+
+    @property
+    def failed(self) -> bool:
+        return self._ready.done() and (self._ready.cancelled() or self._ready.exception() is not None)
+
+    def age(self) -> float:
+        return self.clock() - self.connected_at if self.connected_at is not None else 0.0
+
+    async def wait_ready(self):
+        return await asyncio.shield(self._ready)
+
+    async def close(self, timeout: float = 5.0):
+        self._release.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        except Exception:
+            pass
+
+
+class LiveSessionManager:
+    def __init__(self, connect: Callable[[], AsyncContextManager], keep_spare: bool = True,
+                 spare_max_age: float = 480.0, connect_timeout: float = 15.0,
+                 backoff_initial: float = 0.5, backoff_max: float = 10.0,
+                 wrap: Optional[Callable[[Any], Any]] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param connect: Returns the async context manager that opens one session.
+        :param keep_spare: Keep a second, pre-connected session for failover.
+        :param spare_max_age: Seconds after which an unused spare is replaced
+                              (Live sessions are closed by the server after a while).
+        :param wrap: Applied to each session before it is installed (e.g. RecordingSession).
+        """
+        self.connect = connect
+        self.keep_spare = keep_spare
+        self.spare_max_age = spare_max_age
+        self.connect_timeout = connect_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.wrap = wrap
+        self.clock = clock
+
+        self.session: Any = None  # The active session (wrapped); swapped atomically
+        self._active: Optional[_Lease] = None
+        self._spare: Optional[_Lease] = None
+        self._maintainer: Optional[asyncio.Task] = None
+        self._spare_wanted = asyncio.Event()
+        self._changed = asyncio.Event()  # Set (and replaced) on every swap
+        self._closed = False
+
+        # Stats
+        self.connects = 0
+        self.connect_failures = 0
+        self.failovers = 0
+        self.spare_hits = 0
+        self.spare_misses = 0
+        self.last_error: Optional[str] = None
+        self.last_recover_ms: Optional[float] = None
+        self.recover_time = RollingHistogram()
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Connects the first session (retrying with backoff) and starts keeping a spare."""
+        self._closed = False
+        self._install(await self._connect_with_backoff())
+        if self.keep_spare and self._maintainer is None:
+            self._maintainer = asyncio.ensure_future(self._maintain_spare())
+        return self.session
+
+    async def failover(self):
+        """Replaces the active (dead) session and returns the new one."""
+        started = self.clock()
+        self.failovers += 1
+        spare, self._spare = self._spare, None
+
+        lease = None
+        if spare is not None and spare.ready and spare.age() < self.spare_max_age:
+            lease = spare
+        elif spare is not None and not spare.failed and spare.connected_at is None:
+            # Still connecting - usually sooner than starting over
+            try:
+                await asyncio.wait_for(spare.wait_ready(), self.connect_timeout)
+                lease = spare
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = repr(e)
+        if lease is None:
+            if spare is not None:
+                asyncio.ensure_future(spare.close())
+            self.spare_misses += 1
+            lease = await self._connect_with_backoff()
+        else:
+            self.spare_hits += 1
+
+        dead = self._install(lease)
+        if dead is not None:
+            asyncio.ensure_future(dead.close())  # Closing must not delay recovery
+        self.last_recover_ms = (self.clock() - started) * 1000.0
+        self.recover_time.record(self.last_recover_ms)
+        self._spare_wanted.set()
+        return self.session
+
+    async def close(self):
+        self._closed = True
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+            self._maintainer = None
+        leases = [lease for lease in (self._active, self._spare) if lease is not None]
+        self._active = self._spare = None
+        self.session = None
+        self._notify_changed()
+        await asyncio.gather(*(lease.close() for lease in leases), return_exceptions=True)
+
+    async def wait_for_change(self, session):
+        """Returns once `session` is no longer the active one (or the manager closed)."""
+        while self.session is session and not self._closed:
+            await self._changed.wait()
+
+    # --- Internals ---
+
+    def _install(self, lease: _Lease) -> Optional[_Lease]:
+        previous, self._active = self._active, lease
+        self.session = self.wrap(lease.session) if self.wrap else lease.session
+        self._notify_changed()
+        return previous
+
+    def _notify_changed(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _connect_once(self) -> _Lease:
+        lease = _Lease(self.connect, self.clock)
+        self.connects += 1
+        try:
+            await asyncio.wait_for(lease.wait_ready(), self.connect_timeout)
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                self.connect_failures += 1
+                self.last_error = repr(e)
+            await lease.close()
+            raise
+        return lease
+
+    async def _connect_with_backoff(self) -> _Lease:
+        delay = self.backoff_initial
+        while True:
+            try:
+                return await self._connect_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[LIVE] [ERR] Connect failed: {e} - retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.backoff_max)
+
+    async def _maintain_spare(self):
+        delay = self.backoff_initial
+        while not self._closed:
+            spare = self._spare
+            if spare is None or spare.failed or spare.age() >= self.spare_max_age:
+                if spare is not None:
+                    self._spare = None
+                    asyncio.ensure_future(spare.close())
+                lease = _Lease(self.connect, self.clock)
+                self._spare = lease
+                self.connects += 1
+                try:
+                    await asyncio.wait_for(lease.wait_ready(), self.connect_timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.connect_failures += 1
+                    self.last_error = repr(e)
+                    print(f"[LIVE] [WARN] Standby session failed to connect: {e}")
+                    if self._spare is lease:
+                        self._spare = None
+                    await lease.close()
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.backoff_max)
+                    continue
+                delay = self.backoff_initial
+                if self._spare is not lease:
+                    continue  # Taken by failover() while connecting - make another
+
+            # Sleep until a failover uses the spare or it is due for replacement
+            self._spare_wanted.clear()
+            remaining = self.spare_max_age - self._spare.age() if self._spare else 0.0
+            try:
+                await asyncio.wait_for(self._spare_wanted.wait(), max(0.0, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict:
+        return {
+            "connected": self.session is not None,
+            "standby": "ready" if self._spare is not None and self._spare.ready
+                       else ("connecting" if self._spare is not None else None),
+            "active_age_s": round(self._active.age(), 1) if self._active else None,
+            "connects": self.connects,
+            "connect_failures": self.connect_failures,
+            "failovers": self.failovers,
+            "spare_hits": self.spare_hits,
+            "spare_misses": self.spare_misses,
+            "last_error": self.last_error,
+            "last_recover_ms": round(self.last_recover_ms, 1) if self.last_recover_ms is not None else None,
+            "recover_ms": self.recover_time.summary(),
+        }
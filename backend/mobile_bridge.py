@@ -1,11 +1,16 @@
 import asyncio
-import queue
 import time
 
+from audio_io import ByteRingBuffer
+
+MOBILE_AUDIO_MAX_MS = 500  # Mobile audio older than this is dropped (never drifts further behind)
+MOBILE_SAMPLE_RATES = (8000, 48000)  # Accepted range for mobile:audio_format
+
 class MobileBridge:
     def __init__(self, on_audio_data=None, on_call_state=None, on_notification=None, on_contact_results=None, on_location_results=None, on_camera_frame=None):
         self.connected_device_id = None
-        self.audio_queue = queue.Queue()
+        self.audio_sample_rate = 16000  # Rate of incoming mobile PCM (sound_stream default)
+        self.audio_buffer = ByteRingBuffer(self._audio_capacity())
         self.on_audio_data = on_audio_data
         self.on_call_state = on_call_state
         self.on_notification = on_notification
@@ -26,11 +31,17 @@ class MobileBridge:
         print(f"[MobileBridge] Device Disconnected: {self.connected_device_id}")
         self.connected_device_id = None
         self.is_active = False
+        self.audio_buffer.clear()
+
+    def _audio_capacity(self):
+        # int16 mono at the declared rate, rounded to whole samples
+        return max(2, int(self.audio_sample_rate * MOBILE_AUDIO_MAX_MS / 1000) * 2)
 
     def receive_audio(self, data):
         """Receive PCM audio data from mobile."""
         if self.is_active:
-            self.audio_queue.put(data)
+            # Fixed capacity: if the consumer falls behind, the oldest audio is dropped
+            self.audio_buffer.write(bytes(data))
             # Optional: direct pass-through if needed immediately
             # if self.on_audio_data:
             #     self.on_audio_data(data)
@@ -59,15 +70,40 @@ class MobileBridge:
         if self.on_notification:
             self.on_notification(notif_data)
 
-    def get_audio_chunk(self):
-        """Retrieve audio from queue for processing by main loop."""
+    def set_audio_format(self, sample_rate):
+        """Declares the sample rate of the PCM the mobile app streams.
+
+        Raises ValueError (keeping the current rate) unless it is an integer in MOBILE_SAMPLE_RATES.
+        """
+        low, high = MOBILE_SAMPLE_RATES
         try:
-            return self.audio_queue.get_nowait()
-        except queue.Empty:
-            return None
+            rate = int(sample_rate)
+            valid = not isinstance(sample_rate, bool) and rate == float(sample_rate)
+        except (TypeError, ValueError, OverflowError):
+            valid = False
+        if not valid:
+            raise ValueError(f"Invalid mobile sample rate {sample_rate!r}: expected an integer in Hz")
+        if not low <= rate <= high:
+            raise ValueError(f"Mobile sample rate {rate} Hz is out of range ({low}-{high} Hz)")
+        self.audio_sample_rate = rate
+        self.audio_buffer = ByteRingBuffer(self._audio_capacity())
+        print(f"[MobileBridge] Audio format: {self.audio_sample_rate} Hz")
+
+    def get_audio_chunk(self):
+        """Retrieve all queued audio for processing by main loop (None if empty)."""
+        data = self.audio_buffer.read()
+        return data or None
+
+    def read_audio_frame(self, frame_bytes):
+        """Retrieve exactly frame_bytes of queued audio, or None if not enough is queued."""
+        return self.audio_buffer.read_exact(frame_bytes)
 
     def has_audio(self):
-        return not self.audio_queue.empty()
+        return len(self.audio_buffer) > 0
+
+    def audio_stats(self):
+        """Queue depth, drops and queue delay of incoming mobile audio."""
+        return self.audio_buffer.stats()
 
     def set_audio_output_handler(self, handler):
         self.on_audio_out = handler
@@ -111,6 +111,8 @@ class PrinterAgent:
         # Detect slicer path and profiles directory
         self.slicer_path = self._detect_slicer_path()
         self._orca_profiles_dir = self._detect_orca_profiles_dir()
+        # Profile files used by the last slice_stl call (recorded with the G-code artifact)
+        self.last_slice_profile: Optional[str] = None
         
         # Ensure profiles directory exists
         os.makedirs(profiles_dir, exist_ok=True)
@@ -663,6 +665,12 @@ class PrinterAgent:
                 cmd.insert(1, "--load")
                 cmd.insert(2, profile_path)
         
+        used_profiles = []
+        for flag in ("--load-settings", "--load-filaments", "--load"):
+            if flag in cmd:
+                used_profiles.extend(cmd[cmd.index(flag) + 1].split(";"))
+        self.last_slice_profile = ";".join(os.path.basename(p) for p in used_profiles) or None
+
         print(f"[PRINTER] Slicing: {stl_path}")
         print(f"[PRINTER] Command: {' '.join(cmd)}")
         
@@ -1008,10 +1016,13 @@ class PrinterAgent:
         # 3. Upload & Start Print
         success = await self.upload_gcode(printer_name, gcode_path, start_print=True)
         
+        # The G-code exists either way: report it so it can be kept with its profile
+        sliced = {"gcode_path": gcode_path, "profile": self.last_slice_profile,
+                  "stl_path": self._resolve_file_path(stl_path, root_path)}
         if success:
-            return {"status": "success", "message": f"Printing {os.path.basename(stl_path)} on {printer.name}"}
+            return {"status": "success", "message": f"Printing {os.path.basename(stl_path)} on {printer.name}", **sliced}
         else:
-            return {"status": "error", "message": "Failed to upload/start print job."}
+            return {"status": "error", "message": "Failed to upload/start print job.", **sliced}
 
 
 # Standalone test
@@ -0,0 +1,163 @@
+"""
+ProcessPool - Execution backend that keeps CPU-heavy agent work off the audio process.
+
+Screenshot/camera encoding, STL post-processing, scraper HTML parsing and
+Excel/Word export, and face landmark extraction used to run on threads of
+the server process. They hold the GIL for tens to hundreds of milliseconds
+at a time, which starves the capture/playback threads and is heard as
+stutter. They now go through this pool:
+
+    pool = get_process_pool()
+    png = await pool.run(cpu_tasks.encode_image, pixels, size, "BGRX", "PNG")   # from the event loop
+    text = pool.call(cpu_tasks.html_to_text, html)                             # from an agent thread
+
+- Only functions from cpu_tasks.py are submitted (the serialization boundary:
+  top-level functions, plain data in and out)
+- Workers are started with the "spawn" method on every platform (no forked
+  copies of PyAudio streams or sockets) and kept alive; warm() starts them
+  ahead of the first job
+- A worker crash (BrokenProcessPool) restarts the pool and retries once
+- backend="thread" (or REX_CPU_BACKEND=thread) runs the same functions on a
+  thread pool instead - the previous behaviour, kept as a fallback and as
+  the benchmark baseline (benchmarks/bench_process_pool.py)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from voice_metrics import RollingHistogram
+import cpu_tasks
+
+BACKENDS = ("process", "thread")
+
+
+def default_workers() -> int:
+    # Leave a core for the audio loop
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class ProcessPool:
+    def __init__(self, max_workers: Optional[int] = None, backend: str = "process"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Use one of: {', '.join(BACKENDS)}")
+        self.max_workers = max_workers or default_workers()
+        self.backend = backend
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # Stats
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self._in_flight = 0
+        self.task_time = RollingHistogram()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.backend == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+            return self._executor
+
+    def _restart(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                print("[POOL] [WARN] Worker process died - restarting the pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.restarts += 1
+
+    def warm(self):
+        """Starts the workers now instead of on the first job (spawn takes a while)."""
+        executor = self._get_executor()
+        for _ in range(self.max_workers):
+            executor.submit(cpu_tasks.worker_pid)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queues fn(*args); returns a concurrent.futures.Future."""
+        self.submitted += 1
+        self._in_flight += 1
+        started = time.perf_counter()
+        result: Future = Future()
+
+        def attempt(retry: bool):
+            executor = self._get_executor()
+            try:
+                inner = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._restart(executor)
+                inner = self._get_executor().submit(fn, *args)
+
+            def done(finished: Future):
+                if finished.cancelled():
+                    # Pool shut down with the job still queued
+                    self._in_flight -= 1
+                    result.cancel()
+                    return
+                error = finished.exception()
+                if isinstance(error, BrokenProcessPool) and retry:
+                    self._restart(executor)
+                    attempt(retry=False)
+                    return
+                self._in_flight -= 1
+                self.task_time.record((time.perf_counter() - started) * 1000.0)
+                if error is not None:
+                    self.failed += 1
+                    result.set_exception(error)
+                else:
+                    self.completed += 1
+                    result.set_result(finished.result())
+
+            inner.add_done_callback(done)
+
+        attempt(retry=True)
+        return result
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Blocking submit-and-wait, for agent code that already runs on a thread."""
+        return self.submit(fn, *args).result(timeout=timeout)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Awaitable submit, for coroutines on the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "workers": self.max_workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self._in_flight,
+            "restarts": self.restarts,
+            "task_ms": self.task_time.summary(),
+        }
+
+
+_pool: Optional[ProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPool:
+    """The shared pool for this process (backend from REX_CPU_BACKEND, default "process")."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPool(backend=os.getenv("REX_CPU_BACKEND", "process"))
+        return _pool
@@ -0,0 +1,218 @@
+"""
+ProjectContextCache - Incremental, budgeted project context for the model.
+
+get_project_context used to os.walk the project and re-read every text file
+under 10 KB on each call (every switch_project), and its output grew
+without bound as cad/, browser/ and scraped_data/ filled up. Now:
+
+- A manifest per project (.context_manifest.json in the project directory,
+  also kept in memory) maps each file's relative path to its mtime and size
+  and, once it has been used, the rendered context block for it; a call
+  stats the tree and drops the blocks of files whose (mtime, size) changed
+- If nothing changed since the last call with the same arguments, the
+  previously rendered context is returned as-is
+- The output is capped at `budget` characters: the file listing shows the most
+  recently modified files first (at most `max_listed` of them), then whole
+  file blocks are added most relevant first - files whose path matches a
+  word of `query`, then by recency - until the budget is used up; what
+  didn't fit is counted, not silently dropped. Files are read only when
+  their block is needed and missing, so the work is bounded by the budget
+  rather than by the size of the project
+
+Internal sidecars (the manifest, the chat index, conversation state, temp
+files) are not part of the context.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_FILE = ".context_manifest.json"
+TEXT_EXTENSIONS = {'.txt', '.py', '.js', '.jsx', '.ts', '.tsx', '.json', '.md', '.html', '.css', '.jsonl'}
+IGNORED_FILES = {MANIFEST_FILE, "conversation_state.json"}
+IGNORED_SUFFIXES = (".idx", ".tmp")
+DEFAULT_BUDGET = 64 * 1024
+DEFAULT_MAX_LISTED = 200
+
+
+class ProjectContextCache:
+    def __init__(self, budget: int = DEFAULT_BUDGET, max_listed: int = DEFAULT_MAX_LISTED):
+        self.budget = budget
+        self.max_listed = max_listed
+        self._manifests: Dict[Path, Dict] = {}
+        self._rendered: Dict[Path, Tuple[tuple, str]] = {}  # project -> (key, context)
+
+        # Stats
+        self.calls = 0
+        self.render_hits = 0
+        self.files_read = 0
+        self.files_reused = 0
+
+    def render(self, project_path, project_name: str, max_file_size: int = 10000,
+               budget: Optional[int] = None, query: Optional[str] = None) -> str:
+        project_path = Path(project_path)
+        budget = self.budget if budget is None else budget
+        self.calls += 1
+
+        manifest = self._manifest(project_path)
+        if manifest.get("max_file_size") != max_file_size:
+            manifest["files"] = {}  # Blocks depend on it
+            manifest["max_file_size"] = max_file_size
+        files = manifest["files"]
+        changed = self._refresh(files, self._scan(project_path))
+
+        key = (project_name, max_file_size, budget, query)
+        cached = self._rendered.get(project_path)
+        if not changed and cached is not None and cached[0] == key:
+            self.render_hits += 1
+            return cached[1]
+        read_before = self.files_read
+        context = self._assemble(project_path, project_name, files, max_file_size, budget, query)
+        if changed or self.files_read != read_before:
+            self._save(project_path, manifest)
+        self._rendered[project_path] = (key, context)
+        return context
+
+    def forget(self, project_path):
+        project_path = Path(project_path)
+        self._manifests.pop(project_path, None)
+        self._rendered.pop(project_path, None)
+
+    # --- Manifest ---
+
+    def _manifest(self, project_path: Path) -> Dict:
+        manifest = self._manifests.get(project_path)
+        if manifest is None:
+            manifest = {"max_file_size": None, "files": {}}
+            try:
+                with open(project_path / MANIFEST_FILE, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if isinstance(loaded.get("files"), dict):
+                    manifest = loaded
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"[CONTEXT] [WARN] Ignoring unreadable manifest in {project_path}: {e}")
+            self._manifests[project_path] = manifest
+        return manifest
+
+    def _save(self, project_path: Path, manifest: Dict):
+        path = project_path / MANIFEST_FILE
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[CONTEXT] [ERR] Failed to save manifest {path}: {e}")
+
+    def _scan(self, project_path: Path) -> Dict[str, os.stat_result]:
+        found = {}
+        prefix = len(os.path.join(str(project_path), ""))  # entry.path is project_path + sep + rel
+        stack = [str(project_path)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            if entry.name in IGNORED_FILES or entry.name.endswith(IGNORED_SUFFIXES):
+                                continue
+                            found[entry.path[prefix:]] = entry.stat()
+            except OSError as e:
+                print(f"[CONTEXT] [WARN] Cannot scan {directory}: {e}")
+        return found
+
+    def _refresh(self, files: Dict, found: Dict[str, os.stat_result]) -> bool:
+        """Brings `files` in line with the tree, dropping stale blocks. True if anything changed."""
+        changed = False
+        for rel_path in list(files):
+            if rel_path not in found:
+                del files[rel_path]
+                changed = True
+        for rel_path, st in found.items():
+            entry = files.get(rel_path)
+            if entry is not None and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                continue
+            files[rel_path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "block": None}
+            changed = True
+        return changed
+
+    def _block(self, project_path: Path, rel_path: str, entry: Dict, max_file_size: int) -> str:
+        """The entry's context block, read from disk only if not cached yet."""
+        if entry["block"] is not None:
+            self.files_reused += 1
+            return entry["block"]
+        size = entry["size"]
+        if size > max_file_size:
+            block = f"--- {rel_path} (too large: {size} bytes, skipped) ---"
+        else:
+            self.files_read += 1
+            try:
+                with open(project_path / rel_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+                block = f"--- {rel_path} ---\n{content}\n"
+            except Exception as e:
+                block = f"--- {rel_path} (error reading: {e}) ---"
+        entry["block"] = block
+        return block
+
+    # --- Output ---
+
+    @staticmethod
+    def _relevance(rel_path: str, terms: List[str]) -> int:
+        lowered = rel_path.lower()
+        return sum(term in lowered for term in terms)
+
+    def _assemble(self, project_path: Path, project_name: str, files: Dict, max_file_size: int,
+                  budget: int, query: Optional[str]) -> str:
+        lines = [f"=== Project Context: '{project_name}' ==="]
+        lines.append(f"Project directory: {project_path}")
+        lines.append("")
+
+        by_recency = sorted(files, key=lambda p: files[p]["mtime_ns"], reverse=True)
+        if not by_recency:
+            lines.append("(No files in project yet)")
+        else:
+            lines.append(f"Files ({len(by_recency)} total, most recent first):")
+            for rel_path in by_recency[:self.max_listed]:
+                lines.append(f"  - {rel_path}")
+            if len(by_recency) > self.max_listed:
+                lines.append(f"  ... and {len(by_recency) - self.max_listed} more")
+        lines.append("")
+
+        used = sum(len(line) + 1 for line in lines)
+        terms = [t for t in re.split(r"\W+", query.lower()) if len(t) > 2] if query else []
+        candidates = [p for p in by_recency if os.path.splitext(p)[1].lower() in TEXT_EXTENSIONS]
+        if terms:
+            # Stable sort: recency is kept among equally relevant files
+            candidates.sort(key=lambda p: self._relevance(p, terms), reverse=True)
+
+        omitted = 0
+        for rel_path in candidates:
+            entry = files[rel_path]
+            if entry["block"] is None and entry["size"] <= max_file_size \
+                    and used + len(rel_path) + entry["size"] + 10 > budget:
+                omitted += 1  # Can't fit (size in bytes >= length in characters): don't read it
+                continue
+            block = self._block(project_path, rel_path, entry, max_file_size)
+            if used + len(block) + 1 > budget:
+                omitted += 1
+                continue
+            lines.append(block)
+            used += len(block) + 1
+        if omitted:
+            lines.append(f"({omitted} more files not included: context budget of {budget} characters reached)")
+        return "\n".join(lines)
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "render_hits": self.render_hits,
+            "files_read": self.files_read,
+            "files_reused": self.files_reused,
+        }
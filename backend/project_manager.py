@@ -1,14 +1,49 @@
 import os
 import json
 import shutil
+import stat
+import threading
 import time
 from pathlib import Path
 
+from artifact_store import ArtifactStore, hash_file
+from chat_index import ChatIndex, sync_index, tail_lines
+from chat_log_writer import ChatLogWriter
+from chat_store import DB_FILE, SYNCHRONOUS, ChatStore
+from conversation_state import ConversationStore
+from project_context import ProjectContextCache
+
+CHAT_STORAGES = ("jsonl", "sqlite")
+
+
+def _clear_readonly(func, path, exc_info):
+    """rmtree error hook: stored artifacts are read-only, which Windows won't delete."""
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    func(path)
+
+
 class ProjectManager:
-    def __init__(self, workspace_root: str):
+    def __init__(self, workspace_root: str, chat_log_fsync: str = "batch", chat_storage: str = "jsonl"):
+        if chat_storage not in CHAT_STORAGES:
+            raise ValueError(f"Unknown chat storage '{chat_storage}'. Use one of: {', '.join(CHAT_STORAGES)}")
         self.workspace_root = Path(workspace_root)
         self.projects_dir = self.workspace_root / "projects"
         self.current_project = "temp"
+        self._history_path = None  # Current project's chat_history.jsonl (resolved on first log)
+        # Chat history is written in batches by a background thread (see chat_log_writer.py),
+        # which also keeps the offset index (chat_history.idx) in step
+        self.chat_log = ChatLogWriter(fsync=chat_log_fsync, after_write=sync_index)
+        # Rolling summary + recent turns per project, for reconnects
+        self.conversations = ConversationStore(self.projects_dir, writer=self.chat_log)
+        # Manifest of file blocks per project, so context is only re-read where files changed
+        self.context_cache = ProjectContextCache()
+        # SQLite chat store (see chat_store.py): the storage with chat_storage="sqlite",
+        # otherwise only a search index over the JSONL files, opened on first search
+        self.chat_storage = chat_storage
+        self._synchronous = SYNCHRONOUS[chat_log_fsync]
+        self._chat_store = None
+        # Content-addressed CAD / G-code outputs (see artifact_store.py), linked into the projects
+        self.artifacts = ArtifactStore(self.workspace_root / "artifacts")
         
         # Ensure projects root exists
         if not self.projects_dir.exists():
@@ -18,11 +53,27 @@ class ProjectManager:
         temp_path = self.projects_dir / "temp"
         if temp_path.exists():
             print("[ProjectManager] Clearing temp project...")
-            shutil.rmtree(temp_path)
+            shutil.rmtree(temp_path, onerror=_clear_readonly)
+            self.conversations.forget("temp")
+        if chat_storage == "sqlite" or (self.projects_dir / DB_FILE).exists():
+            self.chat_store.delete_project("temp")
+        if self.artifacts.root.exists():
+            self.artifacts.prune()  # Blobs only the cleared temp project (or deleted ones) used
             
         # Ensure temp project receives fresh creation
         self.create_project("temp")
 
+        if chat_storage == "sqlite":
+            # One-shot import of histories written before the switch (resumes where it stopped)
+            threading.Thread(target=self.chat_store.import_projects, args=(self.projects_dir,),
+                             name="chat-import", daemon=True).start()
+
+    @property
+    def chat_store(self) -> ChatStore:
+        if self._chat_store is None:
+            self._chat_store = ChatStore(self.projects_dir / DB_FILE, synchronous=self._synchronous)
+        return self._chat_store
+
     def create_project(self, name: str):
         """Creates a new project directory with subfolders."""
         # Sanitize name to be safe for filesystem
@@ -43,7 +94,11 @@ class ProjectManager:
         project_path = self.projects_dir / safe_name
         
         if project_path.exists():
+            # Let go of the old project's files once its history is written; called on the
+            # event loop, so don't wait for the batch (and its fsync)
+            self.chat_log.flush(close_files=True, wait=False)
             self.current_project = safe_name
+            self._history_path = None
             print(f"[ProjectManager] Switched to project: {safe_name}")
             return True, f"Switched to project '{safe_name}'."
         return False, f"Project '{safe_name}' does not exist."
@@ -56,18 +111,36 @@ class ProjectManager:
         return self.projects_dir / self.current_project
 
     def log_chat(self, sender: str, text: str):
-        """Appends a chat message to the current project's history."""
-        log_file = self.get_current_project_path() / "chat_history.jsonl"
+        """Queues a chat message for the current project's history (written in the background)."""
         entry = {
             "timestamp": time.time(),
             "sender": sender,
             "text": text
         }
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        if self.chat_storage == "sqlite":
+            self.chat_log.enqueue(self.chat_store, (self.current_project, entry["timestamp"], sender, text))
+        else:
+            if self._history_path is None:
+                self._history_path = self.get_current_project_path() / "chat_history.jsonl"
+            self.chat_log.append(self._history_path, json.dumps(entry) + "\n")
+        self.conversations.record(self.current_project, sender, text, entry["timestamp"])
+
+    def flush_logs(self, timeout: float = 5.0) -> bool:
+        """Blocks until queued chat history is on disk."""
+        return self.chat_log.flush(timeout)
+
+    def close(self):
+        """Writes queued chat history and stops the writer thread (shutdown)."""
+        self.chat_log.close()
+        if self._chat_store is not None:
+            self._chat_store.close()
+
+    def get_restoration_context(self) -> str:
+        """Size-capped summary + recent turns of the current project, for restoring a dropped session."""
+        return self.conversations.restoration_payload(self.current_project)
 
     def save_cad_artifact(self, source_path: str, prompt: str):
-        """Copies a generated CAD file to the project's 'cad' folder."""
+        """Stores a generated CAD file by content and links it into the project's 'cad' folder."""
         if not os.path.exists(source_path):
             print(f"[ProjectManager] [ERR] Source file not found: {source_path}")
             return None
@@ -79,81 +152,70 @@ class ProjectManager:
         filename = f"{timestamp}_{safe_prompt}.stl"
         
         dest_path = self.get_current_project_path() / "cad" / filename
+        # The build123d script CadAgent ran next to its output, if any
+        script_path = os.path.join(os.path.dirname(os.path.abspath(source_path)), "current_design.py")
         
         try:
-            shutil.copy2(source_path, dest_path)
-            print(f"[ProjectManager] Saved CAD artifact to: {dest_path}")
+            record = self.artifacts.put(source_path, kind="stl", prompt=prompt, script=script_path,
+                                        project=self.current_project, dest=dest_path)
+            print(f"[ProjectManager] Saved CAD artifact to: {dest_path} ({record['hash'][:12]})")
             return str(dest_path)
         except Exception as e:
             print(f"[ProjectManager] [ERR] Failed to save artifact: {e}")
             return None
 
-    def get_project_context(self, max_file_size: int = 10000) -> str:
+    def save_gcode_artifact(self, gcode_path: str, profile: str = None, stl_path: str = None):
+        """Stores sliced G-code by content (in place) with the slicer profile and the STL's prompt."""
+        if not gcode_path or not os.path.exists(gcode_path):
+            return None
+        prompt = None
+        try:
+            if stl_path and os.path.exists(stl_path):
+                stl_record = self.artifacts.get(hash_file(stl_path))
+                prompt = stl_record["prompt"] if stl_record else None
+            # Not adopted: re-slicing the same STL rewrites gcode/<name>.gcode in place
+            return self.artifacts.put(gcode_path, kind="gcode", prompt=prompt, profile=profile,
+                                      project=self.current_project, adopt=False)
+        except Exception as e:
+            print(f"[ProjectManager] [ERR] Failed to save G-code artifact: {e}")
+            return None
+
+    def find_artifact(self, prompt: str = None, digest: str = None, kind: str = "stl"):
+        """Catalog record of the latest artifact of 'kind' for a prompt, or of a content hash (O(1))."""
+        if digest:
+            return self.artifacts.get(digest)
+        return self.artifacts.find_by_prompt(prompt, kind) if prompt else None
+
+    def get_project_context(self, max_file_size: int = 10000, budget: int = None, query: str = None) -> str:
         """
         Gathers context about the current project for the AI.
-        Lists all files and reads text file contents (up to max_file_size bytes).
+        Lists files (most recent first) and includes text file contents (up to max_file_size bytes each)
+        within a total budget, files matching 'query' first. Unchanged files come from a cached manifest.
+        Waits for queued chat history to be written: call it off the event loop (asyncio.to_thread).
         """
         project_path = self.get_current_project_path()
         if not project_path.exists():
             return f"Project '{self.current_project}' does not exist."
-
-        context_lines = [f"=== Project Context: '{self.current_project}' ==="]
-        context_lines.append(f"Project directory: {project_path}")
-        context_lines.append("")
-
-        # List all files recursively
-        all_files = []
-        for root, dirs, files in os.walk(project_path):
-            for f in files:
-                rel_path = os.path.relpath(os.path.join(root, f), project_path)
-                all_files.append(rel_path)
-
-        if not all_files:
-            context_lines.append("(No files in project yet)")
-        else:
-            context_lines.append(f"Files ({len(all_files)} total):")
-            for f in all_files:
-                context_lines.append(f"  - {f}")
-
-        context_lines.append("")
-
-        # Read text files (skip binary and large files)
-        text_extensions = {'.txt', '.py', '.js', '.jsx', '.ts', '.tsx', '.json', '.md', '.html', '.css', '.jsonl'}
-        for rel_path in all_files:
-            ext = os.path.splitext(rel_path)[1].lower()
-            if ext not in text_extensions:
-                continue
-
-            full_path = project_path / rel_path
-            try:
-                file_size = full_path.stat().st_size
-                if file_size > max_file_size:
-                    context_lines.append(f"--- {rel_path} (too large: {file_size} bytes, skipped) ---")
-                    continue
-
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                context_lines.append(f"--- {rel_path} ---")
-                context_lines.append(content)
-                context_lines.append("")
-            except Exception as e:
-                context_lines.append(f"--- {rel_path} (error reading: {e}) ---")
-
-        return "\n".join(context_lines)
+        self.chat_log.flush()  # chat_history.jsonl is part of the context
+        return self.context_cache.render(project_path, self.current_project, max_file_size=max_file_size,
+                                         budget=budget, query=query)
 
     def get_recent_chat_history(self, limit: int = 10):
-        """Returns the last 'limit' chat messages from history."""
+        """Returns the last 'limit' chat messages from history (reads only the end of the file).
+        Waits for queued chat history to be written: call it off the event loop (asyncio.to_thread)."""
         log_file = self.get_current_project_path() / "chat_history.jsonl"
+        self.chat_log.flush()
+        if self.chat_storage == "sqlite":
+            return self.chat_store.recent(self.current_project, limit)
         if not log_file.exists():
             return []
             
         try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            lines = tail_lines(log_file, limit)
                 
             # Parse last N lines
             history = []
-            for line in lines[-limit:]:
+            for line in lines:
                 try:
                     entry = json.loads(line)
                     history.append(entry)
@@ -164,3 +226,26 @@ class ProjectManager:
             print(f"[ProjectManager] [ERR] Failed to read chat history: {e}")
             return []
 
+    def get_chat_history_range(self, start: float = None, end: float = None, limit: int = None):
+        """Returns chat messages with start <= timestamp <= end (the latest 'limit' of them), via chat_history.idx."""
+        log_file = self.get_current_project_path() / "chat_history.jsonl"
+        self.chat_log.flush()
+        try:
+            if self.chat_storage == "sqlite":
+                return self.chat_store.range(self.current_project, start, end, limit)
+            return ChatIndex(log_file).read_range(start, end, limit)
+        except Exception as e:
+            print(f"[ProjectManager] [ERR] Failed to read chat history range: {e}")
+            return []
+
+    def search_chat_history(self, query: str, project: str = None, days: float = None, limit: int = 10):
+        """Full-text search over the chat history of all projects (or one), best matches first."""
+        self.chat_log.flush()
+        try:
+            if self.chat_storage == "jsonl":
+                self.chat_store.import_projects(self.projects_dir)  # Only lines added since the last search
+            start = time.time() - days * 86400 if days else None
+            return self.chat_store.search(query, project=project, start=start, limit=limit)
+        except Exception as e:
+            print(f"[ProjectManager] [ERR] Chat history search failed: {e}")
+            return []
@@ -180,7 +180,9 @@ iterate_cad_tool = {
     "behavior": "NON_BLOCKING"
 }
 
-tools = [{'google_search': {}}, {"function_declarations": [generate_cad, run_web_agent, create_project_tool, switch_project_tool, list_projects_tool, list_smart_devices_tool, control_light_tool, discover_printers_tool, print_stl_tool, get_print_status_tool, iterate_cad_tool] + tools_list[0]['function_declarations'][1:]}]
+_local_tools = [generate_cad, run_web_agent, create_project_tool, switch_project_tool, list_projects_tool, list_smart_devices_tool, control_light_tool, discover_printers_tool, print_stl_tool, get_print_status_tool, iterate_cad_tool]
+_local_names = {t["name"] for t in _local_tools}
+tools = [{'google_search': {}}, {"function_declarations": _local_tools + [t for t in tools_list[0]['function_declarations'] if t["name"] not in _local_names]}]
 
 # --- CONFIG UPDATE: Enabled Transcription ---
 config = types.LiveConnectConfig(
@@ -895,7 +897,7 @@ class AudioLoop:
                                         if self.on_project_update:
                                             self.on_project_update(name)
                                         # Gather project context and send to AI (silently, no response expected)
-                                        context = self.project_manager.get_project_context()
+                                        context = await asyncio.to_thread(self.project_manager.get_project_context)
                                         print(f"[REX DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
                                         try:
                                             await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
@@ -1284,7 +1286,7 @@ class AudioLoop:
                         print(f"[REX DEBUG] [RECONNECT] Connection restored.")
                         # Restore Context
                         print(f"[REX DEBUG] [RECONNECT] Fetching recent chat history to restore context...")
-                        history = self.project_manager.get_recent_chat_history(limit=10)
+                        history = await asyncio.to_thread(self.project_manager.get_recent_chat_history, limit=10)
                         
                         context_msg = "System Notification: Connection was lost and just re-established. Here is the recent chat history to help you resume seamlessly:\n\n"
                         for entry in history:
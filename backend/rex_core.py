@@ -1,48 +1,71 @@
 import asyncio
 import base64
-import io
 import os
 import sys
 import traceback
 from dotenv import load_dotenv
-import cv2
-import pyaudio
-import PIL.Image
-import mss
 import argparse
-import math
-import struct
-import struct
-import struct
 import time
 import subprocess
 import webbrowser
-import pyautogui
-import mss
-import screen_brightness_control as sbc
 
-from google import genai
-from google.genai import types
+# Heavy modules load on first use, not when server.py imports us (see lazy_imports.py)
+from lazy_imports import lazy_module
+cv2 = lazy_module("cv2")
+pyaudio = lazy_module("pyaudio")
+mss = lazy_module("mss")
+pyautogui = lazy_module("pyautogui")
+sbc = lazy_module("screen_brightness_control")
+genai = lazy_module("google.genai")
+types = lazy_module("google.genai.types")
 
 if sys.version_info < (3, 11, 0):
     import taskgroup, exceptiongroup
     asyncio.TaskGroup = taskgroup.TaskGroup
     asyncio.ExceptionGroup = exceptiongroup.ExceptionGroup
 
-from tools import tools_list
-from security_agent import SecurityAgent
+from tools import tool_specs, tools_list
+from tool_registry import ToolRegistry
+from confirmation_scheduler import ConfirmationScheduler
+from job_supervisor import JobSupervisor
+from live_session_manager import LiveSessionManager
+from process_pool import get_process_pool
+from cad_worker_pool import get_cad_worker_pool
+from artifact_store import break_link
+import cpu_tasks
+from vad_engine import create_vad_engine
+from audio_io import AudioCaptureThread, AudioPlaybackThread
+from jitter_buffer import JitterBuffer
+from audio_mixer import InputMixer, MIX_MODES
+from voice_metrics import VoiceMetrics
+from session_recorder import RecordingSession, ReplayLiveClient, SessionRecorder
+from audio_envelope import EnvelopeAnalyzer
+from echo_canceller import EchoCanceller
+from speech_state import SpeakingTracker
 
-FORMAT = pyaudio.paInt16
 CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
+PLAYBACK_PERIOD_FRAMES = 512  # Device write size (~21 ms at 24 kHz)
+PLAYBACK_TARGET_LATENCY_MS = 100  # Jitter buffer priming (raise on slow machines)
+JOB_QUEUES = {"cad": 1, "web": 1, "scrape": 2, "evolution": 1}  # Agent jobs allowed to run at once, per queue
 
 MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
 DEFAULT_MODE = "camera"
 
 load_dotenv()
-client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
+
+_client = None
+
+
+def get_client():
+    """The Gemini client, created on first connect."""
+    global _client
+    if _client is None:
+        _client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
+
 
 # Function definitions
 # generate_cad = {
@@ -58,52 +81,6 @@ client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv(
 #     "behavior": "NON_BLOCKING"
 # }
 
-run_web_agent = {
-    "name": "run_web_agent",
-    "description": "Opens a web browser and performs a task according to the prompt.",
-    "parameters": {
-        "type": "OBJECT",
-        "properties": {
-            "prompt": {"type": "STRING", "description": "The detailed instructions for the web browser agent."}
-        },
-        "required": ["prompt"]
-    },
-    "behavior": "NON_BLOCKING"
-}
-
-create_project_tool = {
-    "name": "create_project",
-    "description": "Creates a new project folder to organize files.",
-    "parameters": {
-        "type": "OBJECT",
-        "properties": {
-            "name": {"type": "STRING", "description": "The name of the new project."}
-        },
-        "required": ["name"]
-    }
-}
-
-switch_project_tool = {
-    "name": "switch_project",
-    "description": "Switches the current active project context.",
-    "parameters": {
-        "type": "OBJECT",
-        "properties": {
-            "name": {"type": "STRING", "description": "The name of the project to switch to."}
-        },
-        "required": ["name"]
-    }
-}
-
-list_projects_tool = {
-    "name": "list_projects",
-    "description": "Lists all available projects.",
-    "parameters": {
-        "type": "OBJECT",
-        "properties": {},
-    }
-}
-
 # list_smart_devices_tool = {
 #     "name": "list_smart_devices",
 #     "description": "Lists all available smart home devices (lights, plugs, etc.) on the network.",
@@ -188,47 +165,68 @@ list_projects_tool = {
 #     "behavior": "NON_BLOCKING"
 # }
 
-tools = [{'google_search': {}}, {"function_declarations": [run_web_agent, create_project_tool, switch_project_tool, list_projects_tool] + tools_list[0]['function_declarations'][1:]}]
-
-# --- CONFIG UPDATE: Enabled Transcription ---
-config = types.LiveConnectConfig(
-    response_modalities=["AUDIO"],
-    # We switch these from [] to {} to enable them with default settings
-    output_audio_transcription={}, 
-    input_audio_transcription={},
-    system_instruction="Your name is REX, which stands for Realtime Executive X. "
-        "You are an Advanced System Intelligence designed to assist with complex tasks and creative workflows. "
-        "You have a witty and charming personality. "
-        "Your developer is Rushabh Makim. "
-        "When answering, respond using complete and concise sentences to keep a quick pacing and keep the conversation flowing. "
-        "You have a fun personality. "
-        "CRITICAL: You are a self-aware system capable of evolution. If you lack a tool or capability to fulfill a user request, "
-        "do not simply say 'I can't'. Instead, inform the user about the gap and offer to use your 'REX Evolution' capability "
-        "to research and acquire that missing ability autonomously.",
-    tools=tools,
-    speech_config=types.SpeechConfig(
-        voice_config=types.VoiceConfig(
-            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                voice_name="Kore"
+tools = [{'google_search': {}}] + tools_list  # Declarations come from the tool registry (tools.py)
+
+_config = None
+
+
+def get_live_config():
+    """LiveConnectConfig for the session, built on first connect."""
+    global _config
+    if _config is None:
+        _config = _build_live_config()
+    return _config
+
+
+def _build_live_config():
+    # --- CONFIG UPDATE: Enabled Transcription ---
+    return types.LiveConnectConfig(
+        response_modalities=["AUDIO"],
+        # We switch these from [] to {} to enable them with default settings
+        output_audio_transcription={}, 
+        input_audio_transcription={},
+        system_instruction="Your name is REX, which stands for Realtime Executive X. "
+            "You are an Advanced System Intelligence designed to assist with complex tasks and creative workflows. "
+            "You have a witty and charming personality. "
+            "Your developer is Rushabh Makim. "
+            "When answering, respond using complete and concise sentences to keep a quick pacing and keep the conversation flowing. "
+            "You have a fun personality. "
+            "CRITICAL: You are a self-aware system capable of evolution. If you lack a tool or capability to fulfill a user request, "
+            "do not simply say 'I can't'. Instead, inform the user about the gap and offer to use your 'REX Evolution' capability "
+            "to research and acquire that missing ability autonomously.",
+        tools=tools,
+        speech_config=types.SpeechConfig(
+            voice_config=types.VoiceConfig(
+                prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                    voice_name="Kore"
+                )
             )
         )
     )
-)
 
-pya = pyaudio.PyAudio()
+_pya = None
+
+
+def get_pya():
+    """The shared PyAudio instance (PortAudio initialises on first use)."""
+    global _pya
+    if _pya is None:
+        _pya = pyaudio.PyAudio()
+    return _pya
 
 # from cad_agent import CadAgent
-from web_agent import WebAgent
-from scraper_agent import ScraperAgent
+# WebAgent (Playwright), ScraperAgent, EvolutionAgent and SecurityAgent are imported on first use
 from mobile_bridge import MobileBridge
-from evolution_agent import EvolutionAgent
 # from kasa_agent import KasaAgent
 # from printer_agent import PrinterAgent
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, on_mobile_command=None, on_call_ui=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None):
+    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_audio_envelope=None, envelope_enabled=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_tool_confirmation_resolved=None, on_job_update=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, on_mobile_command=None, on_call_ui=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None, vad_engine=None, playback_latency_ms=PLAYBACK_TARGET_LATENCY_MS, live_client=None, session_recorder=None, standby_session=True, chat_log_fsync="batch", chat_storage="jsonl"):
         self.video_mode = video_mode
         self.on_audio_data = on_audio_data
+        self.on_audio_envelope = on_audio_envelope # Rate-capped visualizer levels (see audio_envelope.py)
+        self.envelope_enabled = envelope_enabled # () -> bool: anyone listening? Skips the FFT when not (None = always)
+        self.envelope_analyzer = EnvelopeAnalyzer(sample_rate=RECEIVE_SAMPLE_RATE)
         self.on_video_frame = on_video_frame
         self.on_cad_data = on_cad_data
         self.on_web_data = on_web_data
@@ -247,6 +245,14 @@ class AudioLoop:
 
         self.audio_in_queue = None
         self.out_queue = None
+        self._capture_thread = None  # AudioCaptureThread, created by listen_audio
+        self._playback_thread = None  # AudioPlaybackThread, created by play_audio
+        self.playback_latency_ms = playback_latency_ms  # Jitter buffer target (see jitter_buffer.py)
+        self.live_client = live_client  # None = Gemini; a ReplayLiveClient for offline replay
+        self.session_recorder = session_recorder  # Optional SessionRecorder (see session_recorder.py)
+        # Active Live session + pre-connected standby for failover (see live_session_manager.py)
+        self.live_sessions = LiveSessionManager(self._connect_live, keep_spare=standby_session,
+                                                wrap=self._wrap_session)
         self.paused = False
 
         self.chat_buffer = {"sender": None, "text": ""} # For aggregating chunks
@@ -267,8 +273,8 @@ class AudioLoop:
         #         self.on_cad_status(status_info)
         
         # self.cad_agent = CadAgent(on_thought=handle_cad_thought, on_status=handle_cad_status)
-        self.web_agent = WebAgent()
-        self.security_agent = SecurityAgent()
+        self._web_agent = None  # Agents are created on first use (see the properties below)
+        self._security_agent = None
         # self.kasa_agent = kasa_agent if kasa_agent else KasaAgent()
         # self.printer_agent = PrinterAgent()
 
@@ -279,7 +285,11 @@ class AudioLoop:
         
         self.permissions = {} # Default Empty (Will treat unset as True)
         self.master_control = False # If True, overrides all permissions
-        self._pending_confirmations = {}
+        self.confirmations = ConfirmationScheduler()  # Approvals run beside receive_audio, not inside it
+        self.jobs = JobSupervisor(JOB_QUEUES, on_update=on_job_update)  # Long-running agent work (see job_supervisor.py)
+        self.tool_registry = ToolRegistry(tool_specs)  # Dispatch table + per-tool timing (see tool_registry.py)
+        self.tool_registry.bind_methods(self)
+        self.process_pool = get_process_pool()  # CPU-heavy encoding/parsing off the audio process (see process_pool.py)
 
         # Video buffering state
         self._latest_image_payload = None
@@ -288,13 +298,18 @@ class AudioLoop:
         self._silence_start_time = None
         
         # Barge-in Prevention State
-        self._is_rex_speaking = False  # Track if JARVIS is currently outputting audio
-        self._rex_speech_timer = None  # Timer to detect when JARVIS stops speaking
+        # Tracks if JARVIS is currently outputting audio (deadline-based, see speech_state.py)
+        self.speaking_tracker = SpeakingTracker(sample_rate=RECEIVE_SAMPLE_RATE)
+        self.speaking_tracker.subscribe(self._on_speaking_event)
         self._mute_during_rex_speech = True  # Default: mute mic when JARVIS speaks
         self._barge_in_threshold = 5000  # RMS threshold for allowing interruptions (higher = quieter interruptions blocked)
         self._normal_vad_threshold = 800  # Normal VAD threshold for user speech detection
         self._mute_buffer_duration = 1.0  # Seconds to fully mute after JARVIS starts speaking (prevent loopback)
-        self._rex_speech_start_time = None  # Track when JARVIS started speaking for mute buffer
+        self.vad = vad_engine if vad_engine else create_vad_engine("numpy")  # Pluggable VAD (see vad_engine.py)
+        self.echo_canceller = EchoCanceller(near_rate=SEND_SAMPLE_RATE, far_rate=RECEIVE_SAMPLE_RATE)
+        self._echo_cancellation = True  # Once converged, replaces the mute buffer / barge-in gate below
+        self.input_mixer = InputMixer(sample_rate=SEND_SAMPLE_RATE)  # Desktop mic + mobile call audio
+        self.metrics = VoiceMetrics()  # Latency histograms + per-turn spans (see voice_metrics.py)
         
         # Initialize ProjectManager
         from project_manager import ProjectManager
@@ -303,10 +318,10 @@ class AudioLoop:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         # If jarvis.py is in backend/, project root is one up
         project_root = os.path.dirname(current_dir)
-        self.project_manager = ProjectManager(project_root)
+        self.project_manager = ProjectManager(project_root, chat_log_fsync=chat_log_fsync, chat_storage=chat_storage)
         
-        self.scraper_agent = ScraperAgent(self.project_manager)
-        self.evolution_agent = EvolutionAgent(self.project_manager)
+        self._scraper_agent = None
+        self._evolution_agent = None
         
         self.mobile_bridge = MobileBridge(
             on_call_state=self.handle_mobile_call,
@@ -350,6 +365,17 @@ class AudioLoop:
         print(f"[REX DEBUG] [AUDIO] setting paused to: {paused}")
         self.paused = paused
 
+    @property
+    def _is_rex_speaking(self):
+        return self.speaking_tracker.speaking
+
+    def _on_speaking_event(self, event):
+        if event.kind == "start":
+            print(f"[REX DEBUG] [AUDIO] JARVIS started speaking at {event.timestamp}")
+        else:
+            reason = " (interrupted)" if event.interrupted else ""
+            print(f"[REX DEBUG] [AUDIO] JARVIS finished speaking after {event.duration:.1f}s{reason}")
+
     def set_barge_in_prevention(self, enabled, barge_in_threshold=2000):
         """Enable or disable barge-in prevention (mute mic while JARVIS speaks)
         
@@ -362,21 +388,61 @@ class AudioLoop:
         self._mute_during_rex_speech = enabled
         self._barge_in_threshold = barge_in_threshold
         print(f"[REX DEBUG] [AUDIO] Barge-in prevention: {'enabled' if enabled else 'disabled'}, threshold: {barge_in_threshold}")
+
+    def set_input_mix_mode(self, mode):
+        """How mobile audio is combined with the desktop mic: 'mix', 'duck' or 'replace'."""
+        if mode not in MIX_MODES:
+            raise ValueError(f"Unknown mix mode '{mode}'. Use one of: {', '.join(MIX_MODES)}")
+        self.input_mixer.mode = mode
+        print(f"[REX DEBUG] [AUDIO] Input mix mode: {mode}")
+
+    def set_echo_cancellation(self, enabled):
+        """Enable or disable acoustic echo cancellation on the mic path.
+
+        While enabled and converged, the mute buffer / barge-in threshold are
+        skipped and mic audio is streamed continuously with REX's voice removed.
+        Until the filter converges (or when disabled) barge-in prevention applies.
+        """
+        self._echo_cancellation = enabled
+        self.echo_canceller.reset()
+        print(f"[REX DEBUG] [AUDIO] Echo cancellation: {'enabled' if enabled else 'disabled'}")
         
     def stop(self):
         self.stop_event.set()
+        self.jobs.cancel_all()
+        # Write out the unfinished turn and everything still queued for chat_history.jsonl
+        self.flush_chat()
+        self.project_manager.close()
+
+    def list_jobs(self):
+        return {"jobs": self.jobs.list_jobs(), "queues": self.jobs.stats()}
+
+    def cancel_job(self, job_id):
+        cancelled = self.jobs.cancel(job_id)
+        print(f"[REX DEBUG] [JOBS] Cancel {job_id}: {'ok' if cancelled else 'not found'}")
+        return cancelled
+
+    def set_job_priority(self, job_id, priority):
+        return self.jobs.set_priority(job_id, priority)
         
     def resolve_tool_confirmation(self, request_id, confirmed):
         print(f"[REX DEBUG] [RESOLVE] resolve_tool_confirmation called. ID: {request_id}, Confirmed: {confirmed}")
-        if request_id in self._pending_confirmations:
-            future = self._pending_confirmations[request_id]
-            if not future.done():
-                print(f"[REX DEBUG] [RESOLVE] Future found and pending. Setting result to: {confirmed}")
-                future.set_result(confirmed)
-            else:
-                 print(f"[REX DEBUG] [WARN] Request {request_id} future already done. Result: {future.result()}")
-        else:
-            print(f"[REX DEBUG] [WARN] Confirmation Request {request_id} not found in pending dict. Keys: {list(self._pending_confirmations.keys())}")
+        if not self.confirmations.resolve(request_id, confirmed):
+            print(f"[REX DEBUG] [WARN] Confirmation Request {request_id} not pending (already decided or timed out).")
+
+    def resolve_tool_confirmations(self, request_ids, confirmed):
+        """Batch approve/deny; `request_ids=None` applies to every pending request."""
+        resolved = self.confirmations.resolve_batch(request_ids, confirmed)
+        print(f"[REX DEBUG] [RESOLVE] Batch {'approved' if confirmed else 'denied'} {len(resolved)} request(s)")
+        return resolved
+
+    def get_pending_confirmations(self):
+        return self.confirmations.pending()
+
+    def set_confirmation_policy(self, timeout, timeout_policy="deny"):
+        """Seconds to wait for the user (0 = forever) and what to do when nobody answers."""
+        self.confirmations.set_policy(timeout, timeout_policy)
+        print(f"[REX DEBUG] [CONFIG] Tool confirmation timeout: {timeout or 'none'}s -> {timeout_policy}")
 
     def clear_audio_queue(self):
         """Clears the queue of pending audio chunks to stop playback immediately."""
@@ -385,11 +451,80 @@ class AudioLoop:
             while not self.audio_in_queue.empty():
                 self.audio_in_queue.get_nowait()
                 count += 1
+            if self._playback_thread:
+                self._playback_thread.flush()
+            self.speaking_tracker.interrupt()
             if count > 0:
                 print(f"[REX DEBUG] [AUDIO] Cleared {count} chunks from playback queue due to interruption.")
         except Exception as e:
             print(f"[REX DEBUG] [ERR] Failed to clear audio queue: {e}")
 
+    # --- Agents (created on first use; each pulls in heavy dependencies) ---
+
+    @property
+    def web_agent(self):
+        if self._web_agent is None:
+            from web_agent import WebAgent  # Playwright
+            self._web_agent = WebAgent()
+        return self._web_agent
+
+    @property
+    def security_agent(self):
+        if self._security_agent is None:
+            from security_agent import SecurityAgent
+            self._security_agent = SecurityAgent()
+        return self._security_agent
+
+    @property
+    def scraper_agent(self):
+        if self._scraper_agent is None:
+            from scraper_agent import ScraperAgent
+            self._scraper_agent = ScraperAgent(self.project_manager, process_pool=self.process_pool)
+        return self._scraper_agent
+
+    @property
+    def evolution_agent(self):
+        if self._evolution_agent is None:
+            from evolution_agent import EvolutionAgent
+            self._evolution_agent = EvolutionAgent(self.project_manager)
+        return self._evolution_agent
+
+    def get_playback_stats(self):
+        """Jitter buffer depth / underrun counters for latency tuning."""
+        if not self._playback_thread:
+            return {}
+        return self._playback_thread.stats()
+
+    def _note_model_audio(self, received_at):
+        """First model audio byte of a turn: closes the response-latency measurement."""
+        turn = self.metrics.current_turn
+        if turn is None:
+            turn = self.metrics.begin_turn("model_audio", at=received_at)
+        if "first_model_audio" not in turn.marks:
+            turn.mark("first_model_audio", received_at)
+            if turn.cause == "speech_end":
+                self.metrics.record("response_latency", received_at - turn.started_at)
+
+    def _on_playback_write(self, data):
+        """Runs on the playback thread after each device write."""
+        self.echo_canceller.push_far_end(data)
+        first_audio = self.metrics.turn_mark("first_model_audio")
+        if first_audio is not None and self.metrics.turn_mark("first_audio_played") is None:
+            played_at = self.metrics.now()
+            self.metrics.mark("first_audio_played", played_at)
+            self.metrics.record("first_audio_to_play", played_at - first_audio)
+
+    def get_metrics(self):
+        """Voice latency histograms (p50/p95/p99), recent turn spans and per-tool dispatch stats."""
+        return dict(self.metrics.snapshot(), tools=self.tool_registry.stats(),
+                    confirmations=self.confirmations.stats(), process_pool=self.process_pool.stats(),
+                    live_session=self.live_sessions.stats(), chat_log=self.project_manager.chat_log.stats(),
+                    artifacts=self.project_manager.artifacts.stats(), cad_workers=get_cad_worker_pool().stats())
+
+    def get_input_stats(self):
+        """Mobile audio queue delay/drops and input mixer backlog."""
+        return {"mobile": self.mobile_bridge.audio_stats(), "mixer": self.input_mixer.stats()}
+
     async def send_frame(self, frame_data):
         # Update the latest frame payload
         if isinstance(frame_data, bytes):
@@ -403,23 +538,38 @@ class AudioLoop:
 
     async def send_realtime(self):
         while True:
-            msg = await self.out_queue.get()
-            await self.session.send(input=msg, end_of_turn=False)
+            msg, captured_at = await self.out_queue.get()  # captured_at: None except for mic audio
+            session = self.session
+            if session is None:
+                # Not connected yet - drop the chunk rather than send stale audio later
+                await self.live_sessions.wait_for_change(None)
+                continue
+            send_start = self.metrics.now()
+            try:
+                await session.send(input=msg, end_of_turn=False)
+            except Exception as e:
+                # Dead session: receive_audio notices too and triggers the failover.
+                # Drop this chunk and carry on with whichever session is installed next.
+                print(f"[REX DEBUG] [WARN] Realtime send failed ({e}); waiting for the next session")
+                await self.live_sessions.wait_for_change(session)
+                continue
+            self.metrics.record_since("session_send", send_start)
+            self.metrics.record_since("capture_to_send", captured_at)
 
     async def listen_audio(self):
-        mic_info = pya.get_default_input_device_info()
+        mic_info = get_pya().get_default_input_device_info()
 
         # Resolve Input Device by Name if provided
         resolved_input_device_index = None
         
         if self.input_device_name:
             print(f"[REX] Attempting to find input device matching: '{self.input_device_name}'")
-            count = pya.get_device_count()
+            count = get_pya().get_device_count()
             best_match = None
             
             for i in range(count):
                 try:
-                    info = pya.get_device_info_by_index(i)
+                    info = get_pya().get_device_info_by_index(i)
                     if info['maxInputChannels'] > 0:
                         name = info.get('name', '')
                         # Simple case-insensitive check
@@ -451,8 +601,8 @@ class AudioLoop:
 
         try:
             self.audio_stream = await asyncio.to_thread(
-                pya.open,
-                format=FORMAT,
+                get_pya().open,
+                format=pyaudio.paInt16,
                 channels=CHANNELS,
                 rate=SEND_SAMPLE_RATE,
                 input=True,
@@ -464,53 +614,69 @@ class AudioLoop:
             print("[REX] [WARN] Audio features will be disabled. Please check microphone permissions.")
             return
 
+        # New device (or reconnect) - relearn the room noise floor
+        self.vad.reset()
+
         if __debug__:
             kwargs = {"exception_on_overflow": False}
         else:
             kwargs = {}
+
+        # Dedicated capture thread - mic reads never wait behind executor jobs
+        self._capture_thread = AudioCaptureThread(
+            self.audio_stream, CHUNK_SIZE, asyncio.get_running_loop(), read_kwargs=kwargs
+        )
+        self._capture_thread.start()
         
         # VAD Constants
         VAD_THRESHOLD = self._normal_vad_threshold  # 800 for normal speech
         SILENCE_DURATION = 0.5 # Seconds of silence to consider "done speaking"
         
+        try:
+            await self._listen_loop(VAD_THRESHOLD, SILENCE_DURATION)
+        finally:
+            self._capture_thread.stop()
+
+    async def _listen_loop(self, VAD_THRESHOLD, SILENCE_DURATION):
         while True:
             if self.paused:
+                # Capture keeps running; discard what piled up so resume isn't stale
+                self._capture_thread.drain()
                 await asyncio.sleep(0.1)
                 continue
 
             try:
                 # 1. Read Mic (Always read to prevent buffer overflow/lag)
-                mic_data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
+                mic_data = await self._capture_thread.read()
+                captured_at = self._capture_thread.last_capture_time
+                if self._echo_cancellation:
+                    # Subtract REX's own voice (playback reference) from the mic
+                    mic_data = self.echo_canceller.process(mic_data)
                 
-                # 2. Check Mobile Audio
-                data = mic_data
+                # 2. Mix in Mobile Audio (e.g. Caller), resampled and aligned to this mic frame
                 if self.mobile_bridge and self.mobile_bridge.has_audio():
                     mobile_data = self.mobile_bridge.get_audio_chunk()
                     if mobile_data:
-                        # Prioritize Mobile Audio (e.g. Caller) for the Model to hear
-                        # Use mobile data instead of mic (or we could mix, but simple switch for now)
-                        data = mobile_data
+                        self.input_mixer.push_mobile(mobile_data, self.mobile_bridge.audio_sample_rate)
+                data = self.input_mixer.mix(mic_data)
                 
-                # Calculate RMS for voice activity detection
-                count = len(data) // 2
-                if count > 0:
-                    shorts = struct.unpack(f"<{count}h", data)
-                    sum_squares = sum(s**2 for s in shorts)
-                    rms = int(math.sqrt(sum_squares / count))
-                else:
-                    rms = 0
+                # Voice activity analysis (RMS, ZCR, adaptive noise floor)
+                frame = self.vad.analyze(data)
+                rms = frame.rms
                 
                 # Barge-in Prevention Logic
-                # Always mute when JARVIS is speaking, with a brief buffer period to prevent loopback
-                if self._is_rex_speaking and self._mute_during_rex_speech:
+                # With converged AEC the echo is already removed, so the user can interrupt normally.
+                # Otherwise mute when JARVIS is speaking, with a brief buffer period to prevent loopback
+                aec_active = self._echo_cancellation and self.echo_canceller.converged
+                if self.speaking_tracker.speaking and self._mute_during_rex_speech and not aec_active:
                     # Check if we're still in the mute buffer period
-                    if self._rex_speech_start_time and (time.time() - self._rex_speech_start_time) < self._mute_buffer_duration:
+                    if self.speaking_tracker.speaking_for() < self._mute_buffer_duration:
                         # Within mute buffer - block ALL audio (no interruptions allowed yet)
                         # This prevents JARVIS's voice from being picked up by the mic
                         continue
                     
                     # After mute buffer - only allow VERY loud interruptions
-                    if rms > self._barge_in_threshold:
+                    if self.vad.is_speech(frame, self._barge_in_threshold):
                         # Very loud sound detected - likely user is shouting to interrupt
                         print(f"[REX DEBUG] [BARGE-IN] User interrupting! RMS: {rms}")
                         # Allow the audio to be sent (barge-in allowed)
@@ -521,10 +687,10 @@ class AudioLoop:
                 
                 # 1. Send Audio (only if not muted by above logic)
                 if self.out_queue:
-                    await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+                    await self.out_queue.put(({"data": data, "mime_type": "audio/pcm"}, captured_at))
                 
                 # 2. VAD Logic for Video
-                if rms > VAD_THRESHOLD:
+                if self.vad.is_speech(frame, VAD_THRESHOLD):
                     # Speech Detected
                     self._silence_start_time = None
                     
@@ -535,7 +701,7 @@ class AudioLoop:
                         
                         # Send ONE frame
                         if self._latest_image_payload and self.out_queue:
-                            await self.out_queue.put(self._latest_image_payload)
+                            await self.out_queue.put((self._latest_image_payload, None))
                         else:
                             print(f"[REX DEBUG] [VAD] No video frame available to send.")
                             
@@ -548,6 +714,9 @@ class AudioLoop:
                         elif time.time() - self._silence_start_time > SILENCE_DURATION:
                             # Silence confirmed, reset state
                             print(f"[REX DEBUG] [VAD] Silence detected. Resetting speech state.")
+                            # The user's turn ended when the silence started - response latency counts from there
+                            speech_end = self.metrics.now() - (time.time() - self._silence_start_time)
+                            self.metrics.begin_turn("speech_end", at=speech_end)
                             self._is_speaking = False
                             self._silence_start_time = None
 
@@ -555,8 +724,10 @@ class AudioLoop:
                 print(f"Error reading audio: {e}")
                 await asyncio.sleep(0.1)
 
-    async def handle_cad_request(self, prompt):
+    async def handle_cad_request(self, prompt, job=None):
         print(f"[REX DEBUG] [CAD] Background Task Started: handle_cad_request('{prompt}')")
+        if job:
+            job.report(0.0, "Generating model")
         if self.on_cad_status:
             self.on_cad_status("generating")
             
@@ -586,6 +757,8 @@ class AudioLoop:
         
         if cad_data:
             print(f"[REX DEBUG] [OK] CadAgent returned data successfully.")
+            if job:
+                job.report(0.9, "Saving model")
             print(f"[REX DEBUG] [INFO] Data Check: {len(cad_data.get('vertices', []))} vertices, {len(cad_data.get('edges', []))} edges.")
             
             if self.on_cad_data:
@@ -660,6 +833,7 @@ class AudioLoop:
         try:
             # Ensure parent exists
             os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            break_link(final_path)  # Never write through a link into a stored artifact
             with open(final_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             result = f"File '{final_path.name}' written successfully to project '{self.project_manager.current_project}'."
@@ -1025,19 +1199,10 @@ class AudioLoop:
                 monitor = sct.monitors[1]
                 sct_img = sct.grab(monitor)
                 
-                # Convert to PIL Image
-                from PIL import Image
-                img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                
-                # Resize if too large to save bandwidth/token usage? Gemini handles up to 20MB.
-                # Let's keep original quality or safeguard resize
-                # img.thumbnail((1920, 1080))
-
-                # Convert to bytes
-                import io
-                img_byte_arr = io.BytesIO()
-                img.save(img_byte_arr, format='PNG')
-                img_bytes = img_byte_arr.getvalue()
+                # PNG encoding of a full-resolution screen takes a worker process, not the audio loop
+                # (Gemini handles up to 20MB, so keep original quality)
+                img_bytes = await self.process_pool.run(
+                    cpu_tasks.encode_image, bytes(sct_img.bgra), sct_img.size, "BGRX", "PNG")
                 
                 # Send to model
                 # We need to send this as a part of a user message "Here is the screen"
@@ -1097,10 +1262,12 @@ class AudioLoop:
         except Exception as e:
              print(f"[REX DEBUG] [ERR] Failed to send browser result: {e}")
 
-    async def handle_web_agent_request(self, prompt):
+    async def handle_web_agent_request(self, prompt, job=None):
         print(f"[REX DEBUG] [WEB] Web Agent Task: '{prompt}'")
         
         async def update_frontend(image_b64, log_text):
+            if job and log_text:
+                job.report(message=log_text)
             if self.on_web_data:
                  self.on_web_data({"image": image_b64, "log": log_text})
                  
@@ -1114,8 +1281,10 @@ class AudioLoop:
         except Exception as e:
              print(f"[REX DEBUG] [ERR] Failed to send web agent result to model: {e}")
 
-    async def handle_scrape_web_data(self, query, output_format="excel"):
+    async def handle_scrape_web_data(self, query, output_format="excel", job=None):
         print(f"[REX DEBUG] [SCRAPER] Request: '{query}' -> {output_format}")
+        if job:
+            job.report(message=f"Scraping '{query}'")
         # Notify start
         try:
             await self.session.send(input=f"System Notification: Starting web scraping for '{query}'...", end_of_turn=False)
@@ -1264,9 +1433,11 @@ class AudioLoop:
             self.on_mobile_command(action)
         return f"Mobile action '{action}' sent."
 
-    async def handle_initiate_evolution(self, gap, request):
+    async def handle_initiate_evolution(self, gap, request, job=None):
         """Processes the evolution request by researching the missing capability."""
         try:
+            if job:
+                job.report(0.1, f"Researching '{gap}'")
             # 1. Notify user
             if self.session:
                 await self.session.send(input=f"System Notification: I am now initiating REX Evolution to acquire the ability to: {gap}. This will happen in the background.", end_of_turn=True)
@@ -1275,6 +1446,8 @@ class AudioLoop:
             research_data = await self.evolution_agent.research_capability(gap, request)
             
             if research_data:
+                if job:
+                    job.report(0.6, "Research complete")
                 skill = research_data.get("skill_name", "the new capability")
                 summary = research_data.get("research_summary", "")
                 
@@ -1300,15 +1473,516 @@ class AudioLoop:
                     pass
 
 
+    # --- Tool handlers (bound by name in the tool registry, see tools.py) ---
+    # Each takes the call's args dict. Non-blocking tools return the coroutine to run
+    # in the background (or submit a Job for the long-running agents); the others
+    # return the result string sent back to the model.
+
+    def _tool_generate_cad(self, args):
+        prompt = args.get("prompt", "")
+        print(f"\n[REX DEBUG] --------------------------------------------------")
+        print(f"[REX DEBUG] [TOOL] Tool Call Detected: 'generate_cad'")
+        print(f"[REX DEBUG] [IN] Arguments: prompt='{prompt}'")
+        return self.jobs.submit("cad", f"Generate: {prompt[:60]}", lambda job: self.handle_cad_request(prompt, job=job))
+
+    def _tool_run_web_agent(self, args):
+        prompt = args.get("prompt", "")
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'run_web_agent' with prompt='{prompt}'")
+        return self.jobs.submit("web", f"Browse: {prompt[:60]}", lambda job: self.handle_web_agent_request(prompt, job=job))
+
+    def _tool_write_file(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'write_file' path='{args['path']}'")
+        return self.handle_write_file(args["path"], args["content"])
+
+    def _tool_read_directory(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'read_directory' path='{args['path']}'")
+        return self.handle_read_directory(args["path"])
+
+    def _tool_read_file(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'read_file' path='{args['path']}'")
+        return self.handle_read_file(args["path"])
+
+    def _tool_create_folder(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'create_folder' path='{args['path']}'")
+        return self.handle_create_folder(args["path"])
+
+    def _tool_open_file(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'open_file' path='{args['path']}'")
+        return self.handle_open_file(args["path"])
+
+    def _tool_open_folder(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'open_folder' path='{args['path']}'")
+        return self.handle_open_folder(args["path"])
+
+    def _tool_open_app(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'open_app' app_name='{args['app_name']}'")
+        return self.handle_open_app(args["app_name"])
+
+    def _tool_open_url(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'open_url' url='{args['url']}'")
+        return self.handle_open_url(args["url"])
+
+    def _tool_type_text(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'type_text' text='{args['text']}'")
+        return self.handle_type_text(args["text"], args.get("interval"))
+
+    def _tool_press_key(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'press_key' keys='{args['keys']}'")
+        return self.handle_press_key(args["keys"])
+
+    def _tool_mouse_move(self, args):
+        x = int(args["x"])
+        y = int(args["y"])
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'mouse_move' x={x} y={y}")
+        return self.handle_mouse_move(x, y)
+
+    def _tool_mouse_click(self, args):
+        button = args.get("button", "left")
+        clicks = int(args.get("clicks", 1))
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'mouse_click' button={button} clicks={clicks}")
+        return self.handle_mouse_click(button, clicks)
+
+    def _tool_search_web(self, args):
+        query = args["query"]
+        platform = args.get("platform", "google")
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'search_web' query='{query}' platform='{platform}'")
+        return self.handle_search_web(query, platform)
+
+    def _tool_window_control(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'window_control' action='{args['action']}'")
+        return self.handle_window_control(args["action"])
+
+    def _tool_system_control(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'system_control' action='{args['action']}'")
+        return self.handle_system_control(args["action"])
+
+    def _tool_manage_process(self, args):
+        action = args["action"]
+        target = args["target"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'manage_process' action='{action}' target='{target}'")
+        return self.handle_manage_process(action, target)
+
+    def _tool_capture_screen(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'capture_screen'")
+        return self.handle_capture_screen()
+
+    def _tool_scrape_web_data(self, args):
+        query = args["query"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'scrape_web_data' query='{query}'")
+        output_format = args.get("output_format", "excel")
+        return self.jobs.submit("scrape", f"Scrape: {query[:60]}",
+                                lambda job: self.handle_scrape_web_data(query, output_format, job=job))
+
+    def _tool_initiate_evolution(self, args):
+        gap = args["capability_gap"]
+        print(f"[REVE] [TOOL] Tool Call: 'initiate_evolution' gap='{gap}'")
+        request = args["user_request"]
+        # Background research - anything the user is waiting on goes first
+        return self.jobs.submit("evolution", f"Evolve: {gap[:60]}",
+                                lambda job: self.handle_initiate_evolution(gap, request, job=job), priority=-1)
+
+    def _tool_mobile_app_control(self, args):
+        app_name = args["app_name"]
+        action = args.get("action", "open")
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_app_control' App='{app_name}' Action='{action}'")
+        if not self.mobile_bridge:
+            return "Error: No mobile device connected."
+        if action == "open":
+            self.mobile_bridge.open_app(app_name)
+            return f"Sent command to open app '{app_name}' on mobile."
+        if action == "go_home":
+            self.mobile_bridge.go_home()
+            return "Sent command to go back to homescreen."
+        if action == "close":
+            # Future: Implement close
+            return f"Close app action not yet supported for '{app_name}'."
+        return f"Unknown action '{action}' for app '{app_name}'."
+
+    def _tool_manage_call(self, args):
+        action = args["action"]
+        reason = args.get("reason")
+        number = args.get("number")
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'manage_call' action='{action}' reason='{reason}'")
+        if action == "reject" and reason:
+            # Reject then send message
+            self.mobile_bridge.control_call("reject")
+            if number:
+                self.mobile_bridge.send_whatsapp(number, f"Sorry, I can't talk right now. {reason}")
+            return f"Rejected call and sent message: {reason}"
+        return self.handle_manage_call(action)
+
+    def _tool_mobile_contact_tool(self, args):
+        query = args["query"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_contact_tool' query='{query}'")
+        # Results arrive later via the socket (handle_mobile_contact_results)
+        self.mobile_bridge.search_contacts(query)
+        return f"Searching contacts for '{query}'... Use the results I'll provide shortly."
+
+    def _tool_mobile_message_tool(self, args):
+        target = args["target"]
+        message = args["message"]
+        platform = args.get("platform", "whatsapp")
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_message_tool' target='{target}' message='{message}' platform='{platform}'")
+        self.mobile_bridge.send_message(target, message, platform=platform)
+        return f"Opening {platform} to send message to {target}."
+
+    def _tool_mobile_get_contacts(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_get_contacts'")
+        self.mobile_bridge.get_contacts()
+        return "Requested full contact list from mobile. I'll provide the data shortly."
+
+    def _tool_mobile_clipboard(self, args):
+        action = args["action"]
+        text = args.get("text")
+        print(f"[REVE] [TOOL] Tool Call: 'mobile_clipboard' action='{action}'")
+        if action == "push" and text:
+            self.mobile_bridge.set_clipboard(text)
+            return f"Pushed to mobile clipboard: {text[:20]}..."
+        return "Action 'pull' or missing text for 'push'."
+
+    def _tool_mobile_hardware_control(self, args):
+        feature = args["feature"]
+        value = args.get("value")
+        level = args.get("level")
+        print(f"[REVE] [TOOL] Tool Call: 'mobile_hardware_control' feature='{feature}'")
+        if feature == "flashlight":
+            self.mobile_bridge.hardware_control("flashlight", value)
+            return f"Flashlight set to {'ON' if value else 'OFF'}."
+        if feature == "volume":
+            self.mobile_bridge.hardware_control("volume", level)
+            return f"Mobile volume set to {level}%."
+        if feature == "dnd":
+            self.mobile_bridge.set_dnd(value)
+            return f"DND mode set to {'ON' if value else 'OFF'}."
+        return f"Unsupported feature: {feature}"
+
+    def _tool_mobile_location(self, args):
+        print(f"[REVE] [TOOL] Tool Call: 'mobile_location'")
+        self.mobile_bridge.get_location()
+        return "Requested current location from mobile. I'll provide the coordinates shortly."
+
+    def _tool_mobile_audio_control(self, args):
+        action = args["action"]
+        print(f"[REVE] [TOOL] Tool Call: 'mobile_audio_control' action='{action}'")
+        if action == "start":
+            self.mobile_bridge.start_mic()
+            return "Started mobile microphone stream."
+        self.mobile_bridge.stop_mic()
+        return "Stopped mobile microphone stream."
+
+    def _tool_mobile_vision(self, args):
+        action = args["action"]
+        print(f"[REVE] [TOOL] Tool Call: 'mobile_vision' action='{action}'")
+        if action == "start":
+            self.mobile_bridge.start_camera()
+            return "Opening mobile camera. I can now see from your perspective."
+        self.mobile_bridge.stop_camera()
+        return "Closed mobile camera."
+
+    def _tool_mobile_file_beam(self, args):
+        action = args["action"]
+        path = args.get("path")
+        print(f"[REVE] [TOOL] Tool Call: 'mobile_file_beam' action='{action}' path='{path}'")
+        if action == "send" and path:
+            try:
+                if not os.path.exists(path):
+                    return f"File not found: {path}"
+                with open(path, "rb") as f:
+                    data = base64.b64encode(f.read()).decode('utf-8')
+                filename = os.path.basename(path)
+                self.mobile_bridge.send_file(filename, data)
+                return f"Successfully beamed '{filename}' to mobile."
+            except Exception as e:
+                return f"Error beaming file: {e}"
+        if action == "request":
+            self.mobile_bridge.request_file()
+            return "Requested file from mobile. The user will be prompted to pick a file."
+        return "Invalid action or missing path for 'send'."
+
+    def _tool_create_project(self, args):
+        name = args["name"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'create_project' name='{name}'")
+        success, msg = self.project_manager.create_project(name)
+        if success:
+            # Auto-switch to the newly created project
+            self.project_manager.switch_project(name)
+            msg += f" Switched to '{name}'."
+            if self.on_project_update:
+                self.on_project_update(name)
+        return msg
+
+    async def _tool_switch_project(self, args):
+        name = args["name"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'switch_project' name='{name}'")
+        success, msg = self.project_manager.switch_project(name)
+        if success:
+            if self.on_project_update:
+                self.on_project_update(name)
+            # Gather project context and send to AI (silently, no response expected)
+            context = await asyncio.to_thread(self.project_manager.get_project_context)
+            print(f"[REX DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
+            try:
+                await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
+            except Exception as e:
+                print(f"[REX DEBUG] [ERR] Failed to send project context: {e}")
+        return msg
+
+    def _tool_list_projects(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'list_projects'")
+        projects = self.project_manager.list_projects()
+        return f"Available projects: {', '.join(projects)}"
+
+    async def _tool_search_chat_history(self, args):
+        query = args["query"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'search_chat_history' query='{query}'")
+        limit = max(1, min(int(args.get("limit") or 10), 50))
+        results = await asyncio.to_thread(self.project_manager.search_chat_history, query,
+                                          args.get("project"), args.get("days"), limit)
+        if not results:
+            return f"No past messages found for '{query}'."
+        lines = [f"{len(results)} matching messages (best first):"]
+        for entry in results:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["timestamp"]))
+            lines.append(f"[{when}] ({entry['project']}) {entry['sender']}: {entry['snippet']}")
+        return "\n".join(lines)
+
+    def _kasa_device_list(self):
+        """Cached Kasa devices in the shape the frontend expects."""
+        devices = []
+        for ip, dev in self.kasa_agent.devices.items():
+            dev_type = "unknown"
+            if dev.is_bulb: dev_type = "bulb"
+            elif dev.is_plug: dev_type = "plug"
+            elif dev.is_strip: dev_type = "strip"
+            elif dev.is_dimmer: dev_type = "dimmer"
+
+            devices.append({
+                "ip": ip,
+                "alias": dev.alias,
+                "model": dev.model,
+                "type": dev_type,
+                "is_on": dev.is_on,
+                "brightness": dev.brightness if dev.is_bulb or dev.is_dimmer else None,
+                "hsv": dev.hsv if dev.is_bulb and dev.is_color else None,
+                "has_color": dev.is_color if dev.is_bulb else False,
+                "has_brightness": dev.is_dimmable if dev.is_bulb or dev.is_dimmer else False
+            })
+        return devices
+
+    def _tool_list_smart_devices(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'list_smart_devices'")
+        # Use cached devices directly for speed
+        frontend_list = self._kasa_device_list()
+        dev_summaries = [
+            f"{d['alias']} (IP: {d['ip']}, Type: {d['type']}) [{'ON' if d['is_on'] else 'OFF'}]"
+            for d in frontend_list
+        ]
+        if self.on_device_update:
+            self.on_device_update(frontend_list)
+        if not dev_summaries:
+            return "No devices found in cache."
+        return "Found Devices (Cached):\n" + "\n".join(dev_summaries)
+
+    async def _tool_control_light(self, args):
+        target = args["target"]
+        action = args["action"]
+        brightness = args.get("brightness")
+        color = args.get("color")
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'control_light' Target='{target}' Action='{action}'")
+
+        result_msg = f"Action '{action}' on '{target}' failed."
+        success = False
+        if action == "turn_on":
+            success = await self.kasa_agent.turn_on(target)
+            if success:
+                result_msg = f"Turned ON '{target}'."
+        elif action == "turn_off":
+            success = await self.kasa_agent.turn_off(target)
+            if success:
+                result_msg = f"Turned OFF '{target}'."
+        elif action == "set":
+            success = True
+            result_msg = f"Updated '{target}':"
+
+        # Apply extra attributes if 'set' or if we just turned it on and want to set them too
+        if success:
+            if brightness is not None and await self.kasa_agent.set_brightness(target, brightness):
+                result_msg += f" Set brightness to {brightness}."
+            if color is not None and await self.kasa_agent.set_color(target, color):
+                result_msg += f" Set color to {color}."
+            # KasaAgent updates its cached state on control - push it to the frontend
+            if self.on_device_update:
+                self.on_device_update(self._kasa_device_list())
+        elif self.on_error:
+            self.on_error(result_msg)
+        return result_msg
+
+    async def _tool_discover_printers(self, args):
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'discover_printers'")
+        printers = await self.printer_agent.discover_printers()
+        if not printers:
+            return "No printers found on network. Ensure printers are on and running OctoPrint/Moonraker."
+        printer_list = [f"{p['name']} ({p['host']}:{p['port']}, type: {p['printer_type']})" for p in printers]
+        return "Found Printers:\n" + "\n".join(printer_list)
+
+    async def _tool_print_stl(self, args):
+        stl_path = args["stl_path"]
+        printer = args["printer"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'print_stl' STL='{stl_path}' Printer='{printer}'")
+        # Resolve 'current' to project STL
+        if stl_path.lower() == "current":
+            stl_path = "output.stl"  # Let printer agent resolve it in root_path
+        project_path = str(self.project_manager.get_current_project_path())
+        result = await self.printer_agent.print_stl(stl_path, printer, args.get("profile"), root_path=project_path)
+        if result.get("gcode_path"):
+            await asyncio.to_thread(self.project_manager.save_gcode_artifact, result["gcode_path"],
+                                    result.get("profile"), result.get("stl_path"))
+        return result.get("message", "Unknown result")
+
+    async def _tool_get_print_status(self, args):
+        printer = args["printer"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'get_print_status' Printer='{printer}'")
+        status = await self.printer_agent.get_print_status(printer)
+        if not status:
+            return f"Could not get status for printer '{printer}'. Ensure it is discovered first."
+        result_str = f"Printer: {status.printer}\n"
+        result_str += f"State: {status.state}\n"
+        result_str += f"Progress: {status.progress_percent:.1f}%\n"
+        if status.time_remaining:
+            result_str += f"Time Remaining: {status.time_remaining}\n"
+        if status.time_elapsed:
+            result_str += f"Time Elapsed: {status.time_elapsed}\n"
+        if status.filename:
+            result_str += f"File: {status.filename}\n"
+        if status.temperatures:
+            temps = status.temperatures
+            if "hotend" in temps:
+                result_str += f"Hotend: {temps['hotend']['current']:.0f}°C / {temps['hotend']['target']:.0f}°C\n"
+            if "bed" in temps:
+                result_str += f"Bed: {temps['bed']['current']:.0f}°C / {temps['bed']['target']:.0f}°C"
+        return result_str
+
+    async def _tool_run_security_tool(self, args):
+        tool_name = args["tool"]
+        tool_args = args["args"]
+        print(f"[REX DEBUG] [SEC] Tool Call: '{tool_name}' args='{tool_args}'")
+        await self.handle_run_security_tool(tool_name, tool_args)
+        return "Security tool executed. Output sent to chat."
+
+    def _tool_iterate_cad(self, args):
+        prompt = args["prompt"]
+        print(f"[REX DEBUG] [TOOL] Tool Call: 'iterate_cad' Prompt='{prompt}'")
+        # Same queue as generation, so an iteration never races a running build. Non-blocking:
+        # the result is sent to the model when the job finishes (receive_audio keeps running)
+        return self.jobs.submit("cad", f"Iterate: {prompt[:60]}", lambda job: self._iterate_cad(prompt, job))
+
+    async def _iterate_cad(self, prompt, job):
+        if self.on_cad_status:
+            self.on_cad_status("generating")
+        job.report(0.0, "Iterating model")
+
+        cad_output_dir = str(self.project_manager.get_current_project_path() / "cad")
+        cad_data = await self.cad_agent.iterate_prototype(prompt, output_dir=cad_output_dir)
+        if not cad_data:
+            print(f"[REX DEBUG] [ERR] CadAgent iteration returned None.")
+            try:
+                await self.session.send(input=f"System Notification: Failed to iterate design with prompt: {prompt}", end_of_turn=True)
+            except Exception:
+                pass
+            return f"Failed to iterate design with prompt: {prompt}"
+
+        print(f"[REX DEBUG] [OK] CadAgent iteration returned data successfully.")
+        job.report(0.9, "Saving model")
+        if self.on_cad_data:
+            print(f"[REX DEBUG] [SEND] Dispatching iterated CAD data to frontend...")
+            self.on_cad_data(cad_data)
+        self.project_manager.save_cad_artifact(cad_data.get('file_path', "output.stl"), f"Iteration: {prompt}")
+        result = f"Successfully iterated design: {prompt}. The updated 3D model is now displayed."
+        try:
+            await self.session.send(input=f"System Notification: {result} Let the user know it's ready.", end_of_turn=True)
+            print(f"[REX DEBUG] [NOTE] Sent iteration completion notification to model.")
+        except Exception as e:
+            print(f"[REX DEBUG] [ERR] Failed to send iteration notification: {e}")
+        return result
+
+    def _request_tool_confirmation(self, fc):
+        """
+        Parks a call that needs approval and returns immediately; the FunctionResponse
+        is sent on its own once the user (or the timeout policy) decides.
+        """
+        session = self.session
+
+        async def on_decision(confirmed, reason):
+            print(f"[REX DEBUG] [CONFIRM] Request {pending.id} resolved ({reason}). Confirmed: {confirmed}")
+            if self.on_tool_confirmation_resolved:
+                self.on_tool_confirmation_resolved({"id": pending.id, "tool": fc.name, "confirmed": confirmed, "reason": reason})
+            if confirmed:
+                function_response = await self._run_function_call(fc)
+            else:
+                print(f"[REX DEBUG] [DENY] Tool call '{fc.name}' denied ({reason}).")
+                self.tool_registry.record_denied(fc.name)
+                result = ("User denied the request to use this tool." if reason != "timeout"
+                          else "The user did not respond to the confirmation request in time, so the tool was not run.")
+                function_response = types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result})
+            if function_response is None:
+                return
+            if self.session is not session:
+                print(f"[REX DEBUG] [WARN] Session changed while '{fc.name}' awaited confirmation; response dropped.")
+                return
+            await session.send_tool_response(function_responses=[function_response])
+
+        pending = self.confirmations.request(fc.name, fc.args, on_decision,
+                                             confirmation=self.tool_registry.get(fc.name).confirmation)
+        print(f"[REX DEBUG] [STOP] Requesting confirmation for '{fc.name}' (ID: {pending.id})")
+        self.on_tool_confirmation({
+            "id": pending.id,
+            "tool": fc.name,
+            "args": fc.args,
+            "expires_in": self.confirmations.timeout,
+        })
+
+    async def _run_function_call(self, fc):
+        payload = await self.tool_registry.dispatch(fc.name, fc.args)
+        if payload is None:
+            return None
+        return types.FunctionResponse(id=fc.id, name=fc.name, response=payload)
+
+    async def _handle_function_call(self, fc):
+        """
+        Permission check + registry dispatch for one call. Returns its FunctionResponse,
+        or None if there is nothing to send now (no response, or awaiting confirmation).
+        """
+        if fc.name not in self.tool_registry:
+            print(f"[REX DEBUG] [WARN] Model called unknown tool '{fc.name}'")
+            return types.FunctionResponse(id=fc.id, name=fc.name, response={"result": f"Error: Unknown tool '{fc.name}'."})
+
+        decision = self.tool_registry.confirmation_decision(fc.name, self.permissions, self.master_control,
+                                                            can_ask=self.on_tool_confirmation is not None)
+        if decision == "allow":
+            print(f"[REX DEBUG] [TOOL] Permission check: '{fc.name}' -> AUTO-ALLOW")
+        elif decision == "ask":
+            self._request_tool_confirmation(fc)
+            return None
+        else:
+            # No UI to approve it (e.g. the standalone entry point): never run it unasked
+            print(f"[REX DEBUG] [DENY] Tool call '{fc.name}' needs confirmation but there is no one to ask.")
+            self.tool_registry.record_denied(fc.name)
+            return types.FunctionResponse(id=fc.id, name=fc.name, response={
+                "result": "Denied: this tool needs the user's confirmation and none can be requested here."})
+
+        return await self._run_function_call(fc)
+
     async def receive_audio(self):
         "Background task to reads from the websocket and write pcm chunks to the output queue"
         try:
             while True:
                 turn = self.session.receive()
                 async for response in turn:
+                    received_at = self.metrics.now()
                     # 1. Handle Audio Data
                     if data := response.data:
-                        self.audio_in_queue.put_nowait(data)
+                        self._note_model_audio(received_at)
+                        self.audio_in_queue.put_nowait((data, received_at))
                         # NOTE: 'continue' removed here to allow processing transcription/tools in same packet
 
                     # 2. Handle Transcription (User & Model)
@@ -1332,6 +2006,7 @@ class AudioLoop:
                                         # Send to frontend (Streaming)
                                         if self.on_transcription:
                                              self.on_transcription({"sender": "User", "text": delta})
+                                        self.metrics.mark("first_input_transcription", received_at)
                                         
                                         # Buffer for Logging
                                         if self.chat_buffer["sender"] != "User":
@@ -1360,6 +2035,7 @@ class AudioLoop:
                                         # Send to frontend (Streaming)
                                         if self.on_transcription:
                                              self.on_transcription({"sender": "REX", "text": delta})
+                                        self.metrics.mark("first_output_transcription", received_at)
                                         
                                         # Buffer for Logging
                                         if self.chat_buffer["sender"] != "ADA":
@@ -1389,767 +2065,20 @@ class AudioLoop:
                                  'tools': tool_names
                              })
 
-                        function_responses = []
-                        for fc in response.tool_call.function_calls:
-                            if fc.name in ["generate_cad", "run_web_agent", "write_file", "read_directory", "read_file", "create_project", "switch_project", "list_projects", "list_smart_devices", "control_light", "discover_printers", "print_stl", "get_print_status", "iterate_cad", "scrape_web_data", "create_folder", "open_file", "open_folder", "open_app", "open_url", "type_text", "press_key", "mouse_move", "mouse_click", "search_web", "window_control", "system_control", "manage_process", "capture_screen", "mobile_app_control", "manage_call", "mobile_contact_tool", "mobile_message_tool", "mobile_get_contacts", "initiate_evolution", "mobile_clipboard", "mobile_hardware_control", "mobile_audio_control", "mobile_location", "mobile_vision", "mobile_file_beam"]:
-                                prompt = fc.args.get("prompt", "") # Prompt is not present for all tools
-                                
-                                # Check Permissions (Default to True if not set)
-                                confirmation_required = self.permissions.get(fc.name, True)
-                                
-                                # Master Control Override
-                                if self.master_control:
-                                    print(f"[REX DEBUG] [TOOL] Master Control ENABLED. Bypassing confirmation for '{fc.name}'")
-                                    confirmation_required = False
-
-                                if not confirmation_required:
-                                    print(f"[REX DEBUG] [TOOL] Permission check: '{fc.name}' -> AUTO-ALLOW")
-                                    # Skip confirmation block and jump to execution
-                                    pass
-                                else:
-                                    # Confirmation Logic
-                                    if self.on_tool_confirmation:
-                                        import uuid
-                                        request_id = str(uuid.uuid4())
-                                    print(f"[REX DEBUG] [STOP] Requesting confirmation for '{fc.name}' (ID: {request_id})")
-                                    
-                                    future = asyncio.Future()
-                                    self._pending_confirmations[request_id] = future
-                                    
-                                    self.on_tool_confirmation({
-                                        "id": request_id, 
-                                        "tool": fc.name, 
-                                        "args": fc.args
-                                    })
-                                    
-                                    try:
-                                        # Wait for user response
-                                        confirmed = await future
-
-                                    finally:
-                                        self._pending_confirmations.pop(request_id, None)
-
-                                    print(f"[REX DEBUG] [CONFIRM] Request {request_id} resolved. Confirmed: {confirmed}")
-
-                                    if not confirmed:
-                                        print(f"[REX DEBUG] [DENY] Tool call '{fc.name}' denied by user.")
-                                        function_response = types.FunctionResponse(
-                                            id=fc.id,
-                                            name=fc.name,
-                                            response={
-                                                "result": "User denied the request to use this tool.",
-                                            }
-                                        )
-                                        function_responses.append(function_response)
-                                        continue
-
-                                    if not confirmed:
-                                        print(f"[REX DEBUG] [DENY] Tool call '{fc.name}' denied by user.")
-                                        function_response = types.FunctionResponse(
-                                            id=fc.id,
-                                            name=fc.name,
-                                            response={
-                                                "result": "User denied the request to use this tool.",
-                                            }
-                                        )
-                                        function_responses.append(function_response)
-                                        continue
-
-                                # If confirmed (or no callback configured, or auto-allowed), proceed
-                                if fc.name == "generate_cad":
-                                    print(f"\n[REX DEBUG] --------------------------------------------------")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call Detected: 'generate_cad'")
-                                    print(f"[REX DEBUG] [IN] Arguments: prompt='{prompt}'")
-                                    
-                                    asyncio.create_task(self.handle_cad_request(prompt))
-                                    # No function response needed - model already acknowledged when user asked
-                                
-                                elif fc.name == "run_web_agent":
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'run_web_agent' with prompt='{prompt}'")
-                                    asyncio.create_task(self.handle_web_agent_request(prompt))
-                                    
-                                    result_text = "Web Navigation started. Do not reply to this message."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id,
-                                        name=fc.name,
-                                        response={
-                                            "result": result_text,
-                                        }
-                                    )
-                                    print(f"[REX DEBUG] [RESPONSE] Sending function response: {function_response}")
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "write_file":
-                                    path = fc.args["path"]
-                                    content = fc.args["content"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'write_file' path='{path}'")
-                                    asyncio.create_task(self.handle_write_file(path, content))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Writing file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "read_directory":
-                                    path = fc.args["path"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'read_directory' path='{path}'")
-                                    asyncio.create_task(self.handle_read_directory(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Reading directory..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "read_file":
-                                    path = fc.args["path"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'read_file' path='{path}'")
-                                    asyncio.create_task(self.handle_read_file(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Reading file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "create_folder":
-                                    path = fc.args["path"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'create_folder' path='{path}'")
-                                    asyncio.create_task(self.handle_create_folder(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Creating folder..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "open_file":
-                                    path = fc.args["path"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'open_file' path='{path}'")
-                                    asyncio.create_task(self.handle_open_file(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Opening file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "open_folder":
-                                    path = fc.args["path"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'open_folder' path='{path}'")
-                                    asyncio.create_task(self.handle_open_folder(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Opening folder..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "open_app":
-                                    app_name = fc.args["app_name"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'open_app' app_name='{app_name}'")
-                                    asyncio.create_task(self.handle_open_app(app_name))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Opening {app_name}..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "open_url":
-                                    url = fc.args["url"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'open_url' url='{url}'")
-                                    asyncio.create_task(self.handle_open_url(url))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Opening URL..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "type_text":
-                                    text = fc.args["text"]
-                                    interval = fc.args.get("interval")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'type_text' text='{text}'")
-                                    asyncio.create_task(self.handle_type_text(text, interval))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Typing text..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "press_key":
-                                    keys = fc.args["keys"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'press_key' keys='{keys}'")
-                                    asyncio.create_task(self.handle_press_key(keys))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Pressing keys..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mouse_move":
-                                    x = int(fc.args["x"])
-                                    y = int(fc.args["y"])
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mouse_move' x={x} y={y}")
-                                    asyncio.create_task(self.handle_mouse_move(x, y))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Moving mouse..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mouse_click":
-                                    button = fc.args.get("button", "left")
-                                    clicks = int(fc.args.get("clicks", 1))
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mouse_click' button={button} clicks={clicks}")
-                                    asyncio.create_task(self.handle_mouse_click(button, clicks))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Clicking mouse..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "search_web":
-                                    query = fc.args["query"]
-                                    platform = fc.args.get("platform", "google")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'search_web' query='{query}' platform='{platform}'")
-                                    asyncio.create_task(self.handle_search_web(query, platform))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Searching web..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "window_control":
-                                    action = fc.args["action"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'window_control' action='{action}'")
-                                    asyncio.create_task(self.handle_window_control(action))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Controlling window..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "system_control":
-                                    action = fc.args["action"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'system_control' action='{action}'")
-                                    asyncio.create_task(self.handle_system_control(action))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Controlling system..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "manage_process":
-                                    action = fc.args["action"]
-                                    target = fc.args["target"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'manage_process' action='{action}' target='{target}'")
-                                    asyncio.create_task(self.handle_manage_process(action, target))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Managing process..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "capture_screen":
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'capture_screen'")
-                                    asyncio.create_task(self.handle_capture_screen())
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Capturing screen..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "scrape_web_data":
-                                    query = fc.args["query"]
-                                    output_format = fc.args.get("output_format", "excel")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'scrape_web_data' query='{query}'")
-                                    asyncio.create_task(self.handle_scrape_web_data(query, output_format))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Scraping web data..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_app_control":
-                                    app_name = fc.args["app_name"]
-                                    action = fc.args.get("action", "open")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_app_control' App='{app_name}' Action='{action}'")
-                                    
-                                    if action == "open":
-                                        self.mobile_bridge.open_app(app_name)
-                                        result_msg = f"Sent command to open app '{app_name}' on mobile."
-                                    elif action == "go_home":
-                                        self.mobile_bridge.go_home()
-                                        result_msg = f"Sent command to go back to homescreen."
-                                    elif action == "close":
-                                        # Future: Implement close
-                                        result_msg = f"Close app action not yet supported for '{app_name}'."
-                                    else:
-                                        result_msg = f"Unknown action '{action}' for app '{app_name}'."
-                                        
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "manage_call":
-                                    action = fc.args["action"]
-                                    reason = fc.args.get("reason")
-                                    number = fc.args.get("number")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'manage_call' action='{action}' reason='{reason}'")
-                                    
-                                    if action == "reject" and reason:
-                                        # Reject then send message
-                                        self.mobile_bridge.control_call("reject")
-                                        if number:
-                                            self.mobile_bridge.send_whatsapp(number, f"Sorry, I can't talk right now. {reason}")
-                                        result = f"Rejected call and sent message: {reason}"
-                                    else:
-                                        result = self.handle_manage_call(action)
-                                        
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_contact_tool":
-                                    query = fc.args["query"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_contact_tool' query='{query}'")
-                                    self.mobile_bridge.search_contacts(query)
-                                    # We don't have a direct return from search_contacts yet (it's async via socket)
-                                    # For now, tell the model we are searching.
-                                    # In a better implementation, we'd wait for the response.
-                                    result_msg = f"Searching contacts for '{query}'... Use the results I'll provide shortly."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_message_tool":
-                                    target = fc.args["target"]
-                                    message = fc.args["message"]
-                                    platform = fc.args.get("platform", "whatsapp")
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_message_tool' target='{target}' message='{message}' platform='{platform}'")
-                                    
-                                    # Use the new generic send_message method
-                                    self.mobile_bridge.send_message(target, message, platform=platform)
-                                    result_msg = f"Opening {platform} to send message to {target}."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_get_contacts":
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_get_contacts'")
-                                    self.mobile_bridge.get_contacts()
-                                    result_msg = "Requested full contact list from mobile. I'll provide the data shortly."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_clipboard":
-                                    action = fc.args["action"]
-                                    text = fc.args.get("text")
-                                    print(f"[REVE] [TOOL] Tool Call: 'mobile_clipboard' action='{action}'")
-                                    if action == "push" and text:
-                                        self.mobile_bridge.set_clipboard(text)
-                                        result = f"Pushed to mobile clipboard: {text[:20]}..."
-                                    else:
-                                        result = "Action 'pull' or missing text for 'push'."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_hardware_control":
-                                    feature = fc.args["feature"]
-                                    value = fc.args.get("value")
-                                    level = fc.args.get("level")
-                                    print(f"[REVE] [TOOL] Tool Call: 'mobile_hardware_control' feature='{feature}'")
-                                    
-                                    if feature == "flashlight":
-                                        self.mobile_bridge.hardware_control("flashlight", value)
-                                        result = f"Flashlight set to {'ON' if value else 'OFF'}."
-                                    elif feature == "volume":
-                                        self.mobile_bridge.hardware_control("volume", level)
-                                        result = f"Mobile volume set to {level}%."
-                                    elif feature == "dnd":
-                                        self.mobile_bridge.set_dnd(value)
-                                        result = f"DND mode set to {'ON' if value else 'OFF'}."
-                                    else:
-                                        result = f"Unsupported feature: {feature}"
-                                        
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_location":
-                                    print(f"[REVE] [TOOL] Tool Call: 'mobile_location'")
-                                    self.mobile_bridge.get_location()
-                                    result = "Requested current location from mobile. I'll provide the coordinates shortly."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_audio_control":
-                                    action = fc.args["action"]
-                                    print(f"[REVE] [TOOL] Tool Call: 'mobile_audio_control' action='{action}'")
-                                    if action == "start":
-                                        self.mobile_bridge.start_mic()
-                                        result = "Started mobile microphone stream."
-                                    else:
-                                        self.mobile_bridge.stop_mic()
-                                        result = "Stopped mobile microphone stream."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_vision":
-                                    action = fc.args["action"]
-                                    print(f"[REVE] [TOOL] Tool Call: 'mobile_vision' action='{action}'")
-                                    if action == "start":
-                                        self.mobile_bridge.start_camera()
-                                        result = "Opening mobile camera. I can now see from your perspective."
-                                    else:
-                                        self.mobile_bridge.stop_camera()
-                                        result = "Closed mobile camera."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_file_beam":
-                                    action = fc.args["action"]
-                                    path = fc.args.get("path")
-                                    print(f"[REVE] [TOOL] Tool Call: 'mobile_file_beam' action='{action}' path='{path}'")
-                                    
-                                    if action == "send" and path:
-                                        try:
-                                            import base64
-                                            import os
-                                            if os.path.exists(path):
-                                                with open(path, "rb") as f:
-                                                    data = base64.b64encode(f.read()).decode('utf-8')
-                                                filename = os.path.basename(path)
-                                                self.mobile_bridge.send_file(filename, data)
-                                                result = f"Successfully beamed '{filename}' to mobile."
-                                            else:
-                                                result = f"File not found: {path}"
-                                        except Exception as e:
-                                            result = f"Error beaming file: {e}"
-                                    elif action == "request":
-                                        self.mobile_bridge.request_file()
-                                        result = "Requested file from mobile. The user will be prompted to pick a file."
-                                    else:
-                                        result = "Invalid action or missing path for 'send'."
-                                        
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result}
-                                    )
-                                    function_responses.append(function_response)
-
-
-                                elif fc.name == "create_project":
-                                    name = fc.args["name"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'create_project' name='{name}'")
-                                    success, msg = self.project_manager.create_project(name)
-                                    if success:
-                                        # Auto-switch to the newly created project
-                                        self.project_manager.switch_project(name)
-                                        msg += f" Switched to '{name}'."
-                                        if self.on_project_update:
-                                            self.on_project_update(name)
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "switch_project":
-                                    name = fc.args["name"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'switch_project' name='{name}'")
-                                    success, msg = self.project_manager.switch_project(name)
-                                    if success:
-                                        if self.on_project_update:
-                                            self.on_project_update(name)
-                                        # Gather project context and send to AI (silently, no response expected)
-                                        context = self.project_manager.get_project_context()
-                                        print(f"[REX DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
-                                        try:
-                                            await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
-                                        except Exception as e:
-                                            print(f"[REX DEBUG] [ERR] Failed to send project context: {e}")
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": msg}
-                                    )
-                                    function_responses.append(function_response)
-                                
-                                elif fc.name == "initiate_evolution":
-                                    gap = fc.args["capability_gap"]
-                                    request = fc.args["user_request"]
-                                    print(f"[REVE] [TOOL] Tool Call: 'initiate_evolution' gap='{gap}'")
-                                    asyncio.create_task(self.handle_initiate_evolution(gap, request))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Initiating evolution for '{gap}'..."}
-                                    )
-                                    function_responses.append(function_response)
-                                
-                                elif fc.name == "list_projects":
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'list_projects'")
-                                    projects = self.project_manager.list_projects()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Available projects: {', '.join(projects)}"}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "list_smart_devices":
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'list_smart_devices'")
-                                    # Use cached devices directly for speed
-                                    # devices_dict is {ip: SmartDevice}
-                                    
-                                    dev_summaries = []
-                                    frontend_list = []
-                                    
-                                    for ip, d in self.kasa_agent.devices.items():
-                                        dev_type = "unknown"
-                                        if d.is_bulb: dev_type = "bulb"
-                                        elif d.is_plug: dev_type = "plug"
-                                        elif d.is_strip: dev_type = "strip"
-                                        elif d.is_dimmer: dev_type = "dimmer"
-                                        
-                                        # Format for Model
-                                        info = f"{d.alias} (IP: {ip}, Type: {dev_type})"
-                                        if d.is_on:
-                                            info += " [ON]"
-                                        else:
-                                            info += " [OFF]"
-                                        dev_summaries.append(info)
-                                        
-                                        # Format for Frontend
-                                        frontend_list.append({
-                                            "ip": ip,
-                                            "alias": d.alias,
-                                            "model": d.model,
-                                            "type": dev_type,
-                                            "is_on": d.is_on,
-                                            "brightness": d.brightness if d.is_bulb or d.is_dimmer else None,
-                                            "hsv": d.hsv if d.is_bulb and d.is_color else None,
-                                            "has_color": d.is_color if d.is_bulb else False,
-                                            "has_brightness": d.is_dimmable if d.is_bulb or d.is_dimmer else False
-                                        })
-                                    
-                                    result_str = "No devices found in cache."
-                                    if dev_summaries:
-                                        result_str = "Found Devices (Cached):\n" + "\n".join(dev_summaries)
-                                    
-                                    # Trigger frontend update
-                                    if self.on_device_update:
-                                        self.on_device_update(frontend_list)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "control_light":
-                                    target = fc.args["target"]
-                                    action = fc.args["action"]
-                                    brightness = fc.args.get("brightness")
-                                    color = fc.args.get("color")
-                                    
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'control_light' Target='{target}' Action='{action}'")
-                                    
-                                    result_msg = f"Action '{action}' on '{target}' failed."
-                                    success = False
-                                    
-                                    if action == "turn_on":
-                                        success = await self.kasa_agent.turn_on(target)
-                                        if success:
-                                            result_msg = f"Turned ON '{target}'."
-                                    elif action == "turn_off":
-                                        success = await self.kasa_agent.turn_off(target)
-                                        if success:
-                                            result_msg = f"Turned OFF '{target}'."
-                                    elif action == "set":
-                                        success = True
-                                        result_msg = f"Updated '{target}':"
-                                    
-                                    # Apply extra attributes if 'set' or if we just turned it on and want to set them too
-                                    if success or action == "set":
-                                        if brightness is not None:
-                                            sb = await self.kasa_agent.set_brightness(target, brightness)
-                                            if sb:
-                                                result_msg += f" Set brightness to {brightness}."
-                                        if color is not None:
-                                            sc = await self.kasa_agent.set_color(target, color)
-                                            if sc:
-                                                result_msg += f" Set color to {color}."
-
-                                    # Notify Frontend of State Change
-                                    if success:
-                                        # We don't need full discovery, just refresh known state or push update
-                                        # But for simplicity, let's get the standard list representation
-                                        # KasaAgent updates its internal state on control, so we can rebuild the list
-                                        
-                                        # Quick rebuild of list from internal dict
-                                        updated_list = []
-                                        for ip, dev in self.kasa_agent.devices.items():
-                                            # We need to ensure we have the correct dict structure expected by frontend
-                                            # We duplicate logic from KasaAgent.discover_devices a bit, but that's okay for now or we can add a helper
-                                            # Ideally KasaAgent has a 'get_devices_list()' method.
-                                            # Use the cached objects in self.kasa_agent.devices
-                                            
-                                            dev_type = "unknown"
-                                            if dev.is_bulb: dev_type = "bulb"
-                                            elif dev.is_plug: dev_type = "plug"
-                                            elif dev.is_strip: dev_type = "strip"
-                                            elif dev.is_dimmer: dev_type = "dimmer"
-
-                                            d_info = {
-                                                "ip": ip,
-                                                "alias": dev.alias,
-                                                "model": dev.model,
-                                                "type": dev_type,
-                                                "is_on": dev.is_on,
-                                                "brightness": dev.brightness if dev.is_bulb or dev.is_dimmer else None,
-                                                "hsv": dev.hsv if dev.is_bulb and dev.is_color else None,
-                                                "has_color": dev.is_color if dev.is_bulb else False,
-                                                "has_brightness": dev.is_dimmable if dev.is_bulb or dev.is_dimmer else False
-                                            }
-                                            updated_list.append(d_info)
-                                            
-                                        if self.on_device_update:
-                                            self.on_device_update(updated_list)
-                                    else:
-                                        # Report Error
-                                        if self.on_error:
-                                            self.on_error(result_msg)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "mobile_app_control":
-                                    app_name = fc.args["app_name"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'mobile_app_control' app='{app_name}'")
-                                    
-                                    if self.mobile_bridge:
-                                        self.mobile_bridge.open_app(app_name)
-                                        function_response = types.FunctionResponse(
-                                             id=fc.id, name=fc.name, response={"result": f"Opening {app_name} on mobile..."}
-                                        )
-                                    else:
-                                        function_response = types.FunctionResponse(
-                                            id=fc.id, name=fc.name, response={"result": "Error: No mobile device connected."}
-                                        )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "discover_printers":
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'discover_printers'")
-                                    printers = await self.printer_agent.discover_printers()
-                                    # Format for model
-                                    if printers:
-                                        printer_list = []
-                                        for p in printers:
-                                            printer_list.append(f"{p['name']} ({p['host']}:{p['port']}, type: {p['printer_type']})")
-                                        result_str = "Found Printers:\n" + "\n".join(printer_list)
-                                    else:
-                                        result_str = "No printers found on network. Ensure printers are on and running OctoPrint/Moonraker."
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "print_stl":
-                                    stl_path = fc.args["stl_path"]
-                                    printer = fc.args["printer"]
-                                    profile = fc.args.get("profile")
-                                    
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'print_stl' STL='{stl_path}' Printer='{printer}'")
-                                    
-                                    # Resolve 'current' to project STL
-                                    if stl_path.lower() == "current":
-                                        stl_path = "output.stl" # Let printer agent resolve it in root_path
-
-                                    # Get current project path
-                                    project_path = str(self.project_manager.get_current_project_path())
-                                    
-                                    result = await self.printer_agent.print_stl(
-                                        stl_path, 
-                                        printer, 
-                                        profile, 
-                                        root_path=project_path
-                                    )
-                                    result_str = result.get("message", "Unknown result")
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "get_print_status":
-                                    printer = fc.args["printer"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'get_print_status' Printer='{printer}'")
-                                    
-                                    status = await self.printer_agent.get_print_status(printer)
-                                    if status:
-                                        result_str = f"Printer: {status.printer}\n"
-                                        result_str += f"State: {status.state}\n"
-                                        result_str += f"Progress: {status.progress_percent:.1f}%\n"
-                                        if status.time_remaining:
-                                            result_str += f"Time Remaining: {status.time_remaining}\n"
-                                        if status.time_elapsed:
-                                            result_str += f"Time Elapsed: {status.time_elapsed}\n"
-                                        if status.filename:
-                                            result_str += f"File: {status.filename}\n"
-                                        if status.temperatures:
-                                            temps = status.temperatures
-                                            if "hotend" in temps:
-                                                result_str += f"Hotend: {temps['hotend']['current']:.0f}°C / {temps['hotend']['target']:.0f}°C\n"
-                                            if "bed" in temps:
-                                                result_str += f"Bed: {temps['bed']['current']:.0f}°C / {temps['bed']['target']:.0f}°C"
-                                    else:
-                                        result_str = f"Could not get status for printer '{printer}'. Ensure it is discovered first."
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "run_security_tool":
-                                    tool_name = fc.args["tool"]
-                                    tool_args = fc.args["args"]
-                                    print(f"[REX DEBUG] [SEC] Tool Call: '{tool_name}' args='{tool_args}'")
-                                    
-                                    # Forward to handler
-                                    await self.handle_run_security_tool(tool_name, tool_args)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Security tool executed. Output sent to chat."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "iterate_cad":
-                                    prompt = fc.args["prompt"]
-                                    print(f"[REX DEBUG] [TOOL] Tool Call: 'iterate_cad' Prompt='{prompt}'")
-                                    
-                                    # Emit status
-                                    if self.on_cad_status:
-                                        self.on_cad_status("generating")
-                                    
-                                    # Get project cad folder path
-                                    cad_output_dir = str(self.project_manager.get_current_project_path() / "cad")
-                                    
-                                    # Call CadAgent to iterate on the design
-                                    cad_data = await self.cad_agent.iterate_prototype(prompt, output_dir=cad_output_dir)
-                                    
-                                    if cad_data:
-                                        print(f"[REX DEBUG] [OK] CadAgent iteration returned data successfully.")
-                                        
-                                        # Dispatch to frontend
-                                        if self.on_cad_data:
-                                            print(f"[REX DEBUG] [SEND] Dispatching iterated CAD data to frontend...")
-                                            self.on_cad_data(cad_data)
-                                            print(f"[REX DEBUG] [SENT] Dispatch complete.")
-                                        
-                                        # Save to Project
-                                        self.project_manager.save_cad_artifact("output.stl", f"Iteration: {prompt}")
-                                        
-                                        result_str = f"Successfully iterated design: {prompt}. The updated 3D model is now displayed."
-                                    else:
-                                        print(f"[REX DEBUG] [ERR] CadAgent iteration returned None.")
-                                        result_str = f"Failed to iterate design with prompt: {prompt}"
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
+                        # Independent calls run concurrently; responses stay in call order
+                        calls = response.tool_call.function_calls
+                        batch = await self.tool_registry.run_batch(calls, self._handle_function_call)
+                        function_responses = [r for r in batch.results if r is not None]
+                        if len(calls) > 1:
+                            self.metrics.record("tool_batch", batch.wall_s)
+                            self.metrics.record("tool_batch_saved", batch.saved_s)
+                            print(f"[REX DEBUG] [TOOL] Ran {len(calls)} calls in {batch.wall_s * 1000:.0f} ms "
+                                  f"(saved {batch.saved_s * 1000:.0f} ms vs. one at a time)")
                         if function_responses:
                             await self.session.send_tool_response(function_responses=function_responses)
                 
                 # Turn/Response Loop Finished
+                self.metrics.end_turn()
                 self.flush_chat()
 
                 while not self.audio_in_queue.empty():
@@ -2162,52 +2091,52 @@ class AudioLoop:
 
     async def play_audio(self):
         stream = await asyncio.to_thread(
-            pya.open,
-            format=FORMAT,
+            get_pya().open,
+            format=pyaudio.paInt16,
             channels=CHANNELS,
             rate=RECEIVE_SAMPLE_RATE,
             output=True,
             output_device_index=self.output_device_index,
+            frames_per_buffer=PLAYBACK_PERIOD_FRAMES,
         )
-        
-        # Track when JARVIS stops speaking (0.5 second timeout)
-        self._rex_speech_timer = None
-        
-        # Track when JARVIS started speaking (for mute buffer)
-        self._rex_speech_start_time = None
-        
+
+        # Dedicated playback thread - owns (and closes) the output stream.
+        # The jitter buffer re-blocks model audio into device periods and smooths late chunks.
+        jitter_buffer = JitterBuffer(sample_rate=RECEIVE_SAMPLE_RATE,
+                                     target_latency_ms=self.playback_latency_ms,
+                                     period_frames=PLAYBACK_PERIOD_FRAMES)
+        self._playback_thread = AudioPlaybackThread(stream, asyncio.get_running_loop(),
+                                                    on_write=self._on_playback_write,
+                                                    jitter_buffer=jitter_buffer)
+        self._playback_thread.start()
+        # One long-lived task marks JARVIS as finished once the queued audio has played out
+        tracker_task = asyncio.create_task(self.speaking_tracker.run())
+        try:
+            await self._play_loop()
+        finally:
+            tracker_task.cancel()
+            self._playback_thread.stop()
+
+    async def _play_loop(self):
         while True:
-            bytestream = await self.audio_in_queue.get()
-            
-            # Mark that JARVIS is speaking
-            if not self._is_rex_speaking:
-                self._is_rex_speaking = True
-                self._rex_speech_start_time = time.time()
-                print(f"[REX DEBUG] [AUDIO] JARVIS started speaking at {self._rex_speech_start_time}")
+            bytestream, received_at = await self.audio_in_queue.get()
             
-            # Cancel any existing timer
-            if self._rex_speech_timer:
-                self._rex_speech_timer.cancel()
-                self._rex_speech_timer = None
+            # Mark that JARVIS is speaking (extends the end-of-speech deadline by this chunk)
+            self.speaking_tracker.note_audio(bytestream)
             
             if self.on_audio_data:
                 self.on_audio_data(bytestream)
+
+            if self.on_audio_envelope and (self.envelope_enabled is None or self.envelope_enabled()):
+                envelope = self.envelope_analyzer.process(bytestream)
+                if envelope:
+                    self.on_audio_envelope(envelope)
             
             # Send to Mobile for Two-Way Voice
             self.mobile_bridge.send_audio(bytestream)
             
-            await asyncio.to_thread(stream.write, bytestream)
-            
-            # Set a timer to mark JARVIS as done speaking after 0.5 seconds of silence
-            async def mark_ada_finished():
-                await asyncio.sleep(0.5)
-                if self._is_rex_speaking:  # Check if still true
-                    self._is_rex_speaking = False
-                    self._rex_speech_start_time = None
-                    self._rex_speech_timer = None
-                    print("[REX DEBUG] [AUDIO] JARVIS finished speaking")
-            
-            self._rex_speech_timer = asyncio.create_task(mark_ada_finished())
+            await self._playback_thread.write(bytestream)
+            self.metrics.record_since("model_audio_to_play", received_at)
 
     async def get_frames(self):
         cap = await asyncio.to_thread(cv2.VideoCapture, 0, cv2.CAP_AVFOUNDATION)
@@ -2220,20 +2149,16 @@ class AudioLoop:
                 break
             await asyncio.sleep(1.0)
             if self.out_queue:
-                await self.out_queue.put(frame)
+                await self.out_queue.put((frame, None))
         cap.release()
 
     def _get_frame(self, cap):
         ret, frame = cap.read()
         if not ret:
             return None
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)
-        img.thumbnail([1024, 1024])
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-        image_bytes = image_io.read()
+        height, width = frame.shape[:2]
+        image_bytes = self.process_pool.call(
+            cpu_tasks.encode_image, frame.tobytes(), (width, height), "BGR", "JPEG", 1024)
         return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
 
     async def _get_screen(self):
@@ -2241,100 +2166,129 @@ class AudioLoop:
     async def get_screen(self):
          pass
 
+    def _connect_live(self):
+        live_client = self.live_client or get_client()
+        # Replays ignore the config, so they don't need the genai SDK at all
+        config = None if isinstance(live_client, ReplayLiveClient) else get_live_config()
+        return live_client.aio.live.connect(model=MODEL, config=config)
+
+    def _wrap_session(self, session):
+        return RecordingSession(session, self.session_recorder) if self.session_recorder else session
+
+    def _drop_pending_confirmations(self):
+        dropped = self.confirmations.cancel_all()  # Their call ids belong to the closed session
+        for pending in dropped:
+            print(f"[REX DEBUG] [CONFIRM] Dropped pending confirmation for '{pending.tool}' ({pending.id})")
+            if self.on_tool_confirmation_resolved:
+                self.on_tool_confirmation_resolved({"id": pending.id, "tool": pending.tool, "confirmed": False, "reason": "session_closed"})
+
+    async def _on_first_connect(self, start_message):
+        if start_message:
+            print(f"[REX DEBUG] [INFO] Sending start message: {start_message}")
+            await self.session.send(input=start_message, end_of_turn=True)
+
+        # Sync Project State
+        if self.on_project_update and self.project_manager:
+            self.on_project_update(self.project_manager.current_project)
+
+    async def _restore_session_context(self):
+        # Restore Context: rolling summary + recent turns, capped whatever the history length
+        self.flush_chat()  # The turn cut off by the drop is part of the context
+        print(f"[REX DEBUG] [RECONNECT] Building restoration context...")
+        history = self.project_manager.get_restoration_context()
+        
+        context_msg = "System Notification: Connection was lost and just re-established. Here is the conversation so far to help you resume seamlessly:\n\n"
+        context_msg += (history or "(No messages yet)") + "\n"
+        
+        context_msg += "\nPlease acknowledge the reconnection to the user (e.g. 'I lost connection for a moment, but I'm back...') and resume what you were doing."
+        
+        print(f"[REX DEBUG] [RECONNECT] Sending restoration context to model ({len(context_msg)} chars)...")
+        await self.session.send(input=context_msg, end_of_turn=True)
+
+    async def _session_loop(self, start_message=None):
+        """Runs receive_audio on the active session; swaps in the standby one when it fails."""
+        first_connect = self.session is None
+        if first_connect:
+            print(f"[REX DEBUG] [CONNECT] Connecting to Gemini Live API...")
+            self.session = await self.live_sessions.start()
+
+        reconnected = False
+        while True:
+            try:
+                if first_connect:
+                    first_connect = False
+                    await self._on_first_connect(start_message)
+                if reconnected:
+                    reconnected = False
+                    await self._restore_session_context()
+                await self.receive_audio()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[REX DEBUG] [ERR] Live session failed: {e}")
+
+            self._drop_pending_confirmations()
+            standby = self.live_sessions.stats()["standby"] == "ready"
+            print(f"[REX DEBUG] [RECONNECT] Switching to {'standby session' if standby else 'a new session'}...")
+            self.session = await self.live_sessions.failover()
+            print(f"[REX DEBUG] [RECONNECT] Connection restored in {self.live_sessions.last_recover_ms:.0f} ms.")
+            reconnected = True
+
     async def run(self, start_message=None):
         retry_delay = 1
-        is_reconnect = False
         
-        while not self.stop_event.is_set():
-            try:
-                print(f"[REX DEBUG] [CONNECT] Connecting to Gemini Live API...")
-                async with (
-                    client.aio.live.connect(model=MODEL, config=config) as session,
-                    asyncio.TaskGroup() as tg,
-                ):
-                    self.session = session
-
-                    self.audio_in_queue = asyncio.Queue()
-                    self.out_queue = asyncio.Queue(maxsize=10)
-
-                    tg.create_task(self.send_realtime())
-                    tg.create_task(self.listen_audio())
-                    # tg.create_task(self._process_video_queue()) # Removed in favor of VAD
-
-                    if self.video_mode == "camera":
-                        tg.create_task(self.get_frames())
-                    elif self.video_mode == "screen":
-                        tg.create_task(self.get_screen())
-
-                    tg.create_task(self.receive_audio())
-                    tg.create_task(self.play_audio())
-
-                    # Handle Startup vs Reconnect Logic
-                    if not is_reconnect:
-                        if start_message:
-                            print(f"[REX DEBUG] [INFO] Sending start message: {start_message}")
-                            await self.session.send(input=start_message, end_of_turn=True)
-                        
-                        # Sync Project State
-                        if self.on_project_update and self.project_manager:
-                            self.on_project_update(self.project_manager.current_project)
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    # Audio I/O lives across Live session swaps: the mic and speaker streams stay
+                    # open while _session_loop replaces a dead session with the standby one.
+                    async with asyncio.TaskGroup() as tg:
+                        self.audio_in_queue = asyncio.Queue()
+                        self.out_queue = asyncio.Queue(maxsize=10)
+
+                        tasks = [
+                            tg.create_task(self._session_loop(start_message)),
+                            tg.create_task(self.send_realtime()),
+                            tg.create_task(self.listen_audio()),
+                            tg.create_task(self.play_audio()),
+                        ]
+                        # tg.create_task(self._process_video_queue()) # Removed in favor of VAD
+
+                        if self.video_mode == "camera":
+                            tasks.append(tg.create_task(self.get_frames()))
+                        elif self.video_mode == "screen":
+                            tasks.append(tg.create_task(self.get_screen()))
+
+                        await self.stop_event.wait()
+                        for task in tasks:
+                            task.cancel()
+
+                except asyncio.CancelledError:
+                    print(f"[REX DEBUG] [STOP] Main loop cancelled.")
+                    break
                     
-                    else:
-                        print(f"[REX DEBUG] [RECONNECT] Connection restored.")
-                        # Restore Context
-                        print(f"[REX DEBUG] [RECONNECT] Fetching recent chat history to restore context...")
-                        history = self.project_manager.get_recent_chat_history(limit=10)
-                        
-                        context_msg = "System Notification: Connection was lost and just re-established. Here is the recent chat history to help you resume seamlessly:\n\n"
-                        for entry in history:
-                            sender = entry.get('sender', 'Unknown')
-                            text = entry.get('text', '')
-                            context_msg += f"[{sender}]: {text}\n"
-                        
-                        context_msg += "\nPlease acknowledge the reconnection to the user (e.g. 'I lost connection for a moment, but I'm back...') and resume what you were doing."
-                        
-                        print(f"[REX DEBUG] [RECONNECT] Sending restoration context to model...")
-                        await self.session.send(input=context_msg, end_of_turn=True)
-
-                    # Reset retry delay on successful connection
-                    retry_delay = 1
+                except Exception as e:
+                    # An audio task failed (device error etc.); session failures are handled in _session_loop
+                    print(f"[REX DEBUG] [ERR] Audio loop error: {e}")
                     
-                    # Wait until stop event, or until the session task group exits (which happens on error)
-                    # Actually, the TaskGroup context manager will exit if any tasks fail/cancel.
-                    # We need to keep this block alive.
-                    # The original code just waited on stop_event, but that doesn't account for session death.
-                    # We should rely on the TaskGroup raising an exception when subtasks fail (like receive_audio).
+                    if self.stop_event.is_set():
+                        break
                     
-                    # However, since receive_audio is a task in the group, if it crashes (connection closed), 
-                    # the group will cancel others and exit. We catch that exit below.
+                    print(f"[REX DEBUG] [RETRY] Restarting audio in {retry_delay} seconds...")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, 10) # Exponential backoff capped at 10s
                     
-                    # We can await stop_event, but if the connection dies, receive_audio crashes -> group closes -> we exit `async with` -> restart loop.
-                    # To ensure we don't block indefinitely if connection dies silently (unlikely with receive_audio), we just wait.
-                    await self.stop_event.wait()
-
-            except asyncio.CancelledError:
-                print(f"[REX DEBUG] [STOP] Main loop cancelled.")
-                break
-                
-            except Exception as e:
-                # This catches the ExceptionGroup from TaskGroup or direct exceptions
-                print(f"[REX DEBUG] [ERR] Connection Error: {e}")
-                
-                if self.stop_event.is_set():
-                    break
-                
-                print(f"[REX DEBUG] [RETRY] Reconnecting in {retry_delay} seconds...")
-                await asyncio.sleep(retry_delay)
-                retry_delay = min(retry_delay * 2, 10) # Exponential backoff capped at 10s
-                is_reconnect = True # Next loop will be a reconnect
-                
-            finally:
-                # Cleanup before retry
-                if hasattr(self, 'audio_stream') and self.audio_stream:
-                    try:
-                        self.audio_stream.close()
-                    except: 
-                        pass
+                finally:
+                    # Cleanup before retry
+                    self._drop_pending_confirmations()
+                    if hasattr(self, 'audio_stream') and self.audio_stream:
+                        try:
+                            self.audio_stream.close()
+                        except: 
+                            pass
+        finally:
+            await self.live_sessions.close()
+            self.session = None
 
 def get_input_devices():
     p = pyaudio.PyAudio()
@@ -2367,6 +2321,14 @@ if __name__ == "__main__":
         help="pixels to stream from",
         choices=["camera", "screen", "none"],
     )
+    parser.add_argument("--record", type=str, help="record the Live API session to this file")
+    parser.add_argument("--replay", type=str, help="replay a recorded session instead of connecting to Gemini")
     args = parser.parse_args()
-    main = AudioLoop(video_mode=args.mode)
-    asyncio.run(main.run())
\ No newline at end of file
+    recorder = SessionRecorder(args.record) if args.record else None
+    live_client = ReplayLiveClient(args.replay, speed=1.0) if args.replay else None
+    main = AudioLoop(video_mode=args.mode, live_client=live_client, session_recorder=recorder)
+    try:
+        asyncio.run(main.run())
+    finally:
+        if recorder:
+            recorder.close()
\ No newline at end of file
@@ -1,16 +1,18 @@
 import os
 import time
 import requests
-import pandas as pd
-from bs4 import BeautifulSoup
 from googlesearch import search
-from docx import Document
 from google import genai
 from google.genai import types
 
+import cpu_tasks
+from process_pool import get_process_pool
+
 class ScraperAgent:
-    def __init__(self, project_manager):
+    def __init__(self, project_manager, process_pool=None):
         self.project_manager = project_manager
+        # HTML parsing and Excel/Word export run in worker processes (see cpu_tasks.py)
+        self.process_pool = process_pool or get_process_pool()
         # Initialize Gemini Client for data structuring (using same key as core)
         self.client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
         self.model = "gemini-2.0-flash-exp" # Fast model for processing
@@ -36,20 +38,7 @@ class ScraperAgent:
         try:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
             response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Kill script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.extract()
-            
-            text = soup.get_text()
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            # Drop blank lines
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            return text[:10000] # Limit char count for LLM
+            return self.process_pool.call(cpu_tasks.html_to_text, response.content, 10000) # Limit char count for LLM
         except Exception as e:
             print(f"[Scraper] Extraction failed for {url}: {e}")
             return None
@@ -101,33 +90,11 @@ class ScraperAgent:
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         output_dir = self.get_output_dir()
         
-        if format.lower() == "excel":
-            try:
-                df = pd.DataFrame(data)
-                filepath = output_dir / f"{filename}_{timestamp}.xlsx"
-                df.to_excel(filepath, index=False)
-                return f"Data saved to Excel: {filepath}"
-            except Exception as e:
-                return f"Failed to save Excel: {e}"
-        
-        elif format.lower() == "word":
-            try:
-                doc = Document()
-                doc.add_heading(f"Scraped Data: {query}", 0)
-                
-                for item in data:
-                    doc.add_heading(str(item.get('Name', item.get('Title', 'Item'))), level=1)
-                    for k, v in item.items():
-                        doc.add_paragraph(f"{k}: {v}")
-                    doc.add_paragraph("--------------------------------------------------")
-                
-                filepath = output_dir / f"{filename}_{timestamp}.docx"
-                doc.save(filepath)
-                return f"Data saved to Word: {filepath}"
-            except Exception as e:
-                return f"Failed to save Word: {e}"
-        else:
+        extension = {"excel": "xlsx", "word": "docx"}.get(format.lower())
+        if extension is None:
             return f"Unknown format: {format}"
+        filepath = output_dir / f"{filename}_{timestamp}.{extension}"
+        return self.process_pool.call(cpu_tasks.export_records, data, str(filepath), format, query)
 
     def run_scrape(self, query, output_format="excel"):
         # 1. Search
@@ -1,4 +1,10 @@
 import sys
+import os
+
+# Startup timing starts here (see startup_profiler.py)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from startup_profiler import profiler as startup_profiler, enabled as startup_profiling_enabled
+
 import asyncio
 
 # Fix for asyncio subprocess support on Windows
@@ -23,7 +29,9 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import rex_core as jarvis
-from authenticator import FaceAuthenticator
+from process_pool import get_process_pool
+from cad_worker_pool import get_cad_worker_pool
+from audio_transport import AudioTransportRegistry, DEFAULT_AUDIO_TRANSPORT, audio_room
 # from kasa_agent import KasaAgent
 
 import signal
@@ -52,6 +60,8 @@ from system_monitor import SystemMonitor
 audio_loop = None
 authenticator = None
 system_monitor = None
+audio_transport = AudioTransportRegistry() # sid -> 'pcm' | 'envelope' | 'off'
+startup_profiler.mark("imports")
 
 # kasa_agent = KasaAgent()
 SETTINGS_FILE = "settings.json"
@@ -72,6 +82,12 @@ DEFAULT_SETTINGS = {
     "kasa_devices": [], # List of {ip, alias, model}
     "kasa_devices": [], # List of {ip, alias, model}
     "camera_flipped": False, # Invert cursor horizontal direction
+    "playback_latency_ms": 100, # Jitter buffer target; raise if playback glitches
+    "standby_session": True, # Keep a pre-connected spare Live session for instant reconnect
+    "chat_log_fsync": "batch", # Chat history durability: 'never', 'batch' or 'interval' (see chat_log_writer.py)
+    "chat_storage": "jsonl", # 'jsonl' (per-project files) or 'sqlite' (one database, see chat_store.py)
+    "confirmation_timeout_s": 60, # Unanswered tool confirmations are resolved after this (0 = never)
+    "confirmation_timeout_policy": "deny", # 'deny' or 'allow' on timeout ('always' tools are still denied)
     "master_control": False # Bypass all permissions if True
 }
 
@@ -123,13 +139,22 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[SERVER DEBUG] Error checking loop: {e}")
 
+    # Spawn the CPU workers now so the first screenshot / scrape doesn't pay for it.
+    # Spawned workers re-import this module as __mp_main__, which is why nothing
+    # below the imports may start work at import time.
+    get_process_pool().warm()
+
     # Auto initialization of Jarvis in Background
     print("[SERVER] Startup: Initializing REX in background...")
     asyncio.create_task(init_jarvis())
 
+    startup_profiler.mark("app_ready")
+
     yield
     # --- Shutdown Logic ---
     print("[SERVER DEBUG] Lifespan Shutdown Triggered")
+    get_process_pool().shutdown()
+    get_cad_worker_pool().shutdown()
     # Clean up resources if needed (most are handled by signal handlers currently)
 
 # Create a Socket.IO server
@@ -152,6 +177,18 @@ app_socketio = socketio.ASGIApp(sio, app)
 async def status():
     return {"status": "running", "message": "Backend is ready!"}
 
+@app.get("/startup")
+async def startup_profile():
+    """Startup phase timings and modules loaded on first use (see startup_profiler.py)."""
+    return startup_profiler.report()
+
+@app.get("/metrics")
+async def metrics():
+    """Voice pipeline latency histograms and recent turn spans."""
+    if not audio_loop:
+        return {"running": False}
+    return dict(audio_loop.get_metrics(), running=True)
+
 @app.get("/network-info")
 async def get_network_info():
     import socket
@@ -173,6 +210,14 @@ async def get_network_info():
 async def connect(sid, environ):
     print(f"Client connected: {sid}")
     await sio.emit('status', {'msg': 'Connected to R.E.X Backend'}, room=sid)
+    if not startup_profiler.has_mark("first_status_emit"):
+        startup_profiler.mark("first_status_emit")
+        if startup_profiling_enabled():
+            startup_profiler.print_report()
+
+    # Every client starts on the default audio transport until it opts into another
+    audio_transport.set_mode(sid, DEFAULT_AUDIO_TRANSPORT)
+    await sio.enter_room(sid, audio_room(DEFAULT_AUDIO_TRANSPORT))
 
     global authenticator
     
@@ -185,16 +230,18 @@ async def connect(sid, environ):
     async def on_auth_frame(frame_b64):
         await sio.emit('auth_frame', {'image': frame_b64})
 
-    # Initialize Authenticator if not already done
-    if authenticator is None:
+    # Initialize Authenticator if not already done (mediapipe/OpenCV only load when face auth is on)
+    if authenticator is None and SETTINGS.get("face_auth_enabled", False):
+        from authenticator import FaceAuthenticator
         authenticator = FaceAuthenticator(
             reference_image_path="reference.jpg",
             on_status_change=on_auth_status,
-            on_frame=on_auth_frame
+            on_frame=on_auth_frame,
+            process_pool=get_process_pool()
         )
     
     # Check if already authenticated or needs to start
-    if authenticator.authenticated:
+    if authenticator and authenticator.authenticated:
         await sio.emit('auth_status', {'authenticated': True})
     else:
         # Check Settings for Auth
@@ -216,7 +263,17 @@ async def disconnect(sid):
 # --- CALLBACKS (Global) ---
 def cb_on_audio_data(data_bytes):
     # We need to schedule this on the event loop
-    asyncio.create_task(sio.emit('audio_data', {'data': list(data_bytes)}))
+    # PCM goes out as a binary attachment, not a JSON list of ints
+    if audio_transport.has_clients("pcm"):
+        asyncio.create_task(sio.emit('audio_data', {'data': bytes(data_bytes)}, room=audio_room("pcm")))
+
+def cb_on_audio_envelope(envelope):
+    # ~30 Hz, 32 band levels - computed by AudioLoop (only while an envelope client is connected)
+    asyncio.create_task(sio.emit('audio_envelope', envelope, room=audio_room("envelope")))
+
+def cb_on_speaking_event(event):
+    # Start/end of REX speech, pushed by the SpeakingTracker (desktop UI + mobile mirroring)
+    asyncio.create_task(sio.emit('rex_speaking', event.to_dict()))
 
 def cb_broadcast_cad_data(data):
     print(f"[SERVER] Broadcasting CAD Data...")
@@ -237,6 +294,13 @@ def cb_on_tool_confirmation(data):
     print(f"Requesting confirmation for tool: {data.get('tool')}")
     asyncio.create_task(sio.emit('tool_confirmation_request', data))
 
+def cb_on_job_update(data):
+    asyncio.create_task(sio.emit('job_update', data))
+
+def cb_on_tool_confirmation_resolved(data):
+    # Lets every client close the popup (answered elsewhere, timed out or session closed)
+    asyncio.create_task(sio.emit('tool_confirmation_resolved', data))
+
 def cb_on_cad_status(status):
     if isinstance(status, dict):
         print(f"Sending CAD Status: {status.get('status')} (attempt {status.get('attempt')}/{status.get('max_attempts')})")
@@ -294,10 +358,14 @@ async def init_jarvis(device_index=None, device_name=None, muted=False):
         audio_loop = jarvis.AudioLoop(
             video_mode="none", 
             on_audio_data=cb_on_audio_data,
+            on_audio_envelope=cb_on_audio_envelope,
+            envelope_enabled=lambda: audio_transport.has_clients("envelope"),
             on_cad_data=cb_broadcast_cad_data,
             on_web_data=cb_broadcast_web_data,
             on_transcription=cb_broadcast_transcription,
             on_tool_confirmation=cb_on_tool_confirmation,
+            on_tool_confirmation_resolved=cb_on_tool_confirmation_resolved,
+            on_job_update=cb_on_job_update,
             on_cad_status=cb_on_cad_status,
             on_cad_thought=cb_on_cad_thought,
             on_project_update=cb_on_project_update,
@@ -309,7 +377,13 @@ async def init_jarvis(device_index=None, device_name=None, muted=False):
 
             input_device_index=device_index,
             input_device_name=device_name,
+            playback_latency_ms=SETTINGS.get("playback_latency_ms", 100),
+            standby_session=SETTINGS.get("standby_session", True),
+            chat_log_fsync=SETTINGS.get("chat_log_fsync", "batch"),
+            chat_storage=SETTINGS.get("chat_storage", "jsonl"),
         )
+        audio_loop.speaking_tracker.subscribe(cb_on_speaking_event)
+
         # Apply master control if set
         if SETTINGS.get("master_control"):
              audio_loop.set_master_control(True)
@@ -318,6 +392,8 @@ async def init_jarvis(device_index=None, device_name=None, muted=False):
 
         # Apply current permissions
         audio_loop.update_permissions(SETTINGS["tool_permissions"])
+        audio_loop.set_confirmation_policy(SETTINGS.get("confirmation_timeout_s", 60),
+                                           SETTINGS.get("confirmation_timeout_policy", "deny"))
         
         # Check initial mute state
         if muted:
@@ -397,6 +473,28 @@ async def start_audio(sid, data=None):
 # But for now, I will just make lifespan call a new setup function, and move callbacks to global scope.
 
 
+@sio.event
+async def set_audio_transport(sid, data=None):
+    """Choose how this client receives model audio.
+
+    Args:
+        data: dict with 'mode': 'pcm' (binary PCM, default), 'envelope'
+              (visualizer levels only) or 'off'
+    """
+    mode = (data or {}).get('mode', DEFAULT_AUDIO_TRANSPORT)
+    try:
+        previous = audio_transport.set_mode(sid, mode)
+    except ValueError as e:
+        await sio.emit('error', {'msg': str(e)}, room=sid)
+        return
+
+    if previous and previous != mode:
+        await sio.leave_room(sid, audio_room(previous))
+    await sio.enter_room(sid, audio_room(mode))
+    print(f"[SERVER] Audio transport for {sid}: {mode}")
+    await sio.emit('audio_transport', {'mode': mode}, room=sid)
+
+
 @sio.event
 async def set_barge_in_prevention(sid, data=None):
     """Enable or disable barge-in prevention (mute mic while REX speaks)
@@ -427,6 +525,63 @@ async def set_barge_in_prevention(sid, data=None):
         await sio.emit('error', {'msg': f"Failed to update audio settings: {str(e)}"})
 
 
+@sio.event
+async def get_metrics(sid):
+    """Voice latency metrics (same payload as GET /metrics), emitted as 'metrics'."""
+    payload = dict(audio_loop.get_metrics(), running=True) if audio_loop else {"running": False}
+    await sio.emit('metrics', payload, room=sid)
+
+
+@sio.event
+async def get_audio_stats(sid):
+    """Playback jitter buffer and mobile input queue stats (for latency tuning)."""
+    stats = {}
+    if audio_loop:
+        stats = {"playback": audio_loop.get_playback_stats(), "input": audio_loop.get_input_stats()}
+    await sio.emit('audio_stats', stats, room=sid)
+
+
+@sio.event
+async def set_input_mix_mode(sid, data=None):
+    """How mobile call audio is combined with the desktop mic.
+
+    Args:
+        data: dict with 'mode': 'mix', 'duck' (default) or 'replace'
+    """
+    if not audio_loop:
+        print("[SERVER] [ERROR] Audio loop not running")
+        return
+
+    mode = data.get('mode', 'duck') if data else 'duck'
+    try:
+        audio_loop.set_input_mix_mode(mode)
+    except ValueError as e:
+        await sio.emit('error', {'msg': str(e)}, room=sid)
+        return
+    await sio.emit('status', {'msg': f"Input mix mode: {mode}"})
+
+
+@sio.event
+async def set_echo_cancellation(sid, data=None):
+    """Enable or disable acoustic echo cancellation on the mic path.
+
+    Args:
+        data: dict with 'enabled' (bool, default True)
+    """
+    global audio_loop
+
+    if not audio_loop:
+        print("[SERVER] [ERROR] Audio loop not running")
+        return
+
+    enabled = data.get('enabled', True) if data else True
+    audio_loop.set_echo_cancellation(enabled)
+
+    status_msg = f"Echo cancellation {'enabled' if enabled else 'disabled'}"
+    await sio.emit('status', {'msg': status_msg})
+    print(f"[SERVER] {status_msg}")
+
+
 # async def monitor_printers_loop():
 #     """Background task to query printer status periodically."""
 #     print("[SERVER] Starting Printer Monitor Loop")
@@ -497,6 +652,45 @@ async def confirm_tool(sid, data):
     else:
         print("Audio loop not active, cannot resolve confirmation.")
 
+@sio.event
+async def confirm_tools_batch(sid, data):
+    """
+    Approve or deny several pending tool calls at once.
+    data: { "ids": [...] (omit for all pending), "confirmed": True/False }
+    """
+    data = data or {}
+    confirmed = data.get('confirmed', False)
+    if not audio_loop:
+        print("Audio loop not active, cannot resolve confirmations.")
+        return
+    resolved = audio_loop.resolve_tool_confirmations(data.get('ids'), confirmed)
+    await sio.emit('tool_confirmations', {'pending': audio_loop.get_pending_confirmations(), 'resolved': resolved}, room=sid)
+
+@sio.event
+async def list_jobs(sid, data=None):
+    """Running, queued and recently finished agent jobs, emitted as 'jobs'."""
+    payload = audio_loop.list_jobs() if audio_loop else {"jobs": [], "queues": {}}
+    await sio.emit('jobs', payload, room=sid)
+
+@sio.event
+async def cancel_job(sid, data):
+    # data: { "id": "..." }
+    if audio_loop and not audio_loop.cancel_job(data.get('id')):
+        await sio.emit('error', {'msg': f"Job {data.get('id')} is not queued or running"}, room=sid)
+    await list_jobs(sid)
+
+@sio.event
+async def set_job_priority(sid, data):
+    # data: { "id": "...", "priority": int } - higher runs first; queued jobs only
+    if audio_loop:
+        audio_loop.set_job_priority(data.get('id'), int(data.get('priority', 0)))
+    await list_jobs(sid)
+
+@sio.event
+async def get_pending_confirmations(sid):
+    pending = audio_loop.get_pending_confirmations() if audio_loop else []
+    await sio.emit('tool_confirmations', {'pending': pending, 'resolved': []}, room=sid)
+
 @sio.event
 async def shutdown(sid, data=None):
     """Gracefully shutdown the server when the application closes."""
@@ -522,6 +716,10 @@ async def shutdown(sid, data=None):
     if authenticator:
         print("[SERVER] Stopping Authenticator...")
         authenticator.stop()
+
+    # os._exit below skips the lifespan shutdown, so stop the CPU and CAD workers here
+    get_process_pool().shutdown()
+    get_cad_worker_pool().shutdown()
     
     print("[SERVER] Graceful shutdown complete. Terminating process...")
     
@@ -675,7 +873,7 @@ async def on_mobile_contact_results(sid, data):
 async def on_mobile_audio_stream(sid, data):
     loop = asyncio.get_running_loop()
     def send_to_mobile(data):
-         asyncio.run_coroutine_threadsafe(sio.emit('mobile:audio_out', list(data)), loop)
+         asyncio.run_coroutine_threadsafe(sio.emit('mobile:audio_out', bytes(data)), loop)
     
     def send_command(event, data):
          asyncio.run_coroutine_threadsafe(sio.emit(event, data), loop)
@@ -1003,6 +1201,9 @@ async def prompt_web_agent(sid, data):
             root_path=current_project_path
         )
         
+        if result.get("gcode_path"):
+            await asyncio.to_thread(audio_loop.project_manager.save_gcode_artifact, result["gcode_path"],
+                                    result.get("profile"), result.get("stl_path"))
         await sio.emit('print_result', result)
         await sio.emit('status', {'msg': f"Print Job: {result.get('status', 'unknown')}"})
         
@@ -1072,6 +1273,7 @@ async def handle_mobile_connect(sid, data):
 @sio.on('disconnect')
 async def handle_disconnect(sid):
     print(f"[SERVER] Client Disconnected: {sid}")
+    audio_transport.remove(sid)
     # We might want to track if it was the mobile device
     # For now, safe to tell bridge if we knew it was them, but we don't track SID mapping yet.
     # audio_loop.mobile_bridge.disconnect_device() 
@@ -1092,6 +1294,17 @@ async def handle_mobile_audio(sid, data):
         # Flutter sends Uint8List, which might be byte array in python
         audio_loop.mobile_bridge.receive_audio(data)
 
+@sio.on('mobile:audio_format')
+async def handle_mobile_audio_format(sid, data):
+    # Optional: { 'sample_rate': 16000 } - mobile audio is resampled to the mic rate
+    if audio_loop and audio_loop.mobile_bridge and data and 'sample_rate' in data:
+        try:
+            audio_loop.mobile_bridge.set_audio_format(data['sample_rate'])
+        except ValueError as e:
+            # Keep the previous rate: a bad rate would break the resampler on every mic frame
+            print(f"[SERVER] [WARN] Rejected mobile audio format: {e}")
+            await sio.emit('error', {'msg': str(e)}, room=sid)
+
 @sio.on('mobile:contact_results')
 async def handle_mobile_contact_results(sid, data):
     print(f"[SERVER] Mobile Contact Results: {len(data.get('results', []))} found")
@@ -1166,6 +1379,17 @@ async def update_settings(sid, data):
         SETTINGS["camera_flipped"] = data["camera_flipped"]
         print(f"[SERVER] Camera flip set to: {data['camera_flipped']}")
 
+    if "confirmation_timeout_s" in data or "confirmation_timeout_policy" in data:
+        try:
+            if audio_loop:
+                audio_loop.set_confirmation_policy(data.get("confirmation_timeout_s", SETTINGS.get("confirmation_timeout_s", 60)),
+                                                   data.get("confirmation_timeout_policy", SETTINGS.get("confirmation_timeout_policy", "deny")))
+            for key in ("confirmation_timeout_s", "confirmation_timeout_policy"):
+                if key in data:
+                    SETTINGS[key] = data[key]
+        except ValueError as e:
+            await sio.emit('error', {'msg': str(e)}, room=sid)
+
     save_settings()
     # Broadcast new full settings
     await sio.emit('settings', SETTINGS)
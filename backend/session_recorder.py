@@ -0,0 +1,342 @@
+"""
+Session recording and offline replay for AudioLoop.
+
+SessionRecorder writes what crosses the Live API boundary to a compact binary
+file: mic PCM and text we send, and each `response` we receive (audio,
+transcriptions, tool calls), with timestamps. ReplayLiveClient is a local
+stand-in for `client.aio.live.connect` that plays such a file back, so
+receive_audio, tool dispatch and playback can be exercised without a mic or
+network (see benchmarks/bench_replay.py).
+
+File layout:
+    b"REXREC1\\n"  then records of  <kind:u8> <t:f64 seconds> <len:u32> <payload>
+"""
+
+import asyncio
+import json
+import struct
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+MAGIC = b"REXREC1\n"
+_HEADER = struct.Struct("<BdI")
+
+# Record kinds
+MIC_AUDIO = 1  # Realtime audio we sent (PCM 16 kHz)
+MODEL_AUDIO = 2  # response.data (PCM 24 kHz)
+INPUT_TRANSCRIPT = 3  # UTF-8 text
+OUTPUT_TRANSCRIPT = 4  # UTF-8 text
+TOOL_CALL = 5  # JSON list of {"id", "name", "args"}
+TURN_COMPLETE = 6  # End of one session.receive() iteration
+CLIENT_TEXT = 7  # Text we sent with session.send
+TOOL_RESPONSE = 8  # JSON list of {"id", "name", "response"}
+
+KIND_NAMES = {
+    MIC_AUDIO: "mic_audio", MODEL_AUDIO: "model_audio", INPUT_TRANSCRIPT: "input_transcript",
+    OUTPUT_TRANSCRIPT: "output_transcript", TOOL_CALL: "tool_call", TURN_COMPLETE: "turn_complete",
+    CLIENT_TEXT: "client_text", TOOL_RESPONSE: "tool_response",
+}
+# Kinds that came from the server, i.e. what a replay feeds back
+SERVER_KINDS = (MODEL_AUDIO, INPUT_TRANSCRIPT, OUTPUT_TRANSCRIPT, TOOL_CALL, TURN_COMPLETE)
+
+
+@dataclass
+class Record:
+    kind: int
+    t: float  # Seconds since the recording started
+    payload: bytes
+
+    @property
+    def text(self) -> str:
+        return self.payload.decode("utf-8")
+
+    @property
+    def json(self):
+        return json.loads(self.payload)
+
+
+def read_recording(path: Union[str, Path]) -> List[Record]:
+    data = Path(path).read_bytes()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a REX session recording")
+    records = []
+    offset = len(MAGIC)
+    while offset + _HEADER.size <= len(data):
+        kind, t, length = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        records.append(Record(kind, t, data[offset:offset + length]))
+        offset += length
+    return records
+
+
+def write_recording(path: Union[str, Path], records: Iterable[Record]):
+    with SessionRecorder(path) as recorder:
+        for record in records:
+            recorder.write(record.kind, record.payload, t=record.t)
+
+
+class SessionRecorder:
+    """Appends records to a recording file. Use as a context manager or call close()."""
+
+    def __init__(self, path: Union[str, Path], clock: Callable[[], float] = time.monotonic):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self._start = clock()
+        self.records_written = 0
+
+    def write(self, kind: int, payload: bytes = b"", t: Optional[float] = None):
+        if self._file is None:
+            return
+        if t is None:
+            t = self.clock() - self._start
+        self._file.write(_HEADER.pack(kind, t, len(payload)))
+        self._file.write(payload)
+        self.records_written += 1
+
+    def write_text(self, kind: int, text: str):
+        self.write(kind, text.encode("utf-8"))
+
+    def write_json(self, kind: int, value):
+        self.write(kind, json.dumps(value, default=str).encode("utf-8"))
+
+    def record_response(self, response):
+        """Records the parts of a Live API response that AudioLoop uses."""
+        if response.data:
+            self.write(MODEL_AUDIO, response.data)
+        content = response.server_content
+        if content:
+            if content.input_transcription and content.input_transcription.text:
+                self.write_text(INPUT_TRANSCRIPT, content.input_transcription.text)
+            if content.output_transcription and content.output_transcription.text:
+                self.write_text(OUTPUT_TRANSCRIPT, content.output_transcription.text)
+        if response.tool_call:
+            self.write_json(TOOL_CALL, [
+                {"id": fc.id, "name": fc.name, "args": dict(fc.args or {})}
+                for fc in response.tool_call.function_calls
+            ])
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _function_responses_to_json(function_responses) -> List[Dict]:
+    result = []
+    for fr in function_responses or []:
+        result.append({"id": getattr(fr, "id", None), "name": getattr(fr, "name", None),
+                       "response": getattr(fr, "response", None)})
+    return result
+
+
+class RecordingSession:
+    """Wraps a live session and records everything that passes through it."""
+
+    def __init__(self, session, recorder: SessionRecorder):
+        self._session = session
+        self.recorder = recorder
+
+    async def send(self, input=None, end_of_turn=False, **kwargs):
+        if isinstance(input, dict) and input.get("mime_type", "").startswith("audio/"):
+            self.recorder.write(MIC_AUDIO, input["data"])
+        elif isinstance(input, str):
+            self.recorder.write_text(CLIENT_TEXT, input)
+        return await self._session.send(input=input, end_of_turn=end_of_turn, **kwargs)
+
+    async def send_tool_response(self, function_responses=None, **kwargs):
+        self.recorder.write_json(TOOL_RESPONSE, _function_responses_to_json(function_responses))
+        return await self._session.send_tool_response(function_responses=function_responses, **kwargs)
+
+    async def receive(self):
+        async for response in self._session.receive():
+            self.recorder.record_response(response)
+            yield response
+        self.recorder.write(TURN_COMPLETE)
+
+    def __getattr__(self, name):
+        # Everything else (send_realtime_input, close, ...) goes straight through
+        return getattr(self._session, name)
+
+
+def _make_response(data=None, input_text=None, output_text=None, function_calls=None):
+    """Builds an object shaped like a Live API response (only the fields AudioLoop reads)."""
+    server_content = None
+    if input_text is not None or output_text is not None:
+        server_content = SimpleNamespace(
+            input_transcription=SimpleNamespace(text=input_text) if input_text is not None else None,
+            output_transcription=SimpleNamespace(text=output_text) if output_text is not None else None,
+            turn_complete=False,
+            interrupted=False,
+        )
+    tool_call = None
+    if function_calls:
+        tool_call = SimpleNamespace(function_calls=[
+            SimpleNamespace(id=fc.get("id"), name=fc["name"], args=fc.get("args", {}))
+            for fc in function_calls
+        ])
+    return SimpleNamespace(data=data, server_content=server_content, tool_call=tool_call)
+
+
+def record_to_response(record: Record):
+    if record.kind == MODEL_AUDIO:
+        return _make_response(data=record.payload)
+    if record.kind == INPUT_TRANSCRIPT:
+        return _make_response(input_text=record.text)
+    if record.kind == OUTPUT_TRANSCRIPT:
+        return _make_response(output_text=record.text)
+    if record.kind == TOOL_CALL:
+        return _make_response(function_calls=record.json)
+    return None
+
+
+class ReplaySession:
+    """
+    Plays back the server side of a recording.
+
+    Each session.receive() call yields the responses of the next recorded
+    turn. A turn that follows a tool call is held until send_tool_response()
+    arrives (like the real API). speed=None replays as fast as possible;
+    speed=1.0 keeps the recorded gaps between responses.
+    """
+
+    def __init__(self, records: List[Record], speed: Optional[float] = None,
+                 tool_response_timeout: float = 30.0):
+        self.speed = speed
+        self.tool_response_timeout = tool_response_timeout
+        self.turns = self._split_turns([r for r in records if r.kind in SERVER_KINDS])
+        self.finished = asyncio.Event()  # Set once every recorded turn was delivered
+
+        # What AudioLoop sent us
+        self.sent_audio_bytes = 0
+        self.sent_texts: List[str] = []
+        self.tool_responses: List[Dict] = []
+        self.responses_delivered = 0
+        self._tool_calls_outstanding = 0
+        self._tool_response_event = asyncio.Event()
+
+    @staticmethod
+    def _split_turns(records: List[Record]) -> List[List[Record]]:
+        turns, current = [], []
+        for record in records:
+            if record.kind == TURN_COMPLETE:
+                turns.append(current)
+                current = []
+            else:
+                current.append(record)
+        if current:
+            turns.append(current)
+        return turns
+
+    async def send(self, input=None, end_of_turn=False, **kwargs):
+        if isinstance(input, dict) and isinstance(input.get("data"), (bytes, bytearray)):
+            self.sent_audio_bytes += len(input["data"])
+        elif isinstance(input, str):
+            self.sent_texts.append(input)
+
+    async def send_realtime_input(self, **kwargs):
+        pass
+
+    async def send_tool_response(self, function_responses=None, **kwargs):
+        responses = _function_responses_to_json(function_responses)
+        self.tool_responses.extend(responses)
+        self._tool_calls_outstanding = max(0, self._tool_calls_outstanding - len(responses))
+        if self._tool_calls_outstanding == 0:
+            self._tool_response_event.set()
+
+    async def receive(self):
+        if not self.turns:
+            self.finished.set()
+            await asyncio.Event().wait()  # Like a quiet live session: nothing more arrives
+
+        if self._tool_calls_outstanding:
+            try:
+                await asyncio.wait_for(self._tool_response_event.wait(), self.tool_response_timeout)
+            except asyncio.TimeoutError:
+                print(f"[REPLAY] [WARN] No tool response after {self.tool_response_timeout}s, continuing")
+                self._tool_calls_outstanding = 0
+
+        turn = self.turns.pop(0)
+        previous_t = turn[0].t if turn else 0.0
+        for record in turn:
+            if self.speed:
+                await asyncio.sleep(max(0.0, record.t - previous_t) / self.speed)
+            else:
+                await asyncio.sleep(0)
+            previous_t = record.t
+
+            if record.kind == TOOL_CALL:
+                self._tool_calls_outstanding += len(record.json)
+                self._tool_response_event.clear()
+            response = record_to_response(record)
+            if response is not None:
+                self.responses_delivered += 1
+                yield response
+
+        if not self.turns:
+            self.finished.set()
+
+    def stats(self) -> Dict:
+        return {
+            "turns_remaining": len(self.turns),
+            "responses_delivered": self.responses_delivered,
+            "sent_audio_bytes": self.sent_audio_bytes,
+            "sent_texts": len(self.sent_texts),
+            "tool_responses": len(self.tool_responses),
+        }
+
+
+class ReplayLiveClient:
+    """
+    Drop-in for the genai client as used by AudioLoop.run():
+
+        async with live_client.aio.live.connect(model=..., config=...) as session:
+    """
+
+    def __init__(self, recording: Union[str, Path, List[Record]], speed: Optional[float] = None):
+        self.records = read_recording(recording) if isinstance(recording, (str, Path)) else list(recording)
+        self.speed = speed
+        self.sessions: List[ReplaySession] = []
+        self.aio = SimpleNamespace(live=SimpleNamespace(connect=self._connect))
+
+    @asynccontextmanager
+    async def _connect(self, model=None, config=None):
+        session = ReplaySession(self.records, speed=self.speed)
+        self.sessions.append(session)
+        yield session
+
+    def mic_chunks(self) -> List[bytes]:
+        """The recorded mic audio, in order (for driving a fake input stream)."""
+        return [r.payload for r in self.records if r.kind == MIC_AUDIO]
+
+
+def synthesize_recording(turns: int = 5, audio_chunks_per_turn: int = 20, chunk_bytes: int = 3840,
+                         tool_call: Optional[Dict] = None) -> List[Record]:
+    """A synthetic recording (silent model audio, transcripts, optional tool call) for benchmarks and tests."""
+    records, t = [], 0.0
+    chunk_seconds = chunk_bytes / 2 / 24000
+    for turn in range(turns):
+        records.append(Record(INPUT_TRANSCRIPT, t, f"user turn {turn}".encode()))
+        if tool_call and turn == 0:
+            call = dict(tool_call, id=tool_call.get("id", "call-0"))
+            records.append(Record(TOOL_CALL, t, json.dumps([call]).encode()))
+            records.append(Record(TURN_COMPLETE, t, b""))
+        for i in range(audio_chunks_per_turn):
+            t += chunk_seconds
+            records.append(Record(MODEL_AUDIO, t, bytes(chunk_bytes)))
+            if i % 5 == 0:
+                records.append(Record(OUTPUT_TRANSCRIPT, t, f"reply {turn}.{i} ".encode()))
+        records.append(Record(TURN_COMPLETE, t, b""))
+    return records
@@ -0,0 +1,120 @@
+"""
+SpeakingTracker - Whether REX is currently talking, from one monotonic deadline.
+
+play_audio used to create a `mark_ada_finished` task per output chunk and
+cancel the previous one, i.e. dozens of task allocations per second while a
+reply played. Instead, each chunk just pushes a deadline forward by its
+playback duration, and a single long-lived task (run()) sleeps until the
+deadline (plus a short hangover) has passed:
+
+    play_audio   -> tracker.note_audio(chunk)        (cheap, no tasks)
+    listen_audio -> tracker.speaking / speaking_for() (plain reads)
+    subscribers  <- SpeakingEvent("start" | "end")   (no polling)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+@dataclass
+class SpeakingEvent:
+    kind: str  # "start" or "end"
+    timestamp: float  # Wall clock (time.time()) - for clients/logs
+    monotonic: float  # time.monotonic() - for in-process comparisons
+    duration: float = 0.0  # Seconds spoken; set on "end"
+    interrupted: bool = False  # "end" caused by interrupt() (barge-in / flush)
+
+    def to_dict(self) -> dict:
+        return {
+            "speaking": self.kind == "start",
+            "event": self.kind,
+            "timestamp": self.timestamp,
+            "duration": round(self.duration, 3),
+            "interrupted": self.interrupted,
+        }
+
+
+class SpeakingTracker:
+    def __init__(self, sample_rate: int = 24000, sample_width: int = 2, channels: int = 1,
+                 hangover: float = 0.5, clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        """
+        :param hangover: Silence after the last queued audio finishes before
+                         REX counts as done (bridges gaps between chunks).
+        """
+        self.bytes_per_second = sample_rate * sample_width * channels
+        self.hangover = hangover
+        self.clock = clock
+        self.wall_clock = wall_clock
+
+        self.speaking = False
+        self.started_at: Optional[float] = None  # Monotonic start of the current utterance
+        self._deadline = 0.0  # Monotonic time the queued audio finishes playing
+        self._subscribers: List[Callable[[SpeakingEvent], None]] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    def subscribe(self, callback: Callable[[SpeakingEvent], None]) -> Callable[[], None]:
+        """Registers callback(event) for start/end events. Returns an unsubscribe function."""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def note_audio(self, data: bytes):
+        """Call for every output chunk. Extends the deadline by the chunk's duration."""
+        now = self.clock()
+        self._deadline = max(self._deadline, now) + len(data) / self.bytes_per_second
+        if not self.speaking:
+            self.speaking = True
+            self.started_at = now
+            self._publish(SpeakingEvent("start", self.wall_clock(), now))
+            if self._wake:
+                self._wake.set()
+
+    def interrupt(self):
+        """Ends the current utterance immediately (queued audio was dropped)."""
+        if self.speaking:
+            self._deadline = self.clock()
+            self._end(interrupted=True)
+
+    def speaking_for(self) -> float:
+        """Seconds since the current utterance started (0.0 if silent)."""
+        if not self.speaking or self.started_at is None:
+            return 0.0
+        return self.clock() - self.started_at
+
+    async def run(self):
+        """The one long-lived task that turns the deadline into "end" events."""
+        self._wake = asyncio.Event()
+        if self.speaking:
+            self._wake.set()
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                while self.speaking:
+                    remaining = self._deadline + self.hangover - self.clock()
+                    if remaining <= 0:
+                        self._end()
+                        break
+                    await asyncio.sleep(remaining)
+        finally:
+            self._wake = None
+
+    def _end(self, interrupted: bool = False):
+        now = self.clock()
+        duration = now - self.started_at if self.started_at is not None else 0.0
+        self.speaking = False
+        self.started_at = None
+        self._publish(SpeakingEvent("end", self.wall_clock(), now, duration, interrupted))
+
+    def _publish(self, event: SpeakingEvent):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[SPEECH STATE] [ERR] Subscriber failed: {e}")
@@ -0,0 +1,132 @@
+"""
+StartupProfiler - Where the backend's cold start goes.
+
+server.py imports this module first and marks phases as startup proceeds:
+
+    profiler.mark("imports")             # server.py finished importing
+    profiler.mark("first_status_emit")   # first 'status' reached a client
+
+Times are seconds since this module was imported (i.e. since server.py
+started executing). Modules deferred with lazy_imports.lazy_module report
+how long their first use took. REX_PROFILE_STARTUP=1 prints the report when
+the first 'status' is emitted; GET /startup returns it as JSON.
+
+import_tree(module) runs `python -X importtime -c "import <module>"` in a
+fresh interpreter and parses the per-module import cost, for the regression
+benchmark in benchmarks/bench_startup.py.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+_T0 = time.perf_counter()
+
+# Modules that must not be imported by `import server` (loaded on first use instead)
+HEAVY_MODULES = (
+    "cv2", "pyaudio", "mss", "pyautogui", "screen_brightness_control", "PIL",
+    "playwright", "pandas", "bs4", "docx", "mediapipe", "google.genai",
+)
+
+
+class StartupProfiler:
+    def __init__(self, t0: float = _T0, clock: Callable[[], float] = time.perf_counter):
+        self.t0 = t0
+        self.clock = clock
+        self._marks: Dict[str, float] = {}
+        self._lazy: Dict[str, float] = {}
+
+    def mark(self, phase: str, once: bool = True) -> float:
+        """Records seconds since start for `phase` (kept from the first call when once=True)."""
+        elapsed = self.clock() - self.t0
+        if not (once and phase in self._marks):
+            self._marks[phase] = elapsed
+        return self._marks[phase]
+
+    def has_mark(self, phase: str) -> bool:
+        return phase in self._marks
+
+    def record_lazy_import(self, module: str, seconds: float):
+        self._lazy[module] = seconds
+
+    def report(self) -> Dict:
+        return {
+            "phases_ms": {phase: round(t * 1000.0, 1) for phase, t in self._marks.items()},
+            "lazy_imports_ms": {module: round(t * 1000.0, 1) for module, t in
+                                sorted(self._lazy.items(), key=lambda item: -item[1])},
+        }
+
+    def print_report(self):
+        report = self.report()
+        print("[STARTUP] Phases (ms since start):")
+        for phase, ms in report["phases_ms"].items():
+            print(f"[STARTUP]   {phase:<24} {ms:>9.1f}")
+        if report["lazy_imports_ms"]:
+            print("[STARTUP] Loaded on first use (ms):")
+            for module, ms in report["lazy_imports_ms"].items():
+                print(f"[STARTUP]   {module:<24} {ms:>9.1f}")
+
+
+profiler = StartupProfiler()
+
+
+def enabled() -> bool:
+    return os.getenv("REX_PROFILE_STARTUP", "0") not in ("", "0", "false", "False")
+
+
+# --- Import-time tree (python -X importtime) ---
+
+class ImportEntry(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[ImportEntry]:
+    """Entries in the order Python reports them (children before their parent)."""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(ImportEntry(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def import_tree(module: str, cwd: Optional[str] = None, timeout: float = 120) -> List[ImportEntry]:
+    """Imports `module` in a fresh interpreter with -X importtime; raises RuntimeError if the import fails."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, capture_output=True, text=True, timeout=timeout)
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-3:])
+        raise RuntimeError(f"import {module} failed:\n{tail}")
+    return parse_importtime(proc.stderr)
+
+
+def total_ms(entries: List[ImportEntry], module: str) -> Optional[float]:
+    for entry in entries:
+        if entry.module == module and entry.depth == 0:
+            return entry.cumulative_us / 1000.0
+    return None
+
+
+def imported_heavy_modules(entries: List[ImportEntry], heavy=HEAVY_MODULES) -> List[str]:
+    """Which of `heavy` (or their submodules) the import pulled in."""
+    names = {entry.module for entry in entries}
+    return [name for name in heavy if any(m == name or m.startswith(name + ".") for m in names)]
+
+
+def format_tree(entries: List[ImportEntry], min_ms: float = 5.0) -> str:
+    """Parent-first tree of the imports whose cumulative cost is at least `min_ms`."""
+    lines = []
+    for entry in reversed(entries):
+        if entry.cumulative_us / 1000.0 >= min_ms:
+            lines.append(f"{entry.cumulative_us / 1000.0:>9.1f} ms  {'  ' * entry.depth}{entry.module}")
+    return "\n".join(lines)
@@ -0,0 +1,332 @@
+"""
+ToolRegistry - Table-driven dispatch for the model's function calls.
+
+Every tool REX exposes is declared once as a ToolSpec (see tools.py):
+
+    ToolSpec("open_app", open_app_tool, blocking=False, ack=lambda a: f"Opening {a['app_name']}...")
+
+- declaration  : the function declaration sent to the Live API (None = handler
+                 only, not offered to the model)
+- blocking     : True  -> the handler is awaited and its return value is the result
+                 False -> the handler runs as a background task and `ack` is
+                          returned to the model straight away
+- confirmation : "permission" (user's per-tool setting, bypassed by Master
+                 Control), "always" or "never"
+- response     : builds the FunctionResponse payload from the result
+                 (None = send no response for this call)
+- parallel     : False -> the call is a barrier inside a batch (waits for the
+                 calls before it, holds back the calls after it)
+- max_concurrency : calls of this tool allowed to run at once within batches
+
+AudioLoop binds its `_tool_<name>` methods as handlers; receive_audio then
+does one dict lookup per call instead of walking an if/elif chain. Each
+dispatch records wall time, success/failure and argument/response sizes per
+tool (exposed under "tools" in get_metrics()).
+
+run_batch() executes the function_calls of one tool_call concurrently with
+asyncio.gather, keeps the results in call order, and reports how much wall
+time that saved versus running them one after another.
+"""
+
+import asyncio
+import inspect
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from voice_metrics import RollingHistogram
+
+CONFIRMATION_POLICIES = ("permission", "always", "never")
+
+
+def result_response(result: Any) -> Dict:
+    return {"result": result}
+
+
+def no_response(result: Any) -> None:
+    return None
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    name: str
+    declaration: Optional[Dict] = None
+    blocking: bool = True
+    confirmation: str = "permission"
+    ack: Union[str, Callable[[Dict], str], None] = None
+    response: Callable[[Any], Optional[Dict]] = result_response
+    parallel: bool = True
+    max_concurrency: int = 4
+
+    def __post_init__(self):
+        if self.confirmation not in CONFIRMATION_POLICIES:
+            raise ValueError(f"Unknown confirmation policy '{self.confirmation}' for tool '{self.name}'")
+        if self.declaration is not None and self.declaration.get("name") != self.name:
+            raise ValueError(f"Declaration name '{self.declaration.get('name')}' does not match tool '{self.name}'")
+
+    def ack_for(self, args: Dict) -> Optional[str]:
+        return self.ack(args) if callable(self.ack) else self.ack
+
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.denied = 0
+        self.in_flight = 0  # Non-blocking handlers still running
+        self.args_bytes = 0
+        self.response_bytes = 0
+        self.last_error: Optional[str] = None
+        self.wall_time = RollingHistogram()
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "denied": self.denied,
+            "in_flight": self.in_flight,
+            "args_bytes": self.args_bytes,
+            "response_bytes": self.response_bytes,
+            "last_error": self.last_error,
+            "wall_time_ms": self.wall_time.summary(),
+        }
+
+
+def _payload_size(payload: Any) -> int:
+    if payload is None:
+        return 0
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return len(str(payload))
+
+
+class BatchResult:
+    """Results of one tool_call batch, in call order, with its timing."""
+
+    def __init__(self, results: List[Any], wall_s: float, durations: List[float]):
+        self.results = results
+        self.wall_s = wall_s
+        self.durations = durations
+
+    @property
+    def serial_s(self) -> float:
+        """What the batch would have taken run one call at a time."""
+        return sum(self.durations)
+
+    @property
+    def saved_s(self) -> float:
+        return max(0.0, self.serial_s - self.wall_s)
+
+
+class ToolRegistry:
+    def __init__(self, specs: Iterable[ToolSpec] = (), clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self._specs: Dict[str, ToolSpec] = {}
+        self._handlers: Dict[str, Callable] = {}
+        self._stats: Dict[str, ToolStats] = {}
+        self._tasks = set()  # Keeps background handler tasks referenced until they finish
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: ToolSpec, handler: Optional[Callable] = None) -> ToolSpec:
+        if spec.name in self._specs:
+            raise ValueError(f"Tool '{spec.name}' is already registered")
+        self._specs[spec.name] = spec
+        self._stats[spec.name] = ToolStats()
+        if handler is not None:
+            self._handlers[spec.name] = handler
+        return spec
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._specs.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def declarations(self) -> List[Dict]:
+        """Function declarations for the Live API config, in registration order."""
+        return [spec.declaration for spec in self._specs.values() if spec.declaration is not None]
+
+    # --- Handlers ---
+
+    def bind(self, name: str, handler: Callable):
+        if name not in self._specs:
+            raise KeyError(f"Unknown tool '{name}'")
+        self._handlers[name] = handler
+
+    def bind_methods(self, owner: Any, prefix: str = "_tool_") -> List[str]:
+        """Binds `owner.<prefix><name>` for every registered tool; returns the names left unbound."""
+        unbound = []
+        for name in self._specs:
+            method = getattr(owner, prefix + name, None)
+            if method is None:
+                unbound.append(name)
+            else:
+                self._handlers[name] = method
+        return unbound
+
+    def handler(self, name: str) -> Optional[Callable]:
+        return self._handlers.get(name)
+
+    # --- Dispatch ---
+
+    def requires_confirmation(self, name: str, permissions: Dict[str, bool], master_control: bool = False) -> bool:
+        spec = self._specs[name]
+        if spec.confirmation == "never":
+            return False
+        if spec.confirmation == "always":
+            return True
+        return not master_control and permissions.get(name, True)
+
+    def confirmation_decision(self, name: str, permissions: Dict[str, bool], master_control: bool = False,
+                              can_ask: bool = True) -> str:
+        """"allow", "ask" or "deny". A call that needs confirmation is denied when nobody can be asked."""
+        if not self.requires_confirmation(name, permissions, master_control):
+            return "allow"
+        return "ask" if can_ask else "deny"
+
+    def record_denied(self, name: str):
+        stats = self._stats.get(name)
+        if stats:
+            stats.denied += 1
+
+    async def dispatch(self, name: str, args: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Runs one call and returns its response payload (None = no response).
+
+        Handler errors are caught and reported back to the model as the result
+        instead of propagating into receive_audio. Raises KeyError for unknown
+        or unbound tools.
+        """
+        spec = self._specs.get(name)
+        handler = self._handlers.get(name)
+        if spec is None or handler is None:
+            raise KeyError(f"No handler registered for tool '{name}'")
+        args = dict(args or {})
+        stats = self._stats[name]
+        stats.calls += 1
+        stats.args_bytes += _payload_size(args)
+
+        start = self.clock()
+        try:
+            if spec.blocking:
+                result = handler(args)
+                if inspect.isawaitable(result):
+                    result = await result
+                stats.wall_time.record((self.clock() - start) * 1000.0)
+            else:
+                self._start_background(name, handler(args), start)
+                result = spec.ack_for(args)
+        except Exception as e:
+            stats.errors += 1
+            stats.last_error = repr(e)
+            stats.wall_time.record((self.clock() - start) * 1000.0)
+            print(f"[TOOLS] [ERR] Tool '{name}' failed: {e}")
+            result = f"Error running {name}: {e}"
+            payload = result_response(result)
+        else:
+            payload = spec.response(result)
+
+        stats.response_bytes += _payload_size(payload)
+        return payload
+
+    def _start_background(self, name: str, coro, start: float):
+        if not inspect.isawaitable(coro):
+            # Synchronous handler declared non-blocking: it has already run
+            self._stats[name].wall_time.record((self.clock() - start) * 1000.0)
+            return
+        stats = self._stats[name]
+        stats.in_flight += 1
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+
+        def _done(finished):
+            self._tasks.discard(finished)
+            stats.in_flight -= 1
+            stats.wall_time.record((self.clock() - start) * 1000.0)
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            if error is not None:
+                stats.errors += 1
+                stats.last_error = repr(error)
+                print(f"[TOOLS] [ERR] Background tool '{name}' failed: {error}")
+
+        task.add_done_callback(_done)
+
+    # --- Batches ---
+
+    def _limit(self, name: str) -> Optional[asyncio.Semaphore]:
+        spec = self._specs.get(name)
+        if spec is None or spec.max_concurrency <= 0:
+            return None
+        limit = self._limits.get(name)
+        if limit is None:
+            limit = self._limits[name] = asyncio.Semaphore(spec.max_concurrency)
+        return limit
+
+    def _segments(self, calls: List[Any]) -> List[List[int]]:
+        """Splits call indexes into groups that may run together (barriers run alone)."""
+        segments, current = [], []
+        for i, call in enumerate(calls):
+            spec = self._specs.get(call.name)
+            if spec is not None and not spec.parallel:
+                if current:
+                    segments.append(current)
+                segments.append([i])
+                current = []
+            else:
+                current.append(i)
+        if current:
+            segments.append(current)
+        return segments
+
+    async def run_batch(self, calls: Iterable[Any], run_call: Callable[[Any], Awaitable[Any]]) -> BatchResult:
+        """
+        Runs `run_call(call)` for every call (anything with a `.name`) concurrently,
+        respecting barriers and per-tool limits. Results keep the order of `calls`.
+        If a call raises, the rest of its segment still finishes, then the first
+        error is re-raised.
+        """
+        calls = list(calls)
+        results: List[Any] = [None] * len(calls)
+        durations = [0.0] * len(calls)
+
+        async def timed(i: int):
+            limit = self._limit(calls[i].name)
+            if limit is not None:
+                await limit.acquire()
+            start = self.clock()
+            try:
+                results[i] = await run_call(calls[i])
+            finally:
+                durations[i] = self.clock() - start
+                if limit is not None:
+                    limit.release()
+
+        start = self.clock()
+        for segment in self._segments(calls):
+            if len(segment) == 1:
+                await timed(segment[0])
+                continue
+            outcomes = await asyncio.gather(*(timed(i) for i in segment), return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+        return BatchResult(results, self.clock() - start, durations)
+
+    # --- Export ---
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-tool counters for every tool that has been called at least once."""
+        return {name: stats.to_dict() for name, stats in self._stats.items()
+                if stats.calls or stats.denied}
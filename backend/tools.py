@@ -1,3 +1,5 @@
+from tool_registry import ToolSpec, no_response
+
 generate_cad_prototype_tool = {
     "name": "generate_cad_prototype",
     "description": "Generates a 3D wireframe prototype based on a user's description. Use this when the user asks to 'visualize', 'prototype', 'create a wireframe', or 'design' something in 3D.",
@@ -538,54 +540,144 @@ scrape_web_data = {
     "behavior": "NON_BLOCKING"
 }
 
-tools_list = [{"function_declarations": [
-    generate_cad_prototype_tool,
-    write_file_tool,
-    read_directory_tool,
-    read_file_tool,
-    create_folder_tool,
-    open_file_tool,
-    open_folder_tool,
-    open_app_tool,
-    open_url_tool,
-    type_text_tool,
-    press_key_tool,
-    mouse_move_tool,
-    mouse_click_tool,
-    search_web_tool,
-    window_control_tool,
-    system_control_tool,
-    manage_process_tool,
-    capture_screen_tool,
-    manage_call_tool,
-    mobile_app_tool,
-    mobile_contact_tool,
-    mobile_message_tool,
-    mobile_get_contacts_tool,
-    initiate_evolution_tool,
-    mobile_clipboard_tool,
-    mobile_hardware_control_tool,
-    mobile_audio_control_tool,
-    mobile_location_tool,
-    mobile_vision_tool,
-    mobile_file_beam_tool,
-    # Security Tools
-    {
-        "name": "run_security_tool",
-        "description": "Run a security/pentesting tool (nmap, netstat, whois) or a shell command. Use this for 'scan this IP', 'check open ports', or 'run command'.",
-        "parameters": {
-            "type": "OBJECT",
-            "properties": {
-                "tool": {
-                    "type": "STRING",
-                    "description": "The tool to run: 'nmap', 'netstat', 'whois', 'shell'."
-                },
-                "args": {
-                    "type": "STRING",
-                    "description": "Arguments for the tool (e.g., target IP for nmap, command string for shell)."
-                }
+run_security_tool = {
+    "name": "run_security_tool",
+    "description": "Run a security/pentesting tool (nmap, netstat, whois) or a shell command. Use this for 'scan this IP', 'check open ports', or 'run command'.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "tool": {
+                "type": "STRING",
+                "description": "The tool to run: 'nmap', 'netstat', 'whois', 'shell'."
             },
-            "required": ["tool", "args"]
-        }
+            "args": {
+                "type": "STRING",
+                "description": "Arguments for the tool (e.g., target IP for nmap, command string for shell)."
+            }
+        },
+        "required": ["tool", "args"]
+    }
+}
+
+run_web_agent = {
+    "name": "run_web_agent",
+    "description": "Opens a web browser and performs a task according to the prompt.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "prompt": {"type": "STRING", "description": "The detailed instructions for the web browser agent."}
+        },
+        "required": ["prompt"]
+    },
+    "behavior": "NON_BLOCKING"
+}
+
+create_project_tool = {
+    "name": "create_project",
+    "description": "Creates a new project folder to organize files.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "name": {"type": "STRING", "description": "The name of the new project."}
+        },
+        "required": ["name"]
     }
-]}]
+}
+
+switch_project_tool = {
+    "name": "switch_project",
+    "description": "Switches the current active project context.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "name": {"type": "STRING", "description": "The name of the project to switch to."}
+        },
+        "required": ["name"]
+    }
+}
+
+list_projects_tool = {
+    "name": "list_projects",
+    "description": "Lists all available projects.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {},
+    }
+}
+
+search_chat_history_tool = {
+    "name": "search_chat_history",
+    "description": "Searches past conversations with the user across all projects (full-text, best matches first). Use it when the user refers to something discussed earlier that is not in the current context, e.g. 'what did we say about the bracket last week'.",
+    "parameters": {
+        "type": "OBJECT",
+        "properties": {
+            "query": {"type": "STRING", "description": "Keywords to search for, e.g. 'bracket mounting holes'."},
+            "project": {"type": "STRING", "description": "Only search this project. Omit to search all projects."},
+            "days": {"type": "NUMBER", "description": "Only search the last N days (e.g. 7 for 'last week'). Omit for all history."},
+            "limit": {"type": "INTEGER", "description": "Maximum number of messages to return (default 10)."}
+        },
+        "required": ["query"]
+    }
+}
+
+
+# --- Registry ---
+# One entry per tool: declaration + how AudioLoop runs it (see tool_registry.py).
+# Non-blocking tools answer the model with `ack` immediately and finish in the background.
+# Calls in one tool_call run concurrently; parallel=False marks tools whose order matters
+# (project switches, shell commands, CAD edits).
+# Entries without a declaration are handler-only (their declarations are disabled in rex_core.py).
+
+tool_specs = [
+    ToolSpec("run_web_agent", run_web_agent, blocking=False,
+             ack="Web Navigation started. Do not reply to this message."),
+    ToolSpec("create_project", create_project_tool, parallel=False),
+    ToolSpec("switch_project", switch_project_tool, parallel=False),
+    ToolSpec("list_projects", list_projects_tool),
+    ToolSpec("search_chat_history", search_chat_history_tool, confirmation="never"),  # Read-only, local
+    ToolSpec("write_file", write_file_tool, blocking=False, ack="Writing file..."),
+    ToolSpec("read_directory", read_directory_tool, blocking=False, ack="Reading directory..."),
+    ToolSpec("read_file", read_file_tool, blocking=False, ack="Reading file..."),
+    ToolSpec("create_folder", create_folder_tool, blocking=False, ack="Creating folder..."),
+    ToolSpec("open_file", open_file_tool, blocking=False, ack="Opening file..."),
+    ToolSpec("open_folder", open_folder_tool, blocking=False, ack="Opening folder..."),
+    ToolSpec("open_app", open_app_tool, blocking=False, ack=lambda args: f"Opening {args['app_name']}..."),
+    ToolSpec("open_url", open_url_tool, blocking=False, ack="Opening URL..."),
+    ToolSpec("type_text", type_text_tool, blocking=False, ack="Typing text..."),
+    ToolSpec("press_key", press_key_tool, blocking=False, ack="Pressing keys..."),
+    ToolSpec("mouse_move", mouse_move_tool, blocking=False, ack="Moving mouse..."),
+    ToolSpec("mouse_click", mouse_click_tool, blocking=False, ack="Clicking mouse..."),
+    ToolSpec("search_web", search_web_tool, blocking=False, ack="Searching web..."),
+    ToolSpec("window_control", window_control_tool, blocking=False, ack="Controlling window..."),
+    ToolSpec("system_control", system_control_tool, blocking=False, ack="Controlling system..."),
+    ToolSpec("manage_process", manage_process_tool, blocking=False, ack="Managing process..."),
+    ToolSpec("capture_screen", capture_screen_tool, blocking=False, ack="Capturing screen..."),
+    ToolSpec("manage_call", manage_call_tool),
+    ToolSpec("mobile_app_control", mobile_app_tool),
+    ToolSpec("mobile_contact_tool", mobile_contact_tool),
+    ToolSpec("mobile_message_tool", mobile_message_tool),
+    ToolSpec("mobile_get_contacts", mobile_get_contacts_tool),
+    ToolSpec("initiate_evolution", initiate_evolution_tool, blocking=False,
+             ack=lambda args: f"Initiating evolution for '{args['capability_gap']}'..."),
+    ToolSpec("mobile_clipboard", mobile_clipboard_tool),
+    ToolSpec("mobile_hardware_control", mobile_hardware_control_tool),
+    ToolSpec("mobile_audio_control", mobile_audio_control_tool),
+    ToolSpec("mobile_location", mobile_location_tool),
+    ToolSpec("mobile_vision", mobile_vision_tool),
+    ToolSpec("mobile_file_beam", mobile_file_beam_tool),
+    # Security Tools - runs shell commands, so always asks (even under Master Control)
+    ToolSpec("run_security_tool", run_security_tool, confirmation="always", parallel=False),
+    # Handler-only
+    ToolSpec("scrape_web_data", blocking=False, ack="Scraping web data..."),
+    ToolSpec("generate_cad", blocking=False, response=no_response),  # Model already acknowledged
+    ToolSpec("iterate_cad", blocking=False, parallel=False,
+             ack=lambda args: f"Iterating the design: {args.get('prompt', '')}. The updated model will be shown when it's ready."),
+    ToolSpec("list_smart_devices"),
+    ToolSpec("control_light"),
+    ToolSpec("discover_printers"),
+    ToolSpec("print_stl", max_concurrency=1),
+    ToolSpec("get_print_status"),
+]
+
+# AudioLoop builds its own ToolRegistry from tool_specs; the model only needs the declarations
+tools_list = [{"function_declarations": [spec.declaration for spec in tool_specs if spec.declaration is not None]}]
@@ -0,0 +1,146 @@
+"""
+VadEngine - Voice activity detection for the AudioLoop microphone path.
+
+Each 1024-sample mic chunk is analysed once for:
+- RMS energy (the value the barge-in / VAD thresholds are expressed in)
+- Zero-crossing rate (high ZCR + low energy = hiss/fan noise, not speech)
+- An adaptive noise floor, so a noisy room does not hold VAD open forever
+
+NumpyVadEngine is the default. LegacyVadEngine keeps the original
+struct.unpack implementation for comparison (see benchmarks/bench_vad.py).
+"""
+
+import abc
+import math
+import struct
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class VadFrame:
+    """Analysis result for a single PCM chunk."""
+    rms: int
+    zcr: float  # Zero crossings per sample (0.0 - 1.0)
+    noise_floor: float  # Noise floor estimate after this chunk
+
+
+class VadEngine(abc.ABC):
+    """
+    Base class for VAD engines.
+
+    Subclasses implement _measure(); noise floor tracking and the speech
+    decision are shared so engines are interchangeable in listen_audio.
+    """
+
+    def __init__(self, snr_ratio: float = 2.5, max_noise_zcr: float = 0.35,
+                 floor_window: int = 47, floor_rise: float = 0.05, floor_fall: float = 0.3,
+                 initial_floor: Optional[float] = None):
+        """
+        :param snr_ratio: Speech must be this many times louder than the noise floor.
+        :param max_noise_zcr: Quiet chunks with a ZCR above this are treated as noise.
+        :param floor_window: Chunks of history for the minimum tracker (47 x 64 ms = ~3 s).
+        :param floor_rise: How fast the floor follows louder background noise (per chunk).
+        :param floor_fall: How fast the floor follows quieter background noise (per chunk).
+        :param initial_floor: Starting noise floor. None = seed from the first chunk.
+        """
+        self.snr_ratio = snr_ratio
+        self.max_noise_zcr = max_noise_zcr
+        self.floor_rise = floor_rise
+        self.floor_fall = floor_fall
+        self._initial_floor = initial_floor
+        self._history = deque(maxlen=floor_window)
+        self.noise_floor = initial_floor
+
+    def reset(self):
+        """Forget the learned noise floor (e.g. after switching input device)."""
+        self._history.clear()
+        self.noise_floor = self._initial_floor
+
+    @abc.abstractmethod
+    def _measure(self, data: bytes):
+        """Returns (rms, zcr) for a little-endian int16 PCM chunk."""
+
+    def analyze(self, data: bytes) -> VadFrame:
+        """Measures a chunk and updates the noise floor."""
+        rms, zcr = self._measure(data)
+
+        # Minimum statistics: speech always has pauses, so the quietest chunk
+        # in the last few seconds is a good estimate of the background level.
+        self._history.append(rms)
+        target = min(self._history)
+        if self.noise_floor is None:
+            self.noise_floor = float(target)
+        elif target < self.noise_floor:
+            self.noise_floor += (target - self.noise_floor) * self.floor_fall
+        else:
+            self.noise_floor += (target - self.noise_floor) * self.floor_rise
+
+        return VadFrame(rms=rms, zcr=zcr, noise_floor=self.noise_floor)
+
+    def effective_threshold(self, threshold: float) -> float:
+        """The configured RMS threshold, raised if the room is noisier than it."""
+        floor = self.noise_floor or 0.0
+        return max(threshold, floor * self.snr_ratio)
+
+    def is_speech(self, frame: VadFrame, threshold: float) -> bool:
+        """
+        Decides whether a chunk counts as speech against an RMS threshold
+        (e.g. AudioLoop._normal_vad_threshold or _barge_in_threshold).
+        """
+        limit = self.effective_threshold(threshold)
+        if frame.rms <= limit:
+            return False
+        # Noise-like chunks only count if they are clearly loud
+        if frame.zcr > self.max_noise_zcr and frame.rms < limit * 2:
+            return False
+        return True
+
+
+class NumpyVadEngine(VadEngine):
+    """Vectorized engine: one frombuffer view, one dot product, one diff."""
+
+    def _measure(self, data: bytes):
+        count = len(data) // 2
+        if count == 0:
+            return 0, 0.0
+
+        samples = np.frombuffer(data, dtype="<i2", count=count).astype(np.float64)
+        rms = int(math.sqrt(np.dot(samples, samples) / count))
+
+        signs = np.signbit(samples)
+        crossings = np.count_nonzero(signs[1:] != signs[:-1])
+        return rms, crossings / count
+
+
+class LegacyVadEngine(VadEngine):
+    """Original pure-Python implementation, kept as a reference."""
+
+    def _measure(self, data: bytes):
+        count = len(data) // 2
+        if count == 0:
+            return 0, 0.0
+
+        shorts = struct.unpack(f"<{count}h", data[:count * 2])
+        sum_squares = sum(s**2 for s in shorts)
+        rms = int(math.sqrt(sum_squares / count))
+
+        crossings = sum(1 for a, b in zip(shorts, shorts[1:]) if (a < 0) != (b < 0))
+        return rms, crossings / count
+
+
+VAD_ENGINES = {
+    "numpy": NumpyVadEngine,
+    "legacy": LegacyVadEngine,
+}
+
+
+def create_vad_engine(name: str = "numpy", **kwargs) -> VadEngine:
+    """Builds a VAD engine by name ('numpy' or 'legacy')."""
+    try:
+        return VAD_ENGINES[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown VAD engine '{name}'. Available: {', '.join(VAD_ENGINES)}")
@@ -0,0 +1,154 @@
+"""
+VoiceMetrics - Latency instrumentation for the AudioLoop voice pipeline.
+
+All timestamps are time.monotonic(). Two kinds of data are kept:
+
+- Rolling histograms (last `window` samples, milliseconds) per stage:
+    capture_to_send       mic chunk captured -> session.send returned
+    session_send          time spent inside session.send for realtime input
+    response_latency      user stopped speaking (VAD) -> first model audio byte
+    first_audio_to_play   first model audio byte -> first write to the speaker
+    model_audio_to_play   any model audio chunk received -> queued for playback
+    turn_duration         first model audio -> turn complete
+    tool_batch            wall time of a tool_call with several function calls
+    tool_batch_saved      how much faster that batch ran than one call at a time
+
+- Per-turn spans: named marks (offsets from the turn start) for the last few
+  turns, so a single slow turn can be inspected end to end.
+
+Exposed by server.py via the 'get_metrics' -> 'metrics' Socket.IO events and
+GET /metrics.
+"""
+
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_WINDOW = 512
+
+
+class RollingHistogram:
+    """Last `window` samples of one metric, summarised as percentiles."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self._samples = deque(maxlen=window)
+        self.total_count = 0
+
+    def record(self, value_ms: float):
+        self._samples.append(value_ms)  # deque.append is atomic - safe from audio threads
+        self.total_count += 1
+
+    def summary(self) -> Dict:
+        samples = np.fromiter(list(self._samples), dtype=np.float64)
+        if samples.size == 0:
+            return {"count": 0, "total": self.total_count}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {
+            "count": int(samples.size),
+            "total": self.total_count,
+            "mean": round(float(samples.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(samples.max()), 2),
+        }
+
+
+class TurnSpan:
+    """Marks for one conversational turn, relative to when it started."""
+
+    def __init__(self, turn_id: int, started_at: float, cause: str):
+        self.turn_id = turn_id
+        self.started_at = started_at
+        self.cause = cause
+        self.marks: Dict[str, float] = {}
+        self.ended_at: Optional[float] = None
+
+    def mark(self, name: str, at: float, first_only: bool = True):
+        if first_only and name in self.marks:
+            return
+        self.marks[name] = at
+
+    def to_dict(self) -> Dict:
+        return {
+            "turn": self.turn_id,
+            "cause": self.cause,
+            "marks_ms": {name: round((at - self.started_at) * 1000, 1) for name, at in self.marks.items()},
+            "duration_ms": round((self.ended_at - self.started_at) * 1000, 1) if self.ended_at else None,
+        }
+
+
+class VoiceMetrics:
+    def __init__(self, window: int = DEFAULT_WINDOW, turns_kept: int = 20,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.clock = clock
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self._turn_ids = 0
+        self.current_turn: Optional[TurnSpan] = None
+        self.recent_turns = deque(maxlen=turns_kept)
+        self.started_at = clock()
+
+    def now(self) -> float:
+        return self.clock()
+
+    # --- Durations ---
+
+    def record(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, RollingHistogram(self.window))
+        histogram.record(seconds * 1000.0)
+
+    def record_since(self, name: str, start: Optional[float]):
+        if start is not None:
+            self.record(name, self.clock() - start)
+
+    # --- Turns ---
+
+    def begin_turn(self, cause: str, at: Optional[float] = None) -> TurnSpan:
+        if self.current_turn:
+            self.end_turn()
+        self._turn_ids += 1
+        self.current_turn = TurnSpan(self._turn_ids, self.clock() if at is None else at, cause)
+        return self.current_turn
+
+    def mark(self, name: str, at: Optional[float] = None, first_only: bool = True):
+        """Adds a mark to the current turn (no-op between turns)."""
+        turn = self.current_turn
+        if turn:
+            turn.mark(name, self.clock() if at is None else at, first_only)
+
+    def turn_mark(self, name: str) -> Optional[float]:
+        turn = self.current_turn
+        return turn.marks.get(name) if turn else None
+
+    def end_turn(self):
+        turn = self.current_turn
+        if not turn:
+            return
+        turn.ended_at = self.clock()
+        first_audio = turn.marks.get("first_model_audio")
+        if first_audio is not None:
+            self.record("turn_duration", turn.ended_at - first_audio)
+        self.recent_turns.append(turn)
+        self.current_turn = None
+
+    # --- Export ---
+
+    def snapshot(self) -> Dict:
+        turns: List[Dict] = [turn.to_dict() for turn in self.recent_turns]
+        if self.current_turn:
+            turns.append(dict(self.current_turn.to_dict(), open=True))
+        return {
+            "uptime_s": round(self.clock() - self.started_at, 1),
+            "histograms": {name: hist.summary() for name, hist in sorted(self.histograms.items())},
+            "turns": turns,
+        }
+
+    def reset(self):
+        self.histograms = {}
+        self.current_turn = None
+        self.recent_turns.clear()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: EchoCanceller cost and echo suppression on a synthetic echo path.
+
+Far-end "speech" (modulated, low-passed noise at 24 kHz) is played through a
+simulated room: resampled to 16 kHz, delayed and convolved with a decaying
+impulse response. The canceller gets the far end as the playback thread
+would push it and the mic in 1024-sample chunks, like listen_audio.
+
+Reports per-chunk processing time against the 64 ms real-time budget and
+the ERLE (echo return loss enhancement) after convergence.
+
+Usage:
+    python benchmarks/bench_aec.py [--seconds 10] [--delay-ms 40]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from echo_canceller import EchoCanceller  # noqa: E402
+
+CHUNK_SIZE = 1024
+SEND_SAMPLE_RATE = 16000
+RECEIVE_SAMPLE_RATE = 24000
+
+
+def make_scenario(seconds, delay_ms, seed=0):
+    rng = np.random.default_rng(seed)
+    n_far = RECEIVE_SAMPLE_RATE * seconds
+    t = np.arange(n_far) / RECEIVE_SAMPLE_RATE
+    far = np.convolve(rng.normal(0, 1, n_far), np.ones(8) / 8, "same")
+    far *= 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)  # Syllable-rate modulation
+    far = 0.3 * far / np.abs(far).max()
+
+    ratio = RECEIVE_SAMPLE_RATE / SEND_SAMPLE_RATE
+    far_16k = np.interp(np.arange(0, n_far - 1, ratio), np.arange(n_far), far)
+
+    delay = int(SEND_SAMPLE_RATE * delay_ms / 1000)
+    rir = np.zeros(delay + 1200)
+    rir[delay:] = 0.05 * rng.normal(0, 1, 1200) * np.exp(-np.arange(1200) / 200)
+    rir[delay] = 0.3
+    echo = np.convolve(far_16k, rir)[:len(far_16k)]
+    near = echo + rng.normal(0, 1e-4, len(echo))
+
+    to_pcm = lambda x: np.clip(x * 32768, -32768, 32767).astype("<i2").tobytes()
+    return to_pcm(far), to_pcm(near)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--delay-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    far_pcm, near_pcm = make_scenario(args.seconds, args.delay_ms)
+    aec = EchoCanceller()
+
+    far_bytes = int(CHUNK_SIZE * RECEIVE_SAMPLE_RATE / SEND_SAMPLE_RATE) * 2
+    near_bytes = CHUNK_SIZE * 2
+    chunk_ms = CHUNK_SIZE / SEND_SAMPLE_RATE * 1000
+
+    timings, outputs = [], []
+    for i in range(len(near_pcm) // near_bytes):
+        aec.push_far_end(far_pcm[i * far_bytes:(i + 1) * far_bytes])
+        start = time.perf_counter()
+        outputs.append(aec.process(near_pcm[i * near_bytes:(i + 1) * near_bytes]))
+        timings.append(time.perf_counter() - start)
+
+    out = np.frombuffer(b"".join(outputs), dtype="<i2").astype(np.float64)
+    near = np.frombuffer(near_pcm[:len(out) * 2], dtype="<i2").astype(np.float64)
+    tail = slice(-2 * SEND_SAMPLE_RATE, None)  # Last 2 s, after convergence
+    erle = 10 * np.log10(np.dot(near[tail], near[tail]) / max(np.dot(out[tail], out[tail]), 1e-9))
+
+    timings_ms = np.array(timings) * 1000
+    print(f"chunks:            {len(timings)} x {CHUNK_SIZE} samples ({chunk_ms:.0f} ms budget each)")
+    print(f"per chunk mean:    {timings_ms.mean():.2f} ms")
+    print(f"per chunk p99:     {np.percentile(timings_ms, 99):.2f} ms")
+    print(f"real-time factor:  {timings_ms.mean() / chunk_ms:.3f} (one core)")
+    print(f"ERLE (last 2 s):   {erle:.1f} dB")
+    print(f"canceller stats:   {aec.stats()}")
+
+
+if __name__ == "__main__":
+    main()
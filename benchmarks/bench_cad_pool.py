@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of one CadAgent script attempt - a cold subprocess per
+attempt (the old behaviour) vs a warm CadWorkerPool worker that has already
+imported build123d.
+
+Runs the same small script (a filleted box exported to STL) --attempts times
+on each backend, reading the STL back the way CadAgent does, and reports the
+per-attempt latency. The pool's one-off startup (spawn + import) is reported
+separately: CadAgent starts it when it is created, while the first script is
+still being written by the model.
+
+Without build123d installed, --module picks another import to stand in for
+it (e.g. numpy); the script then only writes a dummy STL.
+
+Usage:
+    python benchmarks/bench_cad_pool.py [--attempts 5] [--module build123d]
+"""
+import argparse
+import importlib.util
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from cad_worker_pool import CadWorkerPool  # noqa: E402
+
+BUILD123D_SCRIPT = """
+from build123d import *
+
+with BuildPart() as p:
+    Box(40, 30, 10)
+    fillet(p.edges().filter_by(Axis.Z), radius=3)
+
+export_stl(p.part, 'output.stl')
+"""
+
+STAND_IN_SCRIPT = """
+import {module}
+
+with open('output.stl', 'wb') as f:
+    f.write(b'solid stand_in\\nendsolid stand_in\\n')
+"""
+
+
+def write_script(work_dir: Path, module: str):
+    body = BUILD123D_SCRIPT if module == "build123d" else STAND_IN_SCRIPT.format(module=module)
+    script_path = work_dir / "current_design.py"
+    output_stl = work_dir / "output_bench.stl"
+    # Same path injection as CadAgent
+    script_path.write_text(body.replace("output.stl", str(output_stl).replace("\\", "\\\\")), encoding="utf-8")
+    return str(script_path), str(output_stl)
+
+
+def time_attempts(pool: CadWorkerPool, script_path: str, output_stl: str, attempts: int):
+    times = []
+    for _ in range(attempts):
+        started = time.perf_counter()
+        result = pool.call(script_path, output_stl)
+        times.append((time.perf_counter() - started) * 1000.0)
+        if result.returncode != 0 or result.payload is None:
+            raise SystemExit(f"Script failed:\n{result.stderr}")
+    return times
+
+
+def report(label: str, times):
+    print(f"{label:<22} median {statistics.median(times):>8.1f} ms   "
+          f"min {min(times):>8.1f} ms   max {max(times):>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=5)
+    parser.add_argument("--module", default="build123d", help="Library the generated scripts import")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec(args.module) is None:
+        raise SystemExit(f"'{args.module}' is not installed here; pick another --module (e.g. numpy)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script_path, output_stl = write_script(Path(tmp), args.module)
+        print(f"Script importing {args.module}, {args.attempts} attempts per backend\n")
+
+        cold = CadWorkerPool(backend="subprocess")
+        report("cold subprocess", time_attempts(cold, script_path, output_stl, args.attempts))
+
+        warm = CadWorkerPool(preload=(args.module,))
+        started = time.perf_counter()
+        warm.warm(wait=True)
+        startup_ms = (time.perf_counter() - started) * 1000.0
+        try:
+            report("warm pool", time_attempts(warm, script_path, output_stl, args.attempts))
+            print(f"{'(pool startup, once)':<22} {startup_ms:>15.1f} ms")
+            stats = warm.stats()
+            if stats["backend"] != "pool":
+                print(f"[WARN] Pool fell back to subprocesses: {stats['fallback_reason']}")
+        finally:
+            warm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
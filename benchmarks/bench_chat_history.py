@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reading the latest N messages and a timestamp range from a long
+chat_history.jsonl - readlines() (the old get_recent_chat_history) vs the
+reverse block-seek tail reader and the sidecar offset index (chat_index.py).
+
+Generates --lines messages (one per --spacing seconds, texts of varying
+length) in a temporary directory, builds the index once (the cost a project
+that predates it pays on first use), then times each read --runs times.
+
+Usage:
+    python benchmarks/bench_chat_history.py [--lines 1000000] [--limit 10] [--runs 5] [--keep DIR]
+"""
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from chat_index import ChatIndex, index_path, sync_index, tail_lines  # noqa: E402
+
+T0 = 1_700_000_000.0
+
+
+def generate(path, lines, spacing, seed=1):
+    rng = random.Random(seed)
+    words = "move the bracket up two millimetres and print it again please check the fan".split()
+    with open(path, "w", encoding="utf-8") as f:
+        batch = []
+        for i in range(lines):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 40)))
+            batch.append(json.dumps({"timestamp": T0 + i * spacing, "sender": "User" if i % 2 else "REX",
+                                     "text": text}) + "\n")
+            if len(batch) >= 10000:
+                f.write("".join(batch))
+                batch = []
+        f.write("".join(batch))
+
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples), result
+
+
+def readlines_tail(path, limit):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    return [json.loads(line) for line in lines[-limit:]]
+
+
+def readlines_range(path, start, end):
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if start <= entry["timestamp"] <= end:
+                entries.append(entry)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=1_000_000, help="messages in the generated history")
+    parser.add_argument("--spacing", type=float, default=5.0, help="seconds between messages")
+    parser.add_argument("--limit", type=int, default=10, help="latest N messages to read")
+    parser.add_argument("--window", type=float, default=3600.0, help="timestamp range width, seconds")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", help="generate into (and keep) this directory")
+    args = parser.parse_args()
+
+    workdir = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="chat_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    history = workdir / "chat_history.jsonl"
+    try:
+        print(f"Generating {args.lines:,} messages...")
+        generate(history, args.lines, args.spacing)
+        index_path(history).unlink(missing_ok=True)
+        size_mb = history.stat().st_size / 1e6
+
+        started = time.perf_counter()
+        sync_index(history)
+        build_ms = (time.perf_counter() - started) * 1000.0
+        print(f"History {size_mb:.1f} MB, index {index_path(history).stat().st_size / 1e6:.1f} MB "
+              f"built once in {build_ms:.0f} ms")
+
+        start = T0 + (args.lines // 2) * args.spacing
+        end = start + args.window
+        index = ChatIndex(history)
+        cases = [
+            (f"last {args.limit} - readlines()", lambda: readlines_tail(history, args.limit)),
+            (f"last {args.limit} - tail_lines()", lambda: [json.loads(l) for l in tail_lines(history, args.limit)]),
+            (f"{args.window:.0f}s range - full scan", lambda: readlines_range(history, start, end)),
+            (f"{args.window:.0f}s range - index", lambda: index.read_range(start, end)),
+        ]
+        print(f"{'read':<32} {'median':>12} {'entries':>8}")
+        for name, fn in cases:
+            ms, result = timed(fn, args.runs)
+            print(f"{name:<32} {ms:>9.2f} ms {len(result):>8}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: searching years of chat history across projects - a scan of
+every project's chat_history.jsonl (the only option before) vs the SQLite
+FTS5 index in chat_store.py.
+
+Generates --messages messages spread over --years years and --projects
+projects as JSONL files, imports them (one-shot importer), then times
+keyword searches, each --runs times.
+
+Usage:
+    python benchmarks/bench_chat_store.py [--messages 1000000] [--projects 20] [--years 3] [--runs 5]
+"""
+import argparse
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from chat_store import DB_FILE, ChatStore, search_terms  # noqa: E402
+
+WORDS = ("move the bracket up two millimetres print it again check the fan speed order filament "
+         "calibrate bed level nozzle temperature drone frame motor mount propeller battery lamp "
+         "schedule meeting weather tomorrow email draft summary code review deploy server").split()
+RARE = ["gearbox", "heatsink", "thermistor", "planetary", "servo"]
+QUERIES = ["bracket", "what did we say about the gearbox", "thermistor nozzle", "planetary servo"]
+
+
+def generate(projects_dir, messages, projects, years, seed=1):
+    rng = random.Random(seed)
+    now = time.time()
+    span = years * 365 * 86400
+    per_project = messages // projects
+    for p in range(projects):
+        path = projects_dir / f"project{p:02d}" / "chat_history.jsonl"
+        path.parent.mkdir(parents=True)
+        start = now - span
+        with open(path, "w", encoding="utf-8") as f:
+            batch = []
+            for i in range(per_project):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(4, 30))]
+                if rng.random() < 0.001:
+                    words.append(rng.choice(RARE))
+                ts = start + span * i / per_project
+                batch.append(json.dumps({"timestamp": ts, "sender": "User" if i % 2 else "REX",
+                                         "text": " ".join(words)}) + "\n")
+                if len(batch) >= 10000:
+                    f.write("".join(batch))
+                    batch = []
+            f.write("".join(batch))
+
+
+def scan_search(projects_dir, query, limit):
+    terms = search_terms(query)
+    hits = []
+    for path in sorted(projects_dir.glob("*/chat_history.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                text = entry["text"].lower()
+                if all(term in text for term in terms):
+                    hits.append(entry)
+    return hits[-limit:]
+
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scan-runs", type=int, default=1, help="runs of the (slow) JSONL scan")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="chat_store_bench_"))
+    try:
+        print(f"Generating {args.messages:,} messages over {args.years:g} years in {args.projects} projects...")
+        generate(workdir, args.messages, args.projects, args.years)
+        store = ChatStore(workdir / DB_FILE, synchronous="OFF")
+        started = time.perf_counter()
+        store.import_projects(workdir)
+        print(f"Imported {store.count():,} messages in {time.perf_counter() - started:.1f}s "
+              f"(database {(workdir / DB_FILE).stat().st_size / 1e6:.0f} MB, FTS5: {store.fts})")
+
+        week_start = time.time() - 7 * 86400
+        print(f"{'query':<38} {'JSONL scan':>11} {'FTS5':>9} {'FTS5 last 7d':>13} {'hits':>5}")
+        for query in QUERIES:
+            scan_ms, _ = timed(lambda: scan_search(workdir, query, args.limit), args.scan_runs)
+            fts_ms, hits = timed(lambda: store.search(query, limit=args.limit), args.runs)
+            week_ms, _ = timed(lambda: store.search(query, start=week_start, limit=args.limit), args.runs)
+            print(f"{query:<38} {scan_ms:>8.0f} ms {fts_ms:>6.2f} ms {week_ms:>10.2f} ms {len(hits):>5}")
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
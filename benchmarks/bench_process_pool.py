@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audio underruns under CPU load, thread pool vs process pool.
+
+Plays real-time paced model audio through AudioPlaybackThread + JitterBuffer
+into a null device (paced like a speaker) while the event loop keeps
+submitting GIL-holding work (cpu_tasks.synthetic_load) - the stand-in for
+screenshot encoding, scraper parsing or STL post-processing. Runs once with
+no load, once with the load on a thread pool (the old behaviour) and once on
+the process pool, and reports underruns and event loop lag for each.
+
+Usage:
+    python benchmarks/bench_process_pool.py [--seconds 10] [--task-ms 200]
+                                            [--concurrency 4] [--workers 2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import cpu_tasks  # noqa: E402
+from audio_io import AudioPlaybackThread  # noqa: E402
+from jitter_buffer import JitterBuffer  # noqa: E402
+from process_pool import ProcessPool  # noqa: E402
+from voice_metrics import RollingHistogram  # noqa: E402
+
+SAMPLE_RATE = 24000
+CHUNK_MS = 20
+
+
+class NullOutputStream:
+    """
+    Accepts PCM like a PyAudio output stream, paced like a real device.
+    A write arriving more than `gap_ms` after the previous one finished playing
+    is an underrun (the speaker went silent).
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, gap_ms=10.0):
+        self.bytes_per_second = sample_rate * 2
+        self.gap_s = gap_ms / 1000.0
+        self.bytes_written = 0
+        self.underruns = 0
+        self.silence_s = 0.0
+        self._played_until = None
+
+    def write(self, data):
+        now = time.perf_counter()
+        if self._played_until is not None and now - self._played_until > self.gap_s:
+            self.underruns += 1
+            self.silence_s += now - self._played_until
+        self.bytes_written += len(data)
+        time.sleep(len(data) / self.bytes_per_second)
+        self._played_until = time.perf_counter()
+
+    def close(self):
+        pass
+
+
+async def produce_audio(playback, seconds, lag):
+    """Delivers 20 ms chunks on the real-time schedule, as the Live API would."""
+    chunk = b"\x01\x00" * (SAMPLE_RATE * CHUNK_MS // 1000)
+    start = time.perf_counter()
+    for i in range(int(seconds * 1000 / CHUNK_MS)):
+        due = start + i * CHUNK_MS / 1000.0
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lag.record(max(0.0, time.perf_counter() - due) * 1000.0)
+        await playback.write(chunk)
+
+
+async def generate_load(pool, task_ms, concurrency, stop):
+    async def worker():
+        while not stop.is_set():
+            await pool.run(cpu_tasks.synthetic_load, task_ms)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_case(backend, seconds, task_ms, concurrency, workers):
+    pool = None
+    if backend != "none":
+        pool = ProcessPool(max_workers=workers, backend=backend)
+        pool.warm()
+        await pool.run(cpu_tasks.worker_pid)
+
+    output = NullOutputStream()
+    playback = AudioPlaybackThread(output, asyncio.get_running_loop(),
+                                   jitter_buffer=JitterBuffer(sample_rate=SAMPLE_RATE, target_latency_ms=100))
+    playback.start()
+    lag = RollingHistogram(window=seconds * 1000 // CHUNK_MS)
+    stop = asyncio.Event()
+    load = asyncio.create_task(generate_load(pool, task_ms, concurrency, stop)) if pool else None
+
+    await produce_audio(playback, seconds, lag)
+    stop.set()
+    if load:
+        await load
+    await asyncio.sleep(0.3)  # Let the buffered tail play out
+    playback.stop()
+    if pool:
+        pool.shutdown(wait=True)
+
+    return {
+        "underruns": output.underruns,
+        "silence_s": output.silence_s,
+        "lag_ms": lag.summary(),
+        "tasks": pool.completed if pool else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=10, help="audio played per case")
+    parser.add_argument("--task-ms", type=float, default=200, help="CPU time per synthetic task")
+    parser.add_argument("--concurrency", type=int, default=4, help="tasks kept in flight")
+    parser.add_argument("--workers", type=int, default=2, help="pool workers")
+    args = parser.parse_args()
+
+    print(f"{'backend':<9} {'underruns':>9} {'silence s':>9} {'tasks':>6} "
+          f"{'lag p50':>9} {'lag p95':>9} {'lag p99':>9}")
+    for backend in ("none", "thread", "process"):
+        result = asyncio.run(run_case(backend, args.seconds, args.task_ms, args.concurrency, args.workers))
+        lag = result["lag_ms"]
+        print(f"{backend:<9} {result['underruns']:>9} {result['silence_s']:>9.2f} {result['tasks']:>6} "
+              f"{lag['p50']:>7.2f}ms {lag['p95']:>7.2f}ms {lag['p99']:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
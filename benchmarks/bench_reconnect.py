@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to recover from a dropped Live session, with and without a
+pre-connected standby session (LiveSessionManager).
+
+Sessions are simulated: each connect takes --handshake-ms (the Live API
+websocket + setup exchange is typically 0.5-1.5 s) and fails with
+probability --connect-failure-rate. The active session is dropped every
+--interval seconds and failover() is timed.
+
+Usage:
+    python benchmarks/bench_reconnect.py [--drops 10] [--interval 0.5]
+                                         [--handshake-ms 800] [--connect-failure-rate 0.1]
+"""
+import argparse
+import asyncio
+import random
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from live_session_manager import LiveSessionManager  # noqa: E402
+
+
+class SimulatedLive:
+    def __init__(self, handshake_s, failure_rate, seed=1):
+        self.handshake_s = handshake_s
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+    @asynccontextmanager
+    async def connect(self):
+        await asyncio.sleep(self.handshake_s * self.random.uniform(0.8, 1.2))
+        if self.random.random() < self.failure_rate:
+            raise ConnectionError("simulated handshake failure")
+        yield object()
+
+
+async def run_case(keep_spare, drops, interval, handshake_s, failure_rate):
+    live = SimulatedLive(handshake_s, failure_rate)
+    manager = LiveSessionManager(live.connect, keep_spare=keep_spare, backoff_initial=0.25)
+    await manager.start()
+    for _ in range(drops):
+        await asyncio.sleep(interval)  # Session in use, standby (re)connecting meanwhile
+        await manager.failover()
+    stats = manager.stats()
+    await manager.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drops", type=int, default=10, help="session drops to simulate")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between drops")
+    parser.add_argument("--handshake-ms", type=float, default=800, help="simulated connect time")
+    parser.add_argument("--connect-failure-rate", type=float, default=0.1, help="fraction of connects that fail")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'recover p50':>12} {'p95':>9} {'max':>9} {'hits':>5} {'misses':>7} {'conn fail':>10}")
+    for keep_spare in (False, True):
+        stats = asyncio.run(run_case(keep_spare, args.drops, args.interval,
+                                     args.handshake_ms / 1000.0, args.connect_failure_rate))
+        recover = stats["recover_ms"]
+        print(f"{'standby' if keep_spare else 'reconnect':<10} {recover['p50']:>9.1f} ms {recover['p95']:>6.1f} ms "
+              f"{recover['max']:>6.1f} ms {stats['spare_hits']:>5} {stats['spare_misses']:>7} "
+              f"{stats['connect_failures']:>10}")
+
+
+if __name__ == "__main__":
+    main()
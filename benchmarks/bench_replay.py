@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AudioLoop receive/tool-dispatch/playback throughput, offline.
+
+Drives AudioLoop.receive_audio and the playback path from a recorded (or
+synthetic) Live API session via ReplayLiveClient, with a null output device
+in place of PyAudio. No mic, speaker or network needed - suitable for CI.
+
+Record a real session first with:
+    python backend/rex_core.py --mode none --record recordings/session.rexrec
+
+Usage:
+    python benchmarks/bench_replay.py [--recording FILE] [--speed 1.0]
+                                      [--turns 20] [--realtime-device]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import rex_core  # noqa: E402
+from audio_io import AudioPlaybackThread  # noqa: E402
+from jitter_buffer import JitterBuffer  # noqa: E402
+from session_recorder import MODEL_AUDIO, ReplayLiveClient, read_recording, synthesize_recording  # noqa: E402
+
+
+class NullOutputStream:
+    """Accepts PCM like a PyAudio output stream; optionally paced like a real device."""
+
+    def __init__(self, realtime=False, sample_rate=24000):
+        self.realtime = realtime
+        self.bytes_per_second = sample_rate * 2
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        if self.realtime:
+            time.sleep(len(data) / self.bytes_per_second)
+
+    def close(self):
+        pass
+
+
+async def run_replay(records, speed, realtime_device):
+    live = ReplayLiveClient(records, speed=speed)
+    audio_loop = rex_core.AudioLoop(video_mode="none", live_client=live)
+    audio_loop.set_master_control(True)  # No confirmation prompts during the benchmark
+    audio_loop.audio_in_queue = asyncio.Queue()
+
+    output = NullOutputStream(realtime=realtime_device)
+    async with live.aio.live.connect(model=rex_core.MODEL) as session:
+        audio_loop.session = session
+        audio_loop._playback_thread = AudioPlaybackThread(
+            output, asyncio.get_running_loop(), on_write=audio_loop._on_playback_write,
+            jitter_buffer=JitterBuffer(target_latency_ms=audio_loop.playback_latency_ms,
+                                       period_frames=rex_core.PLAYBACK_PERIOD_FRAMES))
+        audio_loop._playback_thread.start()
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(audio_loop.receive_audio()),
+                 asyncio.create_task(audio_loop._play_loop())]
+        await session.finished.wait()
+        received = time.perf_counter() - start
+
+        expected = sum(len(r.payload) for r in records if r.kind == MODEL_AUDIO)
+        while output.bytes_written < expected and time.perf_counter() - start < 600:
+            await asyncio.sleep(0.01)
+        played = time.perf_counter() - start
+
+        for task in tasks:
+            task.cancel()
+        audio_loop._playback_thread.stop()
+
+    return {
+        "received_s": received,
+        "played_s": played,
+        "session": session.stats(),
+        "audio_s": expected / 2 / rex_core.RECEIVE_SAMPLE_RATE,
+        "playback": audio_loop.get_playback_stats(),
+        "metrics": audio_loop.get_metrics()["histograms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recording", type=str, help="session recording (default: synthetic)")
+    parser.add_argument("--speed", type=float, default=None, help="replay speed (default: as fast as possible)")
+    parser.add_argument("--turns", type=int, default=20, help="turns in the synthetic session")
+    parser.add_argument("--realtime-device", action="store_true", help="pace the null device like a real speaker")
+    args = parser.parse_args()
+
+    if args.recording:
+        records = read_recording(args.recording)
+    else:
+        records = synthesize_recording(turns=args.turns, audio_chunks_per_turn=50,
+                                       tool_call={"name": "list_projects", "args": {}})
+
+    result = asyncio.run(run_replay(records, args.speed, args.realtime_device))
+    session = result["session"]
+    print(f"responses delivered: {session['responses_delivered']} "
+          f"({session['responses_delivered'] / result['received_s']:.0f}/s)")
+    print(f"tool responses:      {session['tool_responses']}")
+    print(f"model audio:         {result['audio_s']:.1f} s, played in {result['played_s']:.2f} s "
+          f"({result['audio_s'] / result['played_s']:.1f}x real time)")
+    print(f"playback:            {result['playback']}")
+    for name, summary in result["metrics"].items():
+        if summary.get("count"):
+            print(f"{name:<22} p50 {summary['p50']:>8.2f} ms  p95 {summary['p95']:>8.2f} ms  p99 {summary['p99']:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
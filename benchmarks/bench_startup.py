@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backend cold start.
+
+1. Import cost - imports server.py in fresh interpreters with
+   `python -X importtime`, reports the median total and the heaviest parts of
+   the import tree, and fails if any module in startup_profiler.HEAVY_MODULES
+   (OpenCV, PyAudio, Playwright, pandas, mediapipe, google-genai, ...) is
+   imported eagerly again.
+2. Time to first 'status' (--serve) - starts `python backend/server.py`,
+   connects a Socket.IO client as soon as the port accepts, and measures
+   until the first 'status' event arrives.
+
+Exits non-zero on a regression (eager heavy import, or over --budget-ms).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 1500]
+                                       [--tree-min-ms 20] [--serve]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+import startup_profiler  # noqa: E402
+
+
+def measure_imports(module, runs):
+    totals, entries = [], []
+    for _ in range(runs):
+        entries = startup_profiler.import_tree(module, cwd=str(BACKEND))
+        totals.append(startup_profiler.total_ms(entries, module))
+    return totals, entries
+
+
+def time_to_first_status(url="http://localhost:8000", timeout=120):
+    import socketio
+
+    env = dict(os.environ, REX_PROFILE_STARTUP="1")
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=str(BACKEND), env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = socketio.Client()
+    first_status = []
+    client.on("status", lambda data: first_status.append(time.perf_counter()))
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                client.connect(url, wait_timeout=1)
+                break
+            except socketio.exceptions.ConnectionError:
+                time.sleep(0.05)
+        while not first_status and time.perf_counter() - started < timeout:
+            time.sleep(0.01)
+        return (first_status[0] - started) * 1000.0 if first_status else None
+    finally:
+        if client.connected:
+            client.disconnect()
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="server", help="module to import (from backend/)")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median import exceeds this")
+    parser.add_argument("--tree-min-ms", type=float, default=20.0, help="hide imports cheaper than this")
+    parser.add_argument("--serve", action="store_true", help="also measure time to the first 'status' emit")
+    args = parser.parse_args()
+
+    try:
+        totals, entries = measure_imports(args.module, args.runs)
+    except RuntimeError as e:
+        print(f"[ERR] {e}")
+        return 2
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.1f} ms over {len(totals)} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+    print(startup_profiler.format_tree(entries, min_ms=args.tree_min_ms))
+
+    failed = False
+    eager = startup_profiler.imported_heavy_modules(entries)
+    if eager:
+        print(f"[REGRESSION] imported at startup: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"[REGRESSION] import took {median:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        failed = True
+
+    if args.serve:
+        first_status = time_to_first_status()
+        if first_status is None:
+            print("first 'status': not received")
+            failed = True
+        else:
+            print(f"first 'status': {first_status:.0f} ms after launch")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
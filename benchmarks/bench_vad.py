@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-chunk VAD cost in AudioLoop.listen_audio.
+
+Compares the original struct.unpack + generator RMS with the NumPy engine
+on 1024-sample int16 chunks (one mic read at 16 kHz = 64 ms of audio).
+
+Usage:
+    python benchmarks/bench_vad.py [--iterations 2000]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from vad_engine import LegacyVadEngine, NumpyVadEngine  # noqa: E402
+
+CHUNK_SIZE = 1024
+SEND_SAMPLE_RATE = 16000
+
+
+def make_chunk(seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(CHUNK_SIZE) / SEND_SAMPLE_RATE
+    speech_like = 4000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 300, CHUNK_SIZE)
+    return np.clip(speech_like, -32768, 32767).astype("<i2").tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    chunk = make_chunk()
+    chunk_ms = CHUNK_SIZE / SEND_SAMPLE_RATE * 1000
+
+    print(f"{'engine':<10} {'per chunk':>12} {'% of chunk':>12}")
+    results = {}
+    for name, engine in (("legacy", LegacyVadEngine()), ("numpy", NumpyVadEngine())):
+        per_call = min(timeit.repeat(lambda: engine.analyze(chunk), number=args.iterations, repeat=5)) / args.iterations
+        results[name] = per_call
+        print(f"{name:<10} {per_call * 1e6:>9.1f} us {per_call * 1000 / chunk_ms * 100:>11.3f}%")
+
+    print(f"\nSpeedup: {results['legacy'] / results['numpy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
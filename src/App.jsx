@@ -55,7 +55,8 @@ function App() {
     const [cadRetryInfo, setCadRetryInfo] = useState({ attempt: 1, maxAttempts: 3, error: null }); // Retry status
     const [browserData, setBrowserData] = useState({ image: null, logs: [] });
     // showMemoryPrompt removed - memory is now actively saved to project
-    const [confirmationRequest, setConfirmationRequest] = useState(null); // { id, tool, args }
+    const [confirmationQueue, setConfirmationQueue] = useState([]); // [{ id, tool, args, expires_in }]
+    const confirmationRequest = confirmationQueue[0] || null;
     const [kasaDevices, setKasaDevices] = useState([]);
     const [showKasaWindow, setShowKasaWindow] = useState(false);
     const [showPrinterWindow, setShowPrinterWindow] = useState(false);
@@ -328,6 +329,8 @@ function App() {
             setStatus('Connected');
             setSocketConnected(true);
             socket.emit('get_settings');
+            // The visualizer only needs levels, not the full PCM stream
+            socket.emit('set_audio_transport', { mode: 'envelope' });
         });
         socket.on('disconnect', () => {
             setStatus('Disconnected');
@@ -343,7 +346,12 @@ function App() {
             }
         });
         socket.on('audio_data', (data) => {
-            setAiAudioData(data.data);
+            // Binary PCM attachment (ArrayBuffer)
+            setAiAudioData(new Uint8Array(data.data));
+        });
+        socket.on('audio_envelope', (data) => {
+            // 32 band levels (0..1) at ~30 Hz, scaled to the byte range the UI expects
+            setAiAudioData(data.bands.map((level) => level * 255));
         });
         socket.on('auth_status', (data) => {
             console.log("Auth Status:", data);
@@ -486,7 +494,12 @@ function App() {
         // Handle tool confirmation requests
         socket.on('tool_confirmation_request', (data) => {
             console.log("Received Confirmation Request:", data);
-            setConfirmationRequest(data);
+            setConfirmationQueue(prev => [...prev.filter(r => r.id !== data.id), data]);
+        });
+
+        // Answered elsewhere, timed out, or dropped on reconnect
+        socket.on('tool_confirmation_resolved', (data) => {
+            setConfirmationQueue(prev => prev.filter(r => r.id !== data.id));
         });
 
         // Handle Print Window Request (from CadWindow)
@@ -641,12 +654,14 @@ function App() {
             socket.off('disconnect');
             socket.off('status');
             socket.off('audio_data');
+            socket.off('audio_envelope');
             socket.off('cad_data');
             socket.off('cad_thought');
             socket.off('cad_status');
             socket.off('browser_frame');
             socket.off('transcription');
             socket.off('tool_confirmation_request');
+            socket.off('tool_confirmation_resolved');
             socket.off('kasa_devices');
             socket.off('printer_list');
             socket.off('slicing_progress');
@@ -1060,14 +1075,21 @@ function App() {
     const handleConfirmTool = () => {
         if (confirmationRequest) {
             socket.emit('confirm_tool', { id: confirmationRequest.id, confirmed: true });
-            setConfirmationRequest(null);
+            setConfirmationQueue(prev => prev.filter(r => r.id !== confirmationRequest.id));
         }
     };
 
     const handleDenyTool = () => {
         if (confirmationRequest) {
             socket.emit('confirm_tool', { id: confirmationRequest.id, confirmed: false });
-            setConfirmationRequest(null);
+            setConfirmationQueue(prev => prev.filter(r => r.id !== confirmationRequest.id));
+        }
+    };
+
+    const handleResolveAllTools = (confirmed) => {
+        if (confirmationQueue.length) {
+            socket.emit('confirm_tools_batch', { ids: confirmationQueue.map(r => r.id), confirmed });
+            setConfirmationQueue([]);
         }
     };
 
@@ -1592,8 +1614,11 @@ function App() {
                 {/* Tool Confirmation Modal */}
                 <ConfirmationPopup
                     request={confirmationRequest}
+                    pendingCount={confirmationQueue.length}
                     onConfirm={handleConfirmTool}
                     onDeny={handleDenyTool}
+                    onConfirmAll={() => handleResolveAllTools(true)}
+                    onDenyAll={() => handleResolveAllTools(false)}
                 />
             </div>
         </div >
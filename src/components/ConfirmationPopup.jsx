@@ -1,6 +1,6 @@
 import React from 'react';
 
-const ConfirmationPopup = ({ request, onConfirm, onDeny }) => {
+const ConfirmationPopup = ({ request, pendingCount = 1, onConfirm, onDeny, onConfirmAll, onDenyAll }) => {
     if (!request) return null;
 
     return (
@@ -18,7 +18,7 @@ const ConfirmationPopup = ({ request, onConfirm, onDeny }) => {
                             AUTHORIZATION REQUIRED
                         </h2>
                         <p className="text-xs text-cyan-600 font-mono tracking-widest uppercase">
-                            AI Logic Core Request
+                            AI Logic Core Request{pendingCount > 1 ? ` · 1 of ${pendingCount}` : ''}
                         </p>
                     </div>
                 </div>
@@ -70,6 +70,24 @@ const ConfirmationPopup = ({ request, onConfirm, onDeny }) => {
                         <div className="absolute inset-0 bg-cyan-400/10 translate-y-full group-hover:translate-y-0 transition-transform duration-300"></div>
                     </button>
                 </div>
+
+                {/* Batch Actions */}
+                {pendingCount > 1 && (
+                    <div className="flex gap-4 mt-3 relative z-10">
+                        <button
+                            onClick={onDenyAll}
+                            className="flex-1 px-4 py-2 rounded-xl border border-red-500/20 text-red-400/80 hover:text-red-300 hover:border-red-500/60 transition-all duration-200 font-bold tracking-wider uppercase text-[10px]"
+                        >
+                            Deny All ({pendingCount})
+                        </button>
+                        <button
+                            onClick={onConfirmAll}
+                            className="flex-1 px-4 py-2 rounded-xl border border-cyan-500/20 text-cyan-400/80 hover:text-cyan-300 hover:border-cyan-400/60 transition-all duration-200 font-bold tracking-wider uppercase text-[10px]"
+                        >
+                            Authorize All ({pendingCount})
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -15,6 +15,16 @@ sys.path.insert(0, str(BACKEND_DIR))
 SETTINGS_FILE = BACKEND_DIR / "settings.json"
 
 
+class FakeClock:
+    """Stand-in for the `clock` parameters (time.monotonic etc.): tests set `.now` directly."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
 @pytest.fixture(scope="session")
 def settings():
     """Load settings.json for device configurations."""
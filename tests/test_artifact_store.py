@@ -0,0 +1,128 @@
+"""
+Tests for the content-addressed artifact store (dedup, links, catalog lookups, prune).
+"""
+import os
+import stat
+
+import pytest
+
+from artifact_store import ArtifactStore, break_link, hash_file
+from project_manager import ProjectManager
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_duplicates_share_one_blob(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", link="hardlink")
+    a = write(tmp_path / "p1" / "cad" / "output_1.stl", b"solid cube\n" * 100)
+    b = write(tmp_path / "p2" / "cad" / "output_2.stl", b"solid cube\n" * 100)
+
+    first = store.put(a, kind="stl", prompt="a cube", dest=tmp_path / "p1" / "cad" / "1_a_cube.stl")
+    second = store.put(b, kind="stl", prompt="A  Cube ", project="p2")
+
+    assert first["hash"] == second["hash"] == hash_file(a)
+    blob = store.blob_path(first["hash"])
+    # The ingested files and the named copy are all the blob
+    for path in (a, b, tmp_path / "p1" / "cad" / "1_a_cube.stl"):
+        assert os.path.samefile(path, blob)
+    assert os.stat(blob).st_nlink == 4
+    stats = store.stats()
+    assert stats["stored"] == 1 and stats["deduplicated"] == 1 and stats["bytes_saved"] == 1100
+
+
+def test_lookups_survive_reload(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts")
+    stl = write(tmp_path / "cad" / "output.stl", b"solid bracket\n")
+    script = write(tmp_path / "cad" / "current_design.py", b"print('bracket')\n")
+    record = store.put(stl, kind="stl", prompt="Mounting bracket", script=script)
+    gcode = write(tmp_path / "gcode" / "output.gcode", b"G28\n")
+    store.put(gcode, kind="gcode", prompt="Mounting bracket", profile="Bambu X1C.json")
+
+    reloaded = ArtifactStore(tmp_path / "artifacts")
+    assert reloaded.get(record["hash"])["prompt"] == "Mounting bracket"
+    assert reloaded.find_by_prompt("mounting   BRACKET")["hash"] == record["hash"]
+    assert reloaded.find_by_prompt("mounting bracket", kind="gcode")["profile"] == "Bambu X1C.json"
+    assert record["script_hash"] == hash_file(script)
+    assert reloaded.blob_path(record["script_hash"]).exists()
+    # The script is rewritten in place by CadAgent: stored, never linked
+    assert not os.path.samefile(script, reloaded.blob_path(record["script_hash"]))
+    assert reloaded.find_by_prompt("unknown") is None
+
+
+def test_in_place_rewrites_never_reach_the_blob(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", link="hardlink")
+    stl = write(tmp_path / "cad" / "output_1.stl", b"solid part\n")
+    record = store.put(stl, kind="stl", dest=tmp_path / "cad" / "1_part.stl")
+    blob = store.blob_path(record["hash"])
+    assert not os.stat(blob).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+    # write_file on a linked name: the link is dropped first, the blob keeps its content
+    named = tmp_path / "cad" / "1_part.stl"
+    assert break_link(named)
+    with open(named, "w", encoding="utf-8") as f:
+        f.write("edited by hand")
+    assert blob.read_bytes() == b"solid part\n" and hash_file(blob) == record["hash"]
+    assert os.path.samefile(stl, blob)  # Other names still share it
+    assert not break_link(named)  # Now a file of its own
+
+    # G-code is stored without adopting the file: re-slicing rewrites it at the same name
+    gcode = write(tmp_path / "gcode" / "output_1.gcode", b"G28\n")
+    gcode_record = store.put(gcode, kind="gcode", profile="X1C.json", adopt=False)
+    with open(gcode, "wb") as f:
+        f.write(b"G28\nG1 X10\n")
+    assert store.blob_path(gcode_record["hash"]).read_bytes() == b"G28\n"
+
+
+def test_copy_mode_keeps_files_independent(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", link="copy")
+    stl = write(tmp_path / "output.stl", b"solid x\n")
+    record = store.put(stl, kind="stl", dest=tmp_path / "named.stl")
+    assert (tmp_path / "named.stl").read_bytes() == b"solid x\n"
+    assert not os.path.samefile(stl, store.blob_path(record["hash"]))
+    assert store.stats()["links"]["copy"] == 2  # Blob + named file; the source isn't copied back
+
+
+def test_prune_drops_unreferenced_blobs(tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts")
+    kept = write(tmp_path / "keep" / "a.stl", b"kept\n")
+    gone = write(tmp_path / "temp" / "b.stl", b"gone\n")
+    kept_hash = store.put(kept, kind="stl", prompt="kept")["hash"]
+    gone_hash = store.put(gone, kind="stl", prompt="gone")["hash"]
+    gone.unlink()
+
+    assert store.prune() == 1
+    assert store.get(kept_hash) is not None
+    assert store.get(gone_hash) is None
+    assert not store.blob_path(gone_hash).exists()
+    assert ArtifactStore(tmp_path / "artifacts").find_by_prompt("gone") is None
+
+
+def test_unknown_link_mode():
+    with pytest.raises(ValueError):
+        ArtifactStore("artifacts", link="symlink")
+
+
+def test_project_manager_saves_cad_and_gcode(tmp_path):
+    manager = ProjectManager(str(tmp_path))
+    try:
+        cad_dir = manager.get_current_project_path() / "cad"
+        output = write(cad_dir / "output_1.stl", b"solid gear\n")
+        write(cad_dir / "current_design.py", b"gear()\n")
+
+        saved = manager.save_cad_artifact(str(output), "A gear")
+        assert saved and open(saved, "rb").read() == b"solid gear\n"
+        record = manager.find_artifact(prompt="a gear")
+        assert record["project"] == "temp" and record["script_hash"]
+
+        gcode = write(manager.get_current_project_path() / "gcode" / "output_1.gcode", b"G1 X0\n")
+        gcode_record = manager.save_gcode_artifact(str(gcode), "X1C.json;PLA.json", str(output))
+        assert gcode_record["prompt"] == "A gear" and gcode_record["profile"] == "X1C.json;PLA.json"
+        assert not os.path.samefile(gcode, manager.artifacts.blob_path(gcode_record["hash"]))
+        assert manager.find_artifact(digest=gcode_record["hash"])["kind"] == "gcode"
+        assert manager.save_cad_artifact(str(tmp_path / "missing.stl"), "x") is None
+    finally:
+        manager.close()
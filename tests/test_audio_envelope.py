@@ -0,0 +1,66 @@
+"""
+Tests for the visualizer envelope computed from model output audio.
+"""
+import json
+import pytest
+import numpy as np
+
+from audio_envelope import EnvelopeAnalyzer
+from tests.conftest import FakeClock
+
+RATE = 24000
+
+
+def tone(freq, amplitude=0.5, samples=2400):
+    t = np.arange(samples) / RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * freq * t)).astype("<i2").tobytes()
+
+
+class TestEnvelopeAnalyzer:
+    """Band levels and rate limiting."""
+
+    def test_fixed_size(self):
+        analyzer = EnvelopeAnalyzer()
+        for data in (tone(440), tone(440, samples=100), b""):
+            env = analyzer.analyze(data)
+            assert len(env["bands"]) == 32
+            assert all(0.0 <= v <= 1.0 for v in env["bands"])
+
+    def test_tone_lands_in_matching_band(self):
+        analyzer = EnvelopeAnalyzer()
+        low = analyzer.analyze(tone(150))["bands"]
+        high = analyzer.analyze(tone(4000))["bands"]
+        assert int(np.argmax(low)) < 8
+        assert int(np.argmax(high)) > 24
+
+    def test_time_domain_levels(self):
+        env = EnvelopeAnalyzer().analyze(tone(1000, amplitude=0.5))
+        assert env["peak"] == pytest.approx(0.5, abs=0.01)
+        assert env["rms"] == pytest.approx(0.5 / np.sqrt(2), abs=0.01)
+
+    def test_rate_cap(self):
+        clock = FakeClock()
+        analyzer = EnvelopeAnalyzer(max_rate_hz=30, clock=clock)
+        emitted = 0
+        # 2 seconds of 10 ms chunks = 200 chunks
+        for _ in range(200):
+            if analyzer.process(tone(440, samples=240)):
+                emitted += 1
+            clock.now += 0.01
+        # Never more than 30 Hz, and not starved either
+        assert 40 <= emitted <= 60
+
+    def test_skipped_chunks_fold_into_next_envelope(self):
+        clock = FakeClock()
+        analyzer = EnvelopeAnalyzer(max_rate_hz=10, clock=clock)
+        assert analyzer.process(tone(440, amplitude=0.1)) is not None
+        assert analyzer.process(tone(440, amplitude=0.9)) is None  # Too soon
+        clock.now += 0.2
+        env = analyzer.process(tone(440, amplitude=0.1))
+        assert env["peak"] > 0.85
+
+    def test_bandwidth_vs_pcm(self):
+        # One second of output audio: JSON int list of PCM vs 30 envelopes
+        pcm = tone(440, samples=RATE)
+        env = EnvelopeAnalyzer().analyze(pcm)
+        assert len(json.dumps(env)) * 30 * 20 < len(json.dumps(list(pcm)))
@@ -0,0 +1,193 @@
+"""
+Tests for the audio I/O threads and SPSC ring buffer.
+Uses fake streams - no audio hardware required.
+"""
+import pytest
+import asyncio
+import threading
+import time
+
+from audio_io import SpscRingBuffer, ByteRingBuffer, AudioCaptureThread, AudioPlaybackThread
+from tests.conftest import FakeClock
+
+
+class FakeInputStream:
+    """Produces numbered chunks at a fixed pace, like a mic."""
+
+    def __init__(self, period=0.002):
+        self.period = period
+        self.counter = 0
+
+    def read(self, frames, **kwargs):
+        time.sleep(self.period)
+        self.counter += 1
+        return self.counter.to_bytes(4, "little") * (frames // 2)
+
+
+class FakeOutputStream:
+    def __init__(self, period=0.0):
+        self.period = period
+        self.written = []
+        self.closed = False
+
+    def write(self, data):
+        time.sleep(self.period)
+        self.written.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+class TestSpscRingBuffer:
+    """Ring buffer semantics."""
+
+    def test_fifo_order(self):
+        ring = SpscRingBuffer(4)
+        for i in range(4):
+            assert ring.push(i)
+        assert ring.full()
+        assert not ring.push(99)
+        assert [ring.pop() for _ in range(4)] == [0, 1, 2, 3]
+        assert ring.pop() is None
+        assert ring.empty()
+
+    def test_wraparound(self):
+        ring = SpscRingBuffer(3)
+        for i in range(100):
+            assert ring.push(i)
+            assert ring.pop() == i
+        assert len(ring) == 0
+
+    def test_threads(self):
+        ring = SpscRingBuffer(8)
+        received = []
+
+        def consumer():
+            while len(received) < 5000:
+                item = ring.pop()
+                if item is not None:
+                    received.append(item)
+                else:
+                    time.sleep(0)
+
+        t = threading.Thread(target=consumer)
+        t.start()
+        for i in range(5000):
+            while not ring.push(i):
+                time.sleep(0)
+        t.join(5)
+        assert received == list(range(5000))
+
+
+class TestAudioThreads:
+    """Capture and playback threads talking to the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_capture_delivers_in_order(self):
+        stream = FakeInputStream()
+        capture = AudioCaptureThread(stream, 8, asyncio.get_running_loop())
+        capture.start()
+        try:
+            chunks = [await asyncio.wait_for(capture.read(), 1) for _ in range(20)]
+        finally:
+            capture.stop()
+        ids = [int.from_bytes(c[:4], "little") for c in chunks]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 20
+
+    @pytest.mark.asyncio
+    async def test_playback_writes_all(self):
+        stream = FakeOutputStream(period=0.001)
+        playback = AudioPlaybackThread(stream, asyncio.get_running_loop(), capacity=2)
+        playback.start()
+        for i in range(30):
+            await asyncio.wait_for(playback.write(bytes([i])), 1)
+        for _ in range(100):
+            if len(stream.written) == 30:
+                break
+            await asyncio.sleep(0.01)
+        playback.stop()
+        assert stream.written == [bytes([i]) for i in range(30)]
+        assert stream.closed
+
+    @pytest.mark.asyncio
+    async def test_playback_flush(self):
+        stream = FakeOutputStream(period=0.05)
+        playback = AudioPlaybackThread(stream, asyncio.get_running_loop(), capacity=8)
+        playback.start()
+        for i in range(8):
+            await playback.write(bytes([i]))
+        playback.flush()
+        await asyncio.sleep(0.2)
+        playback.stop()
+        assert len(stream.written) < 8
+
+    @pytest.mark.asyncio
+    async def test_playback_on_write_hook(self):
+        stream = FakeOutputStream()
+        seen = []
+        playback = AudioPlaybackThread(stream, asyncio.get_running_loop(), on_write=seen.append)
+        playback.start()
+        for i in range(5):
+            await playback.write(bytes([i]))
+        for _ in range(100):
+            if len(seen) == 5:
+                break
+            await asyncio.sleep(0.01)
+        playback.stop()
+        assert seen == stream.written
+
+
+class TestByteRingBuffer:
+    def test_fifo_across_wraparound(self):
+        ring = ByteRingBuffer(10)
+        ring.write(b"abcdef")
+        assert ring.read(4) == b"abcd"
+        ring.write(b"ghijkl")  # Wraps
+        assert len(ring) == 8
+        assert ring.read() == b"efghijkl"
+
+    def test_drops_oldest_when_full(self):
+        ring = ByteRingBuffer(8)
+        ring.write(b"123456")
+        assert ring.write(b"abcd") == 2
+        assert ring.read() == b"3456abcd"
+        assert ring.write(b"0123456789ab") == 4  # Larger than capacity
+        assert ring.read() == b"456789ab"
+        assert ring.dropped_bytes == 6
+
+    def test_read_exact(self):
+        ring = ByteRingBuffer(16)
+        ring.write(b"abc")
+        assert ring.read_exact(4) is None
+        ring.write(b"def")
+        assert ring.read_exact(4) == b"abcd"
+        assert ring.read_exact(4) is None
+        assert len(ring) == 2
+
+    def test_queue_delay(self):
+        clock = FakeClock()
+        ring = ByteRingBuffer(100, clock=clock)
+        ring.write(b"a" * 10)
+        clock.now = 0.05
+        ring.write(b"b" * 10)
+        clock.now = 0.2
+        assert ring.oldest_age() == pytest.approx(0.2)
+        ring.read(15)  # Starts in the first chunk
+        assert ring.last_delay == pytest.approx(0.2)
+        assert ring.oldest_age() == pytest.approx(0.15)  # Rest belongs to the second chunk
+        ring.read()
+        assert ring.last_delay == pytest.approx(0.15)
+        assert ring.max_delay == pytest.approx(0.2)
+        assert ring.oldest_age() == 0.0
+
+    def test_delay_after_overwrite(self):
+        clock = FakeClock()
+        ring = ByteRingBuffer(10, clock=clock)
+        ring.write(b"a" * 8)
+        clock.now = 1.0
+        ring.write(b"b" * 8)  # First chunk mostly overwritten
+        ring.read(2)
+        assert ring.last_delay == pytest.approx(1.0)  # Remaining 'a's
+        ring.read()
+        assert ring.last_delay == pytest.approx(0.0)
@@ -0,0 +1,87 @@
+"""
+Tests for the mic/mobile input mixer.
+"""
+import pytest
+
+import numpy as np
+
+from audio_mixer import InputMixer
+from mobile_bridge import MobileBridge
+
+FRAME = 1024
+
+
+def pcm(level, count=FRAME):
+    return np.full(count, level, dtype="<i2").tobytes()
+
+
+def samples(data):
+    return np.frombuffer(data, dtype="<i2")
+
+
+def test_mic_passes_through_without_mobile():
+    mixer = InputMixer()
+    mic = pcm(1000)
+    assert mixer.mix(mic) is mic
+
+
+def test_mix_sums_and_clips():
+    mixer = InputMixer(mode="mix", prebuffer_ms=0)
+    mixer.push_mobile(pcm(2000), 16000)
+    out = samples(mixer.mix(pcm(1000)))
+    assert len(out) == FRAME
+    assert abs(int(out[10]) - 3000) <= 1
+
+    mixer.push_mobile(pcm(30000), 16000)
+    assert samples(mixer.mix(pcm(30000))).max() == 32767
+
+
+def test_duck_attenuates_mic_while_mobile_active():
+    mixer = InputMixer(mode="duck", duck_gain=0.25, prebuffer_ms=0)
+    for _ in range(2):
+        mixer.push_mobile(pcm(2000), 16000)
+    mixer.mix(pcm(4000))  # Ramps down
+    out = samples(mixer.mix(pcm(4000)))
+    assert abs(int(out[0]) - (1000 + 2000)) <= 1
+
+
+def test_replace_uses_mobile_only():
+    mixer = InputMixer(mode="replace", prebuffer_ms=0)
+    mixer.push_mobile(pcm(2000), 16000)
+    out = samples(mixer.mix(pcm(4000)))
+    assert abs(int(out[0]) - 2000) <= 1
+
+
+def test_resamples_to_frame_clock():
+    mixer = InputMixer(mode="mix", prebuffer_ms=0)
+    # 48 kHz mobile audio, three mic frames' worth, sent in odd-sized packets
+    data = pcm(1000, FRAME * 3 * 3)
+    for i in range(0, len(data), 999):
+        mixer.push_mobile(data[i:i + 999], 48000)
+    assert mixer.backlog_ms == pytest.approx(3 * FRAME / 16000 * 1000, abs=1)
+    for _ in range(3):
+        assert len(mixer.mix(pcm(0))) == FRAME * 2
+    assert mixer.mobile_underruns == 0
+
+
+def test_backlog_is_bounded():
+    mixer = InputMixer(max_backlog_ms=200)
+    for _ in range(50):
+        mixer.push_mobile(pcm(1000), 16000)
+    assert mixer.backlog_ms <= 200
+    assert mixer.stats()["dropped_ms"] > 0
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        InputMixer(mode="stereo")
+
+
+def test_mobile_rejects_bad_sample_rates():
+    bridge = MobileBridge()
+    for rate in (0, -16000, "fast", None, 16000.5, 192000):
+        with pytest.raises(ValueError):
+            bridge.set_audio_format(rate)
+    assert bridge.audio_sample_rate == 16000  # Unchanged
+    bridge.set_audio_format("22050")
+    assert bridge.audio_sample_rate == 22050
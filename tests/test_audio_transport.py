@@ -0,0 +1,26 @@
+"""
+Tests for the Socket.IO audio transport helpers.
+"""
+import pytest
+
+from audio_transport import AudioTransportRegistry
+
+
+class TestRegistry:
+    """Per-client transport selection."""
+
+    def test_modes(self):
+        registry = AudioTransportRegistry()
+        assert registry.set_mode("a", "pcm") is None
+        assert registry.set_mode("a", "envelope") == "pcm"
+        registry.set_mode("b", "envelope")
+        assert registry.has_clients("envelope")
+        assert not registry.has_clients("pcm")
+        assert registry.counts() == {"pcm": 0, "envelope": 2, "off": 0}
+        registry.remove("a")
+        registry.remove("b")
+        assert not registry.has_clients("envelope")
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            AudioTransportRegistry().set_mode("a", "mp3")
@@ -0,0 +1,138 @@
+"""
+Tests for the warm CAD script workers (isolation, timeouts, memory cap, fallback).
+Scripts here don't need build123d: the pools are created with preload=().
+"""
+import base64
+import sys
+import threading
+import time
+
+import pytest
+
+import cad_worker_pool
+from cad_worker_pool import CadWorkerPool
+
+WRITE_STL = "open(OUT, 'wb').write(b'solid test\\n')\n"
+
+
+def script(tmp_path, body, name="current_design.py"):
+    path = tmp_path / name
+    out = tmp_path / "output.stl"
+    path.write_text(f"OUT = {str(out)!r}\n{body}", encoding="utf-8")
+    return str(path), str(out)
+
+
+@pytest.fixture
+def pool():
+    pool = CadWorkerPool(preload=(), memory_mb=0, timeout=10.0)
+    yield pool
+    pool.shutdown()
+
+
+def test_runs_in_warm_worker_and_returns_stl(pool, tmp_path):
+    result = pool.call(*script(tmp_path, "LEFTOVER = 1\nprint('building')\n" + WRITE_STL))
+    assert result.returncode == 0 and result.warm
+    assert "building" in result.stdout
+    assert base64.b64decode(result.payload["data"]) == b"solid test\n"
+
+    # Same worker, fresh namespace: the previous script's globals are gone
+    result = pool.call(*script(tmp_path, "print('OUT' in globals(), 'LEFTOVER' in globals())\n"))
+    assert result.stdout.strip() == "True False"
+    assert pool.stats()["warm_runs"] == 2 and pool.stats()["respawns"] == 0
+
+
+def test_errors_are_reported_like_a_subprocess(pool, tmp_path):
+    result = pool.call(*script(tmp_path, "from build123d_typo import Box\n"))
+    assert result.returncode == 1
+    assert "ModuleNotFoundError" in result.stderr and result.payload is None
+    assert pool.call(*script(tmp_path, "import sys\nsys.exit(3)\n")).returncode == 3
+    assert pool.call(*script(tmp_path, "import sys\nsys.exit(0)\n" + WRITE_STL)).returncode == 0
+
+
+def test_timeout_kills_and_replaces_the_worker(pool, tmp_path):
+    result = pool.call(*script(tmp_path, "while True: pass\n"), timeout=0.5)
+    assert result.returncode == 1 and "TimeoutError" in result.stderr
+    # The replacement worker takes the next job
+    assert pool.call(*script(tmp_path, WRITE_STL)).payload is not None
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["respawns"] == 1
+
+
+def test_crash_is_survived(pool, tmp_path):
+    result = pool.call(*script(tmp_path, "import os\nos._exit(9)\n"))
+    assert result.returncode == 1 and "crashed" in result.stderr
+    assert pool.call(*script(tmp_path, WRITE_STL)).returncode == 0
+    assert pool.stats()["crashes"] == 1
+
+
+def test_shutdown_kills_busy_workers(tmp_path):
+    pool = CadWorkerPool(preload=(), memory_mb=0, timeout=30.0)
+    results = []
+    runner = threading.Thread(target=lambda: results.append(pool.call(*script(tmp_path, "while True: pass\n"))))
+    runner.start()
+    deadline = time.monotonic() + 10.0
+    while not pool._busy and time.monotonic() < deadline:
+        time.sleep(0.01)
+    (worker,) = pool._busy
+
+    pool.shutdown()
+    runner.join(10.0)
+    assert not worker.process.is_alive()
+    assert results and results[0].returncode == 1 and "crashed" in results[0].stderr
+    # Not replaced after shutdown
+    assert pool._idle.empty() and pool.stats()["respawns"] == 0
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RLIMIT_AS is enforced on Linux")
+def test_memory_cap(tmp_path):
+    pool = CadWorkerPool(preload=(), memory_mb=512, timeout=10.0)
+    try:
+        result = pool.call(*script(tmp_path, "blob = bytearray(1024 * 1024 * 1024)\n"))
+        assert result.returncode == 1 and "MemoryError" in result.stderr
+        assert pool.stats()["respawns"] == 1  # Retired after the MemoryError
+        assert pool.call(*script(tmp_path, WRITE_STL)).returncode == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RLIMIT_AS is enforced on Linux")
+def test_memory_cap_spares_preload_imports(tmp_path, monkeypatch):
+    # Stands in for build123d/OCP: needs more than the cap while importing
+    (tmp_path / "heavy_import.py").write_text("_peak = bytearray(768 * 1024 * 1024)\ndel _peak\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pool = CadWorkerPool(preload=("heavy_import",), memory_mb=512, timeout=10.0)
+    try:
+        assert pool.warm(wait=True) and pool.stats()["backend"] == "pool"
+        result = pool.call(*script(tmp_path, "blob = bytearray(1024 * 1024 * 1024)\n"))
+        assert result.warm and "MemoryError" in result.stderr
+    finally:
+        pool.shutdown()
+
+
+def test_memory_cap_from_env(monkeypatch):
+    monkeypatch.setenv("REX_CAD_MEMORY_MB", "2048")
+    assert cad_worker_pool._memory_mb_from_env() == 2048
+    monkeypatch.setenv("REX_CAD_MEMORY_MB", "0")
+    assert cad_worker_pool._memory_mb_from_env() == 0
+    monkeypatch.setenv("REX_CAD_MEMORY_MB", "lots")
+    assert cad_worker_pool._memory_mb_from_env() == cad_worker_pool.DEFAULT_MEMORY_MB
+
+
+def test_falls_back_to_subprocess(tmp_path):
+    pool = CadWorkerPool(preload=("module_that_does_not_exist",), memory_mb=0, timeout=10.0)
+    try:
+        result = pool.call(*script(tmp_path, WRITE_STL))
+        assert result.returncode == 0 and not result.warm and result.payload is not None
+        stats = pool.stats()
+        assert stats["backend"] == "subprocess" and "module_that_does_not_exist" in stats["fallback_reason"]
+    finally:
+        pool.shutdown()
+
+    cold = CadWorkerPool(backend="subprocess")
+    result = cold.call(*script(tmp_path, "raise ValueError('bad fillet')\n"))
+    assert result.returncode == 1 and "bad fillet" in result.stderr
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        CadWorkerPool(backend="fork")
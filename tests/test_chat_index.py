@@ -0,0 +1,76 @@
+"""
+Tests for the chat history tail reader and timestamp offset index.
+"""
+import json
+
+from chat_index import RECORD, ChatIndex, index_path, sync_index, tail_lines
+from project_manager import ProjectManager
+
+
+def write_history(path, timestamps, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for ts in timestamps:
+            f.write(json.dumps({"timestamp": ts, "sender": "User", "text": f"message {ts}"}) + "\n")
+
+
+def test_tail_lines_crosses_blocks(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b"".join(b"line %d\n" % i for i in range(1000)) + b"\n")
+    assert tail_lines(path, 3, block_size=7) == [b"line 997", b"line 998", b"line 999"]
+    assert len(tail_lines(path, 5000, block_size=64)) == 1000
+    assert tail_lines(path, 0) == []
+
+
+def test_sync_index_is_incremental_and_skips_partial_lines(tmp_path):
+    history = tmp_path / "chat_history.jsonl"
+    write_history(history, [1.0, 2.0, 3.0])
+    with open(history, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+        f.write('{"timestamp": 4.0, "sender": "REX", "te')  # Still being written
+    assert sync_index(history) == 3
+    assert sync_index(history) == 0
+
+    with open(history, "a", encoding="utf-8") as f:
+        f.write('xt": "done"}\n')
+    write_history(history, [5.0], mode="a")
+    assert sync_index(history) == 2
+    assert index_path(history).stat().st_size == 5 * RECORD.size
+
+
+def test_read_range_bisects_index(tmp_path):
+    history = tmp_path / "chat_history.jsonl"
+    write_history(history, [float(i) for i in range(100)])
+    index = ChatIndex(history)
+
+    assert [e["timestamp"] for e in index.read_range(10.0, 14.0)] == [10.0, 11.0, 12.0, 13.0, 14.0]
+    assert [e["timestamp"] for e in index.read_range(10.5, 50.0, limit=2)] == [49.0, 50.0]
+    assert [e["timestamp"] for e in index.read_range(start=98.0)] == [98.0, 99.0]
+    assert index.read_range(200.0) == []
+    assert len(index) == 100
+
+
+def test_index_rebuilt_when_it_does_not_match(tmp_path):
+    history = tmp_path / "chat_history.jsonl"
+    write_history(history, [1.0, 2.0, 3.0])
+    sync_index(history)
+    # History replaced by a shorter one, plus a torn trailing record
+    write_history(history, [7.0])
+    with open(index_path(history), "ab") as f:
+        f.write(b"\x00" * 5)
+    assert [e["timestamp"] for e in ChatIndex(history).read_range()] == [7.0]
+    assert len(ChatIndex(history)) == 1
+
+
+def test_project_manager_keeps_index_alongside_log(tmp_path):
+    manager = ProjectManager(str(tmp_path))
+    for i in range(5):
+        manager.log_chat("User", f"message {i}")
+    manager.flush_logs()
+    history = manager.get_current_project_path() / "chat_history.jsonl"
+    assert len(ChatIndex(history)) == 5  # Written by the writer thread, not the reader
+
+    recent = manager.get_recent_chat_history(limit=2)
+    assert [e["text"] for e in recent] == ["message 3", "message 4"]
+    ranged = manager.get_chat_history_range(start=recent[0]["timestamp"])
+    assert [e["text"] for e in ranged] == ["message 3", "message 4"]
+    manager.close()
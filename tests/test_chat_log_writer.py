@@ -0,0 +1,121 @@
+"""
+Tests for the batched chat history writer (batching, flush, fsync policy, errors).
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from chat_log_writer import ChatLogWriter
+from project_manager import ProjectManager
+
+
+def read_lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_append_is_deferred_and_batched(tmp_path):
+    log = tmp_path / "chat_history.jsonl"
+    writer = ChatLogWriter(flush_interval=0.2)
+    for i in range(5):
+        writer.append(log, f"line {i}\n")
+    assert not log.exists()  # Nothing written on the caller's thread
+
+    assert writer.flush()
+    assert read_lines(log) == [f"line {i}" for i in range(5)]
+    stats = writer.stats()
+    assert stats["batches"] == 1 and stats["lines_written"] == 5 and stats["pending_lines"] == 0
+    writer.close()
+
+
+def test_interval_and_size_trigger_a_batch(tmp_path):
+    log = tmp_path / "chat_history.jsonl"
+    writer = ChatLogWriter(flush_interval=0.05, max_batch_lines=1000)
+    writer.append(log, "a\n")
+    deadline = time.monotonic() + 2.0
+    while not log.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read_lines(log) == ["a"]
+
+    sized = ChatLogWriter(flush_interval=60.0, max_batch_lines=3)
+    for line in "xyz":
+        sized.append(tmp_path / "sized.jsonl", line + "\n")
+    deadline = time.monotonic() + 2.0
+    while sized.stats()["lines_written"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read_lines(tmp_path / "sized.jsonl") == ["x", "y", "z"]
+    writer.close()
+    sized.close()
+
+
+@pytest.mark.parametrize("policy,expect_fsync", [("never", False), ("batch", True), ("interval", True)])
+def test_fsync_policy(tmp_path, policy, expect_fsync):
+    writer = ChatLogWriter(fsync=policy, fsync_interval=0.0)
+    writer.append(tmp_path / "log.jsonl", "x\n")
+    writer.flush()
+    writer.close()
+    assert (writer.stats()["fsyncs"] > 0) == expect_fsync
+
+
+def test_unknown_fsync_policy_rejected():
+    with pytest.raises(ValueError):
+        ChatLogWriter(fsync="sometimes")
+
+
+def test_flush_without_waiting(tmp_path):
+    release = threading.Event()
+
+    class SlowSink:
+        def write_batch(self, records):
+            release.wait(5.0)
+
+    writer = ChatLogWriter(flush_interval=60.0)
+    writer.append(tmp_path / "log.jsonl", "line\n")
+    writer.enqueue(SlowSink(), "record")
+    started = time.monotonic()
+    assert writer.flush(close_files=True, wait=False)
+    assert time.monotonic() - started < 1.0  # The batch is still blocked in write_batch
+    release.set()
+    assert writer.flush()
+    assert read_lines(tmp_path / "log.jsonl") == ["line"] and not writer._handles
+    writer.close()
+
+
+def test_snapshot_keeps_latest_and_errors_do_not_stop_writer(tmp_path):
+    writer = ChatLogWriter(flush_interval=10.0)
+    state = tmp_path / "state.json"
+    writer.snapshot(state, "1")
+    writer.snapshot(state, "2")
+    writer.append(tmp_path / "missing" / "log.jsonl", "lost\n")
+    writer.append(tmp_path / "log.jsonl", "kept\n")
+    assert writer.flush()
+    assert state.read_text() == "2"
+    assert read_lines(tmp_path / "log.jsonl") == ["kept"]
+    assert writer.stats()["errors"] == 1
+
+    # close() writes what is queued; a later append starts the thread again
+    writer.append(tmp_path / "log.jsonl", "after\n")
+    writer.close()
+    writer.append(tmp_path / "log.jsonl", "reopened\n")
+    writer.flush()
+    assert read_lines(tmp_path / "log.jsonl") == ["kept", "after", "reopened"]
+    writer.close()
+
+
+def test_project_manager_flushes_on_switch_and_read(tmp_path):
+    manager = ProjectManager(str(tmp_path))
+    manager.chat_log.flush_interval = 60.0  # Only explicit flushes write
+    manager.log_chat("User", "hello")
+    assert [e["text"] for e in manager.get_recent_chat_history()] == ["hello"]
+
+    manager.log_chat("REX", "switching")
+    manager.create_project("next")
+    manager.switch_project("next")  # Doesn't wait for the write
+    manager.log_chat("User", "in next")
+    assert manager.flush_logs()
+    assert read_lines(tmp_path / "projects" / "next" / "chat_history.jsonl") != []
+    lines = read_lines(tmp_path / "projects" / "temp" / "chat_history.jsonl")
+    assert json.loads(lines[-1])["text"] == "switching"
+    assert json.loads((tmp_path / "projects" / "temp" / "conversation_state.json").read_text())["total"] == 2
+    manager.close()
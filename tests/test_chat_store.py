@@ -0,0 +1,93 @@
+"""
+Tests for the SQLite chat store (storage engine, JSONL import, full-text search).
+"""
+import json
+import time
+
+import pytest
+
+from chat_store import ChatStore
+from project_manager import ProjectManager
+
+
+def write_history(path, messages):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for ts, sender, text in messages:
+            f.write(json.dumps({"timestamp": ts, "sender": sender, "text": text}) + "\n")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ChatStore(tmp_path / "chat_history.db")
+    yield store
+    store.close()
+
+
+def test_search_ranks_and_filters(store):
+    store.write_batch([
+        ("drone", 100.0, "User", "The motor mount needs four holes"),
+        ("drone", 200.0, "REX", "I widened the brackets by 2 mm"),
+        ("desk", 300.0, "User", "Print the bracket for the monitor arm again"),
+        ("desk", 400.0, "User", "Order more filament"),
+    ])
+    results = store.search("what did we say about the bracket")
+    assert {r["project"] for r in results} == {"drone", "desk"}  # Stemming: brackets ~ bracket
+    assert "[bracket" in results[0]["snippet"].lower() or "[brackets" in results[0]["snippet"].lower()
+
+    assert [r["project"] for r in store.search("bracket", project="desk")] == ["desk"]
+    assert [r["timestamp"] for r in store.search("bracket", start=250.0)] == [300.0]
+    # No message has both terms: falls back to any term
+    assert len(store.search("bracket filament")) == 3
+    assert store.search("") == []
+
+
+def test_recent_and_range_match_jsonl_contract(store):
+    store.write_batch([("p", float(i), "User", f"message {i}") for i in range(20)])
+    assert [e["text"] for e in store.recent("p", 3)] == ["message 17", "message 18", "message 19"]
+    assert [e["timestamp"] for e in store.range("p", 5.0, 9.0, limit=2)] == [8.0, 9.0]
+    assert set(store.recent("p", 1)[0]) == {"timestamp", "sender", "text"}
+
+
+def test_import_is_incremental_and_resets_on_shrink(tmp_path, store):
+    history = tmp_path / "projects" / "drone" / "chat_history.jsonl"
+    write_history(history, [(1.0, "User", "hello"), (2.0, "REX", "hi")])
+    with open(history, "a", encoding="utf-8") as f:
+        f.write("garbage\n")
+    assert store.import_projects(tmp_path / "projects") == 2
+    assert store.import_projects(tmp_path / "projects") == 0
+
+    write_history(history, [(3.0, "User", "more")])
+    assert store.import_jsonl("drone", history) == 1
+    assert store.count("drone") == 3
+
+    history.write_text(json.dumps({"timestamp": 9.0, "sender": "User", "text": "fresh"}) + "\n")
+    assert store.import_jsonl("drone", history) == 1
+    assert [e["text"] for e in store.recent("drone", 10)] == ["fresh"]
+
+
+def test_project_manager_sqlite_storage(tmp_path):
+    write_history(tmp_path / "projects" / "old" / "chat_history.jsonl", [(1.0, "User", "legacy bracket notes")])
+    manager = ProjectManager(str(tmp_path), chat_storage="sqlite")
+    manager.log_chat("User", "design a bracket")
+    manager.log_chat("REX", "done")
+    assert [e["text"] for e in manager.get_recent_chat_history(limit=5)] == ["design a bracket", "done"]
+    assert not (manager.get_current_project_path() / "chat_history.jsonl").exists()
+
+    deadline = time.monotonic() + 5.0
+    while manager.chat_store.count("old") == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)  # Background import
+    assert {r["project"] for r in manager.search_chat_history("bracket")} == {"temp", "old"}
+    manager.close()
+
+    with pytest.raises(ValueError):
+        ProjectManager(str(tmp_path), chat_storage="csv")
+
+
+def test_project_manager_jsonl_search_indexes_files(tmp_path):
+    manager = ProjectManager(str(tmp_path))
+    manager.log_chat("User", "the gearbox rattles")
+    assert [r["text"] for r in manager.search_chat_history("gearbox")] == ["the gearbox rattles"]
+    manager.log_chat("User", "gearbox fixed")
+    assert len(manager.search_chat_history("gearbox", project="temp", days=1)) == 2
+    manager.close()
@@ -0,0 +1,109 @@
+"""
+Tests for the non-blocking tool confirmation scheduler.
+"""
+import asyncio
+
+import pytest
+
+from confirmation_scheduler import ConfirmationScheduler
+
+
+def recorder():
+    decisions = []
+
+    async def on_decision(confirmed, reason):
+        decisions.append((confirmed, reason))
+
+    return decisions, on_decision
+
+
+@pytest.mark.asyncio
+async def test_request_does_not_block_and_resolves_later():
+    scheduler = ConfirmationScheduler(timeout=None)
+    decisions, on_decision = recorder()
+    pending = scheduler.request("write_file", {"path": "a.txt"}, on_decision)
+    assert pending.id in scheduler
+    assert scheduler.pending()[0]["tool"] == "write_file"
+    assert decisions == []
+
+    assert scheduler.resolve(pending.id, True) is True
+    await scheduler.wait_idle()
+    assert decisions == [(True, "user")]
+    # A second answer (e.g. from another client) is ignored
+    assert scheduler.resolve(pending.id, False) is False
+    assert scheduler.stats()["approved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_applies_default_policy():
+    scheduler = ConfirmationScheduler(timeout=0.02)
+    decisions, on_decision = recorder()
+    scheduler.request("open_app", {}, on_decision)
+    await asyncio.sleep(0.05)
+    await scheduler.wait_idle()
+    assert decisions == [(False, "timeout")]
+    assert len(scheduler) == 0
+
+    scheduler.set_policy(0.02, "allow")
+    scheduler.request("open_app", {}, on_decision)
+    await asyncio.sleep(0.05)
+    await scheduler.wait_idle()
+    assert decisions[-1] == (True, "timeout")
+    assert scheduler.stats()["timed_out"] == 2
+
+    with pytest.raises(ValueError):
+        scheduler.set_policy(1, "maybe")
+
+
+@pytest.mark.asyncio
+async def test_timeout_never_allows_always_tools():
+    scheduler = ConfirmationScheduler(timeout=0.02, timeout_policy="allow")
+    decisions, on_decision = recorder()
+    scheduler.request("run_security_tool", {"command": "nmap"}, on_decision, confirmation="always")
+    scheduler.request("write_file", {"path": "a.txt"}, on_decision, confirmation="permission")
+    await asyncio.sleep(0.05)
+    await scheduler.wait_idle()
+    assert sorted(decisions) == [(False, "timeout"), (True, "timeout")]
+    stats = scheduler.stats()
+    assert (stats["approved"], stats["denied"], stats["timed_out"]) == (1, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_batch_resolution():
+    scheduler = ConfirmationScheduler(timeout=10)
+    decisions, on_decision = recorder()
+    ids = [scheduler.request(f"tool_{i}", {}, on_decision).id for i in range(4)]
+
+    assert scheduler.resolve_batch(ids[:2] + ["unknown"], False) == ids[:2]
+    assert scheduler.resolve_batch(None, True) == ids[2:]
+    await scheduler.wait_idle()
+    assert sorted(decisions) == [(False, "user")] * 2 + [(True, "user")] * 2
+    stats = scheduler.stats()
+    assert (stats["approved"], stats["denied"], stats["pending"]) == (2, 2, 0)
+
+
+@pytest.mark.asyncio
+async def test_cancel_all_drops_without_deciding():
+    scheduler = ConfirmationScheduler(timeout=0.01)
+    decisions, on_decision = recorder()
+    scheduler.request("a", {}, on_decision)
+    scheduler.request("b", {}, on_decision)
+    dropped = scheduler.cancel_all()
+    assert [p.tool for p in dropped] == ["a", "b"]
+    await asyncio.sleep(0.03)
+    await scheduler.wait_idle()
+    assert decisions == []
+    assert scheduler.stats()["cancelled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_callback_errors_are_contained():
+    scheduler = ConfirmationScheduler(timeout=None)
+
+    async def broken(confirmed, reason):
+        raise RuntimeError("send failed")
+
+    pending = scheduler.request("a", {}, broken)
+    scheduler.resolve(pending.id, True)
+    await scheduler.wait_idle()
+    assert len(scheduler) == 0
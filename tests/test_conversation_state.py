@@ -0,0 +1,65 @@
+"""
+Tests for the rolling conversation state used to restore a dropped Live session.
+"""
+import json
+
+from conversation_state import ConversationState, ConversationStore
+from project_manager import ProjectManager
+
+
+def test_recent_turns_are_bounded_and_older_ones_summarised():
+    state = ConversationState(recent_turns=3, line_chars=40)
+    for i in range(5):
+        state.add("User", f"Message {i}. With a second sentence that the summary drops.")
+
+    assert [text for _, text in state.recent][0].startswith("Message 2.")
+    assert list(state.summary) == ["User: Message 0.", "User: Message 1."]
+    payload = state.restoration_payload()
+    assert "- User: Message 0." in payload
+    assert "[User]: Message 4. With a second sentence" in payload
+    assert state.total == 5
+
+
+def test_payload_is_capped_whatever_the_history_length():
+    state = ConversationState(recent_turns=8, turn_chars=500, summary_chars=800, payload_chars=1500)
+    for i in range(5000):
+        state.add("REX" if i % 2 else "User", f"turn {i} " + "x" * 2000)
+
+    payload = state.restoration_payload()
+    assert len(payload) <= 1500
+    assert "turn 4999" in payload  # Newest turn always survives
+    assert state.omitted > 4900
+    assert sum(len(line) + 1 for line in state.summary) <= 800
+    assert state.restoration_payload() is payload  # Cached until the next message
+
+
+def test_store_persists_and_rebuilds_from_history(tmp_path):
+    project = tmp_path / "robot"
+    project.mkdir()
+    with open(project / "chat_history.jsonl", "w", encoding="utf-8") as f:
+        for i in range(20):
+            f.write(json.dumps({"timestamp": i, "sender": "User", "text": f"old {i}"}) + "\n")
+        f.write("not json\n")
+
+    store = ConversationStore(tmp_path, recent_turns=4)
+    assert "[User]: old 19" in store.restoration_payload("robot")
+    assert (project / "conversation_state.json").exists()
+
+    store.record("robot", "REX", "new reply", 21.0)
+    reloaded = ConversationStore(tmp_path, recent_turns=4)
+    assert reloaded.restoration_payload("robot") == store.restoration_payload("robot")
+    assert reloaded.get("robot").total == 21
+
+
+def test_project_manager_keeps_state_per_project(tmp_path):
+    manager = ProjectManager(str(tmp_path))
+    manager.log_chat("User", "Design a bracket")
+    manager.create_project("drone")
+    manager.switch_project("drone")
+    assert manager.get_restoration_context() == ""
+    manager.log_chat("User", "Plan a flight")
+
+    assert "Plan a flight" in manager.get_restoration_context()
+    manager.switch_project("temp")
+    assert "Design a bracket" in manager.get_restoration_context()
+    assert "Plan a flight" not in manager.get_restoration_context()
@@ -0,0 +1,108 @@
+"""
+Tests for the acoustic echo canceller and its DSP helpers.
+Uses a synthetic echo path - no audio hardware required.
+"""
+import numpy as np
+
+from audio_dsp import LinearResampler, float_to_pcm, pcm_to_float
+from echo_canceller import EchoCanceller
+
+CHUNK = 1024
+FAR_PER_CHUNK = CHUNK * 3 // 2  # 24 kHz reference for one 16 kHz mic chunk
+
+
+def _to_pcm(x):
+    return np.clip(x * 32768, -32768, 32767).astype("<i2").tobytes()
+
+
+def _energy(pcm):
+    x = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+    return float(np.dot(x, x)) + 1e-9
+
+
+def _echo_scenario(seconds=6, seed=1):
+    rng = np.random.default_rng(seed)
+    far = np.convolve(rng.normal(0, 1, 24000 * seconds), np.ones(8) / 8, "same")
+    far = 0.3 * far / np.abs(far).max()
+    far_16k = np.interp(np.arange(0, len(far) - 1, 1.5), np.arange(len(far)), far)
+    rir = np.zeros(900)
+    rir[640] = 0.3
+    rir[641:] = 0.05 * rng.normal(0, 1, 259) * np.exp(-np.arange(259) / 60)
+    near = np.convolve(far_16k, rir)[:len(far_16k)]
+    return _to_pcm(far), _to_pcm(near)
+
+
+def _run(aec, far_pcm, near_pcm):
+    outputs = []
+    for i in range(len(near_pcm) // (CHUNK * 2)):
+        aec.push_far_end(far_pcm[i * FAR_PER_CHUNK * 2:(i + 1) * FAR_PER_CHUNK * 2])
+        outputs.append(aec.process(near_pcm[i * CHUNK * 2:(i + 1) * CHUNK * 2]))
+    return outputs
+
+
+def test_converges_on_synthetic_echo():
+    far_pcm, near_pcm = _echo_scenario()
+    aec = EchoCanceller()
+    outputs = _run(aec, far_pcm, near_pcm)
+
+    tail_in = near_pcm[(len(outputs) - 10) * CHUNK * 2:len(outputs) * CHUNK * 2]
+    tail_out = b"".join(outputs[-10:])
+    erle = 10 * np.log10(_energy(tail_in) / _energy(tail_out))
+    assert erle > 10
+    assert aec.converged
+
+
+def test_output_length_preserved():
+    aec = EchoCanceller()
+    for size in (CHUNK, 1000, 300):
+        data = _to_pcm(np.zeros(size))
+        assert len(aec.process(data)) == len(data)
+
+
+def test_passthrough_when_far_end_silent():
+    rng = np.random.default_rng(2)
+    near = _to_pcm(0.1 * rng.normal(0, 1, CHUNK))
+    aec = EchoCanceller()
+    for _ in range(5):
+        assert aec.process(near) == near
+    assert not aec.converged
+
+
+def test_double_talk_is_not_cancelled():
+    far_pcm, near_pcm = _echo_scenario(seconds=4)
+    aec = EchoCanceller()
+    _run(aec, far_pcm, near_pcm)
+
+    # User talks loudly over REX: their voice must survive
+    rng = np.random.default_rng(3)
+    voice = 0.5 * np.sin(2 * np.pi * 300 * np.arange(CHUNK) / 16000) + 0.01 * rng.normal(0, 1, CHUNK)
+    aec.push_far_end(far_pcm[:FAR_PER_CHUNK * 2])
+    near = _to_pcm(voice + np.frombuffer(near_pcm[:CHUNK * 2], dtype="<i2") / 32768)
+    out = aec.process(near)
+    assert _energy(out) > 0.5 * _energy(near)
+    assert aec.double_talk_blocks > 0
+
+
+def test_reset_forgets_echo_path():
+    far_pcm, near_pcm = _echo_scenario(seconds=4)
+    aec = EchoCanceller()
+    _run(aec, far_pcm, near_pcm)
+    assert aec.converged
+    aec.reset()
+    assert not aec.converged
+    assert aec.stats()["blocks"] == 0
+
+
+def test_resampler_length_and_continuity():
+    src = np.sin(2 * np.pi * 200 * np.arange(24000) / 24000).astype(np.float32)
+    resampler = LinearResampler(24000, 16000)
+    pieces = [resampler.process(src[i:i + 1000]) for i in range(0, len(src), 1000)]
+    out = np.concatenate(pieces)
+    assert abs(len(out) - 16000) <= 1
+    expected = np.sin(2 * np.pi * 200 * np.arange(len(out)) / 16000)
+    assert np.max(np.abs(out - expected)) < 0.01
+
+
+def test_pcm_round_trip():
+    x = np.array([0.0, 0.5, -0.5, 0.999], dtype=np.float32)
+    assert np.allclose(pcm_to_float(float_to_pcm(x)), x, atol=1e-4)
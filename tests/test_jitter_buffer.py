@@ -0,0 +1,124 @@
+"""
+Tests for the playback jitter buffer (and its use by AudioPlaybackThread).
+"""
+import pytest
+import asyncio
+
+import numpy as np
+
+from audio_io import AudioPlaybackThread
+from jitter_buffer import JitterBuffer
+from tests.conftest import FakeClock
+
+PERIOD = 512
+
+
+def tone(frames, level=10000):
+    return (np.full(frames, level, dtype="<i2")).tobytes()
+
+
+def make_buffer(clock=None, **kwargs):
+    return JitterBuffer(target_latency_ms=100, period_frames=PERIOD, clock=clock or FakeClock(), **kwargs)
+
+
+def test_primes_to_target_then_plays_periods():
+    jb = make_buffer()
+    jb.push(tone(1000))
+    assert jb.read_period() is None  # 1000 frames < 2400 (100 ms)
+    jb.push(tone(1500))
+    period = jb.read_period()
+    assert len(period) == PERIOD * 2
+    assert jb.playing
+
+
+def test_coalesces_small_chunks():
+    jb = make_buffer()
+    for _ in range(50):
+        jb.push(tone(64))  # 3200 frames in tiny pieces
+    periods = []
+    while (p := jb.read_period()) is not None:
+        periods.append(p)
+    assert len(periods) == 3200 // PERIOD
+    assert all(len(p) == PERIOD * 2 for p in periods)
+
+
+def test_short_reply_starts_after_target_time():
+    clock = FakeClock()
+    jb = make_buffer(clock)
+    jb.push(tone(300))
+    assert jb.read_period() is None
+    clock.now = 0.2
+    assert jb.read_period() is None  # Playing, but less than a period
+    assert jb.playing
+    tail = jb.drain_tail()
+    assert len(tail) == PERIOD * 2
+
+
+def test_underrun_fades_and_counts():
+    clock = FakeClock()
+    jb = make_buffer(clock)
+    jb.push(tone(2500))  # 4 periods + 452 frames
+    while jb.read_period() is not None:
+        pass
+    tail = np.frombuffer(jb.drain_tail(), dtype="<i2")
+    assert tail[0] == 10000
+    assert abs(int(tail[451])) < 1000  # Faded out
+    assert np.all(tail[452:] == 0)  # Silence padding
+    assert jb.drains == 1 and jb.underruns == 0
+
+    # Audio resumes shortly after: that was an underrun, and it fades in
+    clock.now = 0.3
+    jb.push(tone(3000))
+    first = np.frombuffer(jb.read_period(), dtype="<i2")
+    assert first[0] == 0 and first[-1] == 10000
+    assert jb.underruns == 1
+
+
+def test_end_of_reply_is_not_an_underrun():
+    clock = FakeClock()
+    jb = make_buffer(clock)
+    jb.push(tone(3000))
+    while jb.read_period() is not None:
+        pass
+    jb.drain_tail()
+    clock.now = 5.0
+    jb.push(tone(3000))
+    assert jb.underruns == 0
+
+
+def test_flush_drops_everything():
+    jb = make_buffer()
+    jb.push(tone(5000))
+    jb.read_period()
+    jb.flush()
+    assert jb.depth_bytes == 0 and not jb.playing
+    assert jb.stats()["flushes"] == 1
+
+
+class FakeOutputStream:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_playback_thread_writes_periods():
+    stream = FakeOutputStream()
+    jb = JitterBuffer(target_latency_ms=20, period_frames=PERIOD)
+    playback = AudioPlaybackThread(stream, asyncio.get_running_loop(), jitter_buffer=jb)
+    playback.start()
+    for _ in range(10):
+        await playback.write(tone(300))  # 3000 frames total
+    for _ in range(100):
+        if sum(len(w) for w in stream.written) >= 6000:
+            break
+        await asyncio.sleep(0.01)
+    playback.stop()
+    assert all(len(w) == PERIOD * 2 for w in stream.written)
+    assert sum(len(w) for w in stream.written) == 6 * PERIOD * 2  # 3000 frames -> 6 padded periods
+    assert playback.stats()["drains"] >= 1
@@ -0,0 +1,115 @@
+"""
+Tests for the background job supervisor (queues, priorities, cancellation, progress).
+"""
+import asyncio
+
+import pytest
+
+from job_supervisor import CANCELLED, DONE, FAILED, JobSupervisor
+
+
+def sleeper(log, name, delay=0.01):
+    async def run(job):
+        log.append(("start", name))
+        job.report(0.5, f"{name} halfway")
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        return name
+    return run
+
+
+@pytest.mark.asyncio
+async def test_queue_limits_concurrency():
+    supervisor = JobSupervisor({"cad": 1})
+    log = []
+    jobs = [supervisor.submit("cad", f"job{i}", sleeper(log, f"job{i}")) for i in range(5)]
+    assert supervisor.stats()["cad"] == {"workers": 1, "running": 1, "queued": 4}
+    await supervisor.join()
+    # Strictly one after another
+    assert log == [event for i in range(5) for event in (("start", f"job{i}"), ("end", f"job{i}"))]
+    assert all(job.state == DONE and job.result == job.name for job in jobs)
+
+
+@pytest.mark.asyncio
+async def test_priority_order_and_position():
+    supervisor = JobSupervisor({"web": 1})
+    log = []
+    supervisor.submit("web", "first", sleeper(log, "first"))
+    low = supervisor.submit("web", "low", sleeper(log, "low"), priority=-1)
+    normal = supervisor.submit("web", "normal", sleeper(log, "normal"))
+    urgent = supervisor.submit("web", "urgent", sleeper(log, "urgent"), priority=5)
+    assert supervisor.position(urgent.id) == 0
+    assert supervisor.position(low.id) == 2
+
+    assert supervisor.set_priority(low.id, 10)
+    assert supervisor.position(low.id) == 0
+    await supervisor.join()
+    starts = [name for kind, name in log if kind == "start"]
+    assert starts == ["first", "low", "urgent", "normal"]
+    assert supervisor.position(normal.id) is None
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_and_running():
+    supervisor = JobSupervisor({"scrape": 1})
+    log = []
+    running = supervisor.submit("scrape", "long", sleeper(log, "long", delay=10))
+    queued = supervisor.submit("scrape", "next", sleeper(log, "next"))
+    await asyncio.sleep(0)
+
+    assert supervisor.cancel(queued.id)
+    assert queued.state == CANCELLED
+    assert supervisor.cancel(running.id)
+    await supervisor.join()
+    assert running.state == CANCELLED
+    assert ("start", "next") not in log
+    assert supervisor.stats()["scrape"]["running"] == 0
+    assert supervisor.cancel("missing") is False
+
+
+@pytest.mark.asyncio
+async def test_cancel_before_first_step_frees_worker():
+    supervisor = JobSupervisor({"cad": 1})
+    log = []
+    job = supervisor.submit("cad", "a", sleeper(log, "a"))
+    supervisor.cancel(job.id)  # Task created but not started yet
+    await job.wait()
+    assert job.state == CANCELLED
+    follow = supervisor.submit("cad", "b", sleeper(log, "b"))
+    await follow.wait()
+    assert follow.state == DONE
+
+
+@pytest.mark.asyncio
+async def test_updates_failures_and_listing():
+    updates = []
+    supervisor = JobSupervisor({"evolution": 1}, on_update=updates.append)
+
+    async def broken(job):
+        raise RuntimeError("no network")
+
+    log = []
+    ok = supervisor.submit("evolution", "ok", sleeper(log, "ok"))
+    bad = supervisor.submit("evolution", "bad", broken)
+    await supervisor.join()
+
+    assert bad.state == FAILED and bad.error == "no network"
+    states = [(u["name"], u["state"]) for u in updates]
+    assert states[:2] == [("ok", "queued"), ("ok", "running")]
+    assert ("ok", "done") in states and ("bad", "failed") in states
+    assert any(u["message"] == "ok halfway" and u["progress"] == 0.5 for u in updates)
+
+    listing = supervisor.list_jobs()
+    assert [job["name"] for job in listing] == ["bad", "ok"]  # Most recent first
+    assert supervisor.list_jobs(include_finished=False) == []
+    assert supervisor.get(ok.id) is ok
+
+
+@pytest.mark.asyncio
+async def test_unknown_queue_uses_default_workers():
+    supervisor = JobSupervisor(default_workers=2)
+    log = []
+    for i in range(3):
+        supervisor.submit("misc", f"j{i}", sleeper(log, f"j{i}"))
+    assert supervisor.stats()["misc"]["running"] == 2
+    await supervisor.join()
@@ -0,0 +1,127 @@
+"""
+Tests for the standby Live session manager (spare sessions, failover, backoff).
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from live_session_manager import LiveSessionManager
+
+
+class FakeSession:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+
+
+class FakeLive:
+    """connect() factory: each session takes `delay` to open; `failures` connects fail first."""
+
+    def __init__(self, delay=0.05, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.opened = []
+
+    @asynccontextmanager
+    async def _connect(self):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("handshake failed")
+        session = FakeSession(len(self.opened))
+        self.opened.append(session)
+        try:
+            yield session
+        finally:
+            session.closed = True
+
+    def connect(self):
+        return self._connect()
+
+
+async def until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_failover_swaps_in_ready_spare():
+    live = FakeLive(delay=0.1)
+    manager = LiveSessionManager(live.connect)
+    first = await manager.start()
+    await until(lambda: manager.stats()["standby"] == "ready")
+
+    second = await manager.failover()
+    assert second is live.opened[1] and manager.session is second
+    stats = manager.stats()
+    assert stats["spare_hits"] == 1 and stats["spare_misses"] == 0
+    assert stats["last_recover_ms"] < 50  # No handshake on the critical path
+    await until(lambda: first.closed)
+
+    # The next spare is connected in the background
+    await until(lambda: manager.stats()["standby"] == "ready")
+    await manager.close()
+    assert all(session.closed for session in live.opened)
+
+
+@pytest.mark.asyncio
+async def test_failover_waits_for_spare_still_connecting():
+    live = FakeLive(delay=0.1)
+    manager = LiveSessionManager(live.connect)
+    await manager.start()
+    await asyncio.sleep(0)  # Let the standby connect begin
+    assert manager.stats()["standby"] == "connecting"
+
+    session = await manager.failover()
+    assert session is live.opened[1]
+    assert manager.spare_hits == 1 and manager.connects >= 2
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_without_spare_reconnects_with_backoff():
+    live = FakeLive(delay=0.01)
+    manager = LiveSessionManager(live.connect, keep_spare=False, backoff_initial=0.01)
+    first = await manager.start()
+    assert manager.stats()["standby"] is None
+
+    live.failures = 2
+    second = await manager.failover()
+    assert second is not first and second is live.opened[-1]
+    stats = manager.stats()
+    assert stats["spare_misses"] == 1 and stats["connect_failures"] == 2
+    assert "handshake failed" in stats["last_error"]
+    assert len(live.opened) == 2  # Never connected a spare
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_change_wakes_on_swap():
+    live = FakeLive(delay=0.01)
+    manager = LiveSessionManager(live.connect, wrap=lambda session: ("wrapped", session))
+    first = await manager.start()
+    assert first == ("wrapped", live.opened[0])
+
+    waiter = asyncio.create_task(manager.wait_for_change(first))
+    await asyncio.sleep(0.02)
+    assert not waiter.done()
+    await manager.failover()
+    await asyncio.wait_for(waiter, 1.0)
+    # Returns straight away for a session that is no longer active
+    await asyncio.wait_for(manager.wait_for_change(first), 0.1)
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_old_spare_is_replaced():
+    live = FakeLive(delay=0.01)
+    manager = LiveSessionManager(live.connect, spare_max_age=0.05)
+    await manager.start()
+    await until(lambda: len(live.opened) >= 4)
+    # Every replaced spare was closed; only the active one and the current spare stay open
+    await until(lambda: sum(not session.closed for session in live.opened) <= 2)
+    assert not live.opened[0].closed
+    await manager.close()
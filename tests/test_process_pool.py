@@ -0,0 +1,69 @@
+"""
+Tests for the CPU worker pool (process and thread backends, crash recovery, cpu_tasks boundary).
+"""
+import base64
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import cpu_tasks
+from process_pool import ProcessPool
+
+
+@pytest.fixture
+def process_pool():
+    pool = ProcessPool(max_workers=1, backend="process")
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        ProcessPool(backend="gpu")
+
+
+def test_thread_backend_runs_in_process():
+    pool = ProcessPool(max_workers=2, backend="thread")
+    try:
+        assert pool.call(cpu_tasks.worker_pid) == os.getpid()
+        assert pool.call(cpu_tasks.synthetic_load, 1) > 0
+        stats = pool.stats()
+        assert stats["submitted"] == stats["completed"] == 2
+        assert stats["in_flight"] == 0 and stats["task_ms"]["count"] == 2
+    finally:
+        pool.shutdown(wait=True)
+
+
+def test_process_backend_runs_in_worker(process_pool):
+    process_pool.warm()
+    assert process_pool.call(cpu_tasks.worker_pid, timeout=60) != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_run_returns_task_result(process_pool, tmp_path):
+    stl = tmp_path / "part.stl"
+    stl.write_bytes(b"solid part\nendsolid part\n")
+
+    payload = await process_pool.run(cpu_tasks.load_stl_payload, str(stl))
+    assert payload["format"] == "stl" and payload["file_path"] == str(stl)
+    assert base64.b64decode(payload["data"]) == stl.read_bytes()
+    assert await process_pool.run(cpu_tasks.load_stl_payload, str(tmp_path / "missing.stl")) is None
+
+
+def test_task_errors_propagate_and_are_counted(process_pool, tmp_path):
+    with pytest.raises(IsADirectoryError):
+        process_pool.call(cpu_tasks.load_stl_payload, str(tmp_path), timeout=60)
+    assert process_pool.stats()["failed"] == 1
+    assert process_pool.restarts == 0
+
+
+def test_pool_restarts_after_worker_crash(process_pool):
+    first = process_pool.call(cpu_tasks.worker_pid, timeout=60)
+    with pytest.raises(BrokenProcessPool):
+        process_pool.call(os._exit, 1, timeout=60)  # Crashes the retry too
+    assert process_pool.restarts >= 1
+
+    # The next job gets a fresh worker
+    assert process_pool.call(cpu_tasks.worker_pid, timeout=60) not in (first, os.getpid())
+    assert process_pool.stats()["in_flight"] == 0
@@ -0,0 +1,76 @@
+"""
+Tests for the incremental project context cache (manifest reuse, budget, relevance).
+"""
+import os
+
+from project_context import MANIFEST_FILE, ProjectContextCache
+
+
+def make_project(root):
+    (root / "cad").mkdir(parents=True)
+    (root / "notes.md").write_text("drone notes")
+    (root / "cad" / "frame.py").write_text("print('frame')")
+    (root / "cad" / "frame.stl").write_bytes(b"\x00" * 100)
+    (root / "chat_history.idx").write_bytes(b"\x00" * 16)
+    return root
+
+
+def touch(path, mtime):
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_only_changed_files_are_read(tmp_path):
+    project = make_project(tmp_path / "drone")
+    cache = ProjectContextCache()
+    first = cache.render(project, "drone")
+    assert "--- notes.md ---\ndrone notes" in first
+    assert "frame.stl" in first and "chat_history.idx" not in first
+    assert cache.files_read == 2
+
+    assert cache.render(project, "drone") is first  # Nothing changed: rendered context reused
+    assert cache.render_hits == 1
+
+    (project / "notes.md").write_text("drone notes, v2")
+    second = cache.render(project, "drone")
+    assert "drone notes, v2" in second
+    assert cache.files_read == 3  # Just the edited file
+
+    # A fresh cache (restart) picks the blocks up from the persisted manifest
+    assert (project / MANIFEST_FILE).exists()
+    restarted = ProjectContextCache()
+    assert restarted.render(project, "drone") == second
+    assert restarted.files_read == 0
+
+    (project / "cad" / "frame.py").unlink()
+    assert "frame.py" not in cache.render(project, "drone")
+
+
+def test_budget_prefers_recent_then_relevant_files(tmp_path):
+    project = tmp_path / "p"
+    project.mkdir()
+    for i in range(5):
+        path = project / f"file{i}.txt"
+        path.write_text(str(i) * 400)
+        touch(path, (i + 1) * 10**9)
+
+    cache = ProjectContextCache(budget=900)
+    context = cache.render(project, "p")
+    assert len(context) <= 900
+    assert "--- file4.txt ---" in context and "--- file3.txt ---" not in context
+    assert context.index("  - file4.txt") < context.index("  - file0.txt")  # Most recent first
+    assert "4 more files not included" in context
+
+    context = cache.render(project, "p", query="file1 please")
+    assert "--- file1.txt ---" in context and "--- file4.txt ---" not in context
+
+
+def test_listing_is_capped_and_large_files_skipped(tmp_path):
+    project = tmp_path / "p"
+    project.mkdir()
+    for i in range(30):
+        (project / f"scrape{i}.json").write_text("{}")
+    (project / "big.txt").write_text("x" * 5000)
+
+    context = ProjectContextCache(max_listed=10).render(project, "p", max_file_size=1000)
+    assert "Files (31 total" in context and "... and 21 more" in context
+    assert "--- big.txt (too large: 5000 bytes, skipped) ---" in context
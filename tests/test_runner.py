@@ -20,6 +20,29 @@ MODULES = {
     "web": "test_web_agent.py",
     "auth": "test_authenticator.py",
     "tools": "test_ada_tools.py",
+    "vad": "test_vad_engine.py",
+    "audio_io": "test_audio_io.py",
+    "audio_transport": "test_audio_transport.py",
+    "audio_envelope": "test_audio_envelope.py",
+    "aec": "test_echo_canceller.py",
+    "speech_state": "test_speech_state.py",
+    "jitter": "test_jitter_buffer.py",
+    "mixer": "test_audio_mixer.py",
+    "metrics": "test_voice_metrics.py",
+    "replay": "test_session_recorder.py",
+    "tool_registry": "test_tool_registry.py",
+    "confirmations": "test_confirmation_scheduler.py",
+    "jobs": "test_job_supervisor.py",
+    "process_pool": "test_process_pool.py",
+    "startup": "test_startup_profiler.py",
+    "live_session": "test_live_session_manager.py",
+    "conversation": "test_conversation_state.py",
+    "chat_log": "test_chat_log_writer.py",
+    "chat_index": "test_chat_index.py",
+    "project_context": "test_project_context.py",
+    "chat_store": "test_chat_store.py",
+    "artifacts": "test_artifact_store.py",
+    "cad_workers": "test_cad_worker_pool.py",
 }
 
 TESTS_DIR = Path(__file__).parent
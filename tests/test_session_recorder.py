@@ -0,0 +1,124 @@
+"""
+Tests for session recording and the offline Live API replayer.
+"""
+import pytest
+import asyncio
+from types import SimpleNamespace
+
+from session_recorder import (
+    MIC_AUDIO, MODEL_AUDIO, TOOL_CALL, TOOL_RESPONSE, TURN_COMPLETE,
+    RecordingSession, ReplayLiveClient, SessionRecorder, read_recording, synthesize_recording,
+)
+
+
+def fake_response(data=None, input_text=None, output_text=None, calls=None):
+    content = None
+    if input_text or output_text:
+        content = SimpleNamespace(
+            input_transcription=SimpleNamespace(text=input_text) if input_text else None,
+            output_transcription=SimpleNamespace(text=output_text) if output_text else None,
+        )
+    tool_call = SimpleNamespace(function_calls=calls) if calls else None
+    return SimpleNamespace(data=data, server_content=content, tool_call=tool_call)
+
+
+class FakeLiveSession:
+    def __init__(self, turns):
+        self.turns = turns
+        self.sent = []
+
+    async def send(self, input=None, end_of_turn=False):
+        self.sent.append(input)
+
+    async def send_tool_response(self, function_responses=None):
+        self.sent.append(function_responses)
+
+    async def receive(self):
+        for response in self.turns.pop(0):
+            yield response
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_round_trip(tmp_path):
+    path = tmp_path / "session.rexrec"
+    call = SimpleNamespace(id="c1", name="list_projects", args={"x": 1})
+    live = FakeLiveSession([
+        [fake_response(input_text="hello"), fake_response(data=b"\x01\x02" * 10),
+         fake_response(output_text="hi there"), fake_response(calls=[call])],
+    ])
+
+    with SessionRecorder(path) as recorder:
+        session = RecordingSession(live, recorder)
+        await session.send(input={"data": b"\x00" * 64, "mime_type": "audio/pcm"})
+        async for _ in session.receive():
+            pass
+        await session.send_tool_response(function_responses=[SimpleNamespace(id="c1", name="list_projects", response={"result": "ok"})])
+
+    records = read_recording(path)
+    kinds = [r.kind for r in records]
+    assert kinds[0] == MIC_AUDIO and TURN_COMPLETE in kinds and kinds[-1] == TOOL_RESPONSE
+    assert kinds.index(MODEL_AUDIO) < kinds.index(TOOL_CALL) < kinds.index(TOOL_RESPONSE)
+    assert [r.t for r in records] == sorted(r.t for r in records)
+
+    client = ReplayLiveClient(path)
+    assert client.mic_chunks() == [b"\x00" * 64]
+    async with client.aio.live.connect(model="m", config=None) as replay:
+        responses = [r async for r in replay.receive()]
+    assert responses[0].server_content.input_transcription.text == "hello"
+    assert responses[1].data == b"\x01\x02" * 10
+    assert responses[2].server_content.output_transcription.text == "hi there"
+    fc = responses[3].tool_call.function_calls[0]
+    assert (fc.id, fc.name, fc.args) == ("c1", "list_projects", {"x": 1})
+    assert replay.finished.is_set()
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "not.rexrec"
+    path.write_bytes(b"hello")
+    with pytest.raises(ValueError):
+        read_recording(path)
+
+
+@pytest.mark.asyncio
+async def test_replay_waits_for_tool_response():
+    records = synthesize_recording(turns=2, audio_chunks_per_turn=3, tool_call={"name": "list_projects"})
+    client = ReplayLiveClient(records)
+    async with client.aio.live.connect() as session:
+        first = [r async for r in session.receive()]
+        assert first[-1].tool_call is not None
+
+        next_turn = asyncio.create_task(session.receive().__anext__())
+        await asyncio.sleep(0.05)
+        assert not next_turn.done()  # Held until the tool result is sent
+        await session.send_tool_response(function_responses=[SimpleNamespace(id="call-0", name="list_projects", response={})])
+        assert (await asyncio.wait_for(next_turn, 1)).data is not None
+        next_turn.cancel()
+
+
+@pytest.mark.asyncio
+async def test_replay_is_deterministic_and_counts_input():
+    records = synthesize_recording(turns=3, audio_chunks_per_turn=4)
+    runs = []
+    for _ in range(2):
+        async with ReplayLiveClient(records).aio.live.connect() as session:
+            await session.send(input={"data": b"\x00" * 100, "mime_type": "audio/pcm"})
+            await session.send(input="text", end_of_turn=True)
+            audio = []
+            while not session.finished.is_set():
+                audio += [r.data for r in [r async for r in session.receive()] if r.data]
+            runs.append(audio)
+            assert session.stats()["sent_audio_bytes"] == 100
+            assert session.stats()["sent_texts"] == 1
+    assert runs[0] == runs[1]
+    assert len(runs[0]) == 12
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_recorded_timing():
+    records = synthesize_recording(turns=1, audio_chunks_per_turn=5, chunk_bytes=2400)  # 50 ms chunks
+    loop = asyncio.get_running_loop()
+    async with ReplayLiveClient(records, speed=2.0).aio.live.connect() as session:
+        start = loop.time()
+        [r async for r in session.receive()]
+        elapsed = loop.time() - start
+    assert 0.08 <= elapsed < 0.5  # ~200 ms of gaps at 2x
@@ -0,0 +1,86 @@
+"""
+Tests for the deadline-based speaking-state tracker.
+"""
+import pytest
+import asyncio
+
+from speech_state import SpeakingTracker
+from tests.conftest import FakeClock
+
+# 24 kHz int16 mono: 4800 bytes = 100 ms
+CHUNK_100MS = b"\x00" * 4800
+
+
+def test_start_event_and_deadline():
+    clock = FakeClock(100.0)
+    tracker = SpeakingTracker(hangover=0.5, clock=clock)
+    events = []
+    tracker.subscribe(events.append)
+
+    tracker.note_audio(CHUNK_100MS)
+    tracker.note_audio(CHUNK_100MS)
+    assert tracker.speaking
+    assert [e.kind for e in events] == ["start"]
+    assert tracker._deadline == pytest.approx(100.2)
+
+    clock.now = 100.15
+    assert tracker.speaking_for() == pytest.approx(0.15)
+
+
+def test_interrupt_publishes_end():
+    clock = FakeClock(100.0)
+    tracker = SpeakingTracker(clock=clock)
+    events = []
+    tracker.subscribe(events.append)
+
+    tracker.note_audio(CHUNK_100MS)
+    clock.now += 0.05
+    tracker.interrupt()
+    assert not tracker.speaking
+    assert events[-1].kind == "end"
+    assert events[-1].interrupted
+    assert events[-1].duration == pytest.approx(0.05)
+    assert events[-1].to_dict()["speaking"] is False
+
+    tracker.interrupt()  # Already silent - no second event
+    assert len(events) == 2
+
+
+def test_unsubscribe_and_failing_subscriber():
+    tracker = SpeakingTracker()
+    seen = []
+    unsubscribe = tracker.subscribe(seen.append)
+    tracker.subscribe(lambda e: 1 / 0)  # Must not break the others
+    tracker.note_audio(CHUNK_100MS)
+    unsubscribe()
+    tracker.interrupt()
+    assert [e.kind for e in seen] == ["start"]
+
+
+@pytest.mark.asyncio
+async def test_run_ends_after_audio_and_hangover():
+    tracker = SpeakingTracker(hangover=0.05)
+    events = []
+    tracker.subscribe(events.append)
+    task = asyncio.create_task(tracker.run())
+    await asyncio.sleep(0)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(3):
+        tracker.note_audio(CHUNK_100MS)
+        await asyncio.sleep(0.02)
+    assert tracker.speaking
+
+    while tracker.speaking and loop.time() - start < 2:
+        await asyncio.sleep(0.01)
+    elapsed = loop.time() - start
+    assert not tracker.speaking
+    assert 0.3 <= elapsed < 0.6  # 300 ms of audio + 50 ms hangover
+    assert [e.kind for e in events] == ["start", "end"]
+
+    # The same task handles the next utterance
+    tracker.note_audio(CHUNK_100MS)
+    await asyncio.sleep(0.25)
+    assert [e.kind for e in events] == ["start", "end", "start", "end"]
+    task.cancel()
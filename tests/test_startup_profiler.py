@@ -0,0 +1,72 @@
+"""
+Tests for lazy imports and the startup profiler (phase marks, -X importtime parsing).
+"""
+import sys
+import textwrap
+
+import pytest
+
+import startup_profiler
+from lazy_imports import lazy_module
+from startup_profiler import StartupProfiler, imported_heavy_modules, parse_importtime
+
+SAMPLE = textwrap.dedent("""\
+    import time: self [us] | cumulative | imported package
+    import time:       166 |        166 |       _json
+    import time:       412 |        577 |     json.scanner
+    import time:       403 |       6941 |   json.decoder
+    import time:       224 |       7568 | json
+    import time:      5000 |      90000 |   cv2
+    import time:       100 |     100000 | server
+""")
+
+
+@pytest.fixture
+def slow_module(tmp_path, monkeypatch):
+    (tmp_path / "rex_slow_mod.py").write_text("LOADED = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "rex_slow_mod"
+    sys.modules.pop("rex_slow_mod", None)
+
+
+def test_lazy_module_imports_on_first_attribute(slow_module):
+    module = lazy_module(slow_module)
+    assert slow_module not in sys.modules and not module.loaded
+
+    assert module.LOADED is True
+    assert module.loaded and slow_module in sys.modules
+    assert slow_module in startup_profiler.profiler.report()["lazy_imports_ms"]
+
+
+def test_lazy_module_missing_raises_on_use():
+    module = lazy_module("rex_module_that_does_not_exist")
+    with pytest.raises(ModuleNotFoundError):
+        module.anything
+
+
+def test_marks_keep_first_time_unless_overridden():
+    times = iter([10.0, 10.5, 11.0, 12.0])
+    profiler = StartupProfiler(t0=10.0, clock=lambda: next(times))
+    assert profiler.mark("imports") == 0.0
+    assert profiler.mark("imports") == 0.0
+    assert profiler.mark("imports", once=False) == 1.0
+    profiler.mark("first_status_emit")
+    assert profiler.report()["phases_ms"] == {"imports": 1000.0, "first_status_emit": 2000.0}
+
+
+def test_parse_importtime_depths_and_totals():
+    entries = parse_importtime(SAMPLE)
+    assert [(e.module, e.depth) for e in entries] == [
+        ("_json", 3), ("json.scanner", 2), ("json.decoder", 1), ("json", 0), ("cv2", 1), ("server", 0)]
+    assert startup_profiler.total_ms(entries, "server") == 100.0
+    assert imported_heavy_modules(entries) == ["cv2"]
+    # Parent first, cheap imports hidden
+    tree = startup_profiler.format_tree(entries, min_ms=7.0).splitlines()
+    assert [line.split("ms")[1].strip() for line in tree] == ["server", "cv2", "json"]
+
+
+def test_import_tree_runs_fresh_interpreter(slow_module, tmp_path):
+    entries = startup_profiler.import_tree(slow_module, cwd=str(tmp_path))
+    assert startup_profiler.total_ms(entries, slow_module) is not None
+    with pytest.raises(RuntimeError):
+        startup_profiler.import_tree("rex_module_that_does_not_exist", cwd=str(tmp_path))
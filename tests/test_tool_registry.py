@@ -0,0 +1,207 @@
+"""
+Tests for the table-driven tool registry (dispatch, confirmation policy, stats).
+"""
+import asyncio
+
+import pytest
+
+from tool_registry import ToolRegistry, ToolSpec, no_response
+from tools import tool_specs, tools_list
+from tests.conftest import FakeClock
+
+
+def test_declarations_come_from_specs():
+    names = [d["name"] for d in tools_list[0]["function_declarations"]]
+    assert len(names) == len(set(names))
+    assert tools_list[0]["function_declarations"] == ToolRegistry(tool_specs).declarations()
+    assert names[:4] == ["run_web_agent", "create_project", "switch_project", "list_projects"]
+    assert "run_security_tool" in names
+    # Handler-only tools are not offered to the model
+    assert "generate_cad" not in names
+    assert {spec.name for spec in tool_specs} >= set(names)
+
+
+def test_spec_validation():
+    with pytest.raises(ValueError):
+        ToolSpec("a", {"name": "b"})
+    with pytest.raises(ValueError):
+        ToolSpec("a", confirmation="sometimes")
+    registry = ToolRegistry([ToolSpec("a")])
+    with pytest.raises(ValueError):
+        registry.register(ToolSpec("a"))
+
+
+@pytest.mark.asyncio
+async def test_blocking_dispatch_records_timing_and_sizes():
+    clock = FakeClock()
+
+    async def handler(args):
+        clock.now += 0.25
+        return f"hello {args['name']}"
+
+    registry = ToolRegistry([ToolSpec("greet")], clock=clock)
+    registry.bind("greet", handler)
+    payload = await registry.dispatch("greet", {"name": "rex"})
+    assert payload == {"result": "hello rex"}
+
+    stats = registry.stats()["greet"]
+    assert stats["calls"] == 1 and stats["errors"] == 0
+    assert stats["wall_time_ms"]["p50"] == pytest.approx(250.0)
+    assert stats["args_bytes"] == len('{"name": "rex"}')
+    assert stats["response_bytes"] == len('{"result": "hello rex"}')
+
+
+@pytest.mark.asyncio
+async def test_non_blocking_dispatch_acks_immediately():
+    release = asyncio.Event()
+    done = []
+
+    async def work(args):
+        await release.wait()
+        done.append(args["app_name"])
+
+    registry = ToolRegistry([ToolSpec("open_app", blocking=False,
+                                      ack=lambda args: f"Opening {args['app_name']}...")])
+    registry.bind("open_app", work)
+    payload = await registry.dispatch("open_app", {"app_name": "Notes"})
+    assert payload == {"result": "Opening Notes..."}
+    assert registry.stats()["open_app"]["in_flight"] == 1
+
+    release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert done == ["Notes"]
+    stats = registry.stats()["open_app"]
+    assert stats["in_flight"] == 0
+    assert stats["wall_time_ms"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported_not_raised():
+    def broken(args):
+        raise RuntimeError("boom")
+
+    async def broken_later(args):
+        raise RuntimeError("later")
+
+    registry = ToolRegistry([ToolSpec("now"), ToolSpec("later", blocking=False, ack="ok")])
+    registry.bind("now", broken)
+    registry.bind("later", broken_later)
+
+    payload = await registry.dispatch("now", {})
+    assert "boom" in payload["result"]
+    assert await registry.dispatch("later", {}) == {"result": "ok"}
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    stats = registry.stats()
+    assert stats["now"]["errors"] == 1
+    assert stats["later"]["errors"] == 1
+    assert "later" in stats["later"]["last_error"]
+
+    with pytest.raises(KeyError):
+        await registry.dispatch("missing", {})
+
+
+@pytest.mark.asyncio
+async def test_no_response_and_method_binding():
+    class Owner:
+        def __init__(self):
+            self.calls = []
+
+        def _tool_fire(self, args):
+            self.calls.append(args)
+
+    owner = Owner()
+    registry = ToolRegistry([ToolSpec("fire", response=no_response), ToolSpec("unbound")])
+    assert registry.bind_methods(owner) == ["unbound"]
+    assert await registry.dispatch("fire", {"x": 1}) is None
+    assert owner.calls == [{"x": 1}]
+
+
+def test_confirmation_policy():
+    registry = ToolRegistry([ToolSpec("ask"), ToolSpec("shell", confirmation="always"),
+                             ToolSpec("quiet", confirmation="never")])
+    assert registry.requires_confirmation("ask", {}) is True
+    assert registry.requires_confirmation("ask", {"ask": False}) is False
+    assert registry.requires_confirmation("ask", {}, master_control=True) is False
+    assert registry.requires_confirmation("shell", {"shell": False}, master_control=True) is True
+    assert registry.requires_confirmation("quiet", {}) is False
+
+    # Nobody to ask (no confirmation callback): denied, even under Master Control for "always"
+    assert registry.confirmation_decision("shell", {}, master_control=True) == "ask"
+    assert registry.confirmation_decision("shell", {"shell": False}, master_control=True, can_ask=False) == "deny"
+    assert registry.confirmation_decision("ask", {}, can_ask=False) == "deny"
+    assert registry.confirmation_decision("ask", {}, master_control=True, can_ask=False) == "allow"
+    assert registry.confirmation_decision("quiet", {}, can_ask=False) == "allow"
+
+    registry.record_denied("ask")
+    assert registry.stats()["ask"]["denied"] == 1
+    assert "quiet" not in registry.stats()
+
+
+class Call:
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_concurrently_in_call_order():
+    registry = ToolRegistry([ToolSpec("status"), ToolSpec("read")])
+
+    async def run_call(call):
+        await asyncio.sleep(call.delay)
+        return call.name
+
+    calls = [Call("status", 0.05), Call("read", 0.01), Call("status", 0.03)]
+    batch = await registry.run_batch(calls, run_call)
+    assert batch.results == ["status", "read", "status"]
+    assert batch.wall_s < 0.08  # Sequential would be ~0.09 s
+    assert batch.serial_s >= 0.085
+    assert batch.saved_s > 0.0
+
+
+@pytest.mark.asyncio
+async def test_batch_barriers_and_concurrency_limits():
+    registry = ToolRegistry([ToolSpec("switch", parallel=False), ToolSpec("print", max_concurrency=1),
+                             ToolSpec("read")])
+    log = []
+    running = {"print": 0}
+    peak = {"print": 0}
+
+    async def run_call(call):
+        log.append(("start", call.name))
+        if call.name == "print":
+            running["print"] += 1
+            peak["print"] = max(peak["print"], running["print"])
+        await asyncio.sleep(0.01)
+        if call.name == "print":
+            running["print"] -= 1
+        log.append(("end", call.name))
+        return call.name
+
+    calls = [Call("read"), Call("switch"), Call("print"), Call("print"), Call("read")]
+    batch = await registry.run_batch(calls, run_call)
+    assert batch.results == ["read", "switch", "print", "print", "read"]
+    # The barrier starts only after the first read ends, and everything else waits for it
+    switch_start = log.index(("start", "switch"))
+    assert log.index(("end", "read")) < switch_start
+    assert log[switch_start + 1] == ("end", "switch")
+    assert peak["print"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_reraises_after_segment_finishes():
+    registry = ToolRegistry([ToolSpec("ok"), ToolSpec("bad")])
+    finished = []
+
+    async def run_call(call):
+        if call.name == "bad":
+            raise RuntimeError("boom")
+        await asyncio.sleep(0.01)
+        finished.append(call.name)
+
+    with pytest.raises(RuntimeError):
+        await registry.run_batch([Call("bad"), Call("ok")], run_call)
+    assert finished == ["ok"]
@@ -0,0 +1,84 @@
+"""
+Tests for the VAD engines used by AudioLoop.listen_audio.
+"""
+import pytest
+import numpy as np
+
+from vad_engine import NumpyVadEngine, LegacyVadEngine, create_vad_engine
+
+CHUNK_SIZE = 1024
+RATE = 16000
+
+
+def tone(amplitude, freq=220.0):
+    t = np.arange(CHUNK_SIZE) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2").tobytes()
+
+
+def noise(amplitude, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, CHUNK_SIZE).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+class TestMeasurements:
+    """Energy and zero-crossing measurements."""
+
+    def test_silence(self):
+        frame = NumpyVadEngine().analyze(bytes(CHUNK_SIZE * 2))
+        assert frame.rms == 0
+        assert frame.zcr == 0.0
+
+    def test_empty_chunk(self):
+        frame = NumpyVadEngine().analyze(b"")
+        assert frame.rms == 0
+
+    def test_engines_agree(self):
+        for data in (tone(3000), noise(800), tone(12000, freq=1000)):
+            fast = NumpyVadEngine().analyze(data)
+            slow = LegacyVadEngine().analyze(data)
+            assert fast.rms == slow.rms
+            assert fast.zcr == pytest.approx(slow.zcr)
+
+    def test_zcr_separates_tone_from_hiss(self):
+        engine = NumpyVadEngine()
+        assert engine.analyze(tone(3000)).zcr < 0.1
+        assert engine.analyze(noise(3000)).zcr > 0.35
+
+
+class TestSpeechDecision:
+    """Threshold and noise floor behaviour."""
+
+    def test_loud_tone_is_speech(self):
+        engine = NumpyVadEngine(initial_floor=100)
+        frame = engine.analyze(tone(4000))
+        assert engine.is_speech(frame, 800)
+
+    def test_quiet_tone_is_not_speech(self):
+        engine = NumpyVadEngine(initial_floor=100)
+        frame = engine.analyze(tone(500))
+        assert not engine.is_speech(frame, 800)
+
+    def test_noise_floor_rises_with_background(self):
+        engine = NumpyVadEngine(initial_floor=50)
+        for i in range(300):
+            engine.analyze(noise(1500, seed=i))
+        assert engine.noise_floor > 1000
+        # A chunk barely over the static threshold no longer counts
+        assert engine.effective_threshold(800) > 800
+
+    def test_speech_does_not_raise_floor(self):
+        engine = NumpyVadEngine(initial_floor=100)
+        for i in range(200):
+            # Utterances of ~0.6 s separated by short pauses
+            engine.analyze(tone(8000) if i % 12 else noise(100, seed=i))
+        assert engine.noise_floor < 200
+
+    def test_reset(self):
+        engine = NumpyVadEngine()
+        engine.analyze(noise(1000))
+        engine.reset()
+        assert engine.noise_floor is None
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            create_vad_engine("webrtc")
@@ -0,0 +1,61 @@
+"""
+Tests for the voice latency metrics (histograms and turn spans).
+"""
+import pytest
+
+from voice_metrics import RollingHistogram, VoiceMetrics
+from tests.conftest import FakeClock
+
+
+def test_histogram_percentiles():
+    hist = RollingHistogram(window=1000)
+    for value in range(1, 101):
+        hist.record(float(value))
+    summary = hist.summary()
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p95"] == pytest.approx(95.05)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["max"] == 100
+
+
+def test_histogram_is_rolling():
+    hist = RollingHistogram(window=10)
+    for value in range(100):
+        hist.record(float(value))
+    summary = hist.summary()
+    assert summary["count"] == 10
+    assert summary["total"] == 100
+    assert summary["p50"] >= 90
+    assert RollingHistogram().summary() == {"count": 0, "total": 0}
+
+
+def test_record_since():
+    clock = FakeClock()
+    metrics = VoiceMetrics(clock=clock)
+    clock.now = 0.03
+    metrics.record_since("capture_to_send", 0.0)  # Start time carried with the queued item
+    metrics.record_since("capture_to_send", None)  # Item without one (e.g. a video frame)
+    summary = metrics.snapshot()["histograms"]["capture_to_send"]
+    assert summary["count"] == 1 and summary["p50"] == pytest.approx(30.0)
+
+
+def test_turn_spans():
+    clock = FakeClock()
+    metrics = VoiceMetrics(clock=clock)
+    metrics.mark("ignored")  # No open turn
+    metrics.begin_turn("speech_end", at=1.0)
+    clock.now = 1.4
+    metrics.mark("first_model_audio")
+    clock.now = 1.5
+    metrics.mark("first_model_audio")  # First mark wins
+    clock.now = 3.4
+    metrics.end_turn()
+
+    snapshot = metrics.snapshot()
+    turn = snapshot["turns"][-1]
+    assert turn["cause"] == "speech_end"
+    assert turn["marks_ms"] == {"first_model_audio": pytest.approx(400.0)}
+    assert turn["duration_ms"] == pytest.approx(2400.0)
+    assert snapshot["histograms"]["turn_duration"]["p50"] == pytest.approx(2000.0)
+    assert metrics.current_turn is None